@@ -85,6 +85,10 @@ helps[
     long-summary: |
                   This command relies on and may install dependent Cython package (uamqp) upon first execution.
                   https://github.com/Azure/azure-uamqp-python
+
+                  The monitor reconnects automatically when its connection expires. When message ids are
+                  provided with --wait-on-msg, the command exits once feedback for every message is received
+                  (or the timeout elapses) and outputs the outcome counts and any ids still outstanding.
     examples:
     - name: Basic usage
       text: >
@@ -99,6 +103,9 @@ helps[
     - name: Exit feedback monitor upon receiving a message with specific id (uuid)
       text: >
         az iot hub monitor-feedback -n {iothub_name} -d {device_id} -w {message_id}
+    - name: Wait up to 10 minutes for feedback on several messages and output delivery outcome stats
+      text: >
+        az iot hub monitor-feedback -n {iothub_name} -w {message_id1} {message_id2} {message_id3} --timeout 600
 """
 
 helps[
@@ -234,6 +241,10 @@ helps[
     long-summary: |
                   Currently etags and key type `swap` are not supported for bulk key regeneration.
                   Bulk Key regeneration will yeild a different output format from single device key regeneration.
+                  Bulk key regeneration sends batches of devices concurrently, reducing concurrency when the hub throttles
+                  requests. Use --checkpoint-file to be able to resume an interrupted bulk key regeneration, skipping
+                  devices whose keys were renewed by a completed batch. Batches still in flight when the run stops
+                  may be renewed again.
     examples:
       - name: Renew the primary key.
         text: az iot hub device-identity renew-key -d {device_id} -n {iothub_name} --kt primary
@@ -243,6 +254,8 @@ helps[
         text: az iot hub device-identity renew-key -d {device_id} {device_id} -n {iothub_name} --kt secondary --include-modules
       - name: Renew the both keys for all devices within the hub.
         text: az iot hub device-identity renew-key -d * -n {iothub_name} --kt both
+      - name: Renew the primary key for all devices within the hub, resuming from a previous run if it was interrupted.
+        text: az iot hub device-identity renew-key -d * -n {iothub_name} --kt primary --checkpoint-file renew-key.ndjson
 """
 
 helps[
@@ -1062,6 +1075,14 @@ helps[
 ] = """
     type: command
     short-summary: List individual device enrollments in an Azure IoT Hub Device Provisioning Service.
+    examples:
+    - name: List all individual enrollments.
+      text: >
+        az iot dps enrollment list --dps-name {dps_name} -g {resource_group_name}
+    - name: Stream all individual enrollments as newline delimited json, including only a few fields.
+      text: >
+        az iot dps enrollment list --dps-name {dps_name} -g {resource_group_name} --top -1 --stream
+        --fields registrationId deviceId provisioningStatus > {file_path}
 """
 
 helps[
@@ -1193,6 +1214,57 @@ helps[
     short-summary: Delete an individual device enrollment in an Azure IoT Hub Device Provisioning Service.
 """
 
+helps[
+    "iot dps enrollment bulk"
+] = """
+    type: group
+    short-summary: Create, update or delete many individual device enrollments using the DPS bulk enrollment operation.
+    long-summary: |
+        Enrollments are submitted in requests of up to 10 enrollments, several requests at a time. Throttled
+        requests are retried with backoff. Failures are reported per enrollment and can be written to a retry file.
+"""
+
+helps[
+    "iot dps enrollment bulk create"
+] = """
+    type: command
+    short-summary: Create individual device enrollments in bulk from a file.
+    examples:
+    - name: Create the enrollments in a JSON array or newline delimited JSON file.
+      text: >
+        az iot dps enrollment bulk create --dps-name {dps_name} -g {resource_group_name} --enrollment-file enrollments.json
+    - name: Create enrollments with more concurrent requests and keep failed enrollments for another run.
+      text: >
+        az iot dps enrollment bulk create --dps-name {dps_name} -g {resource_group_name} --enrollment-file enrollments.json
+        --max-workers 16 --retry-file failed.json
+"""
+
+helps[
+    "iot dps enrollment bulk update"
+] = """
+    type: command
+    short-summary: Update individual device enrollments in bulk from a file.
+    examples:
+    - name: Update the enrollments in a file.
+      text: >
+        az iot dps enrollment bulk update --dps-name {dps_name} -g {resource_group_name} --enrollment-file enrollments.json
+    - name: Update the enrollments in a file only if their etags still match.
+      text: >
+        az iot dps enrollment bulk update --dps-name {dps_name} -g {resource_group_name} --enrollment-file enrollments.json
+        --etag-match
+"""
+
+helps[
+    "iot dps enrollment bulk delete"
+] = """
+    type: command
+    short-summary: Delete individual device enrollments in bulk from a file.
+    examples:
+    - name: Delete the enrollments listed in a file of registration ids, one per line.
+      text: >
+        az iot dps enrollment bulk delete --dps-name {dps_name} -g {resource_group_name} --enrollment-file ids.txt
+"""
+
 helps[
     "iot dps enrollment registration"
 ] = """
@@ -1230,6 +1302,10 @@ helps[
 ] = """
     type: command
     short-summary: List enrollments groups in an Azure IoT Hub Device Provisioning Service.
+    examples:
+    - name: List enrollment group ids and allocation policies.
+      text: >
+        az iot dps enrollment-group list --dps-name {dps_name} -g {resource_group_name} --fields enrollmentGroupId allocationPolicy
 """
 
 helps[
@@ -1349,6 +1425,11 @@ helps[
     type: command
     short-summary: List device registrations for an enrollment group in an Azure IoT Hub Device
         Provisioning Service.
+    examples:
+    - name: Stream the assigned hub of every registration in an enrollment group as newline delimited json.
+      text: >
+        az iot dps enrollment-group registration list --dps-name {dps_name} -g {resource_group_name}
+        --group-id {enrollment_id} --top -1 --stream --fields registrationId assignedHub status
 """
 
 helps[
@@ -1373,6 +1454,10 @@ helps[
     type: command
     short-summary: Generate a derived device SAS key for an enrollment group in an Azure IoT Hub Device
         Provisioning Service.
+    long-summary: |
+                  To compute keys for many devices at once, provide registration IDs with --registration-id-file
+                  or --registration-id-pattern. The enrollment group key is retrieved once and the derived keys
+                  are streamed as csv or ndjson to --output-file or stdout.
     examples:
     - name: Compute the device key with the given symmetric key.
       text: >
@@ -1381,6 +1466,14 @@ helps[
       text: >
         az iot dps enrollment-group compute-device-key -g {resource_group_name} --dps-name {dps_name}
         --enrollment-id {enrollment_id} --registration-id {registration_id}
+    - name: Compute device keys for 100,000 registration IDs with the given enrollment group, writing csv to a file.
+      text: >
+        az iot dps enrollment-group compute-device-key -g {resource_group_name} --dps-name {dps_name}
+        --enrollment-id {enrollment_id} --registration-id-pattern 'sensor-{000001..100000}' --output-file {file_path}
+    - name: Compute device keys for the registration IDs in a file using all CPUs, writing ndjson to stdout.
+      text: >
+        az iot dps enrollment-group compute-device-key --key {enrollement_group_symmetric_key}
+        --registration-id-file {file_path} --output-format ndjson --max-workers 0
 """
 
 helps[
@@ -33,6 +33,7 @@ from azext_iot.common.shared import (
     AuthenticationType,
     AuthenticationTypeDataplane,
     RenewKeyType,
+    BatchOutputFormatType,
 )
 from azext_iot._validators import mode2_iot_login_handler, process_top
 from azext_iot.assets.user_messages import info_param_properties_device
@@ -399,7 +400,8 @@ def load_arguments(self, _):
             "poll_interval",
             options_list=["--poll-interval", "--interval"],
             type=int,
-            help="Interval in seconds that job status will be checked if --wait flag is passed in.",
+            help="Interval in seconds that job status will be checked if --wait flag is passed in. "
+            "The interval grows while the job is queued and shrinks as the job nears completion.",
         )
         context.argument(
             "poll_duration",
@@ -416,6 +418,33 @@ def load_arguments(self, _):
             arg_type=get_enum_type(JobCreateType),
         )
 
+    with self.argument_context("iot hub job watch") as context:
+        context.argument(
+            "job_ids",
+            options_list=["--job-ids", "--ids"],
+            nargs="+",
+            help="Space-separated list of job Ids to watch.",
+        )
+        context.argument(
+            "output_file",
+            options_list=["--output-file", "--of"],
+            help="File to write job progress to as newline delimited json. "
+            "If omitted, job progress is streamed to stdout.",
+        )
+        context.argument(
+            "poll_interval",
+            options_list=["--poll-interval", "--interval"],
+            type=int,
+            help="Base interval in seconds between job status checks. The interval grows while a job is queued "
+            "or scheduled, shrinks as a running job nears completion and grows when the hub throttles requests.",
+        )
+        context.argument(
+            "poll_duration",
+            options_list=["--poll-duration", "--duration"],
+            type=int,
+            help="Total duration in seconds where job status will be checked.",
+        )
+
     with self.argument_context("iot hub monitor-events") as context:
         context.argument("timeout", arg_type=event_timeout_type)
         context.argument("properties", arg_type=event_msg_prop_type)
@@ -436,7 +465,16 @@ def load_arguments(self, _):
         context.argument(
             "wait_on_id",
             options_list=["--wait-on-msg", "-w"],
-            help="Feedback monitor will block until a message with specific id (uuid) is received.",
+            nargs="+",
+            help="Feedback monitor will block until feedback for all of the space-separated message ids (uuid) "
+            "is received. When waiting on several message ids or with --timeout, delivery outcome and latency "
+            "stats are output, otherwise the message id is output.",
+        )
+        context.argument(
+            "timeout",
+            options_list=["--timeout", "--to", "-t"],
+            type=int,
+            help="Maximum seconds to wait for feedback. Use 0 for infinity.",
         )
 
     with self.argument_context("iot hub device-identity") as context:
@@ -492,6 +530,20 @@ def load_arguments(self, _):
             arg_type=get_three_state_flag(),
             help="Hide the progress bar for bulk key regeneration.",
         )
+        context.argument(
+            "checkpoint_file",
+            options_list=["--checkpoint-file", "--cf"],
+            help="File recording the devices and modules whose keys were renewed. If the file exists, devices and "
+            "modules it records are skipped, so an interrupted bulk key regeneration can be resumed. "
+            "Keys are never written to the file.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of concurrent bulk key regeneration requests. Concurrency ramps up to this "
+            "limit and is halved whenever the hub throttles requests.",
+        )
 
     with self.argument_context("iot hub device-identity export") as context:
         context.argument(
@@ -982,6 +1034,20 @@ def load_arguments(self, _):
             help="Name or hostname of the Azure IoT Hub Device Provisioning Service. Required if --login is not provided.",
             arg_group="Device Provisioning Service Identifier"
         )
+        context.argument(
+            "fields",
+            options_list=["--fields"],
+            nargs="+",
+            help="Space-separated list of fields to include for each result. Nested fields use dot notation, "
+            "for example 'registrationState.assignedHub'. Use to drop large attestation details from results.",
+        )
+        context.argument(
+            "stream",
+            options_list=["--stream"],
+            arg_type=get_three_state_flag(),
+            help="Write each result to stdout as a line of json as pages are retrieved instead of returning a "
+            "single list once all pages have been retrieved.",
+        )
         context.argument(
             "initial_twin_properties",
             options_list=["--initial-twin-properties", "--props"],
@@ -1168,6 +1234,35 @@ def load_arguments(self, _):
             help="TPM endorsement key for a TPM device.",
         )
 
+    with self.argument_context("iot dps enrollment bulk") as context:
+        context.argument(
+            "enrollment_file",
+            options_list=["--enrollment-file", "--ef"],
+            help="Path to a file containing a JSON array of individual enrollments or one enrollment JSON "
+            "object per line. Each enrollment uses the DPS service enrollment schema and requires a "
+            "'registrationId'. For delete, lines may also be bare registration ids.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of bulk requests, each containing up to 10 enrollments, to run concurrently.",
+        )
+        context.argument(
+            "retry_file",
+            options_list=["--retry-file", "--rf"],
+            help="Path of a file to write enrollments that failed to. The file uses the same format "
+            "as --enrollment-file so it can be provided as input to a subsequent run.",
+        )
+
+    with self.argument_context("iot dps enrollment bulk update") as context:
+        context.argument(
+            "etag_match",
+            options_list=["--etag-match"],
+            arg_type=get_three_state_flag(),
+            help="Only update enrollments whose 'etag' in the enrollment file matches the service etag.",
+        )
+
     with self.argument_context("iot dps enrollment registration") as context:
         context.argument(
             "registration_id",
@@ -1244,6 +1339,41 @@ def load_arguments(self, _):
             "from the supplied symmetric key without further validation. All other command "
             "parameters aside from registration ID will be ignored.",
         )
+        context.argument(
+            "registration_id_file",
+            options_list=["--registration-id-file", "--rf"],
+            help="Path to a file containing one registration ID per line. Computes a device key for each "
+            "registration ID and writes the results to --output-file or stdout.",
+            arg_group="Batch",
+        )
+        context.argument(
+            "registration_id_pattern",
+            options_list=["--registration-id-pattern", "--rp"],
+            help="Registration ID pattern with an inclusive numeric range, for example 'sensor-{1..100000}'. "
+            "Leading zeros in the range start are kept as padding, for example 'sensor-{000001..100000}'.",
+            arg_group="Batch",
+        )
+        context.argument(
+            "output_file",
+            options_list=["--output-file", "--of"],
+            help="Path of the file to write batch results to. If omitted, results are written to stdout.",
+            arg_group="Batch",
+        )
+        context.argument(
+            "output_format",
+            options_list=["--output-format", "--format"],
+            arg_type=get_enum_type(BatchOutputFormatType),
+            help="Format of batch results. csv writes a header row followed by registrationId,deviceKey rows and "
+            "ndjson writes one json object per line.",
+            arg_group="Batch",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of processes used to compute device keys. Use 0 for the number of CPUs.",
+            arg_group="Batch",
+        )
 
     with self.argument_context("iot dps registration") as context:
         context.argument("registration_id", help="ID of device registration.")
@@ -36,13 +36,38 @@ def load_central_help():
     ] = """
         type: command
         short-summary: Query device telemetry or property data with IoT Central Query Language.
-        long-summary: For query syntax details, visit https://docs.microsoft.com/en-us/azure/iot-central/core/howto-query-with-rest-api.
+        long-summary: |
+            For query syntax details, visit https://docs.microsoft.com/en-us/azure/iot-central/core/howto-query-with-rest-api.
+
+            Continuation tokens are followed until all rows are returned. With --output-file or --output-format,
+            rows are streamed as ndjson or csv while they are downloaded instead of being returned at the end.
+
+            With --start-time and --end-time, the query is bounded to that time range and rows are streamed.
+            Use --window-size to split a large time range into windows that are queried concurrently. Each window
+            runs the query separately, so --window-size cannot be used with queries using TOP or ORDER BY, and
+            aggregations apply to each window.
         examples:
           - name: Query device telemetry
             text: >
               az iot central query
               --app-id {appid}
               --query-string {query_string}
+          - name: Stream query results to a csv file
+            text: >
+              az iot central query
+              --app-id {appid}
+              --query-string {query_string}
+              --output-file telemetry.csv
+              --output-format csv
+          - name: Stream a week of telemetry as ndjson, querying six hour windows concurrently
+            text: >
+              az iot central query
+              --app-id {appid}
+              --query-string "SELECT $id, $ts, temperature FROM dtmi:contoso:sensor;1"
+              --start-time 2023-01-01T00:00:00Z
+              --end-time 2023-01-08T00:00:00Z
+              --window-size PT6H
+              --max-workers 8
         """
 
     _load_central_devices_help()
@@ -485,6 +510,35 @@ def _load_central_devices_help():
             --device-id {deviceid}
     """
 
+    helps[
+        "iot central device registration-info-batch"
+    ] = """
+        type: command
+        short-summary: Get registration info on all devices in an IoT Central app.
+        long-summary: |
+            Devices are listed page by page, and the credentials and DPS registration state of the devices in
+            each page are fetched concurrently. Registration info is written as newline delimited json while the
+            device list is streamed, so memory use does not grow with the number of devices.
+
+            With --checkpoint-file, progress is saved after each page. Rerunning the command with the same
+            checkpoint file and output file resumes an interrupted run from the last complete page.
+
+            When an output file is given, a summary of device and DPS statuses is returned.
+
+        examples:
+        - name: Stream registration info on all devices to stdout
+          text: >
+            az iot central device registration-info-batch
+            --app-id {appid}
+        - name: Write registration info on all devices to a file, resuming from a checkpoint if one exists
+          text: >
+            az iot central device registration-info-batch
+            --app-id {appid}
+            --output-file registrations.ndjson
+            --checkpoint-file registrations.checkpoint.json
+            --max-workers 32
+    """
+
     helps[
         "iot central device attestation"
     ] = """
@@ -1404,6 +1458,36 @@ def _load_central_jobs_help():
           --job-id {jobId}
     """
 
+    helps[
+        "iot central job watch"
+    ] = """
+    type: command
+    short-summary: Watch a job's progress until it finishes.
+    long-summary: |
+        Polls the job status and its device status pages, writing a line of newline delimited json for every
+        device status transition and a progress line with status counts and success and failure rates whenever
+        anything changes.
+
+        Pages whose content has not changed are not downloaded again, and pages where every device has
+        already completed or failed are skipped on later polls.
+
+        When an output file is given, the final progress is returned once the job finishes.
+    examples:
+      - name: Stream device status transitions of a job until it finishes
+        text: >
+          az iot central job watch
+          --app-id {appid}
+          --job-id {jobId}
+      - name: Write job progress to a file, polling every 30 seconds for at most an hour
+        text: >
+          az iot central job watch
+          --app-id {appid}
+          --job-id {jobId}
+          --output-file job-progress.ndjson
+          --interval 30
+          --timeout 3600
+    """
+
 
 def _load_central_monitors_help():
 
@@ -1486,6 +1570,10 @@ def _load_central_monitors_help():
         - name: Filter device and specify an Event Hub consumer group to bind to.
           text: >
             az iot central diagnostics validate-messages --app-id {app_id} -d {device_id} --cg {consumer_group_name}
+        - name: Validate messages indefinitely, writing a summary of issue counts to a file every 5 minutes.
+          text: >
+            az iot central diagnostics validate-messages --app-id {app_id} --duration 0 --max-messages 0
+            --summary-file summary.json --summary-interval 300
     """
 
     helps[
@@ -1732,6 +1820,7 @@ def _load_central_edge_help():
     ] = """
         type: command
         short-summary: Add devices as children to a target edge device.
+        long-summary: Children are added concurrently and the result of each child is reported. The command fails if any child fails.
         examples:
         - name: Add space-separated list of device Ids as children to the target edge device.
           text: >
@@ -1746,6 +1835,7 @@ def _load_central_edge_help():
     ] = """
         type: command
         short-summary: Remove child devices from a target edge device.
+        long-summary: Children are removed concurrently and the result of each child is reported. The command fails if any child fails.
         examples:
         - name: Remove children.
           text: >
@@ -147,6 +147,7 @@ def load_central_commands(self, _):
         cmd_group.command("update", "update_device")
         cmd_group.command("delete", "delete_device")
         cmd_group.command("registration-info", "registration_info")
+        cmd_group.command("registration-info-batch", "registration_info_batch", is_experimental=True)
         cmd_group.command("show-credentials", "get_credentials")
         cmd_group.command("compute-device-key", "compute_device_key")
         cmd_group.command("manual-failover", "run_manual_failover")
@@ -243,6 +244,7 @@ def load_central_commands(self, _):
         cmd_group.command("stop", "stop_job")
         cmd_group.command("resume", "resume_job")
         cmd_group.command("get-devices", "get_job_devices")
+        cmd_group.command("watch", "watch_job", is_experimental=True)
         cmd_group.command("rerun", "rerun_job")
 
     with self.command_group(
@@ -5,7 +5,12 @@
 # --------------------------------------------------------------------------------------------
 # Dev note - think of this as a controller
 
-from azext_iot.central.common import API_VERSION, EDGE_ONLY_FILTER
+from azext_iot.central.common import (
+    API_VERSION,
+    DEVICE_REGISTRATION_MAX_WORKERS,
+    DEVICE_RELATIONSHIP_MAX_WORKERS,
+    EDGE_ONLY_FILTER,
+)
 from azext_iot.central.models.devicetwin import DeviceTwin
 from azext_iot.central.models.edge import EdgeModule
 from azext_iot.central.providers import (
@@ -15,6 +20,7 @@ from azext_iot.central.providers import (
 
 from typing import Optional, List, Any
 from azure.cli.core.azclierror import (
+    AzureResponseError,
     InvalidArgumentValueError,
     RequiredArgumentMissingError,
     ResourceNotFoundError,
@@ -192,6 +198,33 @@ def registration_info(
     )
 
 
+def registration_info_batch(
+    cmd,
+    app_id: str,
+    output_file: Optional[str] = None,
+    checkpoint_file: Optional[str] = None,
+    max_workers: int = DEVICE_REGISTRATION_MAX_WORKERS,
+    token=None,
+    api_version=API_VERSION,
+    central_dns_suffix=CENTRAL_ENDPOINT,
+) -> Optional[dict]:
+    if checkpoint_file and not output_file:
+        raise RequiredArgumentMissingError("An output file is required to resume from a checkpoint file.")
+    if max_workers < 1:
+        raise InvalidArgumentValueError("max workers must be at least 1")
+
+    provider = CentralDeviceProvider(
+        cmd=cmd, app_id=app_id, token=token, api_version=api_version
+    )
+
+    return provider.get_device_registration_info_batch(
+        output_file=output_file,
+        checkpoint_file=checkpoint_file,
+        max_workers=max_workers,
+        central_dns_suffix=central_dns_suffix,
+    )
+
+
 def run_command(
     cmd,
     app_id: str,
@@ -311,35 +344,13 @@ def list_children(
     central_dns_suffix=CENTRAL_ENDPOINT,
     api_version=API_VERSION,
 ) -> List[DeviceGa]:
-    children = []
     provider = CentralDeviceProvider(
         cmd=cmd, app_id=app_id, token=token, api_version=api_version
     )
 
-    # get iotedge device
-    edge_twin = provider.get_device_twin(
+    return provider.list_children(
         device_id=device_id, central_dns_suffix=central_dns_suffix
     )
-    edge_scope_id = edge_twin.device_twin.get("deviceScope")
-
-    # list all application device twins
-    devices = provider.list_devices(central_dns_suffix=central_dns_suffix)
-    for device in devices:
-        try:
-            twin = provider.get_device_twin(
-                device.id, central_dns_suffix=central_dns_suffix
-            )
-            device_scope_id = twin.device_twin.get("deviceScope")
-            if (
-                device_scope_id
-                and device_scope_id == edge_scope_id
-                and device.id != device_id  # skip current device
-            ):
-                children.append(device)
-        except Exception:
-            pass
-
-    return children
 
 
 def add_children(
@@ -347,25 +358,24 @@ def add_children(
     app_id: str,
     device_id: str,
     children_ids: List[str],
+    max_workers=DEVICE_RELATIONSHIP_MAX_WORKERS,
     token=None,
     central_dns_suffix=CENTRAL_ENDPOINT,
     api_version=API_VERSION,
 ):
-    from uuid import uuid4
-
     provider = CentralDeviceProvider(
         cmd=cmd, app_id=app_id, token=token, api_version=api_version
     )
 
-    return [
-        provider.add_relationship(
-            device_id=device_id,
-            target_id=child_id,
-            rel_id=str(uuid4()),
-            central_dns_suffix=central_dns_suffix,
-        )
-        for child_id in children_ids
-    ]
+    results = provider.add_relationships(
+        device_id=device_id,
+        target_ids=children_ids,
+        max_workers=max_workers,
+        central_dns_suffix=central_dns_suffix,
+    )
+
+    _raise_on_failed_children(results, action="add")
+    return results
 
 
 def remove_children(
@@ -373,6 +383,7 @@ def remove_children(
     app_id: str,
     device_id: str,
     children_ids: List[str],
+    max_workers=DEVICE_RELATIONSHIP_MAX_WORKERS,
     token=None,
     central_dns_suffix=CENTRAL_ENDPOINT,
     api_version=API_VERSION,
@@ -382,24 +393,33 @@ def remove_children(
         cmd=cmd, app_id=app_id, token=token, api_version=api_version
     )
 
-    rels = provider.list_relationships(
-        device_id=device_id, central_dns_suffix=central_dns_suffix
+    results = provider.delete_relationships(
+        device_id=device_id,
+        target_ids=children_ids,
+        max_workers=max_workers,
+        central_dns_suffix=central_dns_suffix,
     )
-    deleted = []
-    for rel in rels:
-        if rel.target in children_ids:
-            deleted.append(
-                provider.delete_relationship(
-                    device_id=device_id,
-                    rel_id=rel.id,
-                    central_dns_suffix=central_dns_suffix,
-                )
-            )
 
-    if not deleted:
+    if all(result["status"] == "notFound" for result in results):
         raise ForbiddenError(f"Childs {children_ids} cannot be removed.")
 
-    return deleted
+    _raise_on_failed_children(results, action="remove")
+    return results
+
+
+def _raise_on_failed_children(results: List[dict], action: str):
+    failed = [result for result in results if result["status"] == "failed"]
+    if not failed:
+        return
+
+    for result in results:
+        if result["status"] != "failed":
+            logger.warning("Child '%s': %s.", result["target"], result["status"])
+    raise AzureResponseError(
+        "Failed to {} children: {}".format(
+            action, "; ".join("'{}': {}".format(result["target"], result["error"]) for result in failed)
+        )
+    )
 
 
 def get_edge_device(
@@ -6,9 +6,9 @@
 # Dev note - think of this as a controller
 
 from azure.cli.core.azclierror import InvalidArgumentValueError
-from typing import List, Any
+from typing import List, Any, Optional
 from azext_iot.constants import CENTRAL_ENDPOINT
-from azext_iot.central.common import API_VERSION
+from azext_iot.central.common import API_VERSION, JOB_WATCH_INTERVAL_SEC
 from azext_iot.central.providers.job_provider import CentralJobProvider
 from azext_iot.central.models.ga_2022_07_31 import JobGa
 from azext_iot.common import utility
@@ -94,6 +94,35 @@ def get_job_devices(
     )
 
 
+def watch_job(
+    cmd,
+    app_id: str,
+    job_id: str,
+    output_file: Optional[str] = None,
+    interval: int = JOB_WATCH_INTERVAL_SEC,
+    timeout: int = 0,
+    token=None,
+    central_dns_suffix=CENTRAL_ENDPOINT,
+    api_version=API_VERSION,
+) -> Optional[dict]:
+    if interval < 1:
+        raise InvalidArgumentValueError("interval must be at least 1 second")
+    if timeout < 0:
+        raise InvalidArgumentValueError("timeout cannot be negative")
+
+    provider = CentralJobProvider(
+        cmd=cmd, app_id=app_id, api_version=api_version, token=token
+    )
+
+    return provider.watch_job(
+        job_id=job_id,
+        output_file=output_file,
+        interval=interval,
+        timeout=timeout,
+        central_dns_suffix=central_dns_suffix,
+    )
+
+
 def list_jobs(
     cmd,
     app_id: str,
@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------------------------
 
 
+from azure.cli.core.azclierror import InvalidArgumentValueError
 from azure.cli.core.commands import AzCliCommand
 from azext_iot.constants import CENTRAL_ENDPOINT
 from azext_iot.central.providers.monitor_provider import MonitorProvider
@@ -33,9 +34,13 @@ def validate_messages(
     duration=300,
     style="scroll",
     minimum_severity=Severity.warning.name,
+    summary_file=None,
+    summary_interval=60,
     token=None,
     central_dns_suffix=CENTRAL_ENDPOINT,
 ):
+    if summary_interval < 1:
+        raise InvalidArgumentValueError("Summary interval must be at least 1 second.")
     telemetry_args = TelemetryArguments(
         cmd,
         timeout=timeout,
@@ -58,6 +63,8 @@ def validate_messages(
         max_messages=max_messages,
         style=style,
         minimum_severity=Severity[minimum_severity],
+        summary_file=summary_file,
+        summary_interval=summary_interval,
         common_handler_args=common_handler_args,
     )
     provider = MonitorProvider(
@@ -5,22 +5,72 @@
 # --------------------------------------------------------------------------------------------
 # Command handling for query device telemetry or property data
 
+from datetime import timezone
+from typing import Optional, Union
+
+import isodate
+from azure.cli.core.azclierror import InvalidArgumentValueError, RequiredArgumentMissingError
+
 from azext_iot.constants import CENTRAL_ENDPOINT
-from azext_iot.central.common import API_VERSION_PREVIEW
+from azext_iot.central.common import API_VERSION_PREVIEW, QUERY_WINDOW_MAX_WORKERS
 from azext_iot.central.providers import CentralQueryProvider
 from azext_iot.central.models.v2022_06_30_preview import QueryReponsePreview
+from azext_iot.common.shared import BatchOutputFormatType
 
 
 def query_run(
     cmd,
     app_id: str,
     query_string: str,
+    output_file: Optional[str] = None,
+    output_format: Optional[str] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    window_size: Optional[str] = None,
+    max_workers: int = QUERY_WINDOW_MAX_WORKERS,
     token=None,
     central_dns_suffix=CENTRAL_ENDPOINT,
     api_version=API_VERSION_PREVIEW,
-) -> QueryReponsePreview:
+) -> Union[QueryReponsePreview, dict, None]:
     provider = CentralQueryProvider(
         cmd=cmd, app_id=app_id, query=query_string, api_version=api_version, token=token
     )
 
-    return provider.query_run(central_dns_suffix=central_dns_suffix)
+    if not any([output_file, output_format, start_time, end_time]):
+        if window_size:
+            raise RequiredArgumentMissingError("A window size requires --start-time and --end-time.")
+        return provider.query_run(central_dns_suffix=central_dns_suffix)
+
+    if bool(start_time) != bool(end_time):
+        raise RequiredArgumentMissingError("Both --start-time and --end-time are required to query a time range.")
+    if window_size and not start_time:
+        raise RequiredArgumentMissingError("A window size requires --start-time and --end-time.")
+    if max_workers < 1:
+        raise InvalidArgumentValueError("max workers must be at least 1")
+
+    try:
+        start = isodate.parse_datetime(start_time) if start_time else None
+        end = isodate.parse_datetime(end_time) if end_time else None
+        window = isodate.parse_duration(window_size) if window_size else None
+    except (isodate.ISO8601Error, ValueError) as e:
+        raise InvalidArgumentValueError(
+            "Start and end times must be ISO 8601 datetimes and the window size an ISO 8601 duration: {}".format(e)
+        )
+    if start and start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end and end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start and end <= start:
+        raise InvalidArgumentValueError("The end time must be later than the start time.")
+    if window is not None and (not hasattr(window, "total_seconds") or window.total_seconds() <= 0):
+        raise InvalidArgumentValueError("The window size must be a positive duration of days or less, like PT6H.")
+
+    return provider.query_stream(
+        output_file=output_file,
+        output_format=output_format or BatchOutputFormatType.ndjson.value,
+        start_time=start,
+        end_time=end,
+        window_size=window,
+        max_workers=max_workers,
+        central_dns_suffix=central_dns_suffix,
+    )
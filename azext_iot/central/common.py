@@ -18,6 +18,32 @@ EDGE_ONLY_FILTER = "type eq 'GatewayDevice' or type eq 'EdgeDevice'"
 API_VERSION = ApiVersion.ga.value
 API_VERSION_PREVIEW = ApiVersion.preview.value
 
+# Number of device ids combined into a single list devices $filter
+DEVICE_ID_FILTER_CHUNK_SIZE = 25
+DEVICE_TWIN_MAX_WORKERS = 16
+DEVICE_RELATIONSHIP_MAX_WORKERS = 8
+DEVICE_REGISTRATION_MAX_WORKERS = 16
+QUERY_WINDOW_MAX_WORKERS = 4
+
+# Job watch polling
+JOB_WATCH_INTERVAL_SEC = 10
+JOB_TERMINAL_STATUSES = ["complete", "completed", "failed", "cancelled", "stopped"]
+JOB_DEVICE_SUCCESS_STATUS = "completed"
+JOB_DEVICE_FAILURE_STATUS = "failed"
+
+# Shared HTTP session and request retry settings
+CENTRAL_AAD_RESOURCE = "https://apps.azureiotcentral.com"
+CENTRAL_SESSION_POOL_SIZE = 32
+CENTRAL_THROTTLE_MAX_TRIES = 5
+CENTRAL_THROTTLE_BACKOFF_SEC = 1
+# Throttled requests are retried for every method, service unavailable only for idempotent methods
+CENTRAL_RETRY_STATUS_CODES = [429]
+CENTRAL_IDEMPOTENT_RETRY_STATUS_CODES = [429, 503]
+CENTRAL_IDEMPOTENT_METHODS = ["GET", "PUT", "DELETE"]
+CENTRAL_METRICS_MAX_SAMPLES = 1000
+# Cached AAD tokens are refreshed this long before they expire
+CENTRAL_TOKEN_REFRESH_MARGIN_SEC = 300
+
 
 class DestinationType(Enum):
     """
@@ -20,6 +20,7 @@ from azext_iot.central.common import (
 from azure.cli.core.commands.parameters import get_three_state_flag, get_enum_type
 from azext_iot.monitor.models.enum import Severity
 from azext_iot.central.models.enum import ApiVersion
+from azext_iot.common.shared import BatchOutputFormatType
 from azext_iot._params import event_msg_prop_type, event_timeout_type
 
 severity_type = CLIArgumentType(
@@ -341,6 +342,21 @@ def load_central_arguments(self, _):
             help="The IoT Edge Module ID if the device type is IoT Edge.",
         )
 
+    with self.argument_context("iot central diagnostics validate-messages") as context:
+        context.argument(
+            "summary_file",
+            options_list=["--summary-file", "--sf"],
+            help="Path of a file to periodically write a summary of issues to, as csv if the file has a .csv "
+            "extension and json otherwise. Issues are aggregated into counts per device, template and issue type "
+            "with a few samples of each issue type instead of being kept, for long running validation.",
+        )
+        context.argument(
+            "summary_interval",
+            options_list=["--summary-interval", "--si"],
+            type=int,
+            help="Interval in seconds between writes of the summary file.",
+        )
+
     with self.argument_context("iot central role") as context:
         context.argument(
             "role_id",
@@ -457,6 +473,26 @@ def load_central_arguments(self, _):
             help="The API version for the requested operation.",
         )
 
+    with self.argument_context("iot central job watch") as context:
+        context.argument(
+            "output_file",
+            options_list=["--output-file", "--of"],
+            help="Path of the file to write device status transitions and job progress to as newline delimited "
+            "json. If omitted, they are streamed to stdout.",
+        )
+        context.argument(
+            "interval",
+            options_list=["--interval"],
+            type=int,
+            help="Number of seconds to wait between polls of the job status.",
+        )
+        context.argument(
+            "timeout",
+            options_list=["--timeout", "--to"],
+            type=int,
+            help="Maximum number of seconds to watch the job for. Use 0 to watch until the job finishes.",
+        )
+
     with self.argument_context("iot central job rerun") as context:
         context.argument(
             "rerun_id",
@@ -527,6 +563,48 @@ def load_central_arguments(self, _):
             options_list=["--query-string", "--qs"],
             help="Query clause to retrieve telemetry or property data.",
         )
+        context.argument(
+            "output_file",
+            options_list=["--output-file", "--of"],
+            help="Path of the file to stream result rows to. If omitted, streamed rows are written to stdout.",
+            arg_group="Streaming",
+        )
+        context.argument(
+            "output_format",
+            options_list=["--output-format", "--format"],
+            arg_type=get_enum_type(BatchOutputFormatType),
+            help="Format of streamed result rows. csv takes its columns from the first row and ndjson writes one "
+            "json object per line. Defaults to ndjson.",
+            arg_group="Streaming",
+        )
+        context.argument(
+            "start_time",
+            options_list=["--start-time", "--st"],
+            help="Start of the time range to query, as an ISO 8601 datetime. Rows with a timestamp from the start "
+            "time up to the end time are streamed. The query should not contain its own time filter.",
+            arg_group="Streaming",
+        )
+        context.argument(
+            "end_time",
+            options_list=["--end-time", "--et"],
+            help="End (exclusive) of the time range to query, as an ISO 8601 datetime.",
+            arg_group="Streaming",
+        )
+        context.argument(
+            "window_size",
+            options_list=["--window-size", "--ws"],
+            help="ISO 8601 duration, like PT6H, to split the time range into. Each window is queried separately "
+            "and rows are written in window order. Queries using TOP or ORDER BY are not supported, and aggregations "
+            "apply to each window.",
+            arg_group="Streaming",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of windows to query concurrently.",
+            arg_group="Streaming",
+        )
         context.argument(
             "api_version",
             options_list=["--api-version", "--av"],
@@ -661,6 +739,26 @@ def load_central_arguments(self, _):
             help="The module ID of the target module.",
         )
 
+    with self.argument_context("iot central device registration-info-batch") as context:
+        context.argument(
+            "output_file",
+            options_list=["--output-file", "--of"],
+            help="Path of the file to write registration info to as newline delimited json. "
+            "If omitted, registration info is streamed to stdout.",
+        )
+        context.argument(
+            "checkpoint_file",
+            options_list=["--checkpoint-file", "--cf"],
+            help="Path of a file to save progress to after each page of devices. If the file exists, the run "
+            "resumes from the last complete page and appends to the output file. Requires --output-file.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of devices to fetch credentials and DPS registration state for concurrently.",
+        )
+
     with self.argument_context("iot central device edge children") as context:
         context.argument(
             "children_ids",
@@ -668,6 +766,12 @@ def load_central_arguments(self, _):
             options_list=["--children-ids"],
             help="Space-separated list of children device ids.",
         )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of children to add or remove concurrently.",
+        )
 
     with self.argument_context("iot central enrollment-group") as context:
         context.argument(
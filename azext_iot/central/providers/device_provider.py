@@ -4,11 +4,19 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from typing import List
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional
 from azure.cli.core.azclierror import (
+    AzCLIError,
     AzureResponseError,
     ClientRequestError,
     CLIInternalError,
+    FileOperationError,
+    InvalidArgumentValueError,
     RequiredArgumentMissingError,
     ResourceNotFoundError,
 )
@@ -17,6 +25,12 @@ from azext_iot.central.models.devicetwin import DeviceTwin
 from azext_iot.central.models.edge import EdgeModule
 from azext_iot.constants import CENTRAL_ENDPOINT
 from azext_iot.central import services as central_services
+from azext_iot.central.common import (
+    DEVICE_ID_FILTER_CHUNK_SIZE,
+    DEVICE_REGISTRATION_MAX_WORKERS,
+    DEVICE_RELATIONSHIP_MAX_WORKERS,
+    DEVICE_TWIN_MAX_WORKERS,
+)
 from azext_iot.central.models.enum import DeviceStatus, ApiVersion
 from azext_iot.central.models.ga_2022_07_31 import (DeviceGa, RelationshipGa)
 from azext_iot.dps.services import global_service as dps_global_service
@@ -48,6 +62,7 @@ class CentralDeviceProvider:
         self._device_templates = {}
         self._device_credentials = {}
         self._device_registration_info = {}
+        self._device_scopes = {}
 
     def get_device(
         self,
@@ -94,6 +109,98 @@ class CentralDeviceProvider:
 
         return devices
 
+    def list_devices_by_id(
+        self,
+        device_ids: List[str],
+        central_dns_suffix=CENTRAL_ENDPOINT,
+    ) -> List[DeviceGa]:
+        """
+        Get devices by id, combining ids into $filter expressions instead of requesting each device.
+        """
+        devices = []
+        for i in range(0, len(device_ids), DEVICE_ID_FILTER_CHUNK_SIZE):
+            # single quotes in OData string literals are escaped by doubling them
+            filter = " or ".join(
+                "id eq '{}'".format(device_id.replace("'", "''"))
+                for device_id in device_ids[i:i + DEVICE_ID_FILTER_CHUNK_SIZE]
+            )
+            pages = central_services.device.list_device_pages(
+                cmd=self._cmd,
+                app_id=self._app_id,
+                token=self._token,
+                filter=filter,
+                central_dns_suffix=central_dns_suffix,
+                api_version=self._api_version,
+            )
+            for page, _ in pages:
+                devices.extend(page)
+
+        # add to cache
+        self._devices.update({device.id: device for device in devices})
+
+        return devices
+
+    def list_children(
+        self,
+        device_id: str,
+        max_workers: int = DEVICE_TWIN_MAX_WORKERS,
+        central_dns_suffix=CENTRAL_ENDPOINT,
+    ) -> List[DeviceGa]:
+        """
+        Children are the targets of the device's relationships. When the device has no relationships,
+        fall back to matching the device scope of every device in the application.
+        """
+        child_ids = list(
+            dict.fromkeys(
+                rel.target
+                for rel in self.list_relationships(device_id=device_id, central_dns_suffix=central_dns_suffix)
+                if rel.target and rel.target != device_id
+            )
+        )
+        if child_ids:
+            return self.list_devices_by_id(child_ids, central_dns_suffix=central_dns_suffix)
+
+        logger.debug("Device '%s' has no relationships, matching children by device scope.", device_id)
+        edge_scope_id = self.get_device_twin(
+            device_id=device_id, central_dns_suffix=central_dns_suffix
+        ).device_twin.get("deviceScope")
+        if not edge_scope_id:
+            return []
+
+        devices = [
+            device for device in self.list_devices(central_dns_suffix=central_dns_suffix) if device.id != device_id
+        ]
+        scopes = self.get_device_scopes(
+            [device.id for device in devices], max_workers=max_workers, central_dns_suffix=central_dns_suffix
+        )
+        return [device for device in devices if scopes.get(device.id) == edge_scope_id]
+
+    def get_device_scopes(
+        self,
+        device_ids: Iterable[str],
+        max_workers: int = DEVICE_TWIN_MAX_WORKERS,
+        central_dns_suffix=CENTRAL_ENDPOINT,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Get the device scope of each device from its twin. Twins are fetched concurrently and
+        scopes are cached, devices without a twin have a scope of None.
+        """
+
+        def _get_scope(device_id: str) -> Optional[str]:
+            try:
+                twin = self.get_device_twin(device_id, central_dns_suffix=central_dns_suffix)
+                return twin.device_twin.get("deviceScope")
+            except Exception as e:
+                logger.debug("Unable to get twin for device '%s': %s", device_id, e)
+                return None
+
+        pending = [device_id for device_id in dict.fromkeys(device_ids) if device_id not in self._device_scopes]
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(min(max_workers, len(pending)), 1)) as executor:
+                self._device_scopes.update(zip(pending, executor.map(_get_scope, pending)))
+
+        return {device_id: self._device_scopes.get(device_id) for device_id in device_ids}
+
     def create_device(
         self,
         device_id,
@@ -286,6 +393,81 @@ class CentralDeviceProvider:
 
         return result
 
+    def add_relationships(
+        self,
+        device_id: str,
+        target_ids: List[str],
+        max_workers: int = DEVICE_RELATIONSHIP_MAX_WORKERS,
+        central_dns_suffix=CENTRAL_ENDPOINT,
+    ) -> List[dict]:
+        """
+        Create a relationship from the device to each target concurrently.
+        Returns a result per target, in target order, with the relationship or the error.
+        """
+        from uuid import uuid4
+
+        def _add(target_id: str) -> dict:
+            relationship = self.add_relationship(
+                device_id=device_id,
+                target_id=target_id,
+                rel_id=str(uuid4()),
+                central_dns_suffix=central_dns_suffix,
+            )
+            return dict(vars(relationship))
+
+        return self._run_relationship_operations(device_id, target_ids, _add, max_workers)
+
+    def delete_relationships(
+        self,
+        device_id: str,
+        target_ids: List[str],
+        max_workers: int = DEVICE_RELATIONSHIP_MAX_WORKERS,
+        central_dns_suffix=CENTRAL_ENDPOINT,
+    ) -> List[dict]:
+        """
+        Delete the device's relationships to each target concurrently.
+        Returns a result per target, in target order. Targets without a relationship are reported as not found.
+        """
+        relationships = {}
+        for rel in self.list_relationships(device_id=device_id, central_dns_suffix=central_dns_suffix):
+            relationships.setdefault(rel.target, []).append(rel)
+
+        def _delete(target_id: str) -> dict:
+            rels = relationships.get(target_id)
+            if not rels:
+                raise ResourceNotFoundError(
+                    "No relationship found from '{}' to '{}'.".format(device_id, target_id)
+                )
+            for rel in rels:
+                self.delete_relationship(device_id=device_id, rel_id=rel.id, central_dns_suffix=central_dns_suffix)
+            return {"id": ",".join(rel.id for rel in rels)}
+
+        return self._run_relationship_operations(device_id, target_ids, _delete, max_workers)
+
+    def _run_relationship_operations(
+        self,
+        device_id: str,
+        target_ids: List[str],
+        operation: Callable[[str], dict],
+        max_workers: int,
+    ) -> List[dict]:
+        def _run(target_id: str) -> dict:
+            result = {"source": device_id, "target": target_id}
+            try:
+                result.update(operation(target_id))
+                result["status"] = "succeeded"
+            except ResourceNotFoundError as e:
+                result.update({"status": "notFound", "error": str(e)})
+            except Exception as e:
+                result.update({"status": "failed", "error": str(e)})
+            return result
+
+        target_ids = list(dict.fromkeys(target_ids))
+        if not target_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=max(min(max_workers, len(target_ids)), 1)) as executor:
+            return list(executor.map(_run, target_ids))
+
     def get_device_credentials(
         self,
         device_id,
@@ -319,35 +501,151 @@ class CentralDeviceProvider:
         device_status: DeviceStatus,
         central_dns_suffix=CENTRAL_ENDPOINT,
     ) -> dict:
-        dps_state = {}
         info = self._device_registration_info.get(device_id)
 
         if info:
             return info
 
         device = self.get_device(device_id, central_dns_suffix)
-        if device._device_status == DeviceStatus.provisioned:
-            credentials = self.get_device_credentials(
+        info = self._build_registration_info(
+            device,
+            lambda device_id: self.get_device_credentials(
                 device_id=device_id,
                 central_dns_suffix=central_dns_suffix,
-            )
-            id_scope = credentials["idScope"]
-            key = credentials["symmetricKey"]["primaryKey"]
-            dps_state = dps_global_service.get_registration_state(
-                id_scope=id_scope, key=key, device_id=device_id
-            )
-        dps_state = self._dps_populate_essential_info(dps_state, device._device_status)
-
-        info = {
-            "@device_id": device_id,
-            "dps_state": dps_state,
-            "device_registration_info": device.get_registration_info(),
-        }
+            ),
+        )
 
         self._device_registration_info[device_id] = info
 
         return info
 
+    def get_device_registration_info_batch(
+        self,
+        output_file: Optional[str] = None,
+        checkpoint_file: Optional[str] = None,
+        filter: Optional[str] = None,
+        max_workers: int = DEVICE_REGISTRATION_MAX_WORKERS,
+        central_dns_suffix=CENTRAL_ENDPOINT,
+    ) -> Optional[dict]:
+        """
+        Stream registration info for every device as newline delimited json, page by page.
+
+        Credentials and DPS registration state of the devices in a page are fetched concurrently, and nothing
+        is cached so memory use does not grow with the number of devices. After each page is written,
+        the position in the device list and the output file is saved to the checkpoint file, along with
+        the output file path, so an interrupted run can be resumed from the last complete page.
+        """
+        checkpoint = {
+            "appId": self._app_id,
+            "filter": filter,
+            "outputFile": os.path.abspath(output_file) if output_file else None,
+            "nextLink": None,
+            "offset": 0,
+            "total": 0,
+            "failed": 0,
+            "deviceStatuses": {},
+            "dpsStatuses": {},
+        }
+        resumed = False
+        if checkpoint_file and os.path.exists(checkpoint_file):
+            try:
+                with open(checkpoint_file, "r", encoding="utf-8") as f:
+                    saved_checkpoint = json.load(f)
+            except (OSError, ValueError) as e:
+                raise FileOperationError(f"Unable to read checkpoint file '{checkpoint_file}': {e}")
+            if (saved_checkpoint.get("appId"), saved_checkpoint.get("filter")) != (self._app_id, filter):
+                raise InvalidArgumentValueError(
+                    f"Checkpoint file '{checkpoint_file}' was created for a different app or filter."
+                )
+            if saved_checkpoint.get("outputFile") != checkpoint["outputFile"]:
+                raise InvalidArgumentValueError(
+                    f"Checkpoint file '{checkpoint_file}' was created for a different output file: "
+                    f"'{saved_checkpoint.get('outputFile') or 'stdout'}'."
+                )
+            if output_file and not os.path.exists(output_file):
+                raise FileOperationError(
+                    f"Output file '{output_file}' of the checkpointed run was not found, unable to resume."
+                )
+            checkpoint.update(saved_checkpoint)
+            resumed = True
+            if not checkpoint["nextLink"]:
+                logger.warning("Checkpoint file '%s' is for a completed run, nothing to resume.", checkpoint_file)
+                return self._registration_info_batch_summary(checkpoint, output_file)
+
+        def _get_credentials(device_id: str) -> dict:
+            return central_services.device.get_device_credentials(
+                cmd=self._cmd,
+                app_id=self._app_id,
+                device_id=device_id,
+                token=self._token,
+                central_dns_suffix=central_dns_suffix,
+                api_version=self._api_version,
+            )
+
+        def _get_info(device: DeviceGa) -> dict:
+            try:
+                return self._build_registration_info(device, _get_credentials)
+            except (AzCLIError, KeyError) as e:
+                return {"@device_id": device.id, "error": str(e)}
+
+        def _save_checkpoint():
+            temp_path = f"{checkpoint_file}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f)
+            os.replace(temp_path, checkpoint_file)
+
+        from tqdm import tqdm
+
+        pages = central_services.device.list_device_pages(
+            cmd=self._cmd,
+            app_id=self._app_id,
+            filter=filter,
+            token=self._token,
+            next_link=checkpoint["nextLink"],
+            central_dns_suffix=central_dns_suffix,
+        )
+        start = perf_counter()
+        output = open(output_file, "r+b" if resumed else "wb") if output_file else sys.stdout
+        progress = tqdm(initial=checkpoint["total"], desc="Device registration info", unit=" devices", ascii=" #")
+        try:
+            if resumed:
+                # discard anything written after the last complete page
+                output.seek(checkpoint["offset"])
+                output.truncate()
+            with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+                for devices, next_link in pages:
+                    lines = []
+                    for info in executor.map(_get_info, devices):
+                        lines.append(json.dumps(info) + "\n")
+                        if "error" in info:
+                            checkpoint["failed"] += 1
+                            continue
+                        device_status = info["device_registration_info"]["device_status"]
+                        dps_status = info["dps_state"]["status"] or "None"
+                        checkpoint["deviceStatuses"][device_status] = (
+                            checkpoint["deviceStatuses"].get(device_status, 0) + 1
+                        )
+                        checkpoint["dpsStatuses"][dps_status] = checkpoint["dpsStatuses"].get(dps_status, 0) + 1
+
+                    if output_file:
+                        output.write("".join(lines).encode("utf-8"))
+                        checkpoint["offset"] = output.tell()
+                    else:
+                        output.write("".join(lines))
+                    output.flush()
+
+                    checkpoint["total"] += len(devices)
+                    checkpoint["nextLink"] = next_link
+                    if checkpoint_file:
+                        _save_checkpoint()
+                    progress.update(len(devices))
+        finally:
+            progress.close()
+            if output_file:
+                output.close()
+
+        return self._registration_info_batch_summary(checkpoint, output_file, perf_counter() - start)
+
     def get_device_registration_summary(self, central_dns_suffix=CENTRAL_ENDPOINT):
         return central_services.device.get_device_registration_summary(
             cmd=self._cmd,
@@ -770,6 +1068,39 @@ class CentralDeviceProvider:
             central_dns_suffix=central_dns_suffix,
         )
 
+    def _build_registration_info(self, device: DeviceGa, get_credentials: Callable[[str], dict]) -> dict:
+        dps_state = {}
+        if device._device_status == DeviceStatus.provisioned:
+            credentials = get_credentials(device.id)
+            id_scope = credentials["idScope"]
+            key = credentials["symmetricKey"]["primaryKey"]
+            dps_state = dps_global_service.get_registration_state(
+                id_scope=id_scope, key=key, device_id=device.id
+            )
+        dps_state = self._dps_populate_essential_info(dps_state, device._device_status)
+
+        return {
+            "@device_id": device.id,
+            "dps_state": dps_state,
+            "device_registration_info": device.get_registration_info(),
+        }
+
+    def _registration_info_batch_summary(
+        self, checkpoint: dict, output_file: Optional[str], elapsed: Optional[float] = None
+    ) -> Optional[dict]:
+        if not output_file:
+            return None
+        summary = {
+            "total": checkpoint["total"],
+            "failed": checkpoint["failed"],
+            "deviceStatuses": checkpoint["deviceStatuses"],
+            "dpsStatuses": checkpoint["dpsStatuses"],
+            "outputFile": output_file,
+        }
+        if elapsed is not None:
+            summary["elapsedSeconds"] = round(elapsed, 3)
+        return summary
+
     def _dps_populate_essential_info(self, dps_info, device_status: DeviceStatus):
         error = {
             DeviceStatus.provisioned: "None.",
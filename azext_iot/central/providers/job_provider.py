@@ -4,12 +4,20 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-
-from typing import List
+import json
+import sys
+from time import perf_counter, sleep
+from typing import Callable, Dict, List, Optional
 from knack.log import get_logger
 from azure.cli.core.azclierror import AzureResponseError, ClientRequestError, ResourceNotFoundError
 from azext_iot.constants import CENTRAL_ENDPOINT
 from azext_iot.central import services as central_services
+from azext_iot.central.common import (
+    JOB_DEVICE_FAILURE_STATUS,
+    JOB_DEVICE_SUCCESS_STATUS,
+    JOB_TERMINAL_STATUSES,
+    JOB_WATCH_INTERVAL_SEC,
+)
 from azext_iot.central.models.ga_2022_07_31 import JobGa
 
 logger = get_logger(__name__)
@@ -189,3 +197,142 @@ class CentralJobProvider:
         self._jobs[job.id] = job
 
         return job
+
+    def watch_job(
+        self,
+        job_id: str,
+        output_file: Optional[str] = None,
+        interval: int = JOB_WATCH_INTERVAL_SEC,
+        timeout: int = 0,
+        central_dns_suffix=CENTRAL_ENDPOINT,
+    ) -> Optional[dict]:
+        """
+        Poll a job until it reaches a terminal status, writing device status transitions and job progress
+        as newline delimited json to the output file (or stdout).
+        """
+        watcher = JobDeviceStatusWatcher(
+            get_page=lambda url, etag: central_services.job.get_job_devices_page(
+                cmd=self._cmd,
+                app_id=self._app_id,
+                job_id=job_id,
+                token=self._token,
+                url=url,
+                etag=etag,
+                central_dns_suffix=central_dns_suffix,
+                api_version=self._api_version,
+            )
+        )
+
+        start = perf_counter()
+        output = open(output_file, "w", encoding="utf-8") if output_file else sys.stdout
+        progress = None
+        try:
+            while True:
+                job = central_services.job.get_job(
+                    cmd=self._cmd,
+                    app_id=self._app_id,
+                    job_id=job_id,
+                    token=self._token,
+                    central_dns_suffix=central_dns_suffix,
+                    api_version=self._api_version,
+                )
+                transitions = watcher.poll()
+                elapsed = perf_counter() - start
+
+                lines = [json.dumps(dict(event="deviceStatus", **transition)) for transition in transitions]
+                if transitions or not progress or progress["jobStatus"] != job.status:
+                    progress = watcher.progress(job.status, elapsed)
+                    lines.append(json.dumps(progress))
+                if lines:
+                    output.write("\n".join(lines) + "\n")
+                    output.flush()
+
+                if job.status in JOB_TERMINAL_STATUSES:
+                    break
+                if timeout and elapsed + interval > timeout:
+                    logger.warning("Stopped watching job '%s' after %s seconds.", job_id, timeout)
+                    break
+                sleep(interval)
+        finally:
+            if output_file:
+                output.close()
+
+        if output_file:
+            return dict(watcher.progress(job.status, perf_counter() - start), outputFile=output_file)
+
+
+class JobDeviceStatusWatcher(object):
+    """
+    Tracks per-device job status across polls of the paged job device status list.
+
+    Pages are requested with the etag of their previous content so unchanged pages are not downloaded again,
+    and pages where every device had already completed or failed are skipped by following their previous
+    next link, assuming device statuses keep their order in the list.
+    """
+
+    def __init__(self, get_page: Callable):
+        self._get_page = get_page
+        self._pages: List[dict] = []
+        self.statuses: Dict[str, str] = {}
+        self.polls = 0
+        self.pages_downloaded = 0
+        self.pages_unchanged = 0
+        self.pages_skipped = 0
+
+    def poll(self) -> List[dict]:
+        transitions = []
+        url = None
+        index = 0
+        while True:
+            cached = self._pages[index] if index < len(self._pages) else None
+            if cached and cached["url"] != url:
+                cached = None
+
+            if cached and cached["settled"]:
+                self.pages_skipped += 1
+            else:
+                page, etag = self._get_page(url, cached["etag"] if cached else None)
+                if page is None:
+                    self.pages_unchanged += 1
+                else:
+                    self.pages_downloaded += 1
+                    settled = True
+                    for device in page["value"]:
+                        status = device.get("status")
+                        previous = self.statuses.get(device["id"])
+                        if status != previous:
+                            self.statuses[device["id"]] = status
+                            transitions.append(
+                                {"deviceId": device["id"], "previousStatus": previous, "status": status}
+                            )
+                        settled = settled and status in [JOB_DEVICE_SUCCESS_STATUS, JOB_DEVICE_FAILURE_STATUS]
+                    cached = {"url": url, "etag": etag, "next": page.get("nextLink"), "settled": settled}
+                    self._pages[index:index + 1] = [cached]
+
+            url = cached["next"]
+            index += 1
+            if not url:
+                break
+
+        del self._pages[index:]
+        self.polls += 1
+        return transitions
+
+    def progress(self, job_status: str, elapsed: float) -> dict:
+        counts = {}
+        for status in self.statuses.values():
+            counts[status] = counts.get(status, 0) + 1
+        total = len(self.statuses)
+        return {
+            "event": "progress",
+            "jobStatus": job_status,
+            "elapsedSeconds": round(elapsed, 3),
+            "devices": total,
+            "statuses": counts,
+            "successRate": round(counts.get(JOB_DEVICE_SUCCESS_STATUS, 0) / total, 4) if total else 0,
+            "failureRate": round(counts.get(JOB_DEVICE_FAILURE_STATUS, 0) / total, 4) if total else 0,
+            "polls": self.polls,
+            "pagesDownloaded": self.pages_downloaded,
+            "pagesUnchanged": self.pages_unchanged,
+            "pagesSkipped": self.pages_skipped,
+        }
@@ -4,14 +4,34 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import csv
+import json
+import re
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Iterator, List, Optional, Tuple
+
 from knack.log import get_logger
+from azure.cli.core.azclierror import InvalidArgumentValueError
 
+from azext_iot.central.common import QUERY_WINDOW_MAX_WORKERS
 from azext_iot.central.models.v2022_06_30_preview import QueryReponsePreview
+from azext_iot.common.shared import BatchOutputFormatType
 from azext_iot.constants import CENTRAL_ENDPOINT
 from azext_iot.central import services as central_services
 
 logger = get_logger(__name__)
 
+_WHERE_CLAUSE = re.compile(
+    r"\bWHERE\b(?P<condition>.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|$)", re.IGNORECASE | re.DOTALL
+)
+_QUERY_TAIL = re.compile(r"(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|$)", re.IGNORECASE)
+# TOP and ORDER BY apply to the whole result, so they cannot be split across windows
+_WINDOW_UNSUPPORTED_CLAUSE = re.compile(r"\bTOP\b|\bORDER\s+BY\b", re.IGNORECASE)
+
 
 class CentralQueryProvider:
     def __init__(self, cmd, app_id: str, query: str, api_version: str, token=None):
@@ -47,3 +67,150 @@ class CentralQueryProvider:
         )
 
         return response
+
+    def query_stream(
+        self,
+        output_file: Optional[str] = None,
+        output_format: str = BatchOutputFormatType.ndjson.value,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        window_size: Optional[timedelta] = None,
+        max_workers: int = QUERY_WINDOW_MAX_WORKERS,
+        central_dns_suffix=CENTRAL_ENDPOINT,
+    ) -> Optional[dict]:
+        """
+        Run the query and write each page of rows to the output file (or stdout) as it is downloaded.
+
+        When a time range is given, the query is bounded to it. With a window size, the range is split into
+        sub-windows that are queried concurrently and written in time order, keeping at most max_workers
+        windows in memory. Queries using TOP or ORDER BY cannot be split into windows.
+        """
+        if window_size and _WINDOW_UNSUPPORTED_CLAUSE.search(self._query):
+            raise InvalidArgumentValueError(
+                "--window-size cannot be used with queries that use TOP or ORDER BY, as they apply to the whole result."
+            )
+        queries = [self._query]
+        if start_time and end_time:
+            queries = [
+                _bound_query_window(self._query, window_start, window_end)
+                for window_start, window_end in _split_query_windows(start_time, end_time, window_size)
+            ]
+
+        start = perf_counter()
+        first_row_seconds = None
+        rows = pages = 0
+        output = open(output_file, "w", encoding="utf-8", newline="") if output_file else sys.stdout
+        try:
+            writer = _QueryRowWriter(output, output_format)
+            for page in self._query_window_pages(queries, max_workers, central_dns_suffix):
+                if page and first_row_seconds is None:
+                    first_row_seconds = perf_counter() - start
+                writer.write(page)
+                output.flush()
+                rows += len(page)
+                pages += 1
+        finally:
+            if output_file:
+                output.close()
+
+        if output_file:
+            return {
+                "rows": rows,
+                "pages": pages,
+                "windows": len(queries),
+                "outputFile": output_file,
+                "elapsedSeconds": round(perf_counter() - start, 3),
+                "firstRowSeconds": round(first_row_seconds, 3) if first_row_seconds is not None else None,
+            }
+
+    def _query_window_pages(
+        self, queries: List[str], max_workers: int, central_dns_suffix=CENTRAL_ENDPOINT
+    ) -> Iterator[List[dict]]:
+        def _pages(query: str) -> Iterator[List[dict]]:
+            return central_services.query.query_pages(
+                cmd=self._cmd,
+                app_id=self._app_id,
+                query=query,
+                token=self._token,
+                central_dns_suffix=central_dns_suffix,
+                api_version=self._api_version,
+            )
+
+        if len(queries) == 1 or max_workers == 1:
+            for query in queries:
+                yield from _pages(query)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+            # keep a bounded number of windows in flight so memory use does not grow with the time range
+            pending = deque()
+            try:
+                for query in queries:
+                    pending.append(executor.submit(lambda q: list(_pages(q)), query))
+                    if len(pending) >= max_workers:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+class _QueryRowWriter(object):
+    """
+    Writes query result rows as newline delimited json or csv. Csv columns are taken from the first row,
+    and nested values are written as json.
+    """
+
+    def __init__(self, output, output_format: str):
+        self.output = output
+        self.output_format = output_format
+        self._csv_writer = None
+
+    def write(self, rows: List[dict]):
+        if self.output_format == BatchOutputFormatType.ndjson.value:
+            self.output.write("".join(json.dumps(row) + "\n" for row in rows))
+            return
+
+        for row in rows:
+            if not self._csv_writer:
+                self._csv_writer = csv.DictWriter(self.output, fieldnames=list(row), extrasaction="ignore")
+                self._csv_writer.writeheader()
+            self._csv_writer.writerow(
+                {key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in row.items()}
+            )
+
+
+def _split_query_windows(
+    start_time: datetime, end_time: datetime, window_size: Optional[timedelta] = None
+) -> List[Tuple[datetime, datetime]]:
+    if not window_size:
+        return [(start_time, end_time)]
+    windows = []
+    window_start = start_time
+    while window_start < end_time:
+        window_end = min(window_start + window_size, end_time)
+        windows.append((window_start, window_end))
+        window_start = window_end
+    return windows
+
+
+def _format_query_time(value: datetime) -> str:
+    if not value.tzinfo:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _bound_query_window(query: str, start_time: datetime, end_time: datetime) -> str:
+    """
+    Adds a [start_time, end_time) condition on the message timestamp to the WHERE clause of the query.
+    """
+    window = "$ts >= '{}' AND $ts < '{}'".format(_format_query_time(start_time), _format_query_time(end_time))
+    where = _WHERE_CLAUSE.search(query)
+    if where:
+        condition = where.group("condition").strip()
+        return "{}WHERE {} AND ({}) {}".format(
+            query[:where.start()], window, condition, query[where.end():]
+        ).strip()
+    tail = _QUERY_TAIL.search(query).start()
+    return "{} WHERE {} {}".format(query[:tail].strip(), window, query[tail:]).strip()
@@ -7,7 +7,7 @@
 
 from knack.util import to_snake_case, to_camel_case
 from requests import Response
-from knack.log import logging
+from knack.log import get_logger, logging
 
 from azure.cli.core.azclierror import (
     AzureResponseError,
@@ -16,12 +16,154 @@ from azure.cli.core.azclierror import (
 from azext_iot import constants
 from azext_iot.common import auth
 
+import atexit
 import requests
+import threading
+import time
 import uuid
+from collections import deque
+from datetime import datetime
 from importlib import import_module
+from azext_iot.central.common import (
+    CENTRAL_AAD_RESOURCE,
+    CENTRAL_METRICS_MAX_SAMPLES,
+    CENTRAL_IDEMPOTENT_METHODS,
+    CENTRAL_IDEMPOTENT_RETRY_STATUS_CODES,
+    CENTRAL_RETRY_STATUS_CODES,
+    CENTRAL_SESSION_POOL_SIZE,
+    CENTRAL_THROTTLE_BACKOFF_SEC,
+    CENTRAL_THROTTLE_MAX_TRIES,
+    CENTRAL_TOKEN_REFRESH_MARGIN_SEC,
+)
+from azext_iot.common.utility import latency_percentiles
 from azext_iot.central.models.enum import ApiVersion
 from azure.cli.core.util import should_disable_connection_verify
 
+logger = get_logger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+# Bearer tokens by resource, as (token, expiry timestamp)
+_aad_tokens = {}
+_aad_token_lock = threading.Lock()
+# Request latency by endpoint, only collected when debug logging is enabled
+_request_metrics = {}
+_request_metrics_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the keep-alive session shared by Central requests, sized for concurrent use.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=CENTRAL_SESSION_POOL_SIZE)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def get_bearer_token(cmd, resource=CENTRAL_AAD_RESOURCE) -> str:
+    """
+    Get an AAD bearer token for the resource, reusing a cached token until it is close to expiry.
+    """
+    with _aad_token_lock:
+        cached = _aad_tokens.get(resource)
+        if cached and cached[1] - CENTRAL_TOKEN_REFRESH_MARGIN_SEC > time.time():
+            return cached[0]
+        aad_token = auth.get_aad_token(cmd, resource=resource)
+        token = "Bearer {}".format(aad_token["accessToken"])
+        _aad_tokens[resource] = (token, _parse_token_expiry(aad_token.get("expiresOn")))
+        return token
+
+
+def _parse_token_expiry(expires_on) -> float:
+    # expiresOn is a local time string, tokens without a parsable expiry are only reused briefly
+    try:
+        return datetime.strptime(expires_on, "%Y-%m-%d %H:%M:%S.%f").timestamp()
+    except (TypeError, ValueError):
+        return time.time() + CENTRAL_TOKEN_REFRESH_MARGIN_SEC
+
+
+def _get_retry_delay(response: Response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return int(retry_after)
+    return CENTRAL_THROTTLE_BACKOFF_SEC * 2 ** (attempt - 1)
+
+
+def send_request(method: str, url: str, **kwargs) -> Response:
+    """
+    Send a request over the shared session, retrying throttled (429) responses with backoff.
+    Unavailable (503) responses are only retried for idempotent methods, since the service may
+    already have acted on the request. Keyword arguments are passed to requests.
+    """
+    kwargs.setdefault("verify", not should_disable_connection_verify())
+    retry_status_codes = (
+        CENTRAL_IDEMPOTENT_RETRY_STATUS_CODES
+        if method.upper() in CENTRAL_IDEMPOTENT_METHODS
+        else CENTRAL_RETRY_STATUS_CODES
+    )
+    for attempt in range(1, CENTRAL_THROTTLE_MAX_TRIES + 1):
+        start = time.perf_counter()
+        response = get_session().request(method=method.upper(), url=url, **kwargs)
+        _record_request_metric(method, url, time.perf_counter() - start, retry=attempt > 1)
+        if response.status_code not in retry_status_codes or attempt == CENTRAL_THROTTLE_MAX_TRIES:
+            return response
+        delay = _get_retry_delay(response, attempt)
+        logger.debug(
+            "Request to %s failed with status %s, retrying in %s seconds.", url, response.status_code, delay
+        )
+        time.sleep(delay)
+
+
+def _endpoint_key(method: str, url: str) -> str:
+    """
+    Group urls by endpoint, replacing the id that follows each collection segment (e.g. devices/{id}).
+    """
+    from urllib.parse import urlsplit
+
+    segments = []
+    replaced = False
+    for segment in urlsplit(url).path.strip("/").split("/"):
+        replaced = bool(segments) and not replaced and segments[-1].endswith("s")
+        segments.append("{id}" if replaced else segment)
+    return "{} /{}".format(method.upper(), "/".join(segments))
+
+
+def _record_request_metric(method: str, url: str, latency: float, retry: bool = False):
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    key = _endpoint_key(method, url)
+    with _request_metrics_lock:
+        if not _request_metrics:
+            atexit.register(log_request_metrics)
+        metric = _request_metrics.setdefault(
+            key, {"requests": 0, "retries": 0, "latencies": deque(maxlen=CENTRAL_METRICS_MAX_SAMPLES)}
+        )
+        metric["requests"] += 1
+        metric["retries"] += int(retry)
+        metric["latencies"].append(latency)
+
+
+def get_request_metrics() -> dict:
+    with _request_metrics_lock:
+        return {
+            key: {
+                "requests": metric["requests"],
+                "retries": metric["retries"],
+                "latencyMs": latency_percentiles(list(metric["latencies"])),
+            }
+            for key, metric in _request_metrics.items()
+        }
+
+
+def log_request_metrics():
+    for key, metric in get_request_metrics().items():
+        logger.debug("Central endpoint %s: %s", key, metric)
+
 
 def make_api_call(
     cmd,
@@ -42,21 +184,19 @@ def make_api_call(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.request(
-        url=url,
-        method=method.upper(),
+    response = send_request(
+        method,
+        url,
         headers=headers,
         params=query_parameters,
         json=payload,
-        verify=not should_disable_connection_verify(),
     )
     return try_extract_result(response)
 
 
 def get_headers(token, cmd, has_json_payload=False):
     if not token:
-        aad_token = auth.get_aad_token(cmd, resource="https://apps.azureiotcentral.com")
-        token = "Bearer {}".format(aad_token["accessToken"])
+        token = get_bearer_token(cmd)
 
     headers = {
         "Authorization": token,
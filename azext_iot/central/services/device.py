@@ -5,11 +5,9 @@
 # --------------------------------------------------------------------------------------------
 # This is largely derived from https://docs.microsoft.com/en-us/rest/api/iotcentral/devices
 
-from typing import List
-import requests
+from typing import Iterator, List, Optional, Tuple
 from azext_iot.central.common import API_VERSION, API_VERSION_PREVIEW
 from azext_iot.central.models.edge import EdgeModule
-from azext_iot.common.auth import get_aad_token
 
 from knack.log import get_logger
 
@@ -94,45 +92,81 @@ def list_devices(
     Returns:
         list of devices
     """
-    # Have to use preview version for $filter
-    api_version = API_VERSION_PREVIEW
+    warning = "This command may take a long time to complete if your app contains a lot of devices."
+    logger.warning(warning)
 
     devices = []
+    pages = list_device_pages(
+        cmd,
+        app_id=app_id,
+        filter=filter,
+        token=token,
+        central_dns_suffix=central_dns_suffix,
+    )
+    for pages_processed, (page, _) in enumerate(pages, 1):
+        devices.extend(page)
+        if pages_processed == max_pages:
+            break
 
-    url = "https://{}.{}/{}".format(app_id, central_dns_suffix, BASE_PATH)
-    headers = _utility.get_headers(token, cmd)
+    return devices
 
-    # Construct parameters
-    query_parameters = {"api-version": api_version}
-    if filter is not None:
-        query_parameters["$filter"] = filter
 
-    warning = "This command may take a long time to complete if your app contains a lot of devices."
-    logger.warning(warning)
+def list_device_pages(
+    cmd,
+    app_id: str,
+    filter: str,
+    token: str,
+    api_version=API_VERSION_PREVIEW,
+    next_link: Optional[str] = None,
+    central_dns_suffix=CENTRAL_ENDPOINT,
+) -> Iterator[Tuple[List[DeviceGa], Optional[str]]]:
+    """
+    Lazily get pages of devices in IoTC app
 
-    pages_processed = 0
-    while (max_pages == 0 or pages_processed < max_pages) and url:
-        response = requests.get(
+    Args:
+        cmd: command passed into az
+        app_id: name of app (used for forming request URL)
+        filter: only show filtered devices (only in preview version now)
+        token: (OPTIONAL) authorization token to fetch device details from IoTC.
+            MUST INCLUDE type (e.g. 'SharedAccessToken ...', 'Bearer ...')
+        next_link: (OPTIONAL) link of the page to start from, as returned with a previous page
+        central_dns_suffix: {centralDnsSuffixInPath} as found in docs
+
+    Returns:
+        iterator of (devices, next_link) for each page, where next_link is None for the last page
+    """
+    # Have to use preview version for $filter
+    api_version = API_VERSION_PREVIEW
+
+    url = next_link or "https://{}.{}/{}".format(app_id, central_dns_suffix, BASE_PATH)
+
+    # Construct parameters, the next link already contains them
+    query_parameters = None
+    if not next_link:
+        query_parameters = {"api-version": api_version}
+        if filter is not None:
+            query_parameters["$filter"] = filter
+
+    while url:
+        # headers are built per page so long listings pick up a refreshed token
+        response = _utility.send_request(
+            "GET",
             url,
-            headers=headers,
-            params=query_parameters if pages_processed == 0 else None,
+            headers=_utility.get_headers(token, cmd),
+            params=query_parameters,
         )
         result = _utility.try_extract_result(response)
 
         if "value" not in result:
             raise AzureResponseError("Value is not present in body: {}".format(result))
 
-        devices.extend(
-            [
-                _utility.get_object(device, MODEL, api_version)
-                for device in result["value"]
-            ]
-        )
-
         url = result.get("nextLink", None)
-        pages_processed = pages_processed + 1
+        query_parameters = None
 
-    return devices
+        yield [
+            _utility.get_object(device, MODEL, api_version)
+            for device in result["value"]
+        ], url
 
 
 def get_device_registration_summary(
@@ -169,8 +203,8 @@ def get_device_registration_summary(
     )
 
     while url:
-        response = requests.get(
-            url, headers=headers, verify=not should_disable_connection_verify()
+        response = _utility.send_request(
+            "GET", url, headers=headers, verify=not should_disable_connection_verify()
         )
         result = _utility.try_extract_result(response)
 
@@ -240,7 +274,7 @@ def create_device(
 
     data = _utility.get_object(payload, MODEL, api_version)
     json = _utility.to_camel_dict(dict_clean(parse_entity(data)))
-    response = requests.put(url, headers=headers, json=json, params=query_parameters)
+    response = _utility.send_request("PUT", url, headers=headers, json=json, params=query_parameters)
     result = _utility.try_extract_result(response)
 
     return _utility.get_object(result, MODEL, api_version)
@@ -318,7 +352,8 @@ def update_device(
     data = _utility.get_object(payload, MODEL, api_version)
     json = _utility.to_camel_dict(dict_clean(parse_entity(data)))
 
-    response = requests.patch(
+    response = _utility.send_request(
+        "PATCH",
         url,
         headers=headers,
         json=json,
@@ -389,7 +424,8 @@ def list_relationships(
     relationships = []
     pages_processed = 0
     while (max_pages == 0 or pages_processed < max_pages) and url:
-        response = requests.get(
+        response = _utility.send_request(
+            "GET",
             url,
             headers=headers,
             params=query_parameters if pages_processed == 0 else None,
@@ -608,8 +644,8 @@ def run_command(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.post(
-        url, headers=headers, json=payload, params=query_parameters
+    response = _utility.send_request(
+        "POST", url, headers=headers, json=payload, params=query_parameters
     )
 
     # execute command response has caveats in it due to Async/Sync device methods
@@ -744,18 +780,13 @@ def get_device_twin(
         twin: dict
     """
 
-    if not token:
-        aad_token = get_aad_token(cmd, resource="https://apps.azureiotcentral.com")[
-            "accessToken"
-        ]
-        token = "Bearer {}".format(aad_token)
-
     url = f"https://{app_id}.{central_dns_suffix}/system/iothub/devices/{device_id}/get-twin?extendedInfo=true"
     headers = _utility.get_headers(token, cmd)
 
     # Construct parameters
 
-    response = requests.get(
+    response = _utility.send_request(
+        "GET",
         url,
         headers=headers,
         verify=not should_disable_connection_verify(),
@@ -810,8 +841,8 @@ def run_manual_failover(
         see https://github.com/iot-for-all/iot-central-high-availability-clients#readme for more information"""
         )
 
-    response = requests.post(
-        url, headers=headers, verify=not should_disable_connection_verify(), json=json
+    response = _utility.send_request(
+        "POST", url, headers=headers, verify=not should_disable_connection_verify(), json=json
     )
     _utility.log_response_debug(response=response, logger=logger)
     return _utility.try_extract_result(response)
@@ -842,8 +873,8 @@ def run_manual_failback(
         app_id, central_dns_suffix, "system/iothub/devices", device_id
     )
     headers = _utility.get_headers(token, cmd)
-    response = requests.post(
-        url, headers=headers, verify=not should_disable_connection_verify()
+    response = _utility.send_request(
+        "POST", url, headers=headers, verify=not should_disable_connection_verify()
     )
     _utility.log_response_debug(response=response, logger=logger)
 
@@ -879,7 +910,7 @@ def purge_c2d_messages(
         app_id, central_dns_suffix, "system/iothub/devices", device_id
     )
     headers = _utility.get_headers(token, cmd)
-    response = requests.delete(url, headers=headers)
+    response = _utility.send_request("DELETE", url, headers=headers)
     return _utility.try_extract_result(response)
 
 
@@ -905,18 +936,13 @@ def list_device_modules(
     Returns:
         modules: list
     """
-    if not token:
-        aad_token = get_aad_token(cmd, resource="https://apps.azureiotcentral.com")[
-            "accessToken"
-        ]
-        token = "Bearer {}".format(aad_token)
-
     url = f"https://{app_id}.{central_dns_suffix}/system/iotedge/devices/{device_id}/modules"
     headers = _utility.get_headers(token, cmd)
 
     # Construct parameters
 
-    response = requests.get(
+    response = _utility.send_request(
+        "GET",
         url,
         headers=headers,
         verify=not should_disable_connection_verify(),
@@ -954,12 +980,6 @@ def restart_device_module(
         module: dict
     """
 
-    if not token:
-        aad_token = get_aad_token(cmd, resource="https://apps.azureiotcentral.com")[
-            "accessToken"
-        ]
-        token = "Bearer {}".format(aad_token)
-
     url = f"https://{app_id}.{central_dns_suffix}/system/iotedge/devices/{device_id}/modules/$edgeAgent/directmethods"
     json = {
         "methodName": "RestartModule",
@@ -969,7 +989,8 @@ def restart_device_module(
 
     # Construct parameters
 
-    response = requests.post(
+    response = _utility.send_request(
+        "POST",
         url,
         json=json,
         headers=headers,
@@ -5,7 +5,6 @@
 # --------------------------------------------------------------------------------------------
 # This is largely derived from https://docs.microsoft.com/en-us/rest/api/iotcentral/devicetemplates
 
-import requests
 from typing import List
 from knack.log import get_logger
 
@@ -54,7 +53,7 @@ def get_device_template(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.get(url, headers=headers, params=query_parameters)
+    response = _utility.send_request("GET", url, headers=headers, params=query_parameters)
     result = _utility.try_extract_result(response)
     return _utility.get_object(result, model=MODEL, api_version=api_version)
 
@@ -97,7 +96,8 @@ def list_device_templates(
 
     pages_processed = 0
     while (max_pages == 0 or pages_processed < max_pages) and url:
-        response = requests.get(
+        response = _utility.send_request(
+            "GET",
             url,
             headers=headers,
             params=query_parameters if pages_processed == 0 else None,
@@ -158,7 +158,7 @@ def create_device_template(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.put(url, headers=headers, json=payload, params=query_parameters)
+    response = _utility.send_request("PUT", url, headers=headers, json=payload, params=query_parameters)
     result = _utility.try_extract_result(response)
     return _utility.get_object(result, model=MODEL, api_version=api_version)
 
@@ -201,8 +201,8 @@ def update_device_template(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.patch(
-        url, headers=headers, json=payload, params=query_parameters
+    response = _utility.send_request(
+        "PATCH", url, headers=headers, json=payload, params=query_parameters
     )
     result = _utility.try_extract_result(response)
     return _utility.get_object(result, MODEL, api_version)
@@ -241,5 +241,5 @@ def delete_device_template(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.delete(url, headers=headers, params=query_parameters)
+    response = _utility.send_request("DELETE", url, headers=headers, params=query_parameters)
     return _utility.try_extract_result(response)
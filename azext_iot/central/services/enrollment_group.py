@@ -6,7 +6,6 @@
 # This is largely derived from https://docs.microsoft.com/en-us/rest/api/iotcentral/deviceGroups
 
 from typing import List
-import requests
 
 from knack.log import get_logger
 
@@ -56,7 +55,7 @@ def list_enrollment_groups(
 
     pages_processed = 0
     while (max_pages == 0 or pages_processed < max_pages) and url:
-        response = requests.get(url, headers=headers, params=query_parameters)
+        response = _utility.send_request("GET", url, headers=headers, params=query_parameters)
         result = _utility.try_extract_result(response)
 
         if "value" not in result:
@@ -5,7 +5,6 @@
 # --------------------------------------------------------------------------------------------
 # This is largely derived from https://docs.microsoft.com/en-us/rest/api/iotcentral/fileuploads
 
-import requests
 from typing import Union
 from knack.log import get_logger
 
@@ -37,7 +36,7 @@ def _make_call(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.request(
+    response = _utility.send_request(
         url=url,
         method=method.upper(),
         headers=headers,
@@ -160,12 +159,12 @@ def createorupdate_fileupload(
         payload["sasTtl"] = sasTtl
 
     if update:
-        response = requests.patch(
-            url, headers=headers, json=payload, params=query_parameters
+        response = _utility.send_request(
+            "PATCH", url, headers=headers, json=payload, params=query_parameters
         )
     else:
-        response = requests.put(
-            url, headers=headers, json=payload, params=query_parameters
+        response = _utility.send_request(
+            "PUT", url, headers=headers, json=payload, params=query_parameters
         )
     result = _utility.try_extract_result(response)
 
@@ -5,8 +5,7 @@
 # --------------------------------------------------------------------------------------------
 # This is largely derived from https://docs.microsoft.com/en-us/rest/api/iotcentral/jobs
 
-import requests
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
 from knack.log import get_logger
 
 from azure.cli.core.azclierror import AzureResponseError
@@ -48,7 +47,7 @@ def _call_job(
     if method is None:
         method = "get"
 
-    response = requests.request(
+    response = _utility.send_request(
         method=method.upper(),
         url=url,
         headers=headers,
@@ -99,7 +98,8 @@ def _list_job(
 
     pages_processed = 0
     while (max_pages == 0 or pages_processed < max_pages) and url:
-        response = requests.get(
+        response = _utility.send_request(
+            "GET",
             url,
             headers=headers,
             params=query_parameters,
@@ -308,6 +308,61 @@ def get_job_devices(
     )
 
 
+def get_job_devices_page(
+    cmd,
+    app_id: str,
+    job_id: str,
+    token: str,
+    url: Optional[str] = None,
+    etag: Optional[str] = None,
+    api_version=API_VERSION,
+    central_dns_suffix=CENTRAL_ENDPOINT,
+) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Get a single page of device statuses, conditionally on the page having changed
+
+    Args:
+        cmd: command passed into az
+        job_id: unique case-sensitive job id,
+        app_id: name of app (used for forming request URL)
+        token: (OPTIONAL) authorization token to fetch job details from IoTC.
+            MUST INCLUDE type (e.g. 'SharedAccessToken ...', 'Bearer ...')
+        url: (OPTIONAL) link of the page to get, as returned with a previous page. Defaults to the first page.
+        etag: (OPTIONAL) etag of the previously returned page content
+        central_dns_suffix: {centralDnsSuffixInPath} as found in docs
+
+    Returns:
+        (page, etag): the page is None if its content is unchanged from the given etag
+    """
+    api_version = API_VERSION
+
+    if not url:
+        url = "https://{}.{}/{}/{}/devices".format(app_id, central_dns_suffix, BASE_PATH, job_id)
+    headers = _utility.get_headers(token, cmd)
+    if etag:
+        headers["If-None-Match"] = etag
+
+    # Construct parameters
+    query_parameters = {}
+    query_parameters["api-version"] = api_version
+
+    response = _utility.send_request(
+        "GET",
+        url,
+        headers=headers,
+        params=query_parameters,
+        verify=not should_disable_connection_verify(),
+    )
+    if response.status_code == 304:
+        return None, etag
+
+    result = _utility.try_extract_result(response)
+    if "value" not in result:
+        raise AzureResponseError("Value is not present in body: {}".format(result))
+
+    return result, response.headers.get("ETag")
+
+
 def list_jobs(
     cmd,
     app_id: str,
@@ -399,7 +454,7 @@ def create_job(
             "batch": threshold_batch,
         }
 
-    response = requests.put(url, headers=headers, json=payload, params=query_parameters)
+    response = _utility.send_request("PUT", url, headers=headers, json=payload, params=query_parameters)
     result = _utility.try_extract_result(response)
 
     return _utility.get_object(result, "Job", api_version)
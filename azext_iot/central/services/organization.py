@@ -5,7 +5,6 @@
 # --------------------------------------------------------------------------------------------
 # This is largely derived from https://docs.microsoft.com/en-us/rest/api/iotcentral/roles
 
-import requests
 from knack.log import get_logger
 from typing import List, Union
 
@@ -47,7 +46,7 @@ def _make_call(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.request(
+    response = _utility.send_request(
         url=url,
         method=method.upper(),
         headers=headers,
@@ -5,10 +5,12 @@
 # --------------------------------------------------------------------------------------------
 #
 
-from typing import Union
+from typing import Iterator, List, Union
 
 from knack.log import get_logger
 
+from azure.cli.core.azclierror import AzureResponseError
+
 from azext_iot.constants import CENTRAL_ENDPOINT
 from azext_iot.central.common import API_VERSION_PREVIEW
 from azext_iot.central.services import _utility
@@ -17,6 +19,7 @@ from azext_iot.central.models.v2022_06_30_preview import QueryReponsePreview
 logger = get_logger(__name__)
 
 BASE_PATH = "api/query"
+CONTINUATION_TOKEN_KEY = "continuationToken"
 
 
 def query_run(
@@ -28,7 +31,7 @@ def query_run(
     central_dns_suffix=CENTRAL_ENDPOINT,
 ) -> Union[dict, QueryReponsePreview]:
     """
-    Execute query to get the telemetry or property data
+    Execute query to get the telemetry or property data, following continuation tokens
 
     Agrs:
         cmd: command passed into az
@@ -41,19 +44,66 @@ def query_run(
     returns:
         queryReponse: dict
     """
+    results = []
+    for page in query_pages(
+        cmd,
+        app_id=app_id,
+        query=query,
+        token=token,
+        api_version=api_version,
+        central_dns_suffix=central_dns_suffix,
+    ):
+        results.extend(page)
+
+    return {"results": results}
+
+
+def query_pages(
+    cmd,
+    app_id: str,
+    query: str,
+    token: str,
+    api_version=API_VERSION_PREVIEW,
+    central_dns_suffix=CENTRAL_ENDPOINT,
+) -> Iterator[List[dict]]:
+    """
+    Lazily execute query to get the telemetry or property data, one page of results at a time
+
+    Agrs:
+        cmd: command passed into az
+        query: query syntax sent to query AP
+        app_id: name of app (used for forming request URL)
+        token: (OPTIONAL) authorization token to fetch role details from IoTC.
+            MUST INCLUDE type (e.g. 'SharedAccessToken ...', 'Bearer ...')
+        central_dns_suffix: {centralDnsSuffixInPath} as found in docs
+
+    returns:
+        iterator of result pages: List[dict]
+    """
     api_version = API_VERSION_PREVIEW
 
     url = "https://{}.{}/{}".format(app_id, central_dns_suffix, BASE_PATH)
 
     # Construct parameters
     payload = {"query": query}
-    return _utility.make_api_call(
-        cmd,
-        method="POST",
-        app_id=app_id,
-        url=url,
-        payload=payload,
-        token=token,
-        api_version=api_version,
-        central_dnx_suffix=central_dns_suffix,
-    )
+    while True:
+        result = _utility.make_api_call(
+            cmd,
+            method="POST",
+            app_id=app_id,
+            url=url,
+            payload=payload,
+            token=token,
+            api_version=api_version,
+            central_dnx_suffix=central_dns_suffix,
+        )
+
+        if "results" not in result:
+            raise AzureResponseError("Results are not present in body: {}".format(result))
+
+        yield result["results"]
+
+        continuation_token = result.get(CONTINUATION_TOKEN_KEY)
+        if not continuation_token:
+            break
+        payload = {"query": query, CONTINUATION_TOKEN_KEY: continuation_token}
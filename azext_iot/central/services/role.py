@@ -6,7 +6,6 @@
 # This is largely derived from https://docs.microsoft.com/en-us/rest/api/iotcentral/roles
 
 from typing import List
-import requests
 
 from knack.log import get_logger
 
@@ -54,7 +53,8 @@ def get_role(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.get(
+    response = _utility.send_request(
+        "GET",
         url,
         headers=headers,
         params=query_parameters,
@@ -99,7 +99,8 @@ def list_roles(
 
     pages_processed = 0
     while (max_pages == 0 or pages_processed < max_pages) and url:
-        response = requests.get(
+        response = _utility.send_request(
+            "GET",
             url,
             headers=headers,
             params=query_parameters,
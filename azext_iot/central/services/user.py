@@ -4,7 +4,6 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-import requests
 from typing import List
 from knack.log import get_logger
 
@@ -52,7 +51,7 @@ def _make_call(
     query_parameters = {}
     query_parameters["api-version"] = api_version
 
-    response = requests.request(
+    response = _utility.send_request(
         url=url,
         method=method.upper(),
         headers=headers,
@@ -186,6 +186,13 @@ def load_command_table(self, _):
         cmd_group.command("update", "iot_dps_device_enrollment_update")
         cmd_group.command("delete", "iot_dps_device_enrollment_delete")
 
+    with self.command_group(
+        "iot dps enrollment bulk", command_type=iotdps_ops, is_experimental=True
+    ) as cmd_group:
+        cmd_group.command("create", "iot_dps_device_enrollment_bulk_create")
+        cmd_group.command("update", "iot_dps_device_enrollment_bulk_update")
+        cmd_group.command("delete", "iot_dps_device_enrollment_bulk_delete")
+
     with self.command_group(
         "iot dps enrollment registration", command_type=iotdps_ops
     ) as cmd_group:
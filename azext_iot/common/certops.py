@@ -15,12 +15,29 @@ from typing import Dict, List, Optional
 from cryptography import x509
 from cryptography.x509.oid import NameOID
 from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
 from azext_iot.common.fileops import write_content_to_file
+from azext_iot.common.shared import CertificateKeyType
 from azext_iot.common.utility import read_file_content
 from azure.cli.core.azclierror import FileOperationError
 
 
+def generate_private_key(key_size: int = 2048, key_type: str = CertificateKeyType.rsa.value):
+    """
+    Function used to generate a certificate private key.
+
+    Args:
+        key_size (int): The size of the generated RSA key; ignored for EC keys.
+        key_type (str): The key algorithm, 'rsa' or 'ec' (NIST P-256).
+
+    Returns:
+        private_key: RSA or EC private key object.
+    """
+    if key_type == CertificateKeyType.ec.value:
+        return ec.generate_private_key(ec.SECP256R1())
+    return rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+
+
 def create_self_signed_certificate(
     subject: str,
     valid_days: int = 365,
@@ -29,6 +46,7 @@ def create_self_signed_certificate(
     cert_only: bool = False,
     file_prefix: str = None,
     v3_extensions: bool = False,
+    key_type: str = CertificateKeyType.rsa.value,
 ) -> Dict[str, str]:
     """
     Function used to create a basic self-signed certificate with no extensions.
@@ -40,12 +58,13 @@ def create_self_signed_certificate(
         cert_putput_dir (str): string value of output directory.
         cert_only (bool): generate certificate only; no private key or thumbprint.
         file_prefix (str): Certificate file name if it needs to be different from the subject.
+        key_type (str): The key algorithm of the generated private key, 'rsa' or 'ec'.
 
     Returns:
         result (dict): dict with certificate value, private key and thumbprint.
     """
     # create a key pair
-    key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    key = generate_private_key(key_size=key_size, key_type=key_type)
     serial = x509.random_serial_number()
     # create a self-signed cert
     subject_name = x509.Name(
@@ -166,6 +185,7 @@ def create_ca_signed_certificate(
     cert_file: Optional[str] = None,
     key_size: int = 4096,
     valid_days: int = 365,
+    key_type: str = CertificateKeyType.rsa.value,
 ) -> Dict[str, str]:
     """
     Function used to create a new X.509 v3 certificate signed by an existing CA cert.
@@ -179,12 +199,13 @@ def create_ca_signed_certificate(
         key_size (str): The size of the generated private key
         valid_days (int): number of days certificate is valid for; used to calculate
             certificate expiry.
+        key_type (str): The key algorithm of the generated private key, 'rsa' or 'ec'.
 
     Returns:
         result (dict): dict with certificate value, private key and thumbprint.
     """
 
-    private_key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    private_key = generate_private_key(key_size=key_size, key_type=key_type)
     ca_public_key = ca_public_key.encode("utf-8")
     ca_private_key = ca_private_key.encode("utf-8")
     ca_key = serialization.load_pem_private_key(ca_private_key, password=None)
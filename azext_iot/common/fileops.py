@@ -7,7 +7,7 @@
 from os import makedirs, remove, listdir
 from os.path import exists, join
 from pathlib import PurePath
-from typing import Union
+from typing import Dict, Union
 from azure.cli.core.azclierror import FileOperationError
 
 
@@ -51,3 +51,36 @@ def tar_directory(
     with tarfile.open(full_path, "w:gz") as tar:
         for file_name in listdir(target_directory):
             tar.add(join(target_directory, file_name), file_name)
+
+
+def tar_contents(
+    contents: Dict[str, Union[str, bytes]],
+    tarfile_path: str,
+    tarfile_name: str,
+    overwrite: bool = False,
+):
+    """
+    Builds a gzipped tar archive from in-memory file contents (keyed by archive member name)
+    without staging the files on disk, then writes the archive in a single operation.
+    """
+    full_path = join(tarfile_path, f"{tarfile_name}.tgz")
+    if exists(full_path) and not overwrite:
+        raise FileOperationError(f"File {full_path} already exists")
+    if not exists(tarfile_path):
+        makedirs(tarfile_path, exist_ok=overwrite)
+    import tarfile
+    from io import BytesIO
+    from time import time
+
+    modified_time = time()
+    archive = BytesIO()
+    with tarfile.open(fileobj=archive, mode="w:gz") as tar:
+        for file_name, content in contents.items():
+            file_bytes = bytes(content, "utf-8") if isinstance(content, str) else content
+            file_info = tarfile.TarInfo(name=file_name)
+            file_info.size = len(file_bytes)
+            file_info.mode = 0o644
+            file_info.mtime = modified_time
+            tar.addfile(file_info, BytesIO(file_bytes))
+    with open(full_path, "wb") as f:
+        f.write(archive.getbuffer())
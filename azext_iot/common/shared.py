@@ -304,6 +304,35 @@ class DiscoveryResourceType(Enum):
     DPS = "IoT Hub Device Provisioning Service"
 
 
+class CertificateKeyType(Enum):
+    """
+    Key algorithm used for generated certificates.
+    """
+
+    rsa = "rsa"
+    ec = "ec"
+
+
+class BatchOutputFormatType(Enum):
+    """
+    Line oriented output formats for streamed batch results.
+    """
+
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class BulkEnrollmentOperationMode(Enum):
+    """
+    DPS bulk enrollment operation modes.
+    """
+
+    create = "create"
+    update = "update"
+    update_if_match_etag = "updateIfMatchETag"
+    delete = "delete"
+
+
 class SHAHashVersions(Enum):
     """
     Supported SHA types for generating the certificate thumbprint.
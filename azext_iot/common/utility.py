@@ -18,7 +18,7 @@ import sys
 import re
 import hmac
 import hashlib
-from typing import Any, Optional, List, Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from threading import Event, Thread
 from datetime import datetime
 from knack.log import get_logger
@@ -439,6 +439,16 @@ def handle_service_exception(e):
     raise AzureResponseError(err)
 
 
+def get_retry_after(e) -> int:
+    """
+    Seconds to wait before retrying, from the Retry-After header of a service error response.
+    Returns 0 when the header is missing or not a whole number of seconds.
+    """
+    response = getattr(e, "response", None)
+    retry_after = str(getattr(response, "headers", {}).get("Retry-After", ""))
+    return int(retry_after) if retry_after.isdigit() else 0
+
+
 def dict_transform_lower_case_key(d):
     """Converts a dictionary to an identical one with all lower case keys"""
     return {k.lower(): v for k, v in d.items()}
@@ -611,6 +621,60 @@ def compute_device_key(primary_key, registration_id):
     return device_key
 
 
+def compute_device_keys(primary_key: str, registration_ids: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Compute device SAS keys for many registration ids from the same group key.
+    The group key is decoded and its HMAC state prepared once, then copied for each registration id.
+    Args:
+        primary_key: Primary group SAS token to compute device keys
+        registration_ids: Registration IDs to compute device keys for.
+    Returns:
+        iterator of (registration id, device key) tuples
+    """
+    keyed_hmac = hmac.new(base64.b64decode(primary_key), digestmod=hashlib.sha256)
+    for registration_id in registration_ids:
+        device_hmac = keyed_hmac.copy()
+        device_hmac.update(registration_id.encode("utf8"))
+        yield registration_id, base64.b64encode(device_hmac.digest()).decode("utf8")
+
+
+def expand_id_pattern(pattern: str) -> Iterator[str]:
+    """
+    Expand an id pattern with a single inclusive numeric range, such as "device-{1..100}".
+    Leading zeros on the range start are kept as padding, so "device-{001..100}" yields "device-001" first.
+    The pattern is validated when called, ids are generated lazily.
+    """
+    match = re.search(r"\{(\d+)\.\.(\d+)\}", pattern)
+    if not match:
+        raise InvalidArgumentValueError(
+            "Id pattern '{}' must contain a numeric range such as {{1..100}}.".format(pattern)
+        )
+    start, end = match.group(1), match.group(2)
+    if int(start) > int(end):
+        raise InvalidArgumentValueError("Id pattern range start must not be greater than the range end.")
+    width = len(start) if start.startswith("0") and len(start) > 1 else 0
+    prefix, suffix = pattern[:match.start()], pattern[match.end():]
+    return ("{}{}{}".format(prefix, str(value).zfill(width), suffix) for value in range(int(start), int(end) + 1))
+
+
+def read_ids_from_file(file_path: str) -> Iterator[str]:
+    """
+    Lazily read ids from a file with one id per line, skipping blank lines.
+    The file path is validated when called, the file is read as ids are consumed.
+    """
+    if not os.path.exists(file_path):
+        raise FileOperationError("File path {} does not exist.".format(file_path))
+
+    def _read_ids():
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+    return _read_ids()
+
+
 def generate_key(byte_length=32):
     """
     Generate cryptographically secure device key.
@@ -715,3 +779,20 @@ def assemble_nargs_to_dict(hash_list: List[str]) -> Dict[str, str]:
                 key,
             )
     return result
+
+
+def latency_percentiles(latencies: List[float], percentiles: Optional[List[int]] = None) -> Dict[str, float]:
+    """
+    Nearest-rank percentiles of the given latencies (in seconds), reported in milliseconds.
+    """
+    from azext_iot.constants import LATENCY_PERCENTILES
+
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    result = {}
+    for percentile in percentiles or LATENCY_PERCENTILES:
+        rank = max(int(-(-percentile * len(ordered) // 100)), 1)
+        result[f"p{percentile}"] = round(ordered[rank - 1] * 1000, 3)
+    result["max"] = round(ordered[-1] * 1000, 3)
+    return result
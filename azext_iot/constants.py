@@ -31,6 +31,18 @@ METHOD_INVOKE_MIN_TIMEOUT_SEC = 10
 MIN_SIM_MSG_INTERVAL = 1
 MIN_SIM_MSG_COUNT = 1
 SIM_RECEIVE_SLEEP_SEC = 3
+C2D_SEND_BATCH_SIZE = 500
+C2D_FEEDBACK_BATCH_SIZE = 100
+C2D_FEEDBACK_RECEIVE_TIMEOUT_MS = 1000
+C2D_FEEDBACK_MAX_RECONNECTS = 3
+C2D_FEEDBACK_RECONNECT_WINDOW_SEC = 30
+LATENCY_PERCENTILES = [50, 90, 95, 99]
+DEVICE_KEY_BATCH_CHUNK_SIZE = 10000
+# The DPS bulk enrollment operation accepts at most 10 enrollments per request
+DPS_BULK_ENROLLMENT_MAX_ITEMS = 10
+DPS_BULK_ENROLLMENT_MAX_WORKERS = 8
+DPS_BULK_ENROLLMENT_MAX_TRIES = 5
+DPS_BULK_ENROLLMENT_BACKOFF_SEC = 1
 CENTRAL_ENDPOINT = "azureiotcentral.com"
 DEVICE_DEVICESCOPE_PREFIX = "ms-azure-iot-edge://"
 TRACING_PROPERTY = "azureiot*com^dtracing^1"
@@ -46,7 +58,11 @@ DEVICETWIN_MONITOR_TIME_SEC = 15
 IOTHUB_THROTTLE_MAX_TRIES = 3
 IOTHUB_THROTTLE_SLEEP_SEC = 20
 THROTTLE_HTTP_STATUS_CODE = 429
+SERVICE_UNAVAILABLE_HTTP_STATUS_CODE = 503
 IOTHUB_RENEW_KEY_BATCH_SIZE = 100
+IOTHUB_RENEW_KEY_MAX_WORKERS = 8
+IOTHUB_JOB_POLL_MIN_INTERVAL_SEC = 1
+IOTHUB_JOB_POLL_MAX_INTERVAL_SEC = 60
 # (Lib name, minimum version (including), maximum version (excluding))
 EVENT_LIB = ("uamqp", "1.2", "1.3")
 PNP_DTDLV2_COMPONENT_MARKER = "__t"
@@ -910,6 +910,8 @@ def load_deviceupdate_help():
     helps["iot du update calculate-hash"] = """
         type: command
         short-summary: Calculate the base64 hashed representation of a file.
+        long-summary: |
+          Multiple files are hashed concurrently using a process pool. Large files are memory-mapped.
 
         examples:
         - name: Calculate the base64 representation of a sha256 digest for a target update file.
@@ -922,6 +924,14 @@ def load_deviceupdate_help():
             --file-path /path/to/file1
             --file-path /path/to/file2
             --file-path /path/to/file3
+
+        - name: Calculate sha256 and sha512 digests for multiple target update files in a single read of each file,
+            reusing cached digests for files that have not changed since a previous run.
+          text: >
+            az iot du update calculate-hash
+            --file-path /path/to/file1
+            --file-path /path/to/file2
+            --hash-algo sha256 sha512 --use-cache
     """
 
     helps["iot du update stage"] = """
@@ -937,6 +947,7 @@ def load_deviceupdate_help():
           for a target manifest are expected to be in the same directory the import manifest resides in.
 
           Key based access is used to upload blob artifacts and to generate 3 hour duration SAS URIs with read access.
+          Files are uploaded concurrently. A blob whose content hash matches the local file is not uploaded again.
 
           If `--then-import` flag is provided, the command will import the staged update. Otherwise
           the result of this operation is an import command to run to achieve the same result at a later time.
@@ -12,7 +12,7 @@ from azext_iot.deviceupdate.providers.base import (
     AzureError,
     ARMPolling,
 )
-from azext_iot.deviceupdate.common import ADUValidHashAlgorithmType
+from azext_iot.deviceupdate.common import ADUValidHashAlgorithmType, STAGE_HASH_METADATA_KEY, STAGE_MAX_WORKERS
 from typing import Optional, List, Union, Dict
 
 logger = get_logger(__name__)
@@ -233,6 +233,7 @@ def manifest_init_v5(
     description: str = None,
     deployable: bool = None,
     no_validation: Optional[bool] = None,
+    use_cache: Optional[bool] = None,
 ):
     from datetime import datetime
     from pathlib import PurePath
@@ -371,6 +372,21 @@ def manifest_init_v5(
         file_params = _sanitize_safe_params(safe_params, ["--file", "--related-file"])
         related_file_map = _associate_related(file_params, "--file")
 
+        # Hash every referenced file up front so files are processed concurrently.
+        hash_target_paths = []
+        for file_col in files + (related_files or []):
+            if not file_col or not file_col[0]:
+                continue
+            assembled_hash_target = assemble_nargs_to_dict(file_col)
+            if "path" in assembled_hash_target:
+                hash_target_paths.append(assembled_hash_target["path"])
+        file_metadata_map = dict(
+            zip(
+                hash_target_paths,
+                DeviceUpdateDataManager.calculate_files_metadata(hash_target_paths, use_cache=use_cache),
+            )
+        )
+
         processed_files = []
         processed_files_map = {}
         for f in range(len(files)):
@@ -380,7 +396,7 @@ def manifest_init_v5(
             assembled_file = assemble_nargs_to_dict(files[f])
             if "path" not in assembled_file:
                 raise ArgumentUsageError("When using --file path is required.")
-            assembled_file_metadata = DeviceUpdateDataManager.calculate_file_metadata(assembled_file["path"])
+            assembled_file_metadata = file_metadata_map[assembled_file["path"]]
             processed_file["hashes"] = {"sha256": assembled_file_metadata.hash}
             processed_file["filename"] = assembled_file_metadata.name
             processed_file["sizeInBytes"] = assembled_file_metadata.bytes
@@ -401,7 +417,7 @@ def manifest_init_v5(
                 assembled_related_file = assemble_nargs_to_dict(related_file)
                 if "path" not in assembled_related_file:
                     raise ArgumentUsageError("When using --related-file path is required.")
-                related_file_metadata = DeviceUpdateDataManager.calculate_file_metadata(assembled_related_file["path"])
+                related_file_metadata = file_metadata_map[assembled_related_file["path"]]
                 processed_related_file["hashes"] = {"sha256": related_file_metadata.hash}
                 processed_related_file["filename"] = related_file_metadata.name
                 processed_related_file["sizeInBytes"] = related_file_metadata.bytes
@@ -446,19 +462,28 @@ def manifest_init_v5(
 
 def calculate_hash(
     file_paths: List[str],
-    hash_algo: str = ADUValidHashAlgorithmType.SHA256.value,
+    hash_algo: Union[str, List[str]] = ADUValidHashAlgorithmType.SHA256.value,
+    use_cache: Optional[bool] = None,
+    max_workers: Optional[int] = None,
 ):
+    if max_workers is not None and max_workers < 1:
+        from azure.cli.core.azclierror import InvalidArgumentValueError
+
+        raise InvalidArgumentValueError("max workers must be at least 1")
+    hash_algos = [hash_algo] if isinstance(hash_algo, str) else list(dict.fromkeys(hash_algo))
     result = []
-    for path in file_paths:
-        file_metadata = DeviceUpdateDataManager.calculate_file_metadata(path)
-        result.append(
-            {
-                "bytes": file_metadata.bytes,
-                "hash": file_metadata.hash,
-                "hashAlgorithm": hash_algo,
-                "uri": file_metadata.path.as_uri(),
-            }
-        )
+    for file_metadata in DeviceUpdateDataManager.calculate_files_metadata(
+        file_paths, hash_algos=hash_algos, use_cache=use_cache, max_workers=max_workers
+    ):
+        file_result = {
+            "bytes": file_metadata.bytes,
+            "hash": file_metadata.hash,
+            "hashAlgorithm": hash_algos[0],
+            "uri": file_metadata.path.as_uri(),
+        }
+        if len(hash_algos) > 1:
+            file_result["hashes"] = file_metadata.hashes
+        result.append(file_result)
     return result
 
 
@@ -474,22 +499,25 @@ def stage_update(
     then_import: Optional[bool] = None,
     resource_group_name: Optional[str] = None,
     overwrite: bool = False,
+    max_workers: int = STAGE_MAX_WORKERS,
 ):
-    from azext_iot.common.embedded_cli import EmbeddedCLI
+    from concurrent.futures import ThreadPoolExecutor
+    from azure.cli.core.commands.client_factory import get_subscription_id
     from azext_iot.common.utility import process_json_arg
-    from azext_iot.deviceupdate.common import get_cache_entry_name, CACHE_RESOURCE_TYPE
+    from azext_iot.deviceupdate.common import get_cache_entry_name, CACHE_RESOURCE_TYPE, STAGE_BLOCK_CONCURRENCY
     from azext_iot.deviceupdate.providers.base import MicroObjectCache
     from azext_iot.deviceupdate.providers.storage import StorageAccountManager
     from azure.storage.blob import ResourceTypes, AccountSasPermissions, generate_account_sas
-    from azure.core.exceptions import ResourceExistsError
+    from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
     from pathlib import PurePath
     from datetime import datetime, timedelta
+    from azure.cli.core.azclierror import InvalidArgumentValueError
+
+    if max_workers < 1:
+        raise InvalidArgumentValueError("max workers must be at least 1")
 
-    cli = EmbeddedCLI()
-    # If the user is not logged in, 'account show' will fail asking the user to login
-    # ensuring we have credentials and a subscription.
-    az_account_info = cli.invoke("account show").as_json()
-    target_storage_sub = storage_account_subscription or cmd.cli_ctx.data.get("subscription_id") or az_account_info.get("id")
+    # Fails asking the user to login if there are no credentials or subscription.
+    target_storage_sub = storage_account_subscription or get_subscription_id(cmd.cli_ctx)
     storage_manager = StorageAccountManager(subscription_id=target_storage_sub)
     blob_service_client = storage_manager.get_sas_blob_service_client(account_name=storage_account_name)
 
@@ -499,33 +527,35 @@ def stage_update(
         pass
     container_client = blob_service_client.get_container_client(container=storage_container_name)
 
-    def _stage_update_assets(
-        file_paths: List[str],
-        container_directory: str = "",
-    ) -> List[str]:
-
-        file_sas_result = []
-        for file_path in file_paths:
-            file_name = PurePath(file_path).name
-            blob_client = None
-            with open(file_path, "rb") as data:
-                blob_client = container_client.upload_blob(
-                    name=f"{container_directory}{file_name}", data=data, overwrite=overwrite
-                )
+    # A single read-only SAS token is used for every staged blob.
+    sas_token = generate_account_sas(
+        account_name=blob_service_client.credential.account_name,
+        account_key=blob_service_client.credential.account_key,
+        resource_types=ResourceTypes(object=True),
+        permission=AccountSasPermissions(read=True),
+        expiry=datetime.utcnow() + timedelta(hours=3.0),
+    )
 
-            target_datetime_expiry = datetime.utcnow() + timedelta(hours=3.0)
-            sas_token = generate_account_sas(
-                account_name=blob_service_client.credential.account_name,
-                account_key=blob_service_client.credential.account_key,
-                resource_types=ResourceTypes(object=True),
-                permission=AccountSasPermissions(read=True),
-                expiry=target_datetime_expiry,
+    def _stage_update_asset(file_path: str, blob_name: str, file_hash: str) -> str:
+        blob_client = container_client.get_blob_client(blob=blob_name)
+        try:
+            blob_properties = blob_client.get_blob_properties()
+            if (blob_properties.metadata or {}).get(STAGE_HASH_METADATA_KEY) == file_hash:
+                logger.info("Blob '%s' content is unchanged, skipping upload.", blob_name)
+                return f"{blob_client.url}?{sas_token}"
+        except ResourceNotFoundError:
+            pass
+
+        with open(file_path, "rb") as data:
+            blob_client.upload_blob(
+                data=data,
+                overwrite=overwrite,
+                metadata={STAGE_HASH_METADATA_KEY: file_hash},
+                max_concurrency=STAGE_BLOCK_CONCURRENCY,
             )
-            file_sas_result.append(f"{blob_client.url}?{sas_token}")
-
-        return file_sas_result
+        return f"{blob_client.url}?{sas_token}"
 
-    manifest_sas_uris_map = {}
+    staged_manifests = []
     for manifest_path in update_manifest_paths:
         manifest: dict = process_json_arg(manifest_path, argument_name="--manifest-path")
         manifest_files = manifest.get("files")
@@ -535,67 +565,81 @@ def stage_update(
         manifest_directory_path = manifest_purepath.parent.as_posix()
         manifest_directory_name = manifest_purepath.parent.name
 
-        file_paths = [manifest_path]
+        file_paths = [manifest_purepath.as_posix()]
         file_names = []
-        # TODO: Refactor to reduce duplication
         if manifest_files:
             for file in manifest_files:
-                filename = file["filename"]
-                if filename in uploaded_files_map:
-                    continue
-                file_names.append(filename)
-                file_paths.append(PurePath(manifest_directory_path, filename).as_posix())
-                uploaded_files_map[filename] = 1
-                related_files = file.get("relatedFiles")
-                if related_files:
-                    for related_file in related_files:
-                        related_filename = related_file["filename"]
-                        if related_filename in uploaded_files_map:
-                            continue
-                        file_names.append(related_filename)
-                        file_paths.append(PurePath(manifest_directory_path, related_filename).as_posix())
-                        uploaded_files_map[related_filename] = 1
+                for filename in [file["filename"]] + [r["filename"] for r in file.get("relatedFiles") or []]:
+                    if filename in uploaded_files_map:
+                        continue
+                    file_names.append(filename)
+                    file_paths.append(PurePath(manifest_directory_path, filename).as_posix())
+                    uploaded_files_map[filename] = 1
 
         updateId = manifest["updateId"]
         qualifier = f"{updateId['provider']}_{updateId['name']}_{updateId['version']}"
-        manifest_sas_uris_map[manifest_path] = (
-            _stage_update_assets(file_paths, f"{manifest_directory_name}/{qualifier}/"),
-            file_names,
-        )
+        staged_manifests.append((file_paths, file_names, f"{manifest_directory_name}/{qualifier}/"))
+
+    all_file_paths = [file_path for file_paths, _, _ in staged_manifests for file_path in file_paths]
+    file_metadata_map = dict(
+        zip(all_file_paths, DeviceUpdateDataManager.calculate_files_metadata(all_file_paths))
+    )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        staged_futures = [
+            [
+                executor.submit(
+                    _stage_update_asset,
+                    file_path,
+                    f"{container_directory}{PurePath(file_path).name}",
+                    file_metadata_map[file_path].hash,
+                )
+                for file_path in file_paths
+            ]
+            for file_paths, _, container_directory in staged_manifests
+        ]
+        staged_sas_uris = [[future.result() for future in futures] for futures in staged_futures]
 
     data_manager = DeviceUpdateDataManager(
         cmd=cmd, account_name=name, instance_name=instance_name, resource_group=resource_group_name
     )
     resource_group_name = data_manager.container.resource_group
 
-    user_commands = []
-    manifest_count = len(manifest_sas_uris_map)
-    for manifest_sas_uris in manifest_sas_uris_map:
-        sas_uris, file_names = manifest_sas_uris_map[manifest_sas_uris]
-        root_uri = sas_uris.pop(0)
-        friendly_name_cmd_seg = ""
-        if friendly_name:
-            friendly_name_cmd_seg = f" --friendly-name {friendly_name}"
-        file_cmd_segs = ""
-        for file_uri_index in range(len(sas_uris)):
-            file_cmd_segs = file_cmd_segs + f" --file filename={file_names[file_uri_index]} url={sas_uris[file_uri_index]}"
-        user_commands.append(
-            f"iot du update import -n {name} -i {instance_name} -g {resource_group_name} "
-            f"--url {root_uri}{friendly_name_cmd_seg}{file_cmd_segs} --defer"
+    # Build the deferred import list directly rather than invoking 'iot du update import --defer' per manifest.
+    update_to_import = []
+    for (file_paths, file_names, _), sas_uris in zip(staged_manifests, staged_sas_uris):
+        manifest_metadata = file_metadata_map[file_paths[0]]
+        update_to_import.append(
+            DeviceUpdateDataModels.ImportUpdateInputItem(
+                import_manifest=DeviceUpdateDataModels.ImportManifestMetadata(
+                    url=sas_uris[0],
+                    size_in_bytes=manifest_metadata.bytes,
+                    hashes={"sha256": manifest_metadata.hash},
+                ),
+                friendly_name=friendly_name,
+                files=[
+                    DeviceUpdateDataModels.FileImportMetadata(filename=file_name, url=file_uri)
+                    for file_name, file_uri in zip(file_names, sas_uris[1:])
+                ] or None,
+            )
         )
-        manifest_count = manifest_count - 1
 
-    # Purge cache prior to execution.
+    # Purge and refresh the cache entry for the target instance.
     cache = MicroObjectCache(cmd, DeviceUpdateDataModels)
-    cache.remove(get_cache_entry_name(name, instance_name), resource_group_name, CACHE_RESOURCE_TYPE)
-
-    build_import_commands = {"commands": user_commands}
-    for command in build_import_commands["commands"]:
-        cli.invoke(command)
+    cache_resource_name = get_cache_entry_name(name, instance_name)
+    cache.remove(cache_resource_name, resource_group_name, CACHE_RESOURCE_TYPE)
+    cache.set(
+        resource_name=cache_resource_name,
+        resource_group=resource_group_name,
+        resource_type=CACHE_RESOURCE_TYPE,
+        payload=update_to_import,
+        serialization_model="[ImportUpdateInputItem]",
+    )
 
     invoke_command = f"iot du update import -n {name} -i {instance_name} -g {resource_group_name} --url cache://"
     if then_import:
-        cli.invoke(invoke_command)
-        return
+        return import_update(
+            cmd=cmd, name=name, instance_name=instance_name, url="cache://", resource_group_name=resource_group_name
+        ).result()
 
     return {"importCommand": f"az {invoke_command}"}
@@ -67,6 +67,8 @@ class ADUValidHashAlgorithmType(Enum):
     """
 
     SHA256 = "sha256"
+    SHA384 = "sha384"
+    SHA512 = "sha512"
 
 
 class ADUContentHandlerType(Enum):
@@ -101,6 +103,11 @@ SYSTEM_IDENTITY_ARG = "[system]"
 AUTH_RESOURCE_ID = "https://api.adu.microsoft.com/"
 CACHE_RESOURCE_TYPE = "DeviceUpdate"
 
+# Update staging
+STAGE_MAX_WORKERS = 8
+STAGE_BLOCK_CONCURRENCY = 4
+STAGE_HASH_METADATA_KEY = "sha256"
+
 
 def get_cache_entry_name(account_name: str, instance_name: str):
     return f"{account_name}_{instance_name}_importUpdate"
@@ -176,10 +176,26 @@ def load_deviceupdate_arguments(self, _):
         context.argument(
             "hash_algo",
             options_list=["--hash-algo"],
-            help="Cryptographic algorithm to use for hashing.",
+            nargs="+",
+            help="Cryptographic algorithm(s) to use for hashing. When multiple space-separated algorithms are provided "
+            "each file is read once, 'hash' is calculated with the first algorithm and all digests are returned "
+            "in 'hashes'.",
             arg_type=get_enum_type(ADUValidHashAlgorithmType),
             type=str,
         )
+        context.argument(
+            "use_cache",
+            options_list=["--use-cache"],
+            arg_type=get_three_state_flag(),
+            help="Persist calculated file hashes in the local cache and reuse them for files whose path, size "
+            "and modification time are unchanged.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of processes used to hash files concurrently. Defaults to the number of CPUs.",
+        )
 
     with self.argument_context("iot du update list") as context:
         context.argument(
@@ -538,6 +554,13 @@ def load_deviceupdate_arguments(self, _):
             arg_type=get_three_state_flag(),
             help="Disables client-side json schema validation of the import manifest content.",
         )
+        context.argument(
+            "use_cache",
+            options_list=["--use-cache"],
+            arg_type=get_three_state_flag(),
+            help="Persist calculated file hashes in the local cache and reuse them for files whose path, size "
+            "and modification time are unchanged.",
+        )
 
     with self.argument_context("iot du update stage") as context:
         context.argument(
@@ -576,5 +599,12 @@ def load_deviceupdate_arguments(self, _):
             "overwrite",
             options_list=["--overwrite"],
             arg_type=get_three_state_flag(),
-            help="Flag indicating whether existing blobs should be overwritten if a conflict exists.",
+            help="Flag indicating whether existing blobs should be overwritten if a conflict exists. "
+            "Blobs previously staged with identical content are never re-uploaded.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of files uploaded concurrently.",
         )
@@ -13,7 +13,7 @@ import json
 import os
 from base64 import b64encode
 from pathlib import Path, PurePath
-from typing import Any, List, NamedTuple, Optional, Tuple, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 from azure.cli.core.azclierror import (CLIInternalError,
                                        InvalidArgumentValueError,
@@ -51,6 +51,7 @@ class FileMetadata(NamedTuple):
     hash: str
     name: str
     path: PurePath
+    hashes: Optional[Dict[str, str]] = None
 
 
 __all__ = [
@@ -239,29 +240,89 @@ class DeviceUpdateDataManager(DeviceUpdateAccountManager):
         """
         Calculates key attributes of an update manifest fetched from a given url.
         The hash value is a base64 representation of a sha256 digest.
+        Content is hashed while it is streamed. Metadata for http(s) urls is cached and revalidated
+        with a conditional request, so an unchanged manifest is not downloaded again.
         """
-        from urllib.request import urlopen
+        from urllib.error import HTTPError
+        from urllib.parse import urlsplit
+        from urllib.request import Request, url2pathname, urlopen
+        from azext_iot.deviceupdate.common import ADUValidHashAlgorithmType
+        from azext_iot.deviceupdate.providers.hashing import UrlMetadataCache, hash_file, hash_stream
+
+        hash_algos = (ADUValidHashAlgorithmType.SHA256.value,)
+        parsed_url = urlsplit(url)
+        if parsed_url.scheme == "file":
+            file_hashes = hash_file(url2pathname(parsed_url.path), hash_algos)
+            return UpdateManifestMeta(file_hashes.bytes, file_hashes.hashes[hash_algos[0]])
+
+        cache = UrlMetadataCache(os.path.join(MicroObjectCache.get_config_dir(), "object_cache"))
+        cached_entry = cache.get(url, hash_algos)
+        request = Request(url)
+        if cached_entry:
+            if cached_entry.get("etag"):
+                request.add_header("If-None-Match", cached_entry["etag"])
+            if cached_entry.get("last_modified"):
+                request.add_header("If-Modified-Since", cached_entry["last_modified"])
 
-        with urlopen(url) as f:
-            file_content: bytes = f.read()
-            hash = self.calculate_hash_from_bytes(file_content)
-            return UpdateManifestMeta(len(file_content), hash)
+        try:
+            with urlopen(request) as response:
+                file_hashes = hash_stream(response, hash_algos)
+                cache.set(
+                    url,
+                    file_hashes,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+        except HTTPError as e:
+            if e.code == 304 and cached_entry:
+                logger.info("Manifest at '%s' is unchanged, using cached metadata.", parsed_url.path)
+                return UpdateManifestMeta(cached_entry["bytes"], cached_entry["hashes"][hash_algos[0]])
+            raise
+        cache.save()
+        return UpdateManifestMeta(file_hashes.bytes, file_hashes.hashes[hash_algos[0]])
 
     @classmethod
     def calculate_file_metadata(cls, file_path: str) -> FileMetadata:
         """
         Calculates metadata for a file of arbitrary size.
         """
-        import io
-        h = hashlib.sha256()
-        file_pure_path = PurePath(file_path)
-        size_in_bytes = 0
-        with io.open(file_pure_path.as_posix(), "rb") as file_io:
-            logger.debug("Reading file %s as binary...", file_pure_path)
-            for byte_chunk in iter(lambda: file_io.read(h.block_size**2), b''):
-                h.update(byte_chunk)
-                size_in_bytes = size_in_bytes + len(byte_chunk)
-            return FileMetadata(size_in_bytes, b64encode(h.digest()).decode("utf8"), file_pure_path.name, file_pure_path)
+        return cls.calculate_files_metadata([file_path])[0]
+
+    @classmethod
+    def calculate_files_metadata(
+        cls,
+        file_paths: List[str],
+        hash_algos: Optional[List[str]] = None,
+        use_cache: Optional[bool] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[FileMetadata]:
+        """
+        Calculates metadata for a collection of files of arbitrary size, hashing files concurrently.
+        The primary hash is computed with the first algorithm of hash_algos (sha256 by default).
+        When use_cache is set, digests are persisted and reused for files with unchanged size and mtime.
+        """
+        from azext_iot.deviceupdate.common import ADUValidHashAlgorithmType
+        from azext_iot.deviceupdate.providers.hashing import FileHashCache, hash_files
+
+        hash_algos = tuple(hash_algos or [ADUValidHashAlgorithmType.SHA256.value])
+        cache = FileHashCache(os.path.join(MicroObjectCache.get_config_dir(), "object_cache")) if use_cache else None
+        pure_paths = [PurePath(file_path) for file_path in file_paths]
+        file_hashes_col = hash_files(
+            [pure_path.as_posix() for pure_path in pure_paths],
+            hash_algos=hash_algos,
+            max_workers=max_workers,
+            cache=cache,
+        )
+        return [
+            FileMetadata(
+                file_hashes.bytes,
+                file_hashes.hashes[hash_algos[0]],
+                pure_path.name,
+                pure_path,
+                file_hashes.hashes,
+            )
+            for pure_path, file_hashes in zip(pure_paths, file_hashes_col)
+        ]
 
     @classmethod
     def calculate_hash_from_bytes(cls, raw_bytes: bytes) -> str:
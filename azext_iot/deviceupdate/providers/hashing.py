@@ -0,0 +1,233 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+hashing: File hashing engine for Device Update artifacts.
+
+Large files are memory-mapped, multiple files are hashed concurrently on a process pool
+and each file or stream is read once regardless of how many digests are requested.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from base64 import b64encode
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+# Files at or above this size are memory-mapped instead of read through buffered IO.
+MMAP_THRESHOLD_BYTES = 16 * 1024 * 1024
+HASH_CHUNK_BYTES = 4 * 1024 * 1024
+# Process pool start up only pays off when there is enough data to hash across the pending files.
+PROCESS_POOL_THRESHOLD_BYTES = MMAP_THRESHOLD_BYTES
+HASH_CACHE_FILE_NAME = "du_file_hashes.json"
+URL_CACHE_FILE_NAME = "du_url_metadata.json"
+URL_CACHE_MAX_ENTRIES = 256
+
+
+class FileHashes(NamedTuple):
+    bytes: int
+    hashes: Dict[str, str]
+
+
+def hash_file(file_path: str, hash_algos: Tuple[str, ...]) -> FileHashes:
+    """
+    Calculates base64 encoded digests for each of the requested algorithms in a single pass over the file.
+    Defined at module scope so it can be dispatched to a process pool.
+    """
+    size_in_bytes = os.path.getsize(file_path)
+
+    with open(file_path, "rb") as file_io:
+        if size_in_bytes < MMAP_THRESHOLD_BYTES:
+            logger.debug("Reading file %s as binary...", file_path)
+            return hash_stream(file_io, hash_algos)
+
+        logger.debug("Memory-mapping file %s...", file_path)
+        hashers = [hashlib.new(algo) for algo in hash_algos]
+        with mmap.mmap(file_io.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size_in_bytes, HASH_CHUNK_BYTES):
+                    chunk = view[offset:offset + HASH_CHUNK_BYTES]
+                    for h in hashers:
+                        h.update(chunk)
+                    chunk.release()
+            finally:
+                view.release()
+
+    return FileHashes(
+        size_in_bytes, {algo: b64encode(h.digest()).decode("utf8") for algo, h in zip(hash_algos, hashers)}
+    )
+
+
+def hash_stream(stream: BinaryIO, hash_algos: Tuple[str, ...]) -> FileHashes:
+    """
+    Calculates base64 encoded digests for a readable binary stream, consuming it chunk by chunk.
+    """
+    hashers = [hashlib.new(algo) for algo in hash_algos]
+    size_in_bytes = 0
+    for byte_chunk in iter(lambda: stream.read(HASH_CHUNK_BYTES), b""):
+        for h in hashers:
+            h.update(byte_chunk)
+        size_in_bytes = size_in_bytes + len(byte_chunk)
+
+    return FileHashes(
+        size_in_bytes, {algo: b64encode(h.digest()).decode("utf8") for algo, h in zip(hash_algos, hashers)}
+    )
+
+
+class _JsonFileCache(object):
+    """
+    Minimal persistent key/value store backed by a single json file.
+    """
+
+    def __init__(self, directory: str, file_name: str):
+        self.path = os.path.join(directory, file_name)
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, mode="r", encoding="utf8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                logger.debug("Ignoring unreadable cache at %s.", self.path)
+
+    def save(self):
+        if not self._dirty:
+            return
+        from knack.util import ensure_dir
+
+        ensure_dir(os.path.dirname(self.path))
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, mode="w", encoding="utf8") as f:
+            json.dump(self._entries, f)
+        os.replace(temp_path, self.path)
+        self._dirty = False
+
+
+class FileHashCache(_JsonFileCache):
+    """
+    Persistent cache of file digests keyed by absolute path and validated by file size and modification time.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(directory, HASH_CACHE_FILE_NAME)
+
+    @classmethod
+    def _fingerprint(cls, file_path: str) -> Tuple[str, int, int]:
+        stat = os.stat(file_path)
+        return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+    def get(self, file_path: str, hash_algos: Tuple[str, ...]) -> Optional[FileHashes]:
+        key, size, mtime_ns = self._fingerprint(file_path)
+        entry = self._entries.get(key)
+        if not entry or entry.get("bytes") != size or entry.get("mtime_ns") != mtime_ns:
+            return None
+        hashes = entry.get("hashes", {})
+        if not all(algo in hashes for algo in hash_algos):
+            return None
+        return FileHashes(size, {algo: hashes[algo] for algo in hash_algos})
+
+    def set(self, file_path: str, file_hashes: FileHashes):
+        key, size, mtime_ns = self._fingerprint(file_path)
+        entry = self._entries.get(key)
+        hashes = {}
+        if entry and entry.get("bytes") == size and entry.get("mtime_ns") == mtime_ns:
+            hashes = entry.get("hashes", {})
+        hashes.update(file_hashes.hashes)
+        self._entries[key] = {"bytes": size, "mtime_ns": mtime_ns, "hashes": hashes}
+        self._dirty = True
+
+
+class UrlMetadataCache(_JsonFileCache):
+    """
+    Persistent cache of remote content digests keyed by url (without query string) along with
+    the validators (ETag, Last-Modified) needed to make conditional requests.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(directory, URL_CACHE_FILE_NAME)
+
+    @classmethod
+    def _key(cls, url: str) -> str:
+        from urllib.parse import urlsplit
+
+        parsed_url = urlsplit(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
+
+    def get(self, url: str, hash_algos: Tuple[str, ...]) -> Optional[dict]:
+        entry = self._entries.get(self._key(url))
+        if not entry or not all(algo in entry.get("hashes", {}) for algo in hash_algos):
+            return None
+        return entry
+
+    def set(self, url: str, file_hashes: FileHashes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        key = self._key(url)
+        if not any([etag, last_modified]):
+            self._dirty = self._entries.pop(key, None) is not None or self._dirty
+            return
+        # Re-insert so the most recently used entries are kept when trimming.
+        self._entries.pop(key, None)
+        self._entries[key] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "bytes": file_hashes.bytes,
+            "hashes": file_hashes.hashes,
+        }
+        while len(self._entries) > URL_CACHE_MAX_ENTRIES:
+            self._entries.pop(next(iter(self._entries)))
+        self._dirty = True
+
+
+def hash_files(
+    file_paths: List[str],
+    hash_algos: Tuple[str, ...],
+    max_workers: Optional[int] = None,
+    cache: Optional[FileHashCache] = None,
+) -> List[FileHashes]:
+    """
+    Hashes a collection of files, returning results in input order.
+    Unique uncached files are distributed across a process pool when there is more than one of them
+    and their combined size reaches PROCESS_POOL_THRESHOLD_BYTES, otherwise they are hashed inline.
+    """
+    results: Dict[str, FileHashes] = {}
+    pending: List[str] = []
+    for file_path in file_paths:
+        if file_path in results or file_path in pending:
+            continue
+        cached = cache.get(file_path, hash_algos) if cache else None
+        if cached:
+            logger.debug("Using cached hashes for %s.", file_path)
+            results[file_path] = cached
+        else:
+            pending.append(file_path)
+
+    if (
+        len(pending) > 1
+        and max_workers != 1
+        and sum(os.path.getsize(file_path) for file_path in pending) >= PROCESS_POOL_THRESHOLD_BYTES
+    ):
+        workers = min(len(pending), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for file_path, file_hashes in zip(
+                pending, executor.map(hash_file, pending, [hash_algos] * len(pending))
+            ):
+                results[file_path] = file_hashes
+    else:
+        for file_path in pending:
+            results[file_path] = hash_file(file_path, hash_algos)
+
+    if cache:
+        for file_path in pending:
+            cache.set(file_path, results[file_path])
+        cache.save()
+
+    return [results[file_path] for file_path in file_paths]
@@ -849,11 +849,48 @@ def load_digitaltwins_help():
     helps["dt twin delete-all"] = """
         type: command
         short-summary: Deletes all digital twins within a Digital Twins instance, including all relationships for those twins.
+        long-summary: All relationships in the instance are deleted first, then all twins. Deletes are sent concurrently.
 
         examples:
         - name: Delete all digital twins. Any relationships referencing the twins will also be deleted.
           text: >
             az dt twin delete-all -n {instance_or_hostname}
+
+        - name: Delete all digital twins using up to 32 concurrent requests.
+          text: >
+            az dt twin delete-all -n {instance_or_hostname} --max-workers 32
+    """
+
+    helps["dt twin bulk"] = """
+        type: group
+        short-summary: Manage digital twins and relationships in bulk.
+    """
+
+    helps["dt twin bulk create"] = """
+        type: command
+        short-summary: Create many digital twins and relationships from a file using concurrent requests.
+        long-summary: |
+                      All twins are created before any relationships so relationships can reference twins
+                      defined in the same file. Relationships whose source or target twin failed to be created
+                      are skipped.
+
+                      Items that fail are reported in the command result and can be written to a retry file
+                      that uses the same format as the input file.
+
+                      For very large graphs consider `az dt job import`.
+
+        examples:
+        - name: Create twins and relationships defined in a file.
+          text: >
+            az dt twin bulk create -n {instance_or_hostname} --data-file graph.json
+
+        - name: Create twins and relationships, writing failed items to a retry file.
+          text: >
+            az dt twin bulk create -n {instance_or_hostname} --data-file graph.json --retry-file retry.json
+
+        - name: Create twins and relationships using up to 32 concurrent requests, failing if an item already exists.
+          text: >
+            az dt twin bulk create -n {instance_or_hostname} --data-file graph.json --max-workers 32 --if-none-match
     """
 
     helps["dt twin relationship"] = """
@@ -157,6 +157,11 @@ def load_digitaltwins_commands(self, _):
         cmd_group.command("delete", "delete_twin")
         cmd_group.command("delete-all", "delete_all_twin", confirmation=True)
 
+    with self.command_group(
+        "dt twin bulk", command_type=digitaltwins_twin_ops
+    ) as cmd_group:
+        cmd_group.command("create", "create_twins_bulk")
+
     with self.command_group(
         "dt twin component", command_type=digitaltwins_twin_ops
     ) as cmd_group:
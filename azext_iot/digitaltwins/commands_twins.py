@@ -4,6 +4,7 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+from azext_iot.digitaltwins.common import DEFAULT_BULK_MAX_WORKERS
 from azext_iot.digitaltwins.providers.twin import TwinProvider
 from knack.log import get_logger
 
@@ -32,6 +33,24 @@ def create_twin(
     )
 
 
+def create_twins_bulk(
+    cmd,
+    name_or_hostname,
+    data_file,
+    retry_file=None,
+    if_none_match=False,
+    max_workers=DEFAULT_BULK_MAX_WORKERS,
+    resource_group_name=None,
+):
+    twin_provider = TwinProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
+    return twin_provider.create_bulk(
+        data_file=data_file,
+        retry_file=retry_file,
+        if_none_match=if_none_match,
+        max_workers=max_workers,
+    )
+
+
 def show_twin(cmd, name_or_hostname, twin_id, resource_group_name=None):
     twin_provider = TwinProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
     return twin_provider.get(twin_id)
@@ -47,9 +66,11 @@ def delete_twin(cmd, name_or_hostname, twin_id, resource_group_name=None, etag=N
     return twin_provider.delete(twin_id=twin_id, etag=etag)
 
 
-def delete_all_twin(cmd, name_or_hostname, resource_group_name=None):
+def delete_all_twin(
+    cmd, name_or_hostname, max_workers=DEFAULT_BULK_MAX_WORKERS, resource_group_name=None
+):
     twin_provider = TwinProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
-    return twin_provider.delete_all()
+    return twin_provider.delete_all(max_workers=max_workers)
 
 
 def create_relationship(
@@ -124,12 +145,12 @@ def delete_relationship(
 
 
 def delete_all_relationship(
-    cmd, name_or_hostname, twin_id=None, resource_group_name=None
+    cmd, name_or_hostname, twin_id=None, max_workers=DEFAULT_BULK_MAX_WORKERS, resource_group_name=None
 ):
     twin_provider = TwinProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
     if twin_id:
         return twin_provider.delete_all_relationship(twin_id=twin_id)
-    return twin_provider.delete_all(only_relationships=True)
+    return twin_provider.delete_all(only_relationships=True, max_workers=max_workers)
 
 
 def send_telemetry(
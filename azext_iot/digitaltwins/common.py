@@ -52,6 +52,9 @@ DEFAULT_CONSUMER_GROUP = "$Default"
 # Models create
 MAX_MODELS_PER_BATCH = 30
 
+# Twin and relationship bulk operations
+DEFAULT_BULK_MAX_WORKERS = 16
+
 
 # Enums
 class ADTEndpointType(Enum):
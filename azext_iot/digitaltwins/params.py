@@ -380,6 +380,12 @@ def load_digitaltwins_arguments(self, _):
             options_list=["--if-none-match"],
             help="Indicates the create operation should fail if an existing twin with the same id exists."
         )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of concurrent requests.",
+        )
 
     with self.argument_context("dt twin create") as context:
         context.argument(
@@ -390,6 +396,27 @@ def load_digitaltwins_arguments(self, _):
             "at the minimum you must provide an empty $metadata object for each component.",
         )
 
+    with self.argument_context("dt twin bulk") as context:
+        context.argument(
+            "data_file",
+            options_list=["--data-file", "--df"],
+            help="Path to a JSON file (or inline JSON) containing a 'digitalTwins' array and/or a 'relationships' array. "
+            "Twins require '$dtId' and '$metadata.$model'. Relationships require '$sourceId', "
+            "'$relationshipId', '$targetId' and '$relationshipName'.",
+        )
+        context.argument(
+            "retry_file",
+            options_list=["--retry-file", "--rf"],
+            help="Path of a file to write items that failed to be created to. The file uses the same format "
+            "as --data-file so it can be provided as input to a subsequent run.",
+        )
+        context.argument(
+            "if_none_match",
+            options_list=["--if-none-match"],
+            help="Indicates each create operation should fail if an existing twin or relationship with the same id exists.",
+            arg_type=get_three_state_flag(),
+        )
+
     with self.argument_context("dt twin telemetry") as context:
         context.argument(
             "telemetry",
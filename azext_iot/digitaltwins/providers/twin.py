@@ -11,7 +11,8 @@ from azext_iot.digitaltwins.providers.base import (
     ErrorResponseException,
 )
 from azext_iot.digitaltwins.providers.model import ModelProvider
-from azext_iot.common.utility import handle_service_exception, process_json_arg
+from azext_iot.digitaltwins.common import DEFAULT_BULK_MAX_WORKERS
+from azext_iot.common.utility import handle_service_exception, process_json_arg, unpack_msrest_error
 from knack.log import get_logger
 
 logger = get_logger(__name__)
@@ -77,6 +78,123 @@ class TwinProvider(DigitalTwinsProvider):
         except ErrorResponseException as e:
             handle_service_exception(e)
 
+    def create_bulk(
+        self, data_file, retry_file=None, if_none_match=False, max_workers=DEFAULT_BULK_MAX_WORKERS
+    ):
+        payload = process_json_arg(content=data_file, argument_name="data-file")
+        if not isinstance(payload, dict):
+            raise InvalidArgumentValueError(
+                "--data-file content must be an object with 'digitalTwins' and/or 'relationships' arrays."
+            )
+        twins = payload.get("digitalTwins", [])
+        relationships = payload.get("relationships", [])
+        for key, items in [("digitalTwins", twins), ("relationships", relationships)]:
+            if not isinstance(items, list):
+                raise InvalidArgumentValueError(f"--data-file '{key}' must be an array.")
+            for index, item in enumerate(items):
+                if not isinstance(item, dict):
+                    raise InvalidArgumentValueError(f"--data-file '{key}' entry {index} must be an object.")
+        for twin in twins:
+            if not twin.get("$dtId") or not twin.get("$metadata", {}).get("$model"):
+                raise InvalidArgumentValueError(f"Twin {twin} requires '$dtId' and '$metadata.$model'.")
+        for edge in relationships:
+            if not all(
+                [edge.get("$sourceId"), edge.get("$relationshipId"), edge.get("$targetId"), edge.get("$relationshipName")]
+            ):
+                raise InvalidArgumentValueError(
+                    f"Relationship {edge} requires '$sourceId', '$relationshipId', '$targetId' and '$relationshipName'."
+                )
+
+        options = TwinOptions(if_none_match=("*" if if_none_match else None))
+
+        # Twins must exist before the relationships that reference them can be created.
+        failed_twins = self._execute_concurrently(
+            items=twins,
+            operation=lambda twin: self.twins_sdk.add(
+                id=twin["$dtId"], twin=twin, digital_twins_add_options=options
+            ),
+            max_workers=max_workers,
+            desc="Creating twins...",
+        )
+
+        failed_twin_ids = set(twin["$dtId"] for twin, _ in failed_twins)
+        pending_relationships = []
+        failed_relationships = []
+        for edge in relationships:
+            if edge["$sourceId"] in failed_twin_ids or edge["$targetId"] in failed_twin_ids:
+                failed_relationships.append((edge, "Source or target twin was not created."))
+            else:
+                pending_relationships.append(edge)
+
+        failed_relationships.extend(
+            self._execute_concurrently(
+                items=pending_relationships,
+                operation=lambda edge: self.twins_sdk.add_relationship(
+                    id=edge["$sourceId"],
+                    relationship_id=edge["$relationshipId"],
+                    relationship={k: v for k, v in edge.items() if k not in ["$sourceId", "$relationshipId"]},
+                    digital_twins_add_relationship_options=options,
+                ),
+                max_workers=max_workers,
+                desc="Creating relationships...",
+            )
+        )
+
+        result = {
+            "digitalTwins": {"total": len(twins), "failed": len(failed_twins)},
+            "relationships": {"total": len(relationships), "failed": len(failed_relationships)},
+            "errors": [
+                {"$dtId": twin["$dtId"], "error": error} for twin, error in failed_twins
+            ] + [
+                {"$sourceId": edge["$sourceId"], "$relationshipId": edge["$relationshipId"], "error": error}
+                for edge, error in failed_relationships
+            ],
+        }
+
+        if retry_file and result["errors"]:
+            retry_payload = {
+                "digitalTwins": [twin for twin, _ in failed_twins],
+                "relationships": [edge for edge, _ in failed_relationships],
+            }
+            with open(retry_file, "w", encoding="utf-8") as f:
+                json.dump(retry_payload, f, indent=2)
+            logger.warning(
+                "%s item(s) could not be created and were written to the retry file %s.",
+                len(result["errors"]),
+                retry_file,
+            )
+
+        return result
+
+    def _execute_concurrently(self, items, operation, max_workers, desc=None):
+        """
+        Run an operation against each item over the shared authenticated client.
+        Returns a list of (item, error message) tuples for the items that failed.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from tqdm import tqdm
+
+        if max_workers < 1:
+            raise InvalidArgumentValueError("max workers must be at least 1")
+
+        failures = []
+        if not items:
+            return failures
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(operation, item): item for item in items}
+            with tqdm(total=len(futures), desc=desc, ascii=" #") as pbar:
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except ErrorResponseException as e:
+                        failures.append((futures[future], unpack_msrest_error(e)))
+                    except Exception as e:  # pylint: disable=broad-except
+                        failures.append((futures[future], str(e)))
+                    pbar.update(1)
+
+        return failures
+
     def get(self, twin_id):
         try:
             return self.twins_sdk.get_by_id(id=twin_id, raw=True).response.json()
@@ -114,22 +232,52 @@ class TwinProvider(DigitalTwinsProvider):
         except ErrorResponseException as e:
             handle_service_exception(e)
 
-    def delete_all(self, only_relationships=False):
-        # need to get all twins
+    def delete_all(self, only_relationships=False, max_workers=DEFAULT_BULK_MAX_WORKERS):
+        # Sweep every relationship in the graph once; listing incoming and outgoing
+        # relationships per twin would enumerate (and delete) each edge twice.
+        self.delete_all_relationships_in_graph(max_workers=max_workers)
+        if only_relationships:
+            return
+
         query = "select * from digitaltwins"
         twins = self.invoke_query(query=query, show_cost=False)["result"]
         print(f"Found {len(twins)} twin(s).")
 
-        # go through and delete all
-        for twin in twins:
-            try:
-                self.delete_all_relationship(
-                    twin_id=twin["$dtId"]
-                )
-                if not only_relationships:
-                    self.delete(twin_id=twin["$dtId"])
-            except Exception as e:
-                logger.warning(f"Could not delete twin {twin['$dtId']}. The error is {e}")
+        delete_options = TwinOptions(if_match="*")
+        failures = self._execute_concurrently(
+            items=twins,
+            operation=lambda twin: self.twins_sdk.delete(
+                id=twin["$dtId"], digital_twins_delete_options=delete_options
+            ),
+            max_workers=max_workers,
+            desc="Deleting twins...",
+        )
+        for twin, error in failures:
+            logger.warning(f"Could not delete twin {twin['$dtId']}. The error is {error}")
+
+    def delete_all_relationships_in_graph(self, max_workers=DEFAULT_BULK_MAX_WORKERS):
+        query = "select * from relationships"
+        relationships = self.invoke_query(query=query, show_cost=False)["result"]
+
+        unique_relationships = {}
+        for relationship in relationships:
+            unique_relationships[(relationship["$sourceId"], relationship["$relationshipId"])] = relationship
+        relationships = list(unique_relationships.values())
+        print(f"Found {len(relationships)} relationship(s).")
+
+        delete_options = TwinOptions(if_match="*")
+        failures = self._execute_concurrently(
+            items=relationships,
+            operation=lambda relationship: self.twins_sdk.delete_relationship(
+                id=relationship["$sourceId"],
+                relationship_id=relationship["$relationshipId"],
+                digital_twins_delete_relationship_options=delete_options,
+            ),
+            max_workers=max_workers,
+            desc="Deleting relationships...",
+        )
+        for relationship, error in failures:
+            logger.warning(f"Could not delete relationship {relationship}. The error is {error}.")
 
     def add_relationship(
         self,
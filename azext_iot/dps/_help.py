@@ -57,3 +57,20 @@ def load_deviceprovisioningservice_help():
             the certificate file is the registration id.
           text: az iot device registration create --id-scope {id_scope} --rid {registration_id} --cp {certificate_file} --kp {key_file}
     """
+
+    helps["iot device registration create-batch"] = """
+        type: command
+        short-summary: Register many IoT devices concurrently from a symmetric key enrollment group.
+        long-summary: |
+          Device keys are computed locally from the enrollment group symmetric key, which is retrieved once
+          unless provided with --symmetric-key. Registrations run concurrently, bounded by --concurrency.
+
+          The result reports registration status counts, the distribution of assigned IoT Hubs, registration
+          latency percentiles and any failed registrations. Use it to load test allocation policies.
+        examples:
+        - name: Register 1000 devices from a group enrollment, retrieving the ID Scope and group key.
+          text: az iot device registration create-batch -n {dps_name} --gid {group_enrollment_id} --rp 'sensor-{0001..1000}'
+        - name: Register the devices listed in a file using the Device Provisioning Service ID Scope and the
+            enrollment group symmetric key. This will bypass retrieving the ID Scope and group key.
+          text: az iot device registration create-batch --id-scope {id_scope} --key {symmetric_key} --rf {registration_id_file} --cc 64
+    """
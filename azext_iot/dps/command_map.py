@@ -24,3 +24,4 @@ def load_dps_commands(self, _):
         is_preview=True
     ) as cmd_group:
         cmd_group.command("create", "create_device_registration")
+        cmd_group.command("create-batch", "create_device_registration_batch", is_experimental=True)
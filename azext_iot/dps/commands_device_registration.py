@@ -7,8 +7,16 @@
 
 from knack.log import get_logger
 
+from typing import List
+
+from azure.cli.core.azclierror import MutuallyExclusiveArgumentError, RequiredArgumentMissingError
+from azext_iot.common.utility import expand_id_pattern, read_ids_from_file
 from azext_iot.constants import IOTDPS_PROVISIONING_HOST
-from azext_iot.dps.providers.device_registration import DeviceRegistrationProvider
+from azext_iot.dps.common import REGISTRATION_BATCH_CONCURRENCY
+from azext_iot.dps.providers.device_registration import (
+    DeviceRegistrationBatchProvider,
+    DeviceRegistrationProvider,
+)
 
 logger = get_logger(__name__)
 
@@ -49,3 +57,53 @@ def create_device_registration(
         payload=payload,
         provisioning_host=provisioning_host
     )
+
+
+def create_device_registration_batch(
+    cmd,
+    enrollment_group_id: str = None,
+    device_symmetric_key: str = None,
+    registration_ids: List[str] = None,
+    registration_id_file: str = None,
+    registration_id_pattern: str = None,
+    payload: str = None,
+    concurrency: int = REGISTRATION_BATCH_CONCURRENCY,
+    id_scope: str = None,
+    dps_name: str = None,
+    resource_group_name: str = None,
+    login: str = None,
+    auth_type_dataplane: str = None,
+    provisioning_host: str = IOTDPS_PROVISIONING_HOST,
+):
+    registration_id_sources = [
+        source for source in [registration_ids, registration_id_file, registration_id_pattern] if source
+    ]
+    if not registration_id_sources:
+        raise RequiredArgumentMissingError(
+            "Provide registration ids via --registration-ids, --registration-id-file or --registration-id-pattern."
+        )
+    if len(registration_id_sources) > 1:
+        raise MutuallyExclusiveArgumentError(
+            "Only one of --registration-ids, --registration-id-file or --registration-id-pattern can be used."
+        )
+    if registration_id_file:
+        registration_ids = read_ids_from_file(registration_id_file)
+    elif registration_id_pattern:
+        registration_ids = expand_id_pattern(registration_id_pattern)
+
+    device_provider = DeviceRegistrationBatchProvider(
+        cmd=cmd,
+        id_scope=id_scope,
+        dps_name=dps_name,
+        resource_group_name=resource_group_name,
+        login=login,
+        auth_type_dataplane=auth_type_dataplane,
+    )
+    return device_provider.create_batch(
+        registration_ids=registration_ids,
+        enrollment_group_id=enrollment_group_id,
+        group_symmetric_key=device_symmetric_key,
+        payload=payload,
+        concurrency=concurrency,
+        provisioning_host=provisioning_host,
+    )
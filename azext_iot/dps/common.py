@@ -14,6 +14,9 @@ DPS_IDENTIFIER = "DPS Identifier"
 SYM_KEY_AUTH = "Symmetric Key Authentication"
 CERT_AUTH = "x509 Authentication"
 
+# Bulk registration
+REGISTRATION_BATCH_CONCURRENCY = 32
+
 # Error messages from Device SDK
 DISABLED_REGISTRATION_ERROR = "Query Status Operation encountered an invalid registration status 'disabled' with a "\
     "status code of 200"
@@ -93,3 +93,41 @@ def load_dps_arguments(self, _):
             help="Passphrase for the certificate.",
             arg_group=CERT_AUTH
         )
+
+    with self.argument_context("iot device registration create-batch") as context:
+        context.argument(
+            "enrollment_group_id",
+            options_list=["--enrollment-group-id", "--group-id", "--gid"],
+            help="Symmetric key enrollment group ID. Used to retrieve the group key when --symmetric-key "
+            "is not provided."
+        )
+        context.argument(
+            "device_symmetric_key",
+            options_list=["--symmetric-key", "--key"],
+            help="The enrollment group symmetric key. Device keys are computed from this key for each "
+            "registration ID.",
+            arg_group=SYM_KEY_AUTH
+        )
+        context.argument(
+            "registration_ids",
+            options_list=["--registration-ids", "--rids"],
+            nargs="+",
+            help="Space-separated list of device registration IDs.",
+        )
+        context.argument(
+            "registration_id_file",
+            options_list=["--registration-id-file", "--rf"],
+            help="Path to a file containing one device registration ID per line.",
+        )
+        context.argument(
+            "registration_id_pattern",
+            options_list=["--registration-id-pattern", "--rp"],
+            help="Registration ID pattern with an inclusive numeric range, for example 'sensor-{1..1000}'. "
+            "Leading zeros in the range start are kept as padding, for example 'sensor-{0001..1000}'.",
+        )
+        context.argument(
+            "concurrency",
+            options_list=["--concurrency", "--cc"],
+            type=int,
+            help="Maximum number of registrations in flight at once.",
+        )
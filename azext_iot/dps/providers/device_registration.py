@@ -4,11 +4,15 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import asyncio
 from knack.log import get_logger
-from typing import TypeVar
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypeVar
 from azext_iot.common.shared import AttestationType
+from azext_iot.common.utility import compute_device_keys, ensure_azure_namespace_path, latency_percentiles
 from azext_iot.constants import IOTDPS_PROVISIONING_HOST
 from azext_iot.dps.common import (
+    REGISTRATION_BATCH_CONCURRENCY,
     DISABLED_REGISTRATION_ERROR,
     FAILED_REGISTRATION_ERROR,
     UNAUTHORIZED_ERROR,
@@ -20,6 +24,7 @@ from azext_iot.dps.common import (
 )
 from azext_iot.dps.providers.discovery import DPSDiscovery
 from azext_iot.operations.dps import (
+    _get_enrollment_group_symmetric_key,
     iot_dps_compute_device_key,
     iot_dps_device_enrollment_get,
     iot_dps_device_enrollment_group_get
@@ -52,23 +57,31 @@ class DeviceRegistrationProvider():
         self.resource_group_name = resource_group_name
         self.login = login
         self.auth_type_dataplane = auth_type_dataplane
+        self.discovery = None
+        self.target = None
 
         self.id_scope = id_scope or self._get_idscope()
         self.registration_id = registration_id
 
+    def _get_target(self) -> dict:
+        # Discovery is performed at most once per provider
+        if not self.target:
+            self.discovery = DPSDiscovery(self.cmd)
+            self.target = self.discovery.get_target(
+                self.dps_name,
+                self.resource_group_name,
+                login=self.login,
+                auth_type=self.auth_type_dataplane,
+            )
+        return self.target
+
     def _get_idscope(self) -> str:
-        discovery = DPSDiscovery(self.cmd)
-        target = discovery.get_target(
-            self.dps_name,
-            self.resource_group_name,
-            login=self.login,
-            auth_type=self.auth_type_dataplane,
-        )
+        target = self._get_target()
         if target.get("idscope"):
             return target["idscope"]
         # If cstring is used, will need to retrieve the id scope manually
         dps_name = target['entity'].split(".")[0]
-        return discovery.get_id_scope(resource_name=dps_name, rg=self.resource_group_name)
+        return self.discovery.get_id_scope(resource_name=dps_name, rg=self.resource_group_name)
 
     def create(
         self,
@@ -269,3 +282,146 @@ class DeviceRegistrationProvider():
                 return AzureResponseError(f"{cause}. {msg}")
         else:
             return error
+
+
+class DeviceRegistrationBatchProvider(DeviceRegistrationProvider):
+    """
+    Registers many devices from a symmetric key enrollment group. Device keys are derived locally from the
+    group key and registrations run concurrently on an asyncio event loop with bounded parallelism.
+    """
+
+    def __init__(
+        self,
+        cmd,
+        id_scope: str = None,
+        dps_name: str = None,
+        resource_group_name: str = None,
+        login: str = None,
+        auth_type_dataplane: str = None,
+    ):
+        super(DeviceRegistrationBatchProvider, self).__init__(
+            cmd=cmd,
+            registration_id=None,
+            id_scope=id_scope,
+            dps_name=dps_name,
+            resource_group_name=resource_group_name,
+            login=login,
+            auth_type_dataplane=auth_type_dataplane,
+        )
+
+    def create_batch(
+        self,
+        registration_ids: Iterable[str],
+        enrollment_group_id: str = None,
+        group_symmetric_key: str = None,
+        provisioning_host: str = IOTDPS_PROVISIONING_HOST,
+        payload: str = None,
+        concurrency: int = REGISTRATION_BATCH_CONCURRENCY,
+    ) -> Dict[str, Any]:
+        if concurrency < 1:
+            raise InvalidArgumentValueError("Concurrency must be at least 1.")
+        # read the ids before any service call so a bad id source fails fast
+        registration_ids = list(dict.fromkeys(registration_ids))
+        if not registration_ids:
+            raise RequiredArgumentMissingError("No registration ids were provided.")
+        if not group_symmetric_key:
+            if not enrollment_group_id:
+                raise RequiredArgumentMissingError(COMPUTE_KEY_ERROR)
+            if not (self.dps_name or self.login):
+                raise RequiredArgumentMissingError(MISSING_DPS_CREDENTIALS_ERROR)
+            group_symmetric_key = _get_enrollment_group_symmetric_key(
+                target=self._get_target(), enrollment_id=enrollment_group_id
+            )
+
+        device_keys = list(compute_device_keys(group_symmetric_key, registration_ids))
+
+        start = perf_counter()
+        results = asyncio.run(
+            self._register_all(
+                device_keys=device_keys,
+                provisioning_host=provisioning_host,
+                payload=payload,
+                concurrency=concurrency,
+            )
+        )
+        elapsed = perf_counter() - start
+
+        statuses = {}
+        assigned_hubs = {}
+        latencies = []
+        errors = []
+        for registration_id, registration_result, latency, error in results:
+            if error:
+                errors.append({"registrationId": registration_id, "error": str(error)})
+                continue
+            latencies.append(latency)
+            statuses[registration_result.status] = statuses.get(registration_result.status, 0) + 1
+            registration_state = registration_result.registration_state
+            assigned_hub = registration_state.assigned_hub if registration_state else None
+            if assigned_hub:
+                assigned_hubs[assigned_hub] = assigned_hubs.get(assigned_hub, 0) + 1
+
+        return {
+            "total": len(results),
+            "assigned": sum(assigned_hubs.values()),
+            "failed": len(errors),
+            "elapsedSeconds": round(elapsed, 3),
+            "registrationsPerSecond": round(len(results) / elapsed, 3) if elapsed else 0,
+            "statuses": statuses,
+            "assignedHubs": assigned_hubs,
+            "latencyMs": latency_percentiles(latencies),
+            "errors": errors,
+        }
+
+    async def _register_all(
+        self,
+        device_keys: List[Tuple[str, str]],
+        provisioning_host: str,
+        payload: str,
+        concurrency: int,
+    ) -> List[Tuple[str, Any, float, Optional[Exception]]]:
+        from tqdm import tqdm
+
+        semaphore = asyncio.Semaphore(concurrency)
+        progress = tqdm(total=len(device_keys), desc="Device registration in progress", ascii=" #")
+
+        async def _register(registration_id: str, device_key: str):
+            async with semaphore:
+                result = await self._register_device(
+                    registration_id=registration_id,
+                    device_key=device_key,
+                    provisioning_host=provisioning_host,
+                    payload=payload,
+                )
+                progress.update(1)
+                return result
+
+        try:
+            return await asyncio.gather(*[_register(*device_key) for device_key in device_keys])
+        finally:
+            progress.close()
+
+    async def _register_device(
+        self,
+        registration_id: str,
+        device_key: str,
+        provisioning_host: str,
+        payload: str,
+    ) -> Tuple[str, Any, float, Optional[Exception]]:
+        ensure_azure_namespace_path()
+        from azure.iot.device.aio import ProvisioningDeviceClient
+
+        start = perf_counter()
+        try:
+            client = ProvisioningDeviceClient.create_from_symmetric_key(
+                provisioning_host=provisioning_host,
+                registration_id=registration_id,
+                id_scope=self.id_scope,
+                symmetric_key=device_key,
+            )
+            client.provisioning_payload = payload
+            registration_result = await client.register()
+            return registration_id, registration_result, perf_counter() - start, None
+        except Exception as e:  # pylint: disable=broad-except
+            # any failure is reported for this device without stopping the rest of the batch
+            return registration_id, None, perf_counter() - start, self._handle_exception(e, is_group=True)
@@ -0,0 +1,36 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from typing import List
+from azext_iot.sdk.dps.service.models import ProvisioningServiceErrorDetailsException
+
+
+# Bulk enrollment requests bypass the generated run_bulk_operation to send raw json, which relies on
+# the generated operations' private _client and _deserialize members. All of that access is kept in this
+# module so a regenerated sdk only needs to be checked here.
+
+
+def send_bulk_enrollment_request(sdk, enrollments: List[dict], mode: str):
+    """
+    Send a single bulk individual enrollment request, returning the raw response.
+    """
+    operations = sdk.individual_enrollment
+    request = operations._client.post(
+        operations.run_bulk_operation.metadata["url"], {"api-version": operations.api_version}
+    )
+    return operations._client.send(
+        request,
+        {"Content-Type": "application/json; charset=utf-8"},
+        {"enrollments": enrollments, "mode": mode},
+        stream=False,
+    )
+
+
+def bulk_enrollment_error(sdk, response) -> ProvisioningServiceErrorDetailsException:
+    """
+    Build the service exception for a failed bulk individual enrollment response.
+    """
+    return ProvisioningServiceErrorDetailsException(sdk.individual_enrollment._deserialize, response)
@@ -93,6 +93,27 @@ def load_iothub_help():
             az iot hub job cancel --hub-name {iothub_name} --job-id {job_id}
     """
 
+    helps["iot hub job watch"] = """
+        type: command
+        short-summary: Watch the progress of one or more IoT Hub jobs until they reach a terminal state.
+        long-summary: |
+                      Each job is polled on its own adaptive interval: polling backs off while a job is queued or scheduled,
+                      tightens as its device statistics approach completion and slows down for all jobs when the hub
+                      throttles requests. A job stops being polled once it is completed, failed or cancelled.
+
+                      Whenever the status or device statistics of a job change, a progress record is written as
+                      newline delimited json to the output file or stdout.
+
+        examples:
+        - name: Stream the progress of several jobs to stdout.
+          text: >
+            az iot hub job watch --hub-name {iothub_name} --job-ids {job_id_1} {job_id_2} {job_id_3}
+        - name: Write the progress of several jobs to a file, checking status at most every 30 seconds for up to an hour.
+          text: >
+            az iot hub job watch --hub-name {iothub_name} --job-ids {job_id_1} {job_id_2} --output-file progress.ndjson
+            --poll-interval 30 --poll-duration 3600
+    """
+
     helps["iot hub digital-twin"] = """
         type: group
         short-summary: Manipulate and interact with the digital twin of an IoT Hub device.
@@ -258,6 +279,34 @@ def load_iothub_help():
             az iot device c2d-message send -d {device_id} -n {iothub_name} --data-file-path {file_path} --content-type 'application/json'
     """
 
+    helps[
+        "iot device c2d-message send-batch"
+    ] = """
+        type: command
+        short-summary: Send cloud-to-device messages to many devices over a single AMQP connection.
+        long-summary: |
+                      This command relies on and may install dependent Cython package (uamqp) upon first execution.
+                      https://github.com/Azure/azure-uamqp-python
+
+                      Messages are queued in batches on one send link instead of opening a connection per message.
+                      Targets can be provided with `--device-ids`, with a targets file, or both. Each line of the
+                      targets file is either a device Id or a json object such as
+                      {"deviceId": "d1", "data": "Hello", "properties": {"key0": "value0"}} whose values override
+                      the command level message content for that device.
+
+                      The result includes the message Id and final send state for each target.
+        examples:
+        - name: Send the same message to several devices.
+          text: >
+            az iot device c2d-message send-batch -n {iothub_name} --device-ids {device_id1} {device_id2} --data 'Hello World'
+        - name: Send per-device messages from a targets file and request full acknowledgement.
+          text: >
+            az iot device c2d-message send-batch -n {iothub_name} --targets-file {file_path} --ack full
+        - name: Send to several devices and wait for delivery feedback, reporting outcome and latency stats.
+          text: >
+            az iot device c2d-message send-batch -n {iothub_name} --device-ids {device_id1} {device_id2} --ack full --wait --timeout 600
+    """
+
     helps[
         "iot device send-d2c-message"
     ] = """
@@ -346,6 +395,29 @@ def load_iothub_help():
           text: az iot device simulate -n {iothub_name} -d {device_id} --rs abandon --protocol http
     """
 
+    helps[
+        "iot device simulate-load"
+    ] = """
+        type: command
+        short-summary: Generate device-to-cloud message load from many simulated devices in an Azure IoT Hub.
+        long-summary: |
+                      Each selected device opens its own mqtt connection, or mqtt over websockets with --websockets, and
+                      messages are distributed across the devices to reach the target aggregate message rate. Devices can
+                      be selected with an IoT Hub query, a device Id prefix or a file of device Ids. Only devices using symmetric key authentication can be simulated.
+                      When complete, the achieved throughput and message send latency percentiles are reported.
+                      Note: The command by default will set content-type to application/json and content-encoding
+                      to utf-8. This can be overriden.
+        examples:
+        - name: Send 1000 messages at 50 messages per second from all devices whose Id starts with 'loadtest'
+          text: az iot device simulate-load -n {iothub_name} --device-prefix loadtest --msg-count 1000 --rate 50
+        - name: Send 1KB messages from up to 100 devices selected by a query
+          text: >
+            az iot device simulate-load -n {iothub_name} --device-query "select deviceId from devices where tags.load = true"
+            --max-devices 100 --payload-size 1024
+        - name: Send messages in bursts of 200 at an average of 100 messages per second from devices listed in a file
+          text: az iot device simulate-load -n {iothub_name} --device-file {device_ids_file} --rate 100 --burst-size 200
+    """
+
     helps[
         "iot device upload-file"
     ] = """
@@ -398,6 +470,10 @@ def load_iothub_help():
             --root-cert "root_cert.pem" --root-key "root_key.pem" --device-auth x509_thumbprint
             --device id=parent1
             --device id=child1 parent=parent1
+
+        - name: Create a nested edge device hierarchy from a configuration file, generating EC device and hub auth certificates.
+          text: >
+            az iot edge devices create -n {hub_name} --cfg path/to/config_yml_or_json --out {device_bundle_path} --key-type ec
     """
 
     helps[
@@ -911,7 +987,16 @@ def load_iothub_help():
     ] = """
         type: command
         short-summary: Test all routes or a mentioned route in an IoT Hub.
-        long-summary: You can provide a sample message to test your routes.
+        long-summary: |
+            You can provide a sample message to test your routes.
+
+            Route conditions are retrieved from the hub's routing configuration, compiled once and evaluated
+            locally against the message body, app properties, system properties and twin. Message bodies are
+            only queried when the content type is application/json and the content encoding is utf-8, utf-16
+            or utf-32. Use --messages-file to test a corpus of sample messages, reporting the routes each
+            message is sent to.
+
+            Use --use-service to test routes with the IoT Hub service instead.
         examples:
           - name: Test a route from an IoT Hub.
             text: >
@@ -922,6 +1007,12 @@ def load_iothub_help():
           - name: Test all route from an IoT Hub with a custom message, including body, app properties, and system properties.
             text: >
               az iot hub message-route test -n {iothub_name} -b {body} --ap {app_properties} --sp {system_properties}
+          - name: Test all routes from an IoT Hub against each sample message in a newline delimited json file.
+            text: >
+              az iot hub message-route test -n {iothub_name} --messages-file messages.ndjson
+          - name: Test a route with the IoT Hub service, including the device twin.
+            text: >
+              az iot hub message-route test -n {iothub_name} --route-name {route_name} --twin {twin} --use-service
     """
 
     helps[
@@ -49,6 +49,7 @@ def load_iothub_commands(self, _):
         cmd_group.show_command("show", "job_show")
         cmd_group.command("list", "job_list")
         cmd_group.command("cancel", "job_cancel")
+        cmd_group.command("watch", "job_watch", is_experimental=True)
 
     with self.command_group(
         "iot hub digital-twin", command_type=pnp_runtime_ops
@@ -159,6 +160,7 @@ def load_iothub_commands(self, _):
     with self.command_group("iot device", command_type=device_messaging_ops) as cmd_group:
         cmd_group.command("send-d2c-message", "iot_device_send_message")
         cmd_group.command("simulate", "iot_simulate_device", is_experimental=True)
+        cmd_group.command("simulate-load", "iot_simulate_device_load", is_experimental=True)
         cmd_group.command("upload-file", "iot_device_upload_file")
 
     with self.command_group(
@@ -169,6 +171,7 @@ def load_iothub_commands(self, _):
         cmd_group.command("reject", "iot_c2d_message_reject")
         cmd_group.command("receive", "iot_c2d_message_receive")
         cmd_group.command("send", "iot_c2d_message_send")
+        cmd_group.command("send-batch", "iot_c2d_message_send_batch", is_experimental=True)
         cmd_group.command("purge", "iot_c2d_message_purge")
 
     with self.command_group("iot hub state", command_type=iothub_state_ops, is_experimental=True) as cmd_group:
@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------------------------
 
 from typing import List, Optional
+from azext_iot.common.shared import CertificateKeyType
 from azext_iot.iothub.providers.device_identity import DeviceIdentityProvider
 from knack.log import get_logger
 
@@ -25,6 +26,7 @@ def iot_edge_devices_create(
     root_key_path: Optional[str] = None,
     root_cert_password: Optional[str] = None,
     bundle_output_path: Optional[str] = None,
+    key_type: str = CertificateKeyType.rsa.value,
     hub_name_or_hostname: Optional[str] = None,
     resource_group_name: Optional[str] = None,
     login: Optional[str] = None,
@@ -50,6 +52,7 @@ def iot_edge_devices_create(
         root_key_path=root_key_path,
         root_cert_password=root_cert_password,
         output_path=bundle_output_path,
+        key_type=key_type,
     )
 
 
@@ -4,7 +4,8 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from typing import Optional
+from typing import List, Optional
+from azext_iot.iothub.providers.device_load import DeviceLoadProvider
 from azext_iot.iothub.providers.device_messaging import DeviceMessagingProvider
 from knack.log import get_logger
 
@@ -157,6 +158,54 @@ def iot_c2d_message_send(
     )
 
 
+def iot_c2d_message_send_batch(
+    cmd,
+    device_ids: Optional[List[str]] = None,
+    targets_file: Optional[str] = None,
+    data: str = "Ping from Az CLI IoT Extension",
+    correlation_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    content_encoding: str = "utf-8",
+    content_type: Optional[str] = None,
+    expiry_time_utc: Optional[str] = None,
+    properties: Optional[str] = None,
+    ack: Optional[str] = None,
+    wait_on_feedback: bool = False,
+    timeout: int = 0,
+    yes: bool = False,
+    repair: bool = False,
+    hub_name_or_hostname: Optional[str] = None,
+    resource_group_name: Optional[str] = None,
+    login: Optional[str] = None,
+    auth_type_dataplane: Optional[str] = None
+):
+    from azext_iot.common.deps import ensure_uamqp
+    ensure_uamqp(cmd.cli_ctx.config, yes, repair)
+
+    messaging_provider = DeviceMessagingProvider(
+        cmd=cmd,
+        device_id=None,
+        hub_name=hub_name_or_hostname,
+        rg=resource_group_name,
+        login=login,
+        auth_type_dataplane=auth_type_dataplane
+    )
+    return messaging_provider.c2d_message_send_batch(
+        device_ids=device_ids,
+        targets_file=targets_file,
+        data=data,
+        correlation_id=correlation_id,
+        user_id=user_id,
+        content_encoding=content_encoding,
+        content_type=content_type,
+        expiry_time_utc=expiry_time_utc,
+        properties=properties,
+        ack=ack,
+        wait_on_feedback=wait_on_feedback,
+        timeout=timeout,
+    )
+
+
 def iot_c2d_message_purge(
     cmd,
     device_id: str,
@@ -212,6 +261,46 @@ def iot_simulate_device(
     )
 
 
+def iot_simulate_device_load(
+    cmd,
+    device_query: Optional[str] = None,
+    device_prefix: Optional[str] = None,
+    device_file: Optional[str] = None,
+    max_devices: Optional[int] = None,
+    data: str = "Ping from Az CLI IoT Extension",
+    properties: Optional[str] = None,
+    msg_count: int = 100,
+    rate: float = 10.0,
+    payload_size: Optional[int] = None,
+    burst_size: int = 1,
+    websockets: bool = False,
+    hub_name_or_hostname: Optional[str] = None,
+    resource_group_name: Optional[str] = None,
+    login: Optional[str] = None,
+    auth_type_dataplane: Optional[str] = None,
+):
+    load_provider = DeviceLoadProvider(
+        cmd=cmd,
+        hub_name=hub_name_or_hostname,
+        rg=resource_group_name,
+        login=login,
+        auth_type_dataplane=auth_type_dataplane,
+    )
+    return load_provider.simulate_load(
+        device_query=device_query,
+        device_prefix=device_prefix,
+        device_file=device_file,
+        max_devices=max_devices,
+        data=data,
+        properties=properties,
+        msg_count=msg_count,
+        rate=rate,
+        payload_size=payload_size,
+        burst_size=burst_size,
+        websockets=websockets,
+    )
+
+
 def iot_device_upload_file(
     cmd,
     device_id: str,
@@ -109,3 +109,29 @@ def job_cancel(
         auth_type_dataplane=auth_type_dataplane,
     )
     return jobs.cancel(job_id)
+
+
+def job_watch(
+    cmd,
+    job_ids,
+    output_file=None,
+    poll_interval=10,
+    poll_duration=600,
+    hub_name_or_hostname=None,
+    resource_group_name=None,
+    login=None,
+    auth_type_dataplane=None,
+):
+    jobs = JobProvider(
+        cmd=cmd,
+        hub_name=hub_name_or_hostname,
+        rg=resource_group_name,
+        login=login,
+        auth_type_dataplane=auth_type_dataplane,
+    )
+    return jobs.watch(
+        job_ids=job_ids,
+        output_file=output_file,
+        poll_interval=poll_interval,
+        poll_duration=poll_duration,
+    )
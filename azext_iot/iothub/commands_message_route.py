@@ -100,6 +100,9 @@ def message_route_test(
     body: Optional[str] = None,
     app_properties: Optional[str] = None,
     system_properties: Optional[str] = None,
+    twin: Optional[str] = None,
+    messages_file: Optional[str] = None,
+    use_service: bool = False,
     resource_group_name: Optional[str] = None,
 ):
     message_route_provider = MessageRoute(
@@ -110,7 +113,10 @@ def message_route_test(
         source_type=source_type,
         body=body,
         app_properties=app_properties,
-        system_properties=system_properties
+        system_properties=system_properties,
+        twin=twin,
+        messages_file=messages_file,
+        use_service=use_service,
     )
 
 
@@ -7,7 +7,7 @@
 from azext_iot.iothub.providers.state import HubAspects
 from azext_iot.iothub.common import CertificateAuthorityVersions
 from azure.cli.core.commands.parameters import get_enum_type, get_three_state_flag
-from azext_iot.common.shared import DeviceAuthType, SettleType, ProtocolType, AckType
+from azext_iot.common.shared import DeviceAuthType, SettleType, ProtocolType, AckType, CertificateKeyType
 from azext_iot.assets.user_messages import info_param_properties_device
 from azext_iot._params import hub_auth_type_dataplane_param_type
 from azext_iot.iothub.common import EncodingFormat, EndpointType, RouteSourceType
@@ -164,6 +164,70 @@ def load_iothub_arguments(self, _):
             "Optional param, only supported for mqtt.",
         )
 
+    with self.argument_context("iot device simulate-load") as context:
+        context.argument(
+            "properties",
+            options_list=["--properties", "--props", "-p"],
+            help=info_param_properties_device(),
+        )
+        context.argument(
+            "device_query",
+            options_list=["--device-query", "--dq"],
+            help="IoT Hub query used to select the devices to simulate. The query must return the deviceId of "
+            "each device. If no device selection argument is provided, all devices in the hub are used.",
+            arg_group="Device Selection",
+        )
+        context.argument(
+            "device_prefix",
+            options_list=["--device-prefix", "--dp"],
+            help="Simulate the devices whose device Id starts with this prefix.",
+            arg_group="Device Selection",
+        )
+        context.argument(
+            "device_file",
+            options_list=["--device-file", "--df"],
+            help="Path to a file containing the Ids of the devices to simulate, one per line.",
+            arg_group="Device Selection",
+        )
+        context.argument(
+            "max_devices",
+            options_list=["--max-devices", "--md"],
+            type=int,
+            help="Maximum number of devices to simulate.",
+            arg_group="Device Selection",
+        )
+        context.argument(
+            "msg_count",
+            options_list=["--msg-count", "--mc"],
+            type=int,
+            help="Total number of device messages to send across all simulated devices.",
+        )
+        context.argument(
+            "rate",
+            options_list=["--rate"],
+            type=float,
+            help="Target aggregate rate of device-to-cloud messages per second across all simulated devices.",
+        )
+        context.argument(
+            "payload_size",
+            options_list=["--payload-size", "--ps"],
+            type=int,
+            help="Size in bytes of each message body. The generated payload is padded to this size.",
+        )
+        context.argument(
+            "burst_size",
+            options_list=["--burst-size", "--bs"],
+            type=int,
+            help="Number of messages sent back-to-back in each burst. Bursts are spaced to keep the "
+            "aggregate rate on target; a burst size of 1 sends at a steady rate.",
+        )
+        context.argument(
+            "websockets",
+            options_list=["--websockets", "--ws"],
+            arg_type=get_three_state_flag(),
+            help="Connect the simulated devices using MQTT over WebSockets (port 443) instead of MQTT (port 8883).",
+        )
+
     with self.argument_context("iot device c2d-message") as context:
         context.argument(
             "correlation_id",
@@ -228,6 +292,42 @@ def load_iothub_arguments(self, _):
             help="If set the c2d send operation will block until device feedback has been received.",
         )
 
+    with self.argument_context("iot device c2d-message send-batch") as context:
+        context.argument(
+            "device_ids",
+            options_list=["--device-ids", "--dids"],
+            nargs="+",
+            help="Space-separated list of target device Ids. Each device receives the same message content.",
+        )
+        context.argument(
+            "targets_file",
+            options_list=["--targets-file", "--tf"],
+            help="Path to a file with one target per line. A line is either a device Id or a json object with a "
+            "required 'deviceId' and optional 'data', 'messageId', 'correlationId', 'userId', 'properties' and "
+            "'ack' overrides for that message.",
+        )
+        context.argument(
+            "ack",
+            options_list=["--ack"],
+            arg_type=get_enum_type(AckType),
+            help="Request the delivery of per-message feedback regarding the final state of each message. "
+            "By default, no ack is requested.",
+        )
+        context.argument(
+            "wait_on_feedback",
+            options_list=["--wait", "-w"],
+            arg_type=get_three_state_flag(),
+            help="If set the command will block until feedback has been received for every sent message that "
+            "requested an ack, then report delivery outcome and latency stats. Messages requesting only a negative "
+            "ack are not waited on, as no feedback is sent when they are delivered.",
+        )
+        context.argument(
+            "timeout",
+            options_list=["--timeout", "--to", "-t"],
+            type=int,
+            help="Maximum seconds to wait for feedback. Use 0 for infinity.",
+        )
+
     with self.argument_context("iot device c2d-message receive") as context:
         context.argument(
             "abandon",
@@ -359,8 +459,8 @@ def load_iothub_arguments(self, _):
             "visualize",
             options_list=["--visualize", "--vis", "-v"],
             arg_type=get_three_state_flag(),
-            help="Shows visualizations of devices and progress of various tasks "
-            "(device creation, setting parents, updating configs, etc).",
+            help="Shows visualizations of devices, progress of various tasks "
+            "(device creation, updating configs, writing bundles, etc) and the elapsed time of each phase.",
         )
         context.argument(
             "config_file",
@@ -425,6 +525,14 @@ def load_iothub_arguments(self, _):
             help="Root key password",
             arg_group="Root Certificate",
         )
+        context.argument(
+            "key_type",
+            options_list=["--key-type", "--kt"],
+            arg_type=get_enum_type(CertificateKeyType),
+            help="Key algorithm for generated device CA certificates and, with x509 hub authentication, "
+            "device hub authentication certificates. EC keys use the NIST P-256 curve and are "
+            "significantly faster to generate than RSA keys for large device hierarchies.",
+        )
         context.argument(
             "yes",
             options_list=["--yes", "-y"],
@@ -658,6 +766,24 @@ def load_iothub_arguments(self, _):
             options_list=["--system-properties", "--sp"],
             help="System properties of the route message.",
         )
+        context.argument(
+            "twin",
+            options_list=["--twin"],
+            help="Twin of the device sending the route message, with tags and desired and reported properties, "
+            "for conditions that query $twin.",
+        )
+        context.argument(
+            "messages_file",
+            options_list=["--messages-file", "--mf"],
+            help="Path of a json array or newline delimited json file of sample messages to test locally. "
+            "Each message is an object with optional body, appProperties, systemProperties and twin.",
+        )
+        context.argument(
+            "use_service",
+            options_list=["--use-service", "--us"],
+            arg_type=get_three_state_flag(),
+            help="Test routes with the IoT Hub service instead of evaluating route conditions locally.",
+        )
 
     with self.argument_context("iot hub certificate root-authority set") as context:
         context.argument(
@@ -3,37 +3,40 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import PurePath
 from knack.prompting import prompt_y_n
-from os import makedirs
+from os import cpu_count, makedirs
 from os.path import exists, abspath
-from shutil import rmtree
 from azext_iot.common.certops import (
     create_self_signed_certificate,
     create_ca_signed_certificate,
     make_cert_chain,
 )
 
-from azext_iot.common.fileops import tar_directory, write_content_to_file
+from azext_iot.common.fileops import tar_contents
 from azext_iot.iothub.providers.helpers.edge_device_config import (
     DEVICE_README,
+    EDGE_BUNDLE_MAX_WORKERS,
+    EDGE_IDENTITY_MAX_WORKERS,
     EDGE_ROOT_CERTIFICATE_FILENAME,
-    MAX_DEVICE_SCOPE_RETRIES,
     create_edge_device_config,
     process_edge_devices_config_args,
     process_edge_devices_config_file_content,
     create_edge_device_config_script,
 )
 from tqdm import tqdm
-from time import sleep
-from typing import Dict, List
+from time import perf_counter
+from typing import Dict, List, Tuple
 from knack.log import get_logger
 from typing import Optional
 from azext_iot.common.shared import (
+    CertificateKeyType,
     DeviceAuthType,
     SdkType,
 )
 from azext_iot.iothub.common import (
+    EdgeDeviceConfig,
     EdgeDevicesConfig,
 )
 from azext_iot.iothub.providers.base import IoTHubProvider
@@ -86,6 +89,7 @@ class DeviceIdentityProvider(IoTHubProvider):
         root_key_path: Optional[str] = None,
         root_cert_password: Optional[str] = None,
         output_path: Optional[str] = None,
+        key_type: str = CertificateKeyType.rsa.value,
     ):
         from treelib import Tree
         from treelib.exceptions import (
@@ -95,9 +99,10 @@ class DeviceIdentityProvider(IoTHubProvider):
         )
 
         config: EdgeDevicesConfig = None
+        phase_timings: List[Tuple[str, float]] = []
+        phase_start = perf_counter()
 
-        # configuration for root cert and output directories
-        root_cert_name = EDGE_ROOT_CERTIFICATE_FILENAME
+        # configuration for output directories
         bundle_output_directory = None
         if output_path:
             if not exists(output_path):
@@ -165,7 +170,7 @@ class DeviceIdentityProvider(IoTHubProvider):
         config_devices_iterator = (
             tqdm(
                 config.devices,
-                desc="Creating device structure and certificates",
+                desc="Creating device structure",
             )
             if visualize
             else config.devices
@@ -236,196 +241,141 @@ class DeviceIdentityProvider(IoTHubProvider):
                     "To delete all existing devices before creating new ones, please utilize the `--clean` switch."
                 )
 
-        # Create all devices and configs
-        device_iterator = (
-            tqdm(config.devices, desc="Creating device identities and configs")
-            if visualize
-            else config.devices
+        phase_timings.append(("Validating hierarchy and existing devices", perf_counter() - phase_start))
+
+        # Group devices by hierarchy level so each child can be created with its parent's scope
+        device_levels: List[List[str]] = []
+        level = [node.identifier for node in tree.children(tree_root_node_id)]
+        while level:
+            device_levels.append(level)
+            level = [
+                child.identifier for device_id in level for child in tree.children(device_id)
+            ]
+
+        # Generate device certificates on a process pool (in level order) so key generation overlaps identity creation
+        certificate_executor = (
+            ProcessPoolExecutor(max_workers=min(len(config.devices), cpu_count() or 1))
+            if len(config.devices) > 1
+            else None
         )
-
-        for device in device_iterator:
-            device_id = device.device_id
-            device_cert_output_directory = None
-            if bundle_output_directory:
-                device_cert_output_directory = bundle_output_directory.joinpath(device_id)
-                # if the device's folder already exists, remove it
-                if exists(device_cert_output_directory):
-                    rmtree(device_cert_output_directory)
-                # create fresh device folder
-                makedirs(device_cert_output_directory)
-
-            # signed device cert
-            signed_device_cert = create_ca_signed_certificate(
-                subject=f"{device_id}.deviceca",
-                ca_public_key=config.root_cert["certificate"],
-                ca_private_key=config.root_cert["privateKey"],
-                cert_output_dir=device_cert_output_directory,
-                cert_file=device_id,
-            )
-
-            device_pk = None
-            device_sk = None
-            # if using x509 device auth
-            if hub_cert_auth:
-                # hub auth cert for device
-                device_hub_cert = create_self_signed_certificate(
-                    subject=device_id,
-                    valid_days=365,
-                    key_size=4096,
-                    v3_extensions=True
-                )
-                device_pk = signed_device_cert["thumbprint"]
-                device_sk = device_hub_cert["thumbprint"]
-
-            # create device object for service
-            assembled_device = _assemble_device(
-                is_update=False,
-                device_id=device_id,
-                auth_method=config.auth_method,
-                pk=device_pk,
-                sk=device_sk,
-                edge_enabled=True,
+        certificate_futures: Dict[str, Future] = {
+            device_id: (
+                certificate_executor.submit if certificate_executor else _completed_future
+            )(
+                generate_device_certificates,
+                device_id,
+                config.root_cert,
+                hub_cert_auth,
+                key_type,
             )
-            # create device identity
-            device_result: Device = self.service_sdk.devices.create_or_update_identity(
-                id=device_id, device=assembled_device
+            for level in device_levels
+            for device_id in level
+        }
+        identity_executor = ThreadPoolExecutor(max_workers=EDGE_IDENTITY_MAX_WORKERS)
+        # Device bundles are written in the background while identities are created
+        bundle_executor = (
+            ThreadPoolExecutor(max_workers=EDGE_BUNDLE_MAX_WORKERS)
+            if bundle_output_directory
+            else None
+        )
+        bundle_futures: List[Future] = []
+
+        try:
+            # Create all devices level by level, taking parent scopes from the create responses
+            phase_start = perf_counter()
+            device_scopes: Dict[str, str] = {}
+            identity_progress = (
+                tqdm(total=len(config.devices), desc="Creating device identities and configs")
+                if visualize
+                else None
             )
-
-            # write all device bundle content
-            if device_cert_output_directory:
-                if hub_cert_auth:
-                    # hub auth cert
-                    write_content_to_file(
-                        content=device_hub_cert["certificate"],
-                        destination=device_cert_output_directory,
-                        file_name=f"{device_id}.hub-auth-cert.pem",
-                        overwrite=True
-                    )
-                    # hub auth key
-                    write_content_to_file(
-                        content=device_hub_cert["privateKey"],
-                        destination=device_cert_output_directory,
-                        file_name=f"{device_id}.hub-auth-key.pem",
-                        overwrite=True
-                    )
-                else:
-                    device_keys = device_result.authentication.symmetric_key
-                    device_pk = device_keys.primary_key if device_keys else None
-
-                # edge device config
-                create_edge_device_config(
-                    device_id=device_id,
-                    hub_hostname=self.target["entity"],
-                    auth_method=config.auth_method,
-                    default_edge_agent=config.default_edge_agent,
-                    device_config=device_config_dict[device_id],
-                    device_config_path=config.template_config_path,
-                    device_pk=device_pk,
-                    output_path=device_cert_output_directory,
-                )
-                # root cert
-                write_content_to_file(
-                    content=config.root_cert["certificate"],
-                    destination=device_cert_output_directory,
-                    file_name=root_cert_name,
-                )
-                # full-chain cert
-                make_cert_chain(
-                    certs=[
-                        signed_device_cert["certificate"],
-                        config.root_cert["certificate"],
-                    ],
-                    output_dir=device_cert_output_directory,
-                    output_file=f"{device_id}.full-chain.cert.pem",
-                )
-                # write install script
-                write_content_to_file(
-                    content=create_edge_device_config_script(
+            for level in device_levels:
+                level_futures = {
+                    identity_executor.submit(
+                        self._create_edge_device_identity,
                         device_id=device_id,
-                        hub_auth=hub_cert_auth,
-                        hostname=device.hostname,
-                        has_parent=(device.parent_id is not None),
-                        parent_hostname=device.parent_hostname,
-                    ),
-                    destination=device_cert_output_directory,
-                    file_name="install.sh",
-                    overwrite=True,
-                )
-                # write device readme
-                write_content_to_file(
-                    content=DEVICE_README,
-                    destination=device_cert_output_directory,
-                    file_name="README.md",
-                    overwrite=True,
+                        auth_method=config.auth_method,
+                        certificate_future=certificate_futures[device_id],
+                        parent_scope=device_scopes.get(device_to_parent_dict.get(device_id)),
+                    ): device_id
+                    for device_id in level
+                }
+                for future in as_completed(level_futures):
+                    device_id = level_futures[future]
+                    device_result: Device = future.result()
+                    if identity_progress:
+                        identity_progress.update(1)
+                    if tree.children(device_id):
+                        if not device_result.device_scope:
+                            raise AzureResponseError(
+                                f"An error occurred - No device scope was returned for parent device '{device_id}'."
+                            )
+                        device_scopes[device_id] = device_result.device_scope
+
+                    if bundle_executor:
+                        device_pk = None
+                        if not hub_cert_auth:
+                            device_keys = device_result.authentication.symmetric_key
+                            device_pk = device_keys.primary_key if device_keys else None
+                        bundle_futures.append(
+                            bundle_executor.submit(
+                                self._write_device_bundle,
+                                device=device_config_dict[device_id],
+                                certificate_future=certificate_futures[device_id],
+                                device_pk=device_pk,
+                                config=config,
+                                bundle_output_directory=bundle_output_directory,
+                            )
+                        )
+            if identity_progress:
+                identity_progress.close()
+            phase_timings.append(("Creating device identities", perf_counter() - phase_start))
+
+            # update edge config / set-modules
+            phase_start = perf_counter()
+            deployment_devices = [
+                device_config for device_config in config.devices if device_config.deployment
+            ]
+            module_futures = [
+                identity_executor.submit(
+                    self.service_sdk.configuration.apply_on_edge_device,
+                    id=device_config.device_id,
+                    content=device_config.deployment,
                 )
-                # create archive
-                tar_directory(
-                    target_directory=device_cert_output_directory,
-                    tarfile_path=bundle_output_directory,
-                    tarfile_name=device_id,
-                    overwrite=True,
+                for device_config in deployment_devices
+            ]
+            module_iterator = (
+                tqdm(
+                    as_completed(module_futures),
+                    total=len(module_futures),
+                    desc="Setting edge module content",
                 )
-                # delete uncompressed files
-                rmtree(device_cert_output_directory)
-
-        # Get all device ids and scopes (inconsistent timing, hence sleep)
-        scope_retries = 0
-        query_args = ["SELECT deviceId, deviceScope FROM devices"]
-        query_method = self.service_sdk.query.get_twins
-        all_hub_devices = _execute_query(query_args, query_method)
-
-        # Ensure we retrieve all device scopes
-        while len(all_hub_devices) < len(config.devices) and scope_retries < MAX_DEVICE_SCOPE_RETRIES:
-            sleep(3)
-            scope_retries += 1
-            logger.info("Retrying device scope query - attempt {} of {}"
-                        .format(scope_retries, MAX_DEVICE_SCOPE_RETRIES))
-            all_hub_devices = _execute_query(query_args, query_method)
-
-        if len(all_hub_devices) < len(config.devices):
-            raise AzureResponseError(
-                "An error occurred - Failed to fetch device scopes for all devices after {} retries"
-                .format(scope_retries)
-            )
-
-        # set all device scopes
-        scope_dict: Dict[str, str] = {}
-        for device in all_hub_devices:
-            id = device["deviceId"]
-            if device_config_dict.get(id, None):
-                scope_dict[id] = device["deviceScope"]
-
-        # Set parent / child relationships
-        device_to_parent_iterator = (
-            tqdm(device_to_parent_dict, desc="Setting device parents")
-            if visualize
-            else device_to_parent_dict
-        )
-        for device_id in device_to_parent_iterator:
-            # get device properties
-            device = self.service_sdk.devices.get_identity(id=device_id)
-            parent_id = device_to_parent_dict[device_id]
-            parent_scope = scope_dict[parent_id]
-            # set new parent scope
-            device.parent_scopes = [parent_scope]
-            # update device
-            self.service_sdk.devices.create_or_update_identity(
-                id=device_id, device=device, if_match="*"
+                if visualize
+                else as_completed(module_futures)
             )
+            for future in module_iterator:
+                future.result()
+            phase_timings.append(("Setting edge module content", perf_counter() - phase_start))
+
+            # surface any bundle writing errors
+            phase_start = perf_counter()
+            for bundle_future in bundle_futures:
+                bundle_future.result()
+            if bundle_executor:
+                phase_timings.append(("Writing device bundles", perf_counter() - phase_start))
+        finally:
+            for future in list(certificate_futures.values()) + bundle_futures:
+                future.cancel()
+            identity_executor.shutdown()
+            if certificate_executor:
+                certificate_executor.shutdown()
+            if bundle_executor:
+                bundle_executor.shutdown()
 
-        # update edge config / set-modules
-        devices_config_iterator = (
-            tqdm(config.devices, desc="Setting edge module content")
-            if visualize
-            else config.devices
-        )
-        for device_config in devices_config_iterator:
-            device_id = device_config.device_id
-            deployment_content = device_config.deployment
-            if deployment_content:
-                self.service_sdk.configuration.apply_on_edge_device(
-                    id=device_id, content=deployment_content
-                )
+        if visualize:
+            print("Elapsed time by phase:")
+            for phase, seconds in phase_timings:
+                print(f"  {phase}: {seconds:.2f}s")
 
         # Print device bundle details after other visuals
         if bundle_output_directory:
@@ -433,9 +383,144 @@ class DeviceIdentityProvider(IoTHubProvider):
             bundle_plural = '' if num_bundles == 1 else 's'
             print(f"{num_bundles} device bundle{bundle_plural} created in folder: {abspath(bundle_output_directory)}")
 
+    def _create_edge_device_identity(
+        self,
+        device_id: str,
+        auth_method: str,
+        certificate_future: Future,
+        parent_scope: Optional[str] = None,
+    ) -> Device:
+        device_pk = None
+        device_sk = None
+        # if using x509 device auth
+        if auth_method == DeviceAuthType.x509_thumbprint.value:
+            device_certs = certificate_future.result()
+            device_pk = device_certs["deviceCert"]["thumbprint"]
+            device_sk = device_certs["hubAuthCert"]["thumbprint"]
+
+        # create device object for service, parented to the given scope
+        assembled_device = _assemble_device(
+            is_update=False,
+            device_id=device_id,
+            auth_method=auth_method,
+            pk=device_pk,
+            sk=device_sk,
+            edge_enabled=True,
+            device_scope=parent_scope,
+        )
+        # create device identity
+        return self.service_sdk.devices.create_or_update_identity(
+            id=device_id, device=assembled_device
+        )
+
+    def _write_device_bundle(
+        self,
+        device: EdgeDeviceConfig,
+        certificate_future: Future,
+        device_pk: Optional[str],
+        config: EdgeDevicesConfig,
+        bundle_output_directory: PurePath,
+    ):
+        import tomli_w
+
+        device_id = device.device_id
+        hub_cert_auth = config.auth_method == DeviceAuthType.x509_thumbprint.value
+        device_certs = certificate_future.result()
+        signed_device_cert = device_certs["deviceCert"]
+
+        # bundle content by archive file name
+        bundle_content: Dict[str, str] = {
+            # signed device cert
+            f"{device_id}.cert.pem": signed_device_cert["certificate"],
+            f"{device_id}.key.pem": signed_device_cert["privateKey"],
+        }
+        if hub_cert_auth:
+            device_hub_cert = device_certs["hubAuthCert"]
+            # hub auth cert and key
+            bundle_content[f"{device_id}.hub-auth-cert.pem"] = device_hub_cert["certificate"]
+            bundle_content[f"{device_id}.hub-auth-key.pem"] = device_hub_cert["privateKey"]
+
+        # edge device config
+        bundle_content["config.toml"] = tomli_w.dumps(
+            create_edge_device_config(
+                device_id=device_id,
+                hub_hostname=self.target["entity"],
+                auth_method=config.auth_method,
+                default_edge_agent=config.default_edge_agent,
+                device_config=device,
+                device_config_path=config.template_config_path,
+                device_pk=device_pk,
+            )
+        )
+        # root cert
+        bundle_content[EDGE_ROOT_CERTIFICATE_FILENAME] = config.root_cert["certificate"]
+        # full-chain cert
+        bundle_content[f"{device_id}.full-chain.cert.pem"] = make_cert_chain(
+            certs=[
+                signed_device_cert["certificate"],
+                config.root_cert["certificate"],
+            ],
+        )
+        # install script
+        bundle_content["install.sh"] = create_edge_device_config_script(
+            device_id=device_id,
+            hub_auth=hub_cert_auth,
+            hostname=device.hostname,
+            has_parent=(device.parent_id is not None),
+            parent_hostname=device.parent_hostname,
+        )
+        # device readme
+        bundle_content["README.md"] = DEVICE_README
+
+        # create archive directly from memory
+        tar_contents(
+            contents=bundle_content,
+            tarfile_path=bundle_output_directory,
+            tarfile_name=device_id,
+            overwrite=True,
+        )
+
     def delete_device_identities(self, device_ids: List[str]):
         for id in device_ids:
             try:
                 self.service_sdk.devices.delete_identity(id=id, if_match="*")
             except Exception as err:
                 raise AzureResponseError(err)
+
+
+def generate_device_certificates(
+    device_id: str,
+    root_cert: Dict[str, str],
+    hub_cert_auth: bool,
+    key_type: str = CertificateKeyType.rsa.value,
+) -> Dict[str, Dict[str, str]]:
+    """
+    Generates the root CA signed device certificate and, for x509 hub authentication, the self-signed
+    hub auth certificate of an edge device. Defined at module scope so it can be dispatched to a process pool.
+    """
+    device_certs = {
+        "deviceCert": create_ca_signed_certificate(
+            subject=f"{device_id}.deviceca",
+            ca_public_key=root_cert["certificate"],
+            ca_private_key=root_cert["privateKey"],
+            key_type=key_type,
+        )
+    }
+    if hub_cert_auth:
+        device_certs["hubAuthCert"] = create_self_signed_certificate(
+            subject=device_id,
+            valid_days=365,
+            key_size=4096,
+            v3_extensions=True,
+            key_type=key_type,
+        )
+    return device_certs
+
+
+def _completed_future(fn, *args, **kwargs) -> Future:
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
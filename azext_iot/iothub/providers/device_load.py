@@ -0,0 +1,275 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from knack.log import get_logger
+from azure.cli.core.azclierror import (
+    FileOperationError,
+    InvalidArgumentValueError,
+    MutuallyExclusiveArgumentError,
+    RequiredArgumentMissingError,
+)
+from azext_iot._factory import CloudError
+from azext_iot.common.shared import DeviceAuthApiType, KeyType, ProtocolType, SdkType
+from azext_iot.common.utility import (
+    ensure_azure_namespace_path,
+    handle_service_exception,
+    latency_percentiles,
+    validate_key_value_pairs,
+)
+from azext_iot.iothub.providers.base import IoTHubProvider
+from azext_iot.iothub.providers.device_messaging import _simulate_get_default_properties
+from azext_iot.operations.generic import _execute_query
+from azext_iot.operations.hub import _build_device_or_module_connection_string
+
+logger = get_logger(__name__)
+
+LOAD_CONNECT_CONCURRENCY = 32
+LOAD_IDENTITY_MAX_WORKERS = 16
+
+
+class DeviceLoadProvider(IoTHubProvider):
+    def __init__(
+        self,
+        cmd,
+        hub_name: Optional[str] = None,
+        rg: Optional[str] = None,
+        login: Optional[str] = None,
+        auth_type_dataplane: Optional[str] = None,
+    ):
+        super(DeviceLoadProvider, self).__init__(
+            cmd=cmd, hub_name=hub_name, rg=rg, login=login, auth_type_dataplane=auth_type_dataplane
+        )
+        self.service_sdk = self.get_sdk(SdkType.service_sdk)
+
+    def simulate_load(
+        self,
+        device_query: Optional[str] = None,
+        device_prefix: Optional[str] = None,
+        device_file: Optional[str] = None,
+        max_devices: Optional[int] = None,
+        data: str = "Ping from Az CLI IoT Extension",
+        properties: Optional[str] = None,
+        msg_count: int = 100,
+        rate: float = 10.0,
+        payload_size: Optional[int] = None,
+        burst_size: int = 1,
+        websockets: bool = False,
+    ) -> Dict[str, Any]:
+        if len([arg for arg in [device_query, device_prefix, device_file] if arg]) > 1:
+            raise MutuallyExclusiveArgumentError(
+                "Only one of --device-query, --device-prefix or --device-file can be used to select devices."
+            )
+        if msg_count < 1:
+            raise InvalidArgumentValueError("msg count must be at least 1")
+        if rate <= 0:
+            raise InvalidArgumentValueError("rate must be greater than 0")
+        if burst_size < 1:
+            raise InvalidArgumentValueError("burst size must be at least 1")
+        if payload_size is not None and payload_size < 0:
+            raise InvalidArgumentValueError("payload size cannot be negative")
+        if max_devices is not None and max_devices < 1:
+            raise InvalidArgumentValueError("max devices must be at least 1")
+
+        device_ids = self._get_device_ids(
+            device_query=device_query,
+            device_prefix=device_prefix,
+            device_file=device_file,
+            max_devices=max_devices,
+        )
+        if not device_ids:
+            raise InvalidArgumentValueError("No devices were found to simulate.")
+
+        connection_strings = self._get_device_connection_strings(device_ids)
+        if not connection_strings:
+            raise InvalidArgumentValueError(
+                "None of the selected devices use symmetric key authentication, which is required for load generation."
+            )
+
+        properties_to_send = _simulate_get_default_properties(ProtocolType.mqtt.name)
+        properties_to_send.update(validate_key_value_pairs(properties) or {})
+
+        load = DeviceLoadGenerator(
+            connection_strings=connection_strings,
+            data=data,
+            properties=properties_to_send,
+            msg_count=msg_count,
+            rate=rate,
+            payload_size=payload_size,
+            burst_size=burst_size,
+            websockets=websockets,
+        )
+        return asyncio.run(load.run())
+
+    def _get_device_ids(
+        self,
+        device_query: Optional[str] = None,
+        device_prefix: Optional[str] = None,
+        device_file: Optional[str] = None,
+        max_devices: Optional[int] = None,
+    ) -> List[str]:
+        if device_file:
+            try:
+                with open(device_file, "r", encoding="utf-8") as f:
+                    device_ids = [line.strip() for line in f if line.strip()]
+            except OSError as e:
+                raise FileOperationError(f"Unable to read device file '{device_file}': {e}")
+            # remove duplicates while keeping file order
+            device_ids = list(dict.fromkeys(device_ids))
+            return device_ids[:max_devices] if max_devices else device_ids
+
+        query = device_query or "SELECT deviceId FROM devices"
+        if device_prefix:
+            # filter by prefix in the service so only matching twins are returned
+            query += " WHERE STARTSWITH(deviceId, '{}')".format(device_prefix.replace("'", "''"))
+        try:
+            devices = _execute_query([query], self.service_sdk.query.get_twins, max_devices)
+        except CloudError as e:
+            handle_service_exception(e)
+
+        device_ids = []
+        for device in devices:
+            device_id = device.get("deviceId")
+            if not device_id:
+                raise RequiredArgumentMissingError("The device query must return the deviceId of each device.")
+            device_ids.append(device_id)
+        device_ids = list(dict.fromkeys(device_ids))
+        return device_ids[:max_devices] if max_devices else device_ids
+
+    def _get_device_connection_strings(self, device_ids: List[str]) -> List[str]:
+        def _get_connection_string(device_id: str) -> Optional[str]:
+            try:
+                device = self.service_sdk.devices.get_identity(id=device_id, raw=True).response.json()
+            except CloudError as e:
+                handle_service_exception(e)
+            if device["authentication"]["type"].lower() != DeviceAuthApiType.sas.value.lower():
+                logger.warning("Skipping device '%s', only symmetric key devices can be simulated.", device_id)
+                return None
+            device["hub"] = self.target["entity"]
+            return _build_device_or_module_connection_string(device, KeyType.primary.value)
+
+        with ThreadPoolExecutor(max_workers=min(len(device_ids), LOAD_IDENTITY_MAX_WORKERS)) as executor:
+            connection_strings = list(executor.map(_get_connection_string, device_ids))
+        return [cs for cs in connection_strings if cs]
+
+
+class DeviceLoadGenerator(object):
+    """
+    Sends device-to-cloud messages from many devices at a target aggregate rate. Each device has its own
+    connection and all devices are multiplexed on a single asyncio event loop.
+
+    Messages are sent in bursts of burst_size, with bursts scheduled so that the aggregate rate is maintained.
+    Messages are assigned to devices round-robin.
+    """
+
+    def __init__(
+        self,
+        connection_strings: List[str],
+        data: str,
+        properties: Dict[str, str],
+        msg_count: int,
+        rate: float,
+        payload_size: Optional[int] = None,
+        burst_size: int = 1,
+        websockets: bool = False,
+    ):
+        self.connection_strings = connection_strings
+        self.data = data
+        self.properties = properties
+        self.msg_count = msg_count
+        self.rate = rate
+        self.payload_size = payload_size
+        self.burst_size = burst_size
+        self.websockets = websockets
+        self.latencies: List[float] = []
+        self.failures = 0
+
+    def _create_client(self, connection_string: str):
+        ensure_azure_namespace_path()
+        from azure.iot.device.aio import IoTHubDeviceClient
+
+        return IoTHubDeviceClient.create_from_connection_string(connection_string, websockets=self.websockets)
+
+    def _build_message(self, sequence: int):
+        import json
+        import uuid
+        import datetime
+        from azure.iot.device import Message
+
+        payload = {
+            "id": str(uuid.uuid4()),
+            "timestamp": str(datetime.datetime.utcnow()),
+            "data": str(self.data + " #{}".format(sequence)),
+        }
+        if self.payload_size:
+            # pad the payload so the serialized message body matches the requested size
+            padding = self.payload_size - len(json.dumps({**payload, "padding": ""}))
+            payload["padding"] = "x" * max(padding, 0)
+        message = Message(json.dumps(payload))
+        message.custom_properties = self.properties
+        return message
+
+    async def _connect(self, client, semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
+            try:
+                await client.connect()
+                return True
+            except Exception as e:
+                logger.warning("Failed to connect device client: %s", e)
+                return False
+
+    async def _send(self, client, message):
+        start = perf_counter()
+        try:
+            await client.send_message(message)
+            self.latencies.append(perf_counter() - start)
+        except Exception as e:
+            self.failures += 1
+            logger.debug("Failed to send message: %s", e)
+
+    async def run(self) -> Dict[str, Any]:
+        from tqdm import tqdm
+
+        clients = [self._create_client(cs) for cs in self.connection_strings]
+        semaphore = asyncio.Semaphore(LOAD_CONNECT_CONCURRENCY)
+        connected = await asyncio.gather(*[self._connect(client, semaphore) for client in clients])
+        connected_clients = [client for client, is_connected in zip(clients, connected) if is_connected]
+
+        sends = []
+        start = perf_counter()
+        try:
+            if connected_clients:
+                progress = tqdm(total=self.msg_count, desc="Device load generation in progress", ascii=" #")
+                for burst_start in range(0, self.msg_count, self.burst_size):
+                    # wait until this burst is due to keep the aggregate rate on target
+                    delay = start + (burst_start / self.rate) - perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    for sequence in range(burst_start, min(burst_start + self.burst_size, self.msg_count)):
+                        client = connected_clients[sequence % len(connected_clients)]
+                        sends.append(asyncio.ensure_future(self._send(client, self._build_message(sequence + 1))))
+                    progress.update(min(self.burst_size, self.msg_count - burst_start))
+                await asyncio.gather(*sends)
+                progress.close()
+            elapsed = perf_counter() - start
+        finally:
+            await asyncio.gather(*[client.shutdown() for client in clients], return_exceptions=True)
+
+        sent = len(self.latencies)
+        return {
+            "devices": len(clients),
+            "connectedDevices": len(connected_clients),
+            "messagesSent": sent,
+            "messagesFailed": self.failures + (self.msg_count if not connected_clients else 0),
+            "elapsedSeconds": round(elapsed, 3),
+            "targetRate": self.rate,
+            "achievedRate": round(sent / elapsed, 3) if elapsed else 0,
+            "latencyMs": latency_percentiles(self.latencies),
+        }
@@ -6,7 +6,7 @@
 
 from os.path import exists, basename
 from time import time, sleep
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 from azext_iot.iothub.common import NON_DECODABLE_PAYLOAD
 from knack.log import get_logger
 from azext_iot.common.shared import DeviceAuthApiType, KeyType, ProtocolType, SdkType, SettleType
@@ -285,6 +285,102 @@ class DeviceMessagingProvider(IoTHubProvider):
         if wait_on_feedback:
             _iot_hub_monitor_feedback(target=self.target, device_id=self.device_id, wait_on_id=msg_id)
 
+    def c2d_message_send_batch(
+        self,
+        device_ids: Optional[List[str]] = None,
+        targets_file: Optional[str] = None,
+        data: str = "Ping from Az CLI IoT Extension",
+        correlation_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        content_encoding: str = "utf-8",
+        content_type: Optional[str] = None,
+        expiry_time_utc: Optional[str] = None,
+        properties: Optional[str] = None,
+        ack: Optional[str] = None,
+        wait_on_feedback: bool = False,
+        timeout: int = 0,
+    ) -> Dict[str, Any]:
+        if not any([device_ids, targets_file]):
+            raise RequiredArgumentMissingError(
+                "Provide target devices with --device-ids and/or --targets-file."
+            )
+
+        if properties:
+            properties = validate_key_value_pairs(properties)
+
+        if expiry_time_utc:
+            now_in_milli = int(time() * 1000)
+            user_msg_expiry = int(expiry_time_utc)
+            if user_msg_expiry < now_in_milli:
+                raise InvalidArgumentValueError("Message expiry time utc is in the past!")
+
+        targets = [{"deviceId": device_id} for device_id in device_ids or []]
+        if targets_file:
+            targets.extend(_c2d_read_batch_targets(targets_file))
+
+        # targets may request their own ack, only messages requesting an ack can be waited on
+        if wait_on_feedback and not any(target.get("ack", ack) for target in targets):
+            raise RequiredArgumentMissingError(
+                'To wait on device feedback, ack must be "full", "negative" or "positive"'
+            )
+
+        from azext_iot.monitor import event
+
+        sent_messages = []
+        sent_times = {}
+        message_acks = {}
+
+        def _message_generator():
+            for target in targets:
+                target_properties = target.get("properties", properties)
+                if isinstance(target_properties, str):
+                    target_properties = validate_key_value_pairs(target_properties)
+                msg_id, message = event.build_c2d_message(
+                    device_id=target["deviceId"],
+                    data=target.get("data", data),
+                    message_id=target.get("messageId"),
+                    correlation_id=target.get("correlationId", correlation_id),
+                    user_id=target.get("userId", user_id),
+                    content_encoding=content_encoding,
+                    content_type=content_type,
+                    expiry_time_utc=expiry_time_utc,
+                    properties=target_properties,
+                    ack=target.get("ack", ack),
+                )
+                sent_messages.append({"deviceId": target["deviceId"], "messageId": msg_id})
+                sent_times[msg_id] = time()
+                message_acks[msg_id] = target.get("ack", ack)
+                yield message
+
+        states = event.send_c2d_messages(target=self.target, messages=_message_generator())
+        for sent_message, state in zip(sent_messages, states):
+            sent_message["state"] = state.name
+
+        sent = len([state for state in states if state.name == "SendComplete"])
+        result = {
+            "total": len(sent_messages),
+            "sent": sent,
+            "failed": len(sent_messages) - sent,
+            "messages": sent_messages,
+        }
+
+        if wait_on_feedback and sent:
+            tracked = [
+                m["messageId"] for m in sent_messages if m["state"] == "SendComplete" and message_acks[m["messageId"]]
+            ]
+            if not any(message_acks[msg_id] != "negative" for msg_id in tracked) and not timeout:
+                logger.warning(
+                    "Sent messages only request negative acknowledgement, use --timeout to wait for failed deliveries."
+                )
+            result["feedback"] = _iot_hub_monitor_feedback(
+                target=self.target,
+                device_id=None,
+                sent_times={msg_id: sent_times[msg_id] for msg_id in tracked},
+                timeout=timeout,
+                message_acks={msg_id: message_acks[msg_id] for msg_id in tracked},
+            )
+        return result
+
     def c2d_message_purge(self):
         service_sdk = self.get_sdk(SdkType.service_sdk)
         return service_sdk.cloud_to_device_messages.purge_cloud_to_device_message_queue(
@@ -545,3 +641,36 @@ def _simulate_get_default_properties(protocol: str) -> Dict[str, str]:
     default_properties["$.ce" if is_mqtt else "content-encoding"] = "utf-8"
 
     return default_properties
+
+
+def _c2d_read_batch_targets(targets_file: str) -> List[Dict[str, Any]]:
+    """
+    Reads C2D batch targets from a file. Each non-empty line is either a device Id or a json object
+    with a required deviceId and optional data, messageId, correlationId, userId, properties and ack.
+    """
+    import json
+
+    if not exists(targets_file):
+        raise FileOperationError('File path "{}" does not exist!'.format(targets_file))
+
+    targets = []
+    with open(targets_file, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith("{"):
+                targets.append({"deviceId": line})
+                continue
+            try:
+                target = json.loads(line)
+            except ValueError as e:
+                raise InvalidArgumentValueError(
+                    "Invalid json on line {} of targets file: {}".format(line_number, e)
+                )
+            if not target.get("deviceId"):
+                raise InvalidArgumentValueError(
+                    "Target on line {} of targets file is missing a deviceId.".format(line_number)
+                )
+            targets.append(target)
+    return targets
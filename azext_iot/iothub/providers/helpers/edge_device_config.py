@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------------------------
 """This module defines common values and functions for processing edge device configurations"""
 
+from copy import deepcopy
 from pathlib import PurePath
 from os import getcwd
 from typing import Optional, List, Dict, Any
@@ -34,7 +35,8 @@ from knack.log import get_logger
 
 logger = get_logger(__name__)
 
-MAX_DEVICE_SCOPE_RETRIES = 5
+EDGE_IDENTITY_MAX_WORKERS = 16
+EDGE_BUNDLE_MAX_WORKERS = 4
 
 DEVICE_CONFIG_SCHEMA_VALID_VERSIONS: Dict[str, Any] = {}
 
@@ -253,7 +255,7 @@ def create_edge_device_config(
     device_toml = (
         process_toml_arg(device_config_path)
         if device_config_path
-        else DEVICE_CONFIG_TOML
+        else deepcopy(DEVICE_CONFIG_TOML)
     )
 
     device_toml[
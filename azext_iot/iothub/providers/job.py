@@ -4,22 +4,43 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from time import sleep
-from datetime import datetime, timedelta
+import heapq
+import json
+import sys
+from time import monotonic, sleep
+from typing import Callable, Dict, Iterator, List, Optional
 from knack.log import get_logger
 from azure.cli.core.azclierror import (
     CLIInternalError,
     InvalidArgumentValueError,
     RequiredArgumentMissingError,
 )
+from azext_iot.constants import (
+    IOTHUB_JOB_POLL_MAX_INTERVAL_SEC,
+    IOTHUB_JOB_POLL_MIN_INTERVAL_SEC,
+    THROTTLE_HTTP_STATUS_CODE,
+)
 from azext_iot.common.shared import SdkType, JobStatusType, JobType, JobVersionType
-from azext_iot.common.utility import handle_service_exception, process_json_arg
+from azext_iot.common.utility import get_retry_after, handle_service_exception, process_json_arg
 from azext_iot.operations.generic import _execute_query
 from azext_iot.iothub.providers.base import IoTHubProvider, CloudError, SerializationError
 
 
 logger = get_logger(__name__)
 
+JOB_TERMINAL_STATUSES = [
+    JobStatusType.completed.value,
+    JobStatusType.failed.value,
+    JobStatusType.cancelled.value,
+]
+JOB_WAITING_STATUSES = [
+    JobStatusType.queued.value,
+    JobStatusType.enqueued.value,
+    JobStatusType.scheduled.value,
+]
+# Fraction of devices done after which a running job is polled at the minimum interval
+JOB_NEAR_COMPLETION_RATIO = 0.9
+
 
 class JobProvider(IoTHubProvider):
     def get(self, job_id):
@@ -197,28 +218,20 @@ class JobProvider(IoTHubProvider):
             job_result = service_sdk.jobs.create_scheduled_job(id=job_id, job_request=job_request, raw=True).response.json()
             if wait:
                 logger.info("Waiting for job finished state...")
-                current_datetime = datetime.now()
-                end_datetime = current_datetime + timedelta(seconds=poll_duration)
-
-                while True:
-                    job_result = self._get(job_id)
-                    if "status" in job_result:
-                        refreshed_job_status = job_result["status"]
-                        logger.info("Refreshed job status: '%s'", refreshed_job_status)
-
-                        if refreshed_job_status in [
-                            JobStatusType.completed.value,
-                            JobStatusType.failed.value,
-                            JobStatusType.cancelled.value,
-                        ]:
-                            break
-
-                    if datetime.now() > end_datetime:
-                        logger.info("Job not completed within poll duration....")
-                        break
+                watcher = JobWatcher(
+                    get_job=self._get_for_watch,
+                    job_ids=[job_id],
+                    poll_interval=poll_interval,
+                    poll_duration=poll_duration,
+                )
+                for progress in watcher.watch():
+                    logger.info("Refreshed job status: '%s'", progress["status"])
+                    if progress["nextPollSeconds"] is not None:
+                        logger.info("Waiting %s seconds for next refresh...", progress["nextPollSeconds"])
 
-                    logger.info("Waiting %d seconds for next refresh...", poll_interval)
-                    sleep(poll_interval)
+                if watcher.pending:
+                    logger.info("Job not completed within poll duration....")
+                job_result = watcher.jobs.get(job_id, job_result)
 
             return job_result
         except CloudError as e:
@@ -227,6 +240,53 @@ class JobProvider(IoTHubProvider):
             # ISO8601 parsing is handled by msrest
             raise CLIInternalError(se)
 
+    def watch(self, job_ids, output_file=None, poll_interval=10, poll_duration=600):
+        """
+        Poll many jobs until each reaches a terminal status, writing job progress as newline delimited json to
+        the output file (or stdout).
+        """
+        if not job_ids:
+            raise RequiredArgumentMissingError("At least one job Id is required.")
+
+        if poll_duration < 1:
+            raise InvalidArgumentValueError("--poll-duration must be greater than 0.")
+
+        if poll_interval < 1:
+            raise InvalidArgumentValueError("--poll-interval must be greater than 0.")
+
+        watcher = JobWatcher(
+            get_job=self._get_for_watch,
+            job_ids=job_ids,
+            poll_interval=poll_interval,
+            poll_duration=poll_duration,
+        )
+        output = open(output_file, "w", encoding="utf-8") if output_file else sys.stdout
+        try:
+            for progress in watcher.watch():
+                output.write(json.dumps(progress) + "\n")
+                output.flush()
+        except CloudError as e:
+            handle_service_exception(e)
+        finally:
+            if output_file:
+                output.close()
+
+        if watcher.pending:
+            logger.warning(
+                "Stopped watching jobs %s after %s seconds.", ", ".join(watcher.pending), poll_duration
+            )
+        if output_file:
+            return dict(watcher.summary(), outputFile=output_file)
+
+    def _get_for_watch(self, job_id):
+        # Service errors are raised as is so the watcher can back off on throttling
+        service_sdk = self.get_sdk(SdkType.service_sdk)
+        job_result = service_sdk.jobs.get_scheduled_job(id=job_id, raw=True).response.json()
+        if job_result.get("status") == JobStatusType.unknown.value:
+            # Replace 'unknown' v2 result with v1 result
+            job_result = self._convert_v1_to_v2(service_sdk.jobs.get_import_export_job(id=job_id))
+        return job_result
+
     def _convert_v1_to_v2(self, job_v1):
         v2_result = {}
 
@@ -254,3 +314,131 @@ class JobProvider(IoTHubProvider):
             jobs = [job for job in jobs if job["status"] == job_status]
 
         return jobs
+
+
+class JobWatcher(object):
+    """
+    Polls many jobs from one process until each job reaches a terminal status.
+
+    Every job is polled on its own interval. The interval doubles while a job waits to start, shrinks as the
+    job's device statistics approach completion and polling of all jobs is held back while the hub throttles
+    requests. A progress record is produced whenever the status or device statistics of a job change.
+    """
+
+    def __init__(
+        self,
+        get_job: Callable[[str], dict],
+        job_ids: List[str],
+        poll_interval: int = 10,
+        poll_duration: int = 600,
+    ):
+        self._get_job = get_job
+        self.job_ids = list(dict.fromkeys(job_ids))
+        self.poll_interval = poll_interval
+        self.poll_duration = poll_duration
+        self.min_interval = min(poll_interval, IOTHUB_JOB_POLL_MIN_INTERVAL_SEC)
+        self.max_interval = max(poll_interval, IOTHUB_JOB_POLL_MAX_INTERVAL_SEC)
+        self.jobs: Dict[str, dict] = {}
+        self.pending: List[str] = []
+        self.polls = 0
+        self.throttled = 0
+        self._intervals = {job_id: poll_interval for job_id in self.job_ids}
+        # last (poll time, devices done) of each running job, used to estimate its completion rate
+        self._samples: Dict[str, tuple] = {}
+        self._throttle_delay = 0
+        self._start = None
+
+    def watch(self) -> Iterator[dict]:
+        self._start = monotonic()
+        end = self._start + self.poll_duration
+        # (due time, job id) of every job that has not reached a terminal status
+        schedule = [(self._start, job_id) for job_id in self.job_ids]
+        not_before = self._start
+        while schedule:
+            due, job_id = schedule[0]
+            due = max(due, not_before)
+            if due > end:
+                break
+            wait = due - monotonic()
+            if wait > 0:
+                sleep(wait)
+            heapq.heappop(schedule)
+
+            try:
+                job = self._get_job(job_id)
+            except CloudError as e:
+                if e.status_code != THROTTLE_HTTP_STATUS_CODE:
+                    raise
+                self.throttled += 1
+                self._throttle_delay = min(max(self._throttle_delay * 2, self.poll_interval), self.max_interval)
+                not_before = monotonic() + max(self._throttle_delay, get_retry_after(e))
+                heapq.heappush(schedule, (not_before, job_id))
+                continue
+
+            now = monotonic()
+            self.polls += 1
+            self._throttle_delay = self._throttle_delay / 2 if self._throttle_delay > self.min_interval else 0
+            previous = self.jobs.get(job_id)
+            self.jobs[job_id] = job
+
+            status = job.get("status")
+            interval = None if status in JOB_TERMINAL_STATUSES else self._next_interval(job_id, job, now)
+            if (
+                previous is None
+                or previous.get("status") != status
+                or previous.get("deviceJobStatistics") != job.get("deviceJobStatistics")
+            ):
+                yield self._progress(job_id, job, now, interval)
+            if interval is not None:
+                heapq.heappush(schedule, (now + interval, job_id))
+
+        self.pending = sorted(job_id for _, job_id in schedule)
+
+    def summary(self) -> dict:
+        statuses = {}
+        for job in self.jobs.values():
+            statuses[job.get("status")] = statuses.get(job.get("status"), 0) + 1
+        return {
+            "jobs": len(self.job_ids),
+            "statuses": statuses,
+            "pending": self.pending,
+            "polls": self.polls,
+            "throttled": self.throttled,
+            "elapsedSeconds": round(monotonic() - self._start, 3) if self._start is not None else 0,
+        }
+
+    def _next_interval(self, job_id: str, job: dict, now: float) -> float:
+        if job.get("status") in JOB_WAITING_STATUSES:
+            interval = min(self._intervals[job_id] * 2, self.max_interval)
+        else:
+            interval = self.poll_interval
+            device_count, done = _job_device_counts(job)
+            sample = self._samples.get(job_id)
+            self._samples[job_id] = (now, done)
+            if device_count:
+                if sample and done > sample[1]:
+                    # poll again when about half of the estimated remaining time has passed
+                    remaining = (device_count - done) * (now - sample[0]) / (done - sample[1])
+                    interval = min(interval, remaining / 2)
+                if done / device_count >= JOB_NEAR_COMPLETION_RATIO:
+                    interval = self.min_interval
+            interval = max(interval, self.min_interval)
+        self._intervals[job_id] = interval
+        return interval
+
+    def _progress(self, job_id: str, job: dict, now: float, interval: Optional[float]) -> dict:
+        device_count, done = _job_device_counts(job)
+        return {
+            "jobId": job_id,
+            "status": job.get("status"),
+            "deviceJobStatistics": job.get("deviceJobStatistics"),
+            "percentComplete": round(100 * done / device_count, 1) if device_count else None,
+            "elapsedSeconds": round(now - self._start, 3),
+            "nextPollSeconds": round(interval, 3) if interval is not None else None,
+        }
+
+
+def _job_device_counts(job: dict) -> tuple:
+    statistics = job.get("deviceJobStatistics") or {}
+    done = (statistics.get("succeededCount") or 0) + (statistics.get("failedCount") or 0)
+    return statistics.get("deviceCount") or 0, done
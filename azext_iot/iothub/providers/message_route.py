@@ -4,12 +4,24 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from typing import Optional
+from time import perf_counter
+from typing import Any, Iterator, List, Optional, Tuple
 from knack.log import get_logger
-from azure.cli.core.azclierror import ResourceNotFoundError
+from azure.cli.core.azclierror import (
+    FileOperationError,
+    InvalidArgumentValueError,
+    MutuallyExclusiveArgumentError,
+    ResourceNotFoundError,
+)
 from azext_iot.common.utility import handle_service_exception, process_json_arg
-from azext_iot.iothub.common import RouteSourceType
+from azext_iot.iothub.common import FALLBACK_ROUTE_NAME, RouteSourceType
 from azext_iot.iothub.providers.base import IoTHubProvider
+from azext_iot.iothub.providers.routing_query import (
+    RouteCondition,
+    RouteMessage,
+    RoutingQueryError,
+    compile_route_condition,
+)
 from azure.core.exceptions import HttpResponseError
 
 
@@ -115,24 +127,71 @@ class MessageRoute(IoTHubProvider):
         source_type: Optional[str] = None,
         body: Optional[str] = None,
         app_properties: Optional[str] = None,
-        system_properties: Optional[str] = None
+        system_properties: Optional[str] = None,
+        twin: Optional[str] = None,
+        messages_file: Optional[str] = None,
+        use_service: bool = False,
     ):
+        if messages_file and any([body, app_properties, system_properties, twin]):
+            raise MutuallyExclusiveArgumentError(
+                "A messages file cannot be combined with a message body, properties or twin."
+            )
+        if messages_file and use_service:
+            raise MutuallyExclusiveArgumentError("A messages file can only be tested locally.")
+
         if app_properties:
             app_properties = process_json_arg(content=app_properties, argument_name="app_properties")
         if system_properties:
             system_properties = process_json_arg(content=system_properties, argument_name="system_properties")
+        if twin:
+            twin = process_json_arg(content=twin, argument_name="twin")
 
-        route_message = {
-            "body": body,
-            "appProperties": app_properties,
-            "systemProperties": system_properties
-        }
+        if use_service:
+            return self._test_with_service(
+                route_name=route_name,
+                source_type=source_type,
+                route_message={
+                    "body": body,
+                    "appProperties": app_properties,
+                    "systemProperties": system_properties
+                },
+                twin=twin,
+            )
 
+        if route_name:
+            route = self.show(route_name)
+            try:
+                result = compile_route_condition(route.condition).evaluate(
+                    RouteMessage(body, app_properties, system_properties, twin)
+                )
+            except RoutingQueryError as e:
+                return {
+                    "result": "undefined",
+                    "details": {"compilationErrors": [{"message": str(e), "severity": "error"}]},
+                }
+            return {
+                "result": str(result).lower() if isinstance(result, bool) else "undefined",
+                "details": {"compilationErrors": []},
+            }
+
+        routes = self._compile_routes(source_type=source_type)
+        if messages_file:
+            return self._test_messages_file(routes, messages_file)
+        matched = self._match_routes(routes, RouteMessage(body, app_properties, system_properties, twin))
+        return {"routes": [{"properties": route} for route in matched]}
+
+    def _test_with_service(
+        self,
+        route_message: dict,
+        twin: Optional[dict] = None,
+        route_name: Optional[str] = None,
+        source_type: Optional[str] = None,
+    ):
         if route_name:
             route = self.show(route_name)
             test_route_input = {
                 "message": route_message,
-                "twin": None,
+                "twin": twin,
                 "route": route
             }
             return self.discovery.client.test_route(
@@ -145,7 +204,7 @@ class MessageRoute(IoTHubProvider):
             test_all_routes_input = {
                 "routingSource": source_type,
                 "message": route_message,
-                "twin": None
+                "twin": twin
             }
             return self.discovery.client.test_all_routes(
                 iot_hub_name=self.hub_resource.name,
@@ -160,7 +219,7 @@ class MessageRoute(IoTHubProvider):
             test_all_routes_input = {
                 "routingSource": type,
                 "message": route_message,
-                "twin": None
+                "twin": twin
             }
             result = self.discovery.client.test_all_routes(
                 iot_hub_name=self.hub_resource.name,
@@ -169,7 +228,7 @@ class MessageRoute(IoTHubProvider):
             ).routes
 
             # Fallback for if no routes pass
-            if len(result) == 1 and result[0].properties.name == "$fallback":
+            if len(result) == 1 and result[0].properties.name == FALLBACK_ROUTE_NAME:
                 fallback = result
             else:
                 routes.extend(result)
@@ -178,6 +237,75 @@ class MessageRoute(IoTHubProvider):
             routes = fallback
         return {"routes": routes}
 
+    def _compile_routes(self, source_type: Optional[str] = None) -> List[Tuple[Any, RouteCondition]]:
+        """
+        Compiles the conditions of enabled routes (and the fallback route) once, skipping invalid conditions.
+        """
+        routing = self.hub_resource.properties.routing
+        routes = [route for route in routing.routes if route.is_enabled]
+        fallback_route = routing.fallback_route
+        if fallback_route and fallback_route.is_enabled:
+            routes.append(fallback_route)
+        if source_type:
+            routes = [route for route in routes if route.source.lower() == source_type.lower()]
+
+        compiled = []
+        for route in routes:
+            try:
+                compiled.append((route, compile_route_condition(route.condition)))
+            except RoutingQueryError as e:
+                logger.warning("Skipping route '%s' with an invalid condition: %s", route.name, e)
+        return compiled
+
+    def _match_routes(self, routes: List[Tuple[Any, RouteCondition]], message: RouteMessage) -> list:
+        """
+        Returns the routes a message is sent to. Like the service, the fallback route only applies to
+        messages that do not match any other route of the same source.
+        """
+        matched = []
+        fallback = None
+        for route, condition in routes:
+            if route.name == FALLBACK_ROUTE_NAME:
+                fallback = (route, condition)
+            elif condition.matches(message):
+                matched.append(route)
+        if fallback and not any(route.source == fallback[0].source for route in matched):
+            if fallback[1].matches(message):
+                matched.append(fallback[0])
+        return matched
+
+    def _test_messages_file(self, routes: List[Tuple[Any, RouteCondition]], messages_file: str) -> dict:
+        start = perf_counter()
+        route_counts = {route.name: 0 for route, _ in routes}
+        results = []
+        unmatched = 0
+        for index, message in enumerate(_read_route_messages(messages_file)):
+            matched = [
+                route.name for route in self._match_routes(
+                    routes,
+                    RouteMessage(
+                        body=message.get("body"),
+                        app_properties=message.get("appProperties"),
+                        system_properties=message.get("systemProperties"),
+                        twin=message.get("twin"),
+                    ),
+                )
+            ]
+            for name in matched:
+                route_counts[name] += 1
+            unmatched += 0 if matched else 1
+            results.append({"index": index, "routes": matched})
+
+        elapsed = perf_counter() - start
+        return {
+            "total": len(results),
+            "unmatched": unmatched,
+            "routes": route_counts,
+            "elapsedSeconds": round(elapsed, 3),
+            "messagesPerSecond": round(len(results) / elapsed, 3) if elapsed else 0,
+            "results": results,
+        }
+
     def show_fallback(self):
         return self.hub_resource.properties.routing.fallback_route
 
@@ -192,3 +320,30 @@ class MessageRoute(IoTHubProvider):
             if_match=self.hub_resource.etag
         )
         return self.show_fallback()
+
+
+def _read_route_messages(messages_file: str) -> Iterator[dict]:
+    """
+    Reads sample messages from a json array or newline delimited json file. Each message is an object with
+    optional body, appProperties, systemProperties and twin.
+    """
+    import json
+
+    try:
+        with open(messages_file, "r", encoding="utf-8") as f:
+            content = f.read()
+    except OSError as e:
+        raise FileOperationError(f"Unable to read messages file '{messages_file}': {e}")
+
+    try:
+        if content.lstrip().startswith("["):
+            messages = json.loads(content)
+        else:
+            messages = [json.loads(line) for line in content.splitlines() if line.strip()]
+    except ValueError as e:
+        raise InvalidArgumentValueError(f"Messages file '{messages_file}' is not valid json: {e}")
+
+    for message in messages:
+        if not isinstance(message, dict):
+            raise InvalidArgumentValueError("Each message in the messages file must be a json object.")
+        yield message
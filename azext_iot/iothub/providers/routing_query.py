@@ -0,0 +1,492 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+routing_query: Local evaluator for the IoT Hub message routing query language.
+
+Route conditions are compiled once into a tree of closures and evaluated against sample messages
+(body, application properties, system properties and twin) without calling the service.
+Evaluation follows the service's three-valued logic: references that do not resolve and operations on
+mismatched types are undefined, and a route only matches when its condition is true.
+"""
+
+import json
+import math
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+__all__ = ["UNDEFINED", "RoutingQueryError", "RouteCondition", "RouteMessage", "compile_route_condition"]
+
+
+class _Undefined(object):
+    def __repr__(self):
+        return "undefined"
+
+
+UNDEFINED = _Undefined()
+
+# Body queries are only supported for json messages in these encodings
+BODY_QUERY_CONTENT_TYPE = "application/json"
+BODY_QUERY_CONTENT_ENCODINGS = ["utf-8", "utf-16", "utf-32"]
+
+# Routing query system property names for the keys used in message system properties
+SYSTEM_PROPERTY_ALIASES = {
+    "connectiondeviceid": "iothub-connection-device-id",
+    "connectionmoduleid": "iothub-connection-module-id",
+    "connectionauthmethod": "iothub-connection-auth-method",
+    "connectiondevicegenerationid": "iothub-connection-auth-generation-id",
+    "enqueuedtime": "iothub-enqueuedtime",
+}
+
+_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<number>(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?)
+    | (?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*")
+    | (?P<reference>\$[A-Za-z_][\w-]*)
+    | (?P<name>[A-Za-z_]\w*)
+    | (?P<op><>|!=|<=|>=|\|\||[=<>+\-*/%(),.\[\]])
+    """,
+    re.VERBOSE,
+)
+_KEYWORDS = ["and", "or", "not", "true", "false", "null"]
+_COMPARISONS = ["=", "!=", "<>", "<", "<=", ">", ">="]
+
+
+class RoutingQueryError(Exception):
+    pass
+
+
+class RouteMessage(object):
+    """
+    A sample message to evaluate route conditions against. The body is parsed on first use.
+    """
+
+    def __init__(
+        self,
+        body: Optional[Any] = None,
+        app_properties: Optional[Dict[str, Any]] = None,
+        system_properties: Optional[Dict[str, Any]] = None,
+        twin: Optional[Dict[str, Any]] = None,
+    ):
+        self.app_properties = app_properties or {}
+        self.system_properties = {key.lower(): value for key, value in (system_properties or {}).items()}
+        self.twin = twin if twin is not None else UNDEFINED
+        self._raw_body = body
+        self._body = None
+
+    @property
+    def body(self) -> Any:
+        if self._body is None:
+            self._body = self._parse_body()
+        return self._body
+
+    def _parse_body(self) -> Any:
+        content_type = str(self.system_properties.get("contenttype", "")).lower()
+        content_encoding = str(self.system_properties.get("contentencoding", "")).lower()
+        if content_type != BODY_QUERY_CONTENT_TYPE or content_encoding not in BODY_QUERY_CONTENT_ENCODINGS:
+            return UNDEFINED
+        if self._raw_body is None:
+            return UNDEFINED
+        if not isinstance(self._raw_body, str):
+            return self._raw_body
+        try:
+            return json.loads(self._raw_body)
+        except ValueError:
+            return UNDEFINED
+
+    def system_property(self, name: str) -> Any:
+        name = name.lower()
+        if name in self.system_properties:
+            return self.system_properties[name]
+        alias = SYSTEM_PROPERTY_ALIASES.get(name)
+        return self.system_properties.get(alias, UNDEFINED) if alias else UNDEFINED
+
+
+class RouteCondition(NamedTuple):
+    condition: str
+    evaluate: Callable[[RouteMessage], Any]
+
+    def matches(self, message: RouteMessage) -> bool:
+        return self.evaluate(message) is True
+
+
+def compile_route_condition(condition: str) -> RouteCondition:
+    """
+    Compiles a route condition, raising RoutingQueryError if it is not a valid routing query.
+    """
+    parser = _Parser(condition if condition and condition.strip() else "true")
+    evaluate = parser.parse()
+    return RouteCondition(condition, evaluate)
+
+
+class _Token(NamedTuple):
+    kind: str
+    value: str
+    position: int
+
+
+def _tokenize(condition: str) -> List[_Token]:
+    tokens = []
+    position = 0
+    while position < len(condition):
+        match = _TOKEN.match(condition, position)
+        if not match:
+            raise RoutingQueryError(
+                "Unexpected character '{}' at position {}.".format(condition[position], position + 1)
+            )
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "name" and value.lower() in _KEYWORDS:
+            kind, value = "keyword", value.lower()
+        if kind != "space":
+            tokens.append(_Token(kind, value, position + 1))
+        position = match.end()
+    tokens.append(_Token("end", "", len(condition) + 1))
+    return tokens
+
+
+def _unquote(value: str) -> str:
+    quote = value[0]
+    inner = value[1:-1].replace(quote * 2, quote)
+    return re.sub(r"\\(.)", lambda m: {"n": "\n", "t": "\t", "r": "\r"}.get(m.group(1), m.group(1)), inner)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _same_type(left: Any, right: Any) -> bool:
+    if _is_number(left) and _is_number(right):
+        return True
+    return type(left) is type(right) and isinstance(left, (str, bool, type(None)))
+
+
+def _compare(op: str, left: Any, right: Any) -> Any:
+    if left is UNDEFINED or right is UNDEFINED or not _same_type(left, right):
+        return UNDEFINED
+    if op == "=":
+        return left == right
+    if op in ["!=", "<>"]:
+        return left != right
+    if left is None or isinstance(left, bool):
+        return UNDEFINED
+    if op == "<":
+        return left < right
+    if op == "<=":
+        return left <= right
+    if op == ">":
+        return left > right
+    return left >= right
+
+
+def _arithmetic(op: str, left: Any, right: Any) -> Any:
+    if op == "||":
+        return left + right if isinstance(left, str) and isinstance(right, str) else UNDEFINED
+    if not (_is_number(left) and _is_number(right)):
+        return UNDEFINED
+    if op == "+":
+        return left + right
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    if right == 0:
+        return UNDEFINED
+    if op == "/":
+        return left / right
+    return math.fmod(left, right)
+
+
+def _and(left: Any, right: Any) -> Any:
+    if left is False or right is False:
+        return False
+    if left is True and right is True:
+        return True
+    return UNDEFINED
+
+
+def _or(left: Any, right: Any) -> Any:
+    if left is True or right is True:
+        return True
+    if left is False and right is False:
+        return False
+    return UNDEFINED
+
+
+def _strings(*values) -> bool:
+    return all(isinstance(value, str) for value in values)
+
+
+def _numbers(*values) -> bool:
+    return all(_is_number(value) for value in values)
+
+
+def _substring(value, start, length):
+    if not (_strings(value) and _numbers(start, length)):
+        return UNDEFINED
+    start, length = int(start), int(length)
+    return value[start:start + length] if start >= 0 and length >= 0 else UNDEFINED
+
+
+def _as_number(value):
+    if _is_number(value):
+        return value
+    if not isinstance(value, str):
+        return UNDEFINED
+    try:
+        number = json.loads(value)
+    except ValueError:
+        return UNDEFINED
+    return number if _is_number(number) else UNDEFINED
+
+
+def _math(func: Callable, domain: Callable = lambda *args: True) -> Callable:
+    def _apply(*args):
+        if not _numbers(*args) or not domain(*args):
+            return UNDEFINED
+        try:
+            return func(*args)
+        except (OverflowError, ValueError):
+            return UNDEFINED
+
+    return _apply
+
+
+def _string(func: Callable, *arg_checks: Callable) -> Callable:
+    def _apply(*args):
+        checks = arg_checks or [_strings] * len(args)
+        if not all(check(arg) for check, arg in zip(checks, args)):
+            return UNDEFINED
+        return func(*args)
+
+    return _apply
+
+
+# name: (min args, max args or None for variadic, implementation)
+_FUNCTIONS: Dict[str, tuple] = {
+    "is_array": (1, 1, lambda v: isinstance(v, list)),
+    "is_bool": (1, 1, lambda v: isinstance(v, bool)),
+    "is_defined": (1, 1, lambda v: v is not UNDEFINED),
+    "is_null": (1, 1, lambda v: v is None),
+    "is_number": (1, 1, _is_number),
+    "is_object": (1, 1, lambda v: isinstance(v, dict)),
+    "is_primitive": (1, 1, lambda v: v is None or isinstance(v, (str, bool, int, float))),
+    "is_string": (1, 1, lambda v: isinstance(v, str)),
+    "abs": (1, 1, _math(abs)),
+    "ceiling": (1, 1, _math(math.ceil)),
+    "exp": (1, 1, _math(math.exp)),
+    "floor": (1, 1, _math(math.floor)),
+    "power": (2, 2, _math(math.pow)),
+    "sign": (1, 1, _math(lambda v: (v > 0) - (v < 0))),
+    "sqrt": (1, 1, _math(math.sqrt, lambda v: v >= 0)),
+    "square": (1, 1, _math(lambda v: v * v)),
+    "as_number": (1, 1, _as_number),
+    "concat": (2, None, _string(lambda *args: "".join(args))),
+    "contains": (2, 2, _string(lambda s, sub: sub in s)),
+    "ends_with": (2, 2, _string(lambda s, suffix: s.endswith(suffix))),
+    "index_of": (2, 2, _string(lambda s, sub: s.find(sub))),
+    "length": (1, 1, _string(len)),
+    "lower": (1, 1, _string(str.lower)),
+    "starts_with": (2, 2, _string(lambda s, prefix: s.startswith(prefix))),
+    "substring": (3, 3, _substring),
+    "upper": (1, 1, _string(str.upper)),
+}
+_TYPE_CHECK_FUNCTIONS = [name for name in _FUNCTIONS if name.startswith("is_")]
+
+
+class _Parser(object):
+    """
+    Recursive descent parser producing closures that take a RouteMessage.
+    """
+
+    def __init__(self, condition: str):
+        self.condition = condition
+        self.tokens = _tokenize(condition)
+        self.index = 0
+
+    @property
+    def current(self) -> _Token:
+        return self.tokens[self.index]
+
+    def _advance(self) -> _Token:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def _accept(self, kind: str, *values: str) -> Optional[_Token]:
+        token = self.current
+        if token.kind == kind and (not values or token.value in values):
+            return self._advance()
+        return None
+
+    def _expect(self, kind: str, value: str) -> _Token:
+        token = self._accept(kind, value)
+        if not token:
+            self._error("Expected '{}'".format(value))
+        return token
+
+    def _error(self, message: str):
+        token = self.current
+        found = "end of condition" if token.kind == "end" else "'{}'".format(token.value)
+        raise RoutingQueryError("{} but found {} at position {}.".format(message, found, token.position))
+
+    def parse(self) -> Callable[[RouteMessage], Any]:
+        expression = self._or()
+        if self.current.kind != "end":
+            self._error("Expected end of condition")
+        return expression
+
+    def _or(self):
+        left = self._and()
+        while self._accept("keyword", "or"):
+            right = self._and()
+            left = (lambda lhs, rhs: lambda m: _or(lhs(m), rhs(m)))(left, right)
+        return left
+
+    def _and(self):
+        left = self._not()
+        while self._accept("keyword", "and"):
+            right = self._not()
+            left = (lambda lhs, rhs: lambda m: _and(lhs(m), rhs(m)))(left, right)
+        return left
+
+    def _not(self):
+        if self._accept("keyword", "not"):
+            operand = self._not()
+
+            def _negate(m):
+                value = operand(m)
+                return (not value) if isinstance(value, bool) else UNDEFINED
+
+            return _negate
+        return self._comparison()
+
+    def _comparison(self):
+        left = self._additive()
+        token = self._accept("op", *_COMPARISONS)
+        if token:
+            right = self._additive()
+            op = token.value
+            return lambda m: _compare(op, left(m), right(m))
+        return left
+
+    def _additive(self):
+        left = self._multiplicative()
+        while True:
+            token = self._accept("op", "+", "-", "||")
+            if not token:
+                return left
+            right = self._multiplicative()
+            left = (lambda op, lhs, rhs: lambda m: _arithmetic(op, lhs(m), rhs(m)))(token.value, left, right)
+
+    def _multiplicative(self):
+        left = self._unary()
+        while True:
+            token = self._accept("op", "*", "/", "%")
+            if not token:
+                return left
+            right = self._unary()
+            left = (lambda op, lhs, rhs: lambda m: _arithmetic(op, lhs(m), rhs(m)))(token.value, left, right)
+
+    def _unary(self):
+        if self._accept("op", "-"):
+            operand = self._unary()
+            return lambda m: _arithmetic("-", 0, operand(m))
+        if self._accept("op", "+"):
+            return self._unary()
+        return self._primary()
+
+    def _primary(self):
+        token = self.current
+        if self._accept("op", "("):
+            expression = self._or()
+            self._expect("op", ")")
+            return expression
+        if self._accept("number"):
+            value = float(token.value) if any(c in token.value for c in ".eE") else int(token.value)
+            return lambda m: value
+        if self._accept("string"):
+            value = _unquote(token.value)
+            return lambda m: value
+        if self._accept("keyword", "true", "false", "null"):
+            value = {"true": True, "false": False, "null": None}[token.value]
+            return lambda m: value
+        if self._accept("reference"):
+            return self._reference(token)
+        if self._accept("name"):
+            if self.current.kind == "op" and self.current.value == "(":
+                return self._function(token)
+            name = token.value
+            return self._path(lambda m: m.app_properties.get(name, UNDEFINED))
+        self._error("Expected a value")
+
+    def _reference(self, token: _Token):
+        name = token.value[1:]
+        if name.lower() == "body":
+            return self._path(lambda m: m.body)
+        if name.lower() == "twin":
+            return self._path(lambda m: m.twin)
+        return lambda m: m.system_property(name)
+
+    def _path(self, target):
+        while True:
+            if self._accept("op", "."):
+                name = self.current
+                if name.kind not in ["name", "keyword"]:
+                    self._error("Expected a property name")
+                self._advance()
+                target = (lambda get, key: lambda m: _member(get(m), key))(target, name.value)
+            elif self._accept("op", "["):
+                index = self.current
+                if not (self._accept("number") or self._accept("string")):
+                    self._error("Expected an index or quoted property name")
+                self._expect("op", "]")
+                key = _unquote(index.value) if index.kind == "string" else int(float(index.value))
+                target = (lambda get, key: lambda m: _member(get(m), key))(target, key)
+            else:
+                return target
+
+    def _function(self, token: _Token):
+        name = token.value.lower()
+        if name not in _FUNCTIONS:
+            raise RoutingQueryError(
+                "Unknown function '{}' at position {}.".format(token.value, token.position)
+            )
+        min_args, max_args, func = _FUNCTIONS[name]
+        self._expect("op", "(")
+        args = []
+        if not self._accept("op", ")"):
+            args.append(self._or())
+            while self._accept("op", ","):
+                args.append(self._or())
+            self._expect("op", ")")
+        if len(args) < min_args or (max_args is not None and len(args) > max_args):
+            raise RoutingQueryError(
+                "Function '{}' at position {} takes {} argument(s) but {} were given.".format(
+                    token.value,
+                    token.position,
+                    min_args if min_args == max_args else "at least {}".format(min_args),
+                    len(args),
+                )
+            )
+
+        if name in _TYPE_CHECK_FUNCTIONS:
+            return lambda m: func(*[arg(m) for arg in args])
+
+        def _call(m):
+            values = [arg(m) for arg in args]
+            if any(value is UNDEFINED for value in values):
+                return UNDEFINED
+            return func(*values)
+
+        return _call
+
+
+def _member(value: Any, key) -> Any:
+    if isinstance(key, int):
+        return value[key] if isinstance(value, list) and 0 <= key < len(value) else UNDEFINED
+    return value.get(key, UNDEFINED) if isinstance(value, dict) else UNDEFINED
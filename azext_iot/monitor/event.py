@@ -4,17 +4,26 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import isodate
 import json
 import os
 import uamqp
 import yaml
 
-from typing import Optional, Tuple, Union
+from time import perf_counter, time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from uuid import uuid4
 from knack.log import get_logger
-from azext_iot.constants import USER_AGENT
+from azext_iot.constants import (
+    C2D_FEEDBACK_BATCH_SIZE,
+    C2D_FEEDBACK_MAX_RECONNECTS,
+    C2D_FEEDBACK_RECEIVE_TIMEOUT_MS,
+    C2D_FEEDBACK_RECONNECT_WINDOW_SEC,
+    C2D_SEND_BATCH_SIZE,
+    USER_AGENT,
+)
 from azext_iot.common.shared import AuthenticationTypeDataplane
-from azext_iot.common.utility import shell_safe_json_parse
+from azext_iot.common.utility import latency_percentiles, shell_safe_json_parse
 from azext_iot.monitor.builders.hub_target_builder import AmqpBuilder
 from uamqp.authentication import JWTTokenAuth
 
@@ -37,6 +46,37 @@ def send_c2d_message(
     expiry_time_utc=None,
     properties=None,
 ):
+    target_msg_id, message = build_c2d_message(
+        device_id=device_id,
+        data=data,
+        data_file_path=data_file_path,
+        message_id=message_id,
+        correlation_id=correlation_id,
+        ack=ack,
+        content_type=content_type,
+        user_id=user_id,
+        content_encoding=content_encoding,
+        expiry_time_utc=expiry_time_utc,
+        properties=properties,
+    )
+    result = send_c2d_messages(target=target, messages=[message])
+    errors = [m for m in result if m == uamqp.constants.MessageState.SendFailed]
+    return target_msg_id, errors
+
+
+def build_c2d_message(
+    device_id,
+    data,
+    data_file_path: Optional[str] = None,
+    message_id=None,
+    correlation_id=None,
+    ack=None,
+    content_type=None,
+    user_id=None,
+    content_encoding="utf-8",
+    expiry_time_utc=None,
+    properties=None,
+) -> Tuple[str, uamqp.Message]:
 
     app_props = {}
     if properties:
@@ -93,7 +133,17 @@ def send_c2d_message(
     message = uamqp.Message(
         body=msg_body, properties=msg_props, application_properties=app_props
     )
+    return target_msg_id, message
 
+
+def send_c2d_messages(
+    target, messages: Iterable[uamqp.Message], batch_size: Optional[int] = None
+) -> List[uamqp.constants.MessageState]:
+    """
+    Sends cloud-to-device messages over a single /messages/devicebound link, queueing up to batch_size
+    messages at a time. Returns the final send state of each message, in order.
+    """
+    batch_size = batch_size or C2D_SEND_BATCH_SIZE
     operation = "/messages/devicebound"
     endpoint_target, token_auth = _get_endpoint_and_token_auth(
         target=target, operation=operation
@@ -105,37 +155,44 @@ def send_c2d_message(
         client_name=_get_container_id(),
         debug=DEBUG,
     )
-    client.queue_message(message)
-    result = client.send_all_messages()
-    errors = [m for m in result if m == uamqp.constants.MessageState.SendFailed]
-    return target_msg_id, errors
+    results = []
+    try:
+        batch = []
+        for message in messages:
+            batch.append(message)
+            if len(batch) == batch_size:
+                client.queue_message(*batch)
+                results.extend(client.send_all_messages(close_on_done=False))
+                batch = []
+        if batch:
+            client.queue_message(*batch)
+            results.extend(client.send_all_messages(close_on_done=False))
+    finally:
+        client.close()
+    return results
 
 
-def monitor_feedback(target, device_id, wait_on_id=None, token_duration=3600):
-    def handle_msg(msg):
-        payload = next(msg.get_data())
-        if isinstance(payload, bytes):
-            payload = str(payload, "utf8")
-        # assume json [] based on spec
-        payload = json.loads(payload)
-        for p in payload:
-            if (
-                device_id
-                and p.get("deviceId")
-                and p["deviceId"].lower() != device_id.lower()
-            ):
-                return None
-            print(yaml.safe_dump({"feedback": p}, default_flow_style=False), flush=True)
-            if wait_on_id:
-                msg_id = p["originalMessageId"]
-                if msg_id == wait_on_id:
-                    return msg_id
-        return None
-
-    operation = "/messages/servicebound/feedback"
-    endpoint_target, token_auth = _get_endpoint_and_token_auth(
-        target=target, operation=operation
-    )
+def monitor_feedback(
+    target,
+    device_id=None,
+    wait_on_id=None,
+    token_duration=3600,
+    wait_on_ids: Optional[Iterable[str]] = None,
+    sent_times: Optional[Dict[str, float]] = None,
+    timeout: int = 0,
+    message_acks: Optional[Dict[str, str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Prints C2D feedback records as they arrive. When message Ids are provided (wait_on_id, wait_on_ids or the
+    keys of sent_times) the monitor returns delivery stats once feedback for every message has been received
+    or the timeout (in seconds) elapses. Messages that only requested negative acknowledgement (see message_acks)
+    do not hold the monitor open, as no feedback is sent when they are delivered.
+    """
+    message_ids = set(wait_on_ids or [])
+    if wait_on_id:
+        message_ids.add(wait_on_id)
+    message_ids.update(sent_times or {})
+
     device_filter_txt = None
     if device_id:
         device_filter_txt = " filtering on device: {},".format(device_id)
@@ -144,24 +201,168 @@ def monitor_feedback(target, device_id, wait_on_id=None, token_duration=3600):
         f"Starting C2D feedback monitor,{device_filter_txt if device_filter_txt else ''} use ctrl-c to stop..."
     )
 
-    try:
-        client = uamqp.ReceiveClient(
+    correlator = C2DFeedbackCorrelator(
+        target=target,
+        device_id=device_id,
+        message_ids=message_ids,
+        message_acks=message_acks,
+        sent_times=sent_times,
+        timeout=timeout,
+        token_duration=token_duration,
+    )
+    correlator.run()
+    if message_ids:
+        return correlator.stats()
+
+
+class C2DFeedbackCorrelator(object):
+    """
+    Receives C2D feedback in batches from the service bound feedback endpoint and correlates feedback records
+    with a set of outstanding message Ids.
+
+    Each batch of feedback messages is settled together once its records have been processed. While waiting on
+    message Ids or a timeout, the connection is re-established when the token expires or the link is closed by
+    the service.
+    """
+
+    def __init__(
+        self,
+        target: dict,
+        device_id: Optional[str] = None,
+        message_ids: Optional[Iterable[str]] = None,
+        sent_times: Optional[Dict[str, float]] = None,
+        timeout: int = 0,
+        token_duration: int = 3600,
+        batch_size: int = C2D_FEEDBACK_BATCH_SIZE,
+        print_feedback: bool = True,
+        message_acks: Optional[Dict[str, str]] = None,
+    ):
+        self.target = target
+        self.device_id = device_id.lower() if device_id else None
+        self.outstanding = set(message_ids or [])
+        self.tracked = len(self.outstanding)
+        # feedback is only guaranteed for messages that requested it on success, the others are
+        # correlated while waiting but are not waited on
+        message_acks = message_acks or {}
+        self.awaited = {msg_id for msg_id in self.outstanding if message_acks.get(msg_id) != "negative"}
+        self.required = len(self.awaited)
+        self.sent_times = sent_times or {}
+        self.timeout = timeout
+        self.token_duration = token_duration
+        self.batch_size = batch_size
+        self.print_feedback = print_feedback
+        self.outcomes: Dict[str, int] = {}
+        self.latencies: List[float] = []
+        self.reconnects = 0
+        self.elapsed = 0.0
+
+    def _create_client(self) -> uamqp.ReceiveClient:
+        endpoint_target, token_auth = _get_endpoint_and_token_auth(
+            target=self.target, operation="/messages/servicebound/feedback", token_duration=self.token_duration
+        )
+        return uamqp.ReceiveClient(
             source=endpoint_target,
             auth=token_auth,
             client_name=_get_container_id(),
             debug=DEBUG,
+            auto_complete=False,
         )
-        message_generator = client.receive_messages_iter()
-        for msg in message_generator:
-            match = handle_msg(msg)
-            if match:
-                logger.info("Requested message Id has been matched...")
-                msg.accept()
-                return match
-    except uamqp.errors.AMQPConnectionError:
-        logger.debug("AMQPS connection has expired...")
-    finally:
-        client.close()
+
+    def _done(self, deadline: Optional[float]) -> bool:
+        if self.required and not self.awaited:
+            return True
+        if self.tracked and not self.required and not deadline:
+            return True
+        return bool(deadline and perf_counter() >= deadline)
+
+    def handle_records(self, records: List[dict], received_time: Optional[float] = None):
+        """
+        Processes the records of a feedback message, printing them and updating the outstanding message Ids.
+        """
+        received_time = received_time or time()
+        output = []
+        for record in records:
+            if self.device_id and record.get("deviceId") and record["deviceId"].lower() != self.device_id:
+                continue
+            if self.print_feedback:
+                output.append(yaml.safe_dump({"feedback": record}, default_flow_style=False))
+
+            msg_id = record.get("originalMessageId")
+            if msg_id not in self.outstanding:
+                continue
+            self.outstanding.discard(msg_id)
+            self.awaited.discard(msg_id)
+            outcome = record.get("statusCode") or record.get("description") or "Unknown"
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            if msg_id in self.sent_times:
+                self.latencies.append(
+                    max(_parse_enqueued_time(record.get("enqueuedTimeUtc"), received_time) - self.sent_times[msg_id], 0)
+                )
+        if output:
+            print("".join(output), end="", flush=True)
+
+    def run(self):
+        start = perf_counter()
+        deadline = start + self.timeout if self.timeout else None
+        failed_connections = 0
+        try:
+            while not self._done(deadline):
+                connected_at = perf_counter()
+                client = self._create_client()
+                try:
+                    while not self._done(deadline):
+                        batch = client.receive_message_batch(
+                            max_batch_size=self.batch_size, timeout=C2D_FEEDBACK_RECEIVE_TIMEOUT_MS
+                        )
+                        received_time = time()
+                        for msg in batch:
+                            payload = next(msg.get_data())
+                            if isinstance(payload, bytes):
+                                payload = str(payload, "utf8")
+                            # assume json [] based on spec
+                            self.handle_records(json.loads(payload), received_time)
+                        for msg in batch:
+                            msg.accept()
+                        if batch:
+                            failed_connections = 0
+                except (uamqp.errors.AMQPConnectionError, uamqp.errors.TokenExpired) as e:
+                    # with no messages to wait on and no timeout, the monitor stops when the connection expires
+                    if not self.tracked and not deadline:
+                        logger.debug("AMQPS connection has expired...")
+                        return
+                    # a connection that drops soon after opening is treated as a failure rather than an expiry
+                    if perf_counter() - connected_at < C2D_FEEDBACK_RECONNECT_WINDOW_SEC:
+                        failed_connections += 1
+                    else:
+                        failed_connections = 0
+                    if failed_connections >= C2D_FEEDBACK_MAX_RECONNECTS:
+                        raise
+                    logger.debug("AMQPS connection has expired or closed, reconnecting: %s", e)
+                    self.reconnects += 1
+                finally:
+                    client.close()
+        finally:
+            self.elapsed = perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tracked": self.tracked,
+            "received": self.tracked - len(self.outstanding),
+            "outstanding": sorted(self.awaited),
+            "outcomes": self.outcomes,
+            "latencyMs": latency_percentiles(self.latencies),
+            "elapsedSeconds": round(self.elapsed, 3),
+            "reconnects": self.reconnects,
+        }
+
+
+def _parse_enqueued_time(enqueued_time_utc: Optional[str], default: float) -> float:
+    if not enqueued_time_utc:
+        return default
+    try:
+        return isodate.parse_datetime(enqueued_time_utc).timestamp()
+    except (ValueError, isodate.ISO8601Error):
+        return default
 
 
 def _get_container_id():
@@ -169,10 +370,9 @@ def _get_container_id():
 
 
 def _get_endpoint_and_token_auth(
-    target: dict, operation: str
+    target: dict, operation: str, token_duration: int = 360
 ) -> Tuple[str, Union[JWTTokenAuth, None]]:
     from azext_iot.constants import IOTHUB_RESOURCE_ID
-    from time import time
     from collections import namedtuple
 
     AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
@@ -196,6 +396,8 @@ def _get_endpoint_and_token_auth(
         )
         jwt_token_auth.update_token()  # Work-around for uamqp error.
     else:
-        endpoint_with_op = f"amqps://{AmqpBuilder.build_iothub_amqp_endpoint_from_target(target)}{operation}"
+        endpoint_with_op = (
+            f"amqps://{AmqpBuilder.build_iothub_amqp_endpoint_from_target(target, token_duration)}{operation}"
+        )
 
     return endpoint_with_op, jwt_token_auth
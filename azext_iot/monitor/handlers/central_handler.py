@@ -5,8 +5,11 @@
 # --------------------------------------------------------------------------------------------
 
 import csv
+import json
+import os
 import sys
 
+from time import perf_counter
 from typing import List
 from knack.log import get_logger
 
@@ -18,7 +21,7 @@ from azext_iot.central.providers import (
 from azext_iot.monitor.handlers import CommonHandler
 from azext_iot.monitor.models.arguments import CentralHandlerArguments
 from azext_iot.monitor.parsers.central_parser import CentralParser
-from azext_iot.monitor.parsers.issue import Issue
+from azext_iot.monitor.parsers.issue import Issue, IssueSummary
 
 logger = get_logger(__name__)
 
@@ -40,8 +43,11 @@ class CentralHandler(CommonHandler):
 
         self._central_handler_args = central_handler_args
 
-        self._messages = []
+        self._n_messages = 0
         self._issues: List[Issue] = []
+        # when writing a summary file, issues are aggregated instead of kept
+        self._issue_summary = IssueSummary() if self._central_handler_args.summary_file else None
+        self._last_summary_flush = perf_counter()
         self._central_dns_suffix = central_dns_suffix
 
         if self._central_handler_args.duration:
@@ -66,16 +72,22 @@ class CentralHandler(CommonHandler):
         if not self._should_process_module(parser.module_id):
             return
 
-        parsed_message = parser.parse_message()
+        parser.parse_message()
 
-        self._messages.append(parsed_message)
-        n_messages = len(self._messages)
+        self._n_messages += 1
+        n_messages = self._n_messages
 
         issues = parser.issues_handler.get_issues_with_minimum_severity(
             self._central_handler_args.minimum_severity
         )
 
-        self._issues.extend(issues)
+        if self._issue_summary:
+            for issue in issues:
+                self._issue_summary.add(issue)
+            if perf_counter() - self._last_summary_flush >= self._central_handler_args.summary_interval:
+                self._flush_summary()
+        else:
+            self._issues.extend(issues)
 
         self._print_progress_update(n_messages)
 
@@ -122,7 +134,14 @@ class CentralHandler(CommonHandler):
             print("Processed {} messages...".format(n_messages), flush=True)
 
     def _print_results(self):
-        n_messages = len(self._messages)
+        n_messages = self._n_messages
+
+        if self._issue_summary:
+            self._flush_summary()
+            print("Summary of {} issue(s) in {} message(s) written to {}.".format(
+                self._issue_summary.total, n_messages, self._central_handler_args.summary_file
+            ))
+            return
 
         if not self._issues:
             print("No errors detected after parsing {} message(s).".format(n_messages))
@@ -144,8 +163,6 @@ class CentralHandler(CommonHandler):
             return
 
     def _handle_json_summary(self, issues: List[Issue]):
-        import json
-
         output = json.dumps(issues, indent=4)
         print(output)
 
@@ -156,6 +173,25 @@ class CentralHandler(CommonHandler):
         for issue in issues:
             writer.writerow(issue)
 
+    def _flush_summary(self):
+        """
+        Write the rolling issue summary to the summary file, as csv when the file has a .csv
+        extension and json otherwise. The file is replaced atomically so readers never see a partial summary.
+        """
+        summary_file = self._central_handler_args.summary_file
+        temp_file = "{}.{}.tmp".format(summary_file, os.getpid())
+        with open(temp_file, "w", encoding="utf-8", newline="") as f:
+            if summary_file.lower().endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=["category", "key", "severity", "count"])
+                writer.writeheader()
+                writer.writerows(self._issue_summary.csv_rows())
+            else:
+                summary = self._issue_summary.json_repr()
+                summary["messages"] = self._n_messages
+                json.dump(summary, f, indent=4)
+        os.replace(temp_file, summary_file)
+        self._last_summary_flush = perf_counter()
+
     def _quit_messages_exceeded(self):
         message = "Successfully parsed {} message(s).".format(
             self._central_handler_args.max_messages
@@ -71,10 +71,14 @@ class CentralHandlerArguments:
         style="json",
         minimum_severity=Severity.warning,
         progress_interval=5,
+        summary_file=None,
+        summary_interval=60,
     ):
         self.duration = duration
         self.max_messages = max_messages
         self.minimum_severity = minimum_severity
         self.progress_interval = progress_interval
         self.style = style
+        self.summary_file = summary_file
+        self.summary_interval = summary_interval
         self.common_handler_args = common_handler_args
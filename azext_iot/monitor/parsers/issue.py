@@ -4,7 +4,8 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from typing import List
+from collections import Counter
+from typing import Dict, List, Tuple
 from azext_iot.monitor.utility import unicode_decode
 from knack.log import get_logger
 
@@ -12,6 +13,10 @@ from azext_iot.monitor.models.enum import Severity
 
 logger = get_logger(__name__)
 
+ISSUE_SUMMARY_MAX_SAMPLES = 5
+ISSUE_SUMMARY_MAX_TYPES = 1000
+ISSUE_SUMMARY_OTHER_TYPE = "Other issues (issue type limit reached)"
+
 
 class Issue:
     def __init__(self, severity: Severity, details: str, message, device_id=""):
@@ -132,3 +137,65 @@ class IssueHandler:
             "error" will not be included
         """
         return [issue for issue in self._issues if issue.severity <= severity]
+
+
+class IssueSummary:
+    """
+    Aggregates issues into counts per device, template and issue type (severity and details).
+    Only a bounded number of sample issues are kept for each issue type and the number of issue
+    types is capped, so memory stays constant regardless of how many messages are validated.
+    """
+
+    def __init__(
+        self,
+        max_samples: int = ISSUE_SUMMARY_MAX_SAMPLES,
+        max_issue_types: int = ISSUE_SUMMARY_MAX_TYPES,
+    ):
+        self.max_samples = max_samples
+        self.max_issue_types = max_issue_types
+        self.total = 0
+        self.severities = Counter()
+        self.devices = Counter()
+        self.templates = Counter()
+        self._issue_types: Dict[Tuple[str, str], dict] = {}
+
+    def add(self, issue: Issue):
+        severity = issue.severity.name
+        key = (severity, issue.details)
+        if key not in self._issue_types and len(self._issue_types) >= self.max_issue_types:
+            key = (severity, ISSUE_SUMMARY_OTHER_TYPE)
+        issue_type = self._issue_types.setdefault(
+            key, {"severity": severity, "details": key[1], "count": 0, "samples": []}
+        )
+        issue_type["count"] += 1
+        if len(issue_type["samples"]) < self.max_samples:
+            issue_type["samples"].append(dict(vars(issue), severity=severity))
+
+        self.total += 1
+        self.severities[severity] += 1
+        self.devices[issue.device_id] += 1
+        self.templates[getattr(issue, "template_id", "Unknown")] += 1
+
+    def json_repr(self) -> dict:
+        return {
+            "issues": self.total,
+            "severities": dict(self.severities),
+            "devices": dict(self.devices.most_common()),
+            "templates": dict(self.templates.most_common()),
+            "issueTypes": sorted(self._issue_types.values(), key=lambda t: t["count"], reverse=True),
+        }
+
+    def csv_rows(self) -> List[dict]:
+        """
+        Flattened summary counts, one row per severity, device, template and issue type.
+        """
+        rows = [{"category": "severity", "key": k, "severity": k, "count": v} for k, v in self.severities.items()]
+        rows.extend({"category": "device", "key": k, "severity": "", "count": v} for k, v in self.devices.most_common())
+        rows.extend(
+            {"category": "template", "key": k, "severity": "", "count": v} for k, v in self.templates.most_common()
+        )
+        rows.extend(
+            {"category": "issue", "key": t["details"], "severity": t["severity"], "count": t["count"]}
+            for t in sorted(self._issue_types.values(), key=lambda t: t["count"], reverse=True)
+        )
+        return rows
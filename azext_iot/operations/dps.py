@@ -4,11 +4,18 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import csv
+import io
+import json
+import os
+import sys
+from typing import Iterator, List, Optional, Tuple
 from knack.log import get_logger
 from azure.cli.core.azclierror import (
     ArgumentUsageError,
     AzureResponseError,
     BadRequestError,
+    FileOperationError,
     InvalidArgumentValueError,
     MutuallyExclusiveArgumentError,
     RequiredArgumentMissingError,
@@ -21,12 +28,32 @@ from azext_iot.common.shared import (
     ReprovisionType,
     AllocationType,
     KeyType,
-    IoTDPSStateType
+    IoTDPSStateType,
+    BatchOutputFormatType,
+    BulkEnrollmentOperationMode,
+)
+from azext_iot.common.utility import (
+    compute_device_key,
+    compute_device_keys,
+    expand_id_pattern,
+    handle_service_exception,
+    read_ids_from_file,
+    shell_safe_json_parse,
+    unpack_msrest_error,
+)
+from azext_iot.constants import (
+    DEVICE_KEY_BATCH_CHUNK_SIZE,
+    DPS_BULK_ENROLLMENT_BACKOFF_SEC,
+    DPS_BULK_ENROLLMENT_MAX_ITEMS,
+    DPS_BULK_ENROLLMENT_MAX_TRIES,
+    DPS_BULK_ENROLLMENT_MAX_WORKERS,
+    SERVICE_UNAVAILABLE_HTTP_STATUS_CODE,
+    THROTTLE_HTTP_STATUS_CODE,
 )
-from azext_iot.common.utility import compute_device_key, handle_service_exception, shell_safe_json_parse
 from azext_iot.common.certops import open_certificate
 from azext_iot.dps.providers.discovery import DPSDiscovery
-from azext_iot.operations.generic import _execute_query
+from azext_iot.dps.providers.enrollment_bulk import bulk_enrollment_error, send_bulk_enrollment_request
+from azext_iot.operations.generic import _execute_query_pages, _project_fields, _write_ndjson
 from azext_iot._factory import SdkResolver
 from azext_iot.sdk.dps.service.models import (
     IndividualEnrollment,
@@ -60,6 +87,8 @@ def iot_dps_device_enrollment_list(
     top=None,
     login=None,
     auth_type_dataplane=None,
+    fields=None,
+    stream=False,
 ):
     from azext_iot.sdk.dps.service.models import QuerySpecification
 
@@ -77,7 +106,7 @@ def iot_dps_device_enrollment_list(
 
         query_command = "SELECT *"
         query = [QuerySpecification(query=query_command)]
-        return _execute_query(query, sdk.individual_enrollment.query, top)
+        return _list_query_results(query, sdk.individual_enrollment.query, top=top, fields=fields, stream=stream)
     except ProvisioningServiceErrorDetailsException as e:
         handle_service_exception(e)
 
@@ -361,11 +390,236 @@ def iot_dps_device_enrollment_delete(
         handle_service_exception(e)
 
 
+def iot_dps_device_enrollment_bulk_create(
+    cmd,
+    enrollment_file,
+    dps_name=None,
+    resource_group_name=None,
+    max_workers=DPS_BULK_ENROLLMENT_MAX_WORKERS,
+    retry_file=None,
+    login=None,
+    auth_type_dataplane=None,
+):
+    return _run_enrollment_bulk_operation(
+        cmd,
+        mode=BulkEnrollmentOperationMode.create.value,
+        enrollment_file=enrollment_file,
+        dps_name=dps_name,
+        resource_group_name=resource_group_name,
+        max_workers=max_workers,
+        retry_file=retry_file,
+        login=login,
+        auth_type_dataplane=auth_type_dataplane,
+    )
+
+
+def iot_dps_device_enrollment_bulk_update(
+    cmd,
+    enrollment_file,
+    dps_name=None,
+    resource_group_name=None,
+    etag_match=False,
+    max_workers=DPS_BULK_ENROLLMENT_MAX_WORKERS,
+    retry_file=None,
+    login=None,
+    auth_type_dataplane=None,
+):
+    mode = BulkEnrollmentOperationMode.update_if_match_etag if etag_match else BulkEnrollmentOperationMode.update
+    return _run_enrollment_bulk_operation(
+        cmd,
+        mode=mode.value,
+        enrollment_file=enrollment_file,
+        dps_name=dps_name,
+        resource_group_name=resource_group_name,
+        max_workers=max_workers,
+        retry_file=retry_file,
+        login=login,
+        auth_type_dataplane=auth_type_dataplane,
+    )
+
+
+def iot_dps_device_enrollment_bulk_delete(
+    cmd,
+    enrollment_file,
+    dps_name=None,
+    resource_group_name=None,
+    max_workers=DPS_BULK_ENROLLMENT_MAX_WORKERS,
+    retry_file=None,
+    login=None,
+    auth_type_dataplane=None,
+):
+    return _run_enrollment_bulk_operation(
+        cmd,
+        mode=BulkEnrollmentOperationMode.delete.value,
+        enrollment_file=enrollment_file,
+        dps_name=dps_name,
+        resource_group_name=resource_group_name,
+        max_workers=max_workers,
+        retry_file=retry_file,
+        login=login,
+        auth_type_dataplane=auth_type_dataplane,
+    )
+
+
+def _run_enrollment_bulk_operation(
+    cmd,
+    mode,
+    enrollment_file,
+    dps_name=None,
+    resource_group_name=None,
+    max_workers=DPS_BULK_ENROLLMENT_MAX_WORKERS,
+    retry_file=None,
+    login=None,
+    auth_type_dataplane=None,
+):
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from tqdm import tqdm
+
+    if max_workers < 1:
+        raise InvalidArgumentValueError("max workers must be at least 1")
+    enrollments = _read_bulk_enrollments(
+        enrollment_file, allow_ids=(mode == BulkEnrollmentOperationMode.delete.value)
+    )
+
+    discovery = DPSDiscovery(cmd)
+    target = discovery.get_target(
+        dps_name,
+        resource_group_name,
+        login=login,
+        auth_type=auth_type_dataplane,
+    )
+    resolver = SdkResolver(target=target)
+    sdk = resolver.get_sdk(SdkType.dps_sdk)
+
+    chunks = [
+        enrollments[i:i + DPS_BULK_ENROLLMENT_MAX_ITEMS]
+        for i in range(0, len(enrollments), DPS_BULK_ENROLLMENT_MAX_ITEMS)
+    ]
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(min(max_workers, len(chunks)), 1)) as executor:
+        futures = {
+            executor.submit(_submit_enrollment_bulk_chunk, sdk, chunk, mode): chunk for chunk in chunks
+        }
+        with tqdm(total=len(enrollments), desc=f"Bulk enrollment {mode} in progress", ascii=" #") as pbar:
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    errors.extend(future.result().get("errors") or [])
+                except ProvisioningServiceErrorDetailsException as e:
+                    # the whole request was rejected, so every enrollment in it failed
+                    errors.extend(
+                        {
+                            "registrationId": enrollment["registrationId"],
+                            "errorCode": e.response.status_code,
+                            "errorStatus": unpack_msrest_error(e),
+                        }
+                        for enrollment in chunk
+                    )
+                pbar.update(len(chunk))
+
+    result = {
+        "total": len(enrollments),
+        "succeeded": len(enrollments) - len(errors),
+        "failed": len(errors),
+        "errors": errors,
+    }
+
+    if retry_file and errors:
+        failed_ids = set(error.get("registrationId") for error in errors)
+        with open(retry_file, "w", encoding="utf-8") as f:
+            json.dump(
+                [enrollment for enrollment in enrollments if enrollment["registrationId"] in failed_ids], f, indent=2
+            )
+        logger.warning(
+            "%s enrollment(s) failed and were written to the retry file %s.", len(errors), retry_file
+        )
+
+    return result
+
+
+def _read_bulk_enrollments(enrollment_file: str, allow_ids: bool = False) -> List[dict]:
+    """
+    Read enrollments from a JSON array or newline delimited JSON file. Registration ids, quoted
+    or bare, are accepted when allow_ids is set (deletes only need the registration id).
+    """
+    try:
+        with open(enrollment_file, "r", encoding="utf-8") as f:
+            content = f.read()
+    except OSError as e:
+        raise FileOperationError(f"Unable to read enrollment file '{enrollment_file}': {e}")
+
+    try:
+        items = json.loads(content)
+        if isinstance(items, dict):
+            items = items.get("enrollments", [items])
+    except ValueError:
+        items = []
+        for line in content.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                if not allow_ids:
+                    raise InvalidArgumentValueError(
+                        f"Enrollment file '{enrollment_file}' is not valid JSON or NDJSON: {e}"
+                    )
+                # lines that are not json are bare registration ids
+                items.append(line)
+    if not isinstance(items, list):
+        items = [items]
+
+    enrollments = {}
+    for item in items:
+        if allow_ids and isinstance(item, str):
+            item = {"registrationId": item}
+        if not isinstance(item, dict) or not item.get("registrationId"):
+            raise InvalidArgumentValueError(f"Enrollment {item} requires a 'registrationId'.")
+        if item["registrationId"] in enrollments:
+            logger.warning("Duplicate enrollment '%s' found, using the last one.", item["registrationId"])
+        enrollments[item["registrationId"]] = item
+    if not enrollments:
+        raise InvalidArgumentValueError(f"No enrollments were found in '{enrollment_file}'.")
+    return list(enrollments.values())
+
+
+def _submit_enrollment_bulk_chunk(sdk, enrollments: List[dict], mode: str) -> dict:
+    """
+    Run a single bulk enrollment request, backing off when the service throttles.
+
+    The payload is sent as raw json instead of through the IndividualEnrollment model so
+    fields unknown to the sdk are kept and deletes only need the registration id.
+    """
+    from time import sleep
+
+    for attempt in range(1, DPS_BULK_ENROLLMENT_MAX_TRIES + 1):
+        response = send_bulk_enrollment_request(sdk, enrollments, mode)
+        if response.status_code == 200:
+            return response.json()
+        if (
+            response.status_code not in [THROTTLE_HTTP_STATUS_CODE, SERVICE_UNAVAILABLE_HTTP_STATUS_CODE]
+            or attempt == DPS_BULK_ENROLLMENT_MAX_TRIES
+        ):
+            raise bulk_enrollment_error(sdk, response)
+        retry_after = response.headers.get("Retry-After", "")
+        delay = int(retry_after) if retry_after.isdigit() else DPS_BULK_ENROLLMENT_BACKOFF_SEC * 2 ** (attempt - 1)
+        logger.debug("Bulk enrollment request throttled, retrying in %s seconds.", delay)
+        sleep(delay)
+
+
 # DPS Enrollments Group
 
 
 def iot_dps_device_enrollment_group_list(
-    cmd, dps_name=None, resource_group_name=None, top=None, login=None, auth_type_dataplane=None,
+    cmd,
+    dps_name=None,
+    resource_group_name=None,
+    top=None,
+    login=None,
+    auth_type_dataplane=None,
+    fields=None,
+    stream=False,
 ):
     from azext_iot.sdk.dps.service.models import QuerySpecification
 
@@ -382,7 +636,7 @@ def iot_dps_device_enrollment_group_list(
 
         query_command = "SELECT *"
         query1 = [QuerySpecification(query=query_command)]
-        return _execute_query(query1, sdk.enrollment_group.query, top)
+        return _list_query_results(query1, sdk.enrollment_group.query, top=top, fields=fields, stream=stream)
     except ProvisioningServiceErrorDetailsException as e:
         handle_service_exception(e)
 
@@ -687,14 +941,41 @@ def iot_dps_device_enrollment_group_delete(
 
 def iot_dps_compute_device_key(
     cmd,
-    registration_id,
+    registration_id=None,
     enrollment_id=None,
     dps_name=None,
     resource_group_name=None,
     symmetric_key=None,
     login=None,
     auth_type_dataplane=None,
+    registration_id_file=None,
+    registration_id_pattern=None,
+    output_file=None,
+    output_format=BatchOutputFormatType.csv.value,
+    max_workers=1,
 ):
+    registration_id_sources = [
+        source for source in [registration_id, registration_id_file, registration_id_pattern] if source
+    ]
+    if not registration_id_sources:
+        raise RequiredArgumentMissingError(
+            "Please provide a registration ID via --registration-id, or registration IDs via "
+            "--registration-id-file or --registration-id-pattern."
+        )
+    if len(registration_id_sources) > 1:
+        raise MutuallyExclusiveArgumentError(
+            "Only one of --registration-id, --registration-id-file or --registration-id-pattern can be used."
+        )
+    if max_workers is not None and max_workers < 0:
+        raise InvalidArgumentValueError("--max-workers cannot be negative.")
+
+    # validate the id source before fetching the group key or creating the output file
+    registration_ids = None
+    if registration_id_file:
+        registration_ids = read_ids_from_file(registration_id_file)
+    elif registration_id_pattern:
+        registration_ids = expand_id_pattern(registration_id_pattern)
+
     if symmetric_key is None:
         if not all([dps_name, enrollment_id]):
             raise RequiredArgumentMissingError(
@@ -710,28 +991,127 @@ def iot_dps_compute_device_key(
             login=login,
             auth_type=auth_type_dataplane,
         )
-        try:
-            resolver = SdkResolver(target=target)
-            sdk = resolver.get_sdk(SdkType.dps_sdk)
-            attestation = sdk.enrollment_group.get_attestation_mechanism(
-                enrollment_id, raw=True
-            ).response.json()
-            if attestation.get("type") != AttestationType.symmetricKey.value:
-                raise BadRequestError(
-                    "Requested enrollment group has an attestation type of '{}'. Currently, compute-device-key "
-                    "is only supported for enrollment groups with symmetric key attestation type.".format(
-                        attestation.get("type")
-                    )
-                )
-            symmetric_key = attestation["symmetricKey"]["primaryKey"]
-        except ProvisioningServiceErrorDetailsException as e:
-            raise AzureResponseError(e)
+        symmetric_key = _get_enrollment_group_symmetric_key(target=target, enrollment_id=enrollment_id)
 
-    return compute_device_key(
-        primary_key=symmetric_key, registration_id=registration_id
+    if registration_id:
+        return compute_device_key(
+            primary_key=symmetric_key, registration_id=registration_id
+        )
+
+    return _compute_device_keys_batch(
+        primary_key=symmetric_key,
+        registration_ids=registration_ids,
+        output_file=output_file,
+        output_format=output_format,
+        max_workers=max_workers,
     )
 
 
+def _compute_device_keys_batch(
+    primary_key: str,
+    registration_ids: Iterator[str],
+    output_file: Optional[str] = None,
+    output_format: str = BatchOutputFormatType.csv.value,
+    max_workers: Optional[int] = 1,
+) -> Optional[dict]:
+    """
+    Derives device keys for a stream of registration ids in chunks, writing each chunk to the output file
+    (or stdout) in order. Chunks are formatted on a process pool when more than one worker is requested.
+    """
+    from itertools import islice
+    from time import perf_counter
+
+    chunks = iter(lambda: list(islice(registration_ids, DEVICE_KEY_BATCH_CHUNK_SIZE)), [])
+    start = perf_counter()
+    count = 0
+    output = open(output_file, "w", encoding="utf-8", newline="") if output_file else sys.stdout
+    try:
+        if output_format == BatchOutputFormatType.csv.value:
+            output.write("registrationId,deviceKey\n")
+        for chunk_count, chunk_output in _format_device_key_chunks(primary_key, chunks, output_format, max_workers):
+            output.write(chunk_output)
+            count += chunk_count
+    finally:
+        if output_file:
+            output.close()
+        else:
+            output.flush()
+
+    if output_file:
+        elapsed = perf_counter() - start
+        return {
+            "count": count,
+            "outputFile": output_file,
+            "elapsedSeconds": round(elapsed, 3),
+            "keysPerSecond": round(count / elapsed, 3) if elapsed else 0,
+        }
+
+
+def _format_device_key_chunks(
+    primary_key: str, chunks: Iterator[List[str]], output_format: str, max_workers: Optional[int] = 1
+) -> Iterator[Tuple[int, str]]:
+    if max_workers == 1:
+        for chunk in chunks:
+            yield format_device_keys(primary_key, chunk, output_format)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep a bounded number of chunks in flight so memory use does not grow with the input
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(format_device_keys, primary_key, chunk, output_format))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def format_device_keys(primary_key: str, registration_ids: List[str], output_format: str) -> Tuple[int, str]:
+    """
+    Derives and formats device keys for a chunk of registration ids.
+    Defined at module scope so it can be dispatched to a process pool.
+    """
+    device_keys = compute_device_keys(primary_key, registration_ids)
+    if output_format == BatchOutputFormatType.ndjson.value:
+        lines = [
+            json.dumps({"registrationId": registration_id, "deviceKey": device_key}) + "\n"
+            for registration_id, device_key in device_keys
+        ]
+        return len(lines), "".join(lines)
+
+    chunk_output = io.StringIO()
+    writer = csv.writer(chunk_output, lineterminator="\n")
+    writer.writerows(device_keys)
+    return len(registration_ids), chunk_output.getvalue()
+
+
+def _get_enrollment_group_symmetric_key(target, enrollment_id):
+    try:
+        resolver = SdkResolver(target=target)
+        sdk = resolver.get_sdk(SdkType.dps_sdk)
+        attestation = sdk.enrollment_group.get_attestation_mechanism(
+            enrollment_id, raw=True
+        ).response.json()
+        if attestation.get("type") != AttestationType.symmetricKey.value:
+            raise BadRequestError(
+                "Requested enrollment group has an attestation type of '{}'. Currently, compute-device-key "
+                "is only supported for enrollment groups with symmetric key attestation type.".format(
+                    attestation.get("type")
+                )
+            )
+        return attestation["symmetricKey"]["primaryKey"]
+    except ProvisioningServiceErrorDetailsException as e:
+        raise AzureResponseError(e)
+
+
 # DPS Connection strings
 
 
@@ -824,6 +1204,8 @@ def iot_dps_registration_list(
     top=None,
     login=None,
     auth_type_dataplane=None,
+    fields=None,
+    stream=False,
 ):
     discovery = DPSDiscovery(cmd)
     target = discovery.get_target(
@@ -835,7 +1217,9 @@ def iot_dps_registration_list(
     try:
         resolver = SdkResolver(target=target)
         sdk = resolver.get_sdk(SdkType.dps_sdk)
-        return _execute_query([enrollment_id], sdk.device_registration_state.query, top)
+        return _list_query_results(
+            [enrollment_id], sdk.device_registration_state.query, top=top, fields=fields, stream=stream
+        )
     except ProvisioningServiceErrorDetailsException as e:
         handle_service_exception(e)
 
@@ -1190,3 +1574,16 @@ def _validate_allocation_policy_for_enrollment(
                 )
     elif iot_hub_list and not current_enrollment:
         raise RequiredArgumentMissingError("Please provide allocation policy.")
+
+
+def _list_query_results(query_args, query_method, top=None, fields=None, stream=False):
+    """
+    Pages through query results, prefetching the next page in the background. Items are optionally projected
+    to the requested fields and either returned as a list or streamed to stdout as newline delimited json.
+    """
+    pages = _execute_query_pages(query_args, query_method, top=top, prefetch=True)
+    items = (_project_fields(item, fields) if fields else item for page in pages for item in page)
+    if stream:
+        _write_ndjson(items)
+        return None
+    return list(items)
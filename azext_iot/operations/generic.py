@@ -4,36 +4,106 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from typing import Optional
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, TextIO
 from azure.cli.core.azclierror import InvalidArgumentValueError
 from azext_iot.assets.user_messages import error_param_top_out_of_bounds
 
+NDJSON_FLUSH_INTERVAL = 100
+
 
 def _execute_query(query_args, query_method, top: Optional[int] = None):
     payload = []
+    for page in _execute_query_pages(query_args, query_method, top):
+        payload.extend(page)
+    return payload
+
+
+def _execute_query_pages(
+    query_args, query_method, top: Optional[int] = None, prefetch: bool = False
+) -> Iterator[List[dict]]:
+    """
+    Lazily yields each page of query results, following continuation tokens until top items have been returned.
+    With prefetch, the request for the next page is issued in the background while the current page is consumed.
+    """
     headers = {"Cache-Control": "no-cache, must-revalidate"}
 
     if top:
         headers["x-ms-max-item-count"] = str(top)
 
-    result = query_method(*query_args, custom_headers=headers, raw=True)
-    token = result.response.headers.get("x-ms-continuation")
-
-    payload.extend(result.response.json())
-    while token:
-        # In case requested count is > service max page size
-        if top:
-            pl = len(payload)
-            if pl < top:
-                page = top - pl
-                headers["x-ms-max-item-count"] = str(page)
+    def _get_page(page_headers):
+        result = query_method(*query_args, custom_headers=page_headers, raw=True)
+        return result.response.headers.get("x-ms-continuation"), result.response.json()
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    next_page = None
+    try:
+        token, page = _get_page(dict(headers))
+        count = 0
+        while True:
+            if top:
+                page = page[:top - count]
+            count += len(page)
+            # In case requested count is > service max page size
+            if token and not (top and count >= top):
+                if top:
+                    headers["x-ms-max-item-count"] = str(top - count)
+                headers["x-ms-continuation"] = token
+                if executor:
+                    next_page = executor.submit(_get_page, dict(headers))
             else:
+                token = None
+
+            yield page
+
+            if not token:
                 break
-        headers["x-ms-continuation"] = token
-        result = query_method(*query_args, custom_headers=headers, raw=True)
-        token = result.response.headers.get("x-ms-continuation")
-        payload.extend(result.response.json())
-    return payload[:top] if top else payload
+            token, page = next_page.result() if executor else _get_page(dict(headers))
+            next_page = None
+    finally:
+        if executor:
+            if next_page:
+                next_page.cancel()
+            executor.shutdown(wait=True)
+
+
+def _project_fields(item: dict, fields: List[str]) -> dict:
+    """
+    Returns a copy of item with only the requested fields. Nested fields are selected with dot notation,
+    such as "registrationState.assignedHub".
+    """
+    projection = {}
+    for field in fields:
+        value = item
+        parts = field.split(".")
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = projection
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return projection
+
+
+def _write_ndjson(items: Iterable[dict], output: Optional[TextIO] = None) -> int:
+    """
+    Writes each item as a line of json, flushing as items arrive. Returns the number of items written.
+    """
+    import json
+
+    output = output or sys.stdout
+    count = 0
+    for item in items:
+        output.write(json.dumps(item) + "\n")
+        count += 1
+        if count % NDJSON_FLUSH_INTERVAL == 0:
+            output.flush()
+    output.flush()
+    return count
 
 
 def _process_top(top: int, upper_limit: Optional[int] = None):
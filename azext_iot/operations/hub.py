@@ -4,6 +4,8 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import json
+from collections import deque
 from os.path import exists
 from knack.log import get_logger
 from enum import Enum, EnumMeta
@@ -21,6 +23,7 @@ from azure.cli.core.azclierror import (
 from azext_iot.constants import (
     DEVICE_DEVICESCOPE_PREFIX,
     IOTHUB_RENEW_KEY_BATCH_SIZE,
+    IOTHUB_RENEW_KEY_MAX_WORKERS,
     IOTHUB_THROTTLE_MAX_TRIES,
     IOTHUB_THROTTLE_SLEEP_SEC,
     THROTTLE_HTTP_STATUS_CODE,
@@ -49,6 +52,7 @@ from azext_iot.common.utility import (
     init_monitoring,
     process_json_arg,
     generate_storage_account_sas_token,
+    get_retry_after,
 )
 from azext_iot._factory import SdkResolver, CloudError
 from azext_iot.operations.generic import _execute_query
@@ -506,11 +510,16 @@ def iot_device_key_regenerate(
     renew_key_type,
     include_modules=False,
     no_progress=False,
+    checkpoint_file=None,
+    max_workers=IOTHUB_RENEW_KEY_MAX_WORKERS,
     resource_group_name=None,
     login=None,
     etag=None,
     auth_type_dataplane=None,
 ):
+    if max_workers < 1:
+        raise InvalidArgumentValueError("max workers must be at least 1")
+
     discovery = IotHubDiscovery(cmd)
     target = discovery.get_target(
         resource_name=hub_name_or_hostname,
@@ -568,7 +577,9 @@ def iot_device_key_regenerate(
         service_sdk=service_sdk,
         renew_key_type=renew_key_type,
         items=devices + modules,
-        no_progress=no_progress
+        no_progress=no_progress,
+        checkpoint_file=checkpoint_file,
+        max_workers=max_workers,
     )
 
     # avoid breaking changes by having one device return the device identity
@@ -1079,7 +1090,10 @@ def _iot_key_regenerate_batch(
     items,
     device_id=None,
     no_progress=False,
+    checkpoint_file=None,
+    max_workers=IOTHUB_RENEW_KEY_MAX_WORKERS,
 ):
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
     from time import sleep
     overall_result = {
         "policyKey": renew_key_type,
@@ -1090,42 +1104,180 @@ def _iot_key_regenerate_batch(
     logger.info(f"Found {len(items)} {starting_msg}.")
     if not items:
         return {}
-    batches = []
-    while items:
-        if len(items) > IOTHUB_RENEW_KEY_BATCH_SIZE:
-            batches.append(items[:IOTHUB_RENEW_KEY_BATCH_SIZE])
-            items = items[IOTHUB_RENEW_KEY_BATCH_SIZE:]
-        else:
-            batches.append(items[:])
-            items = []
-    for batch in tqdm(batches, desc="Bulk key regeneration is in progress", ascii=' #', disable=no_progress):
-        # call
-        result = None
-        tries = 0
-        while tries < IOTHUB_THROTTLE_MAX_TRIES:
-            try:
-                result = service_sdk.service.bulk_regenerate_device_key_method(
-                    policy_key=renew_key_type,
-                    devices=batch
-                )
-                break
-            except CloudError as e:
-                tries += 1
-                if tries == IOTHUB_THROTTLE_MAX_TRIES or e.status_code != THROTTLE_HTTP_STATUS_CODE:
-                    if overall_result["rotatedKeys"]:
-                        logger.warning(
-                            f"Managed to renew the following keys:\n{overall_result['rotatedKeys']}"
-                        )
-                    handle_service_exception(e)
-                sleep(IOTHUB_THROTTLE_SLEEP_SEC)
+
+    checkpoint = None
+    if checkpoint_file:
+        # devices rotated by a previous run are not rotated again
+        checkpoint, rotated = _iot_key_regenerate_open_checkpoint(checkpoint_file, renew_key_type)
+        if rotated:
+            items = [item for item in items if (item["id"], item.get("moduleId")) not in rotated]
+            overall_result["skipped"] = len(rotated)
+            logger.info(f"Skipping {len(rotated)} keys rotated by a previous run.")
+        if not items:
+            checkpoint.close()
+            return overall_result
+
+    batches = [
+        items[i:i + IOTHUB_RENEW_KEY_BATCH_SIZE] for i in range(0, len(items), IOTHUB_RENEW_KEY_BATCH_SIZE)
+    ]
+    # (batch, throttled attempts) in submission order, throttled batches are retried first
+    pending = deque((batch, 0) for batch in batches)
+    in_flight = {}
+    concurrency = _AdaptiveConcurrency(max_limit=max_workers)
+    throttle_sleep = 0
+    error = None
+    progress = tqdm(
+        total=len(batches), desc="Bulk key regeneration is in progress", ascii=' #', disable=no_progress
+    )
+
+    def _record_result(result):
+        progress.update(1)
         # combine result
         if result.errors:
             overall_result["errors"].extend(result.errors)
         if result.rotated_keys:
             overall_result["rotatedKeys"].extend(result.rotated_keys)
+            if checkpoint:
+                checkpoint.write(json.dumps({
+                    "rotated": [[key.id, key.module_id] for key in result.rotated_keys]
+                }) + "\n")
+                checkpoint.flush()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or in_flight:
+                while pending and not error and len(in_flight) < concurrency.limit:
+                    if throttle_sleep:
+                        sleep(throttle_sleep)
+                        throttle_sleep = 0
+                    batch, tries = pending.popleft()
+                    future = executor.submit(
+                        service_sdk.service.bulk_regenerate_device_key_method,
+                        policy_key=renew_key_type,
+                        devices=batch,
+                    )
+                    in_flight[future] = (batch, tries, concurrency.generation)
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch, tries, generation = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except CloudError as e:
+                        if e.status_code == THROTTLE_HTTP_STATUS_CODE:
+                            concurrency.throttled(generation)
+                            tries += 1
+                            # only give up once the hub keeps throttling a single request at a time
+                            if tries < IOTHUB_THROTTLE_MAX_TRIES or concurrency.limit > 1:
+                                pending.appendleft((batch, tries))
+                                throttle_sleep = get_retry_after(e) or IOTHUB_THROTTLE_SLEEP_SEC
+                                continue
+                        error = error or e
+                        continue
+                    except Exception as e:
+                        error = error or e
+                        continue
+
+                    concurrency.succeeded()
+                    _record_result(result)
+    finally:
+        # leaving the executor waits for batches still in flight (i.e. on interrupt), record the keys they rotated
+        for future in in_flight:
+            if future.done() and not future.cancelled() and not future.exception():
+                _record_result(future.result())
+        progress.close()
+        if checkpoint:
+            checkpoint.close()
+
+    if error:
+        if overall_result["rotatedKeys"]:
+            logger.warning(
+                f"Managed to renew the following keys:\n{overall_result['rotatedKeys']}"
+            )
+        if isinstance(error, CloudError):
+            handle_service_exception(error)
+        raise error
     return overall_result
 
 
+def _iot_key_regenerate_open_checkpoint(checkpoint_file, renew_key_type):
+    """
+    Open the key regeneration checkpoint for appending and return the keys it records as rotated.
+
+    The checkpoint is newline delimited json: a header with the policy key, then one line listing the
+    (device id, module id) pairs rotated by each completed batch. Only ids are recorded, never keys.
+    """
+    rotated = set()
+    if exists(checkpoint_file):
+        try:
+            with open(checkpoint_file, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            raise FileOperationError(f"Unable to read checkpoint file '{checkpoint_file}': {e}")
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # the last line may be partially written if the previous run was interrupted
+                break
+        if records:
+            if records[0].get("policyKey") != renew_key_type:
+                raise InvalidArgumentValueError(
+                    f"Checkpoint file '{checkpoint_file}' was created for policy key "
+                    f"{records[0].get('policyKey')}, not {renew_key_type}."
+                )
+            for record in records[1:]:
+                rotated.update((device_id, module_id) for device_id, module_id in record.get("rotated", []))
+
+            # rewrite the checkpoint in case the last line was partially written
+            checkpoint = _open_file(checkpoint_file, "w")
+            checkpoint.write("\n".join(json.dumps(record) for record in records) + "\n")
+            checkpoint.flush()
+            return checkpoint, rotated
+
+    checkpoint = _open_file(checkpoint_file, "w")
+    checkpoint.write(json.dumps({"policyKey": renew_key_type}) + "\n")
+    checkpoint.flush()
+    return checkpoint, rotated
+
+
+def _open_file(path, mode):
+    try:
+        return open(path, mode, encoding="utf-8")
+    except OSError as e:
+        raise FileOperationError(f"Unable to open file '{path}': {e}")
+
+
+class _AdaptiveConcurrency(object):
+    """
+    Additive increase, multiplicative decrease limit on concurrent requests.
+
+    The limit grows by one after a full limit of successful requests and halves when a request is throttled.
+    Throttled requests sent before the last decrease do not decrease the limit again.
+    """
+
+    def __init__(self, max_limit, limit=1):
+        self.max_limit = max(max_limit, 1)
+        self.limit = min(limit, self.max_limit)
+        self.generation = 0
+        self._successes = 0
+
+    def succeeded(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_limit:
+            self.limit += 1
+            self._successes = 0
+
+    def throttled(self, generation):
+        if generation == self.generation:
+            self.limit = max(self.limit // 2, 1)
+            self.generation += 1
+            self._successes = 0
+
+
 def iot_device_module_list(
     cmd,
     device_id,
@@ -2700,6 +2852,7 @@ def iot_hub_monitor_feedback(
     device_id=None,
     yes=False,
     wait_on_id=None,
+    timeout=0,
     repair=False,
     resource_group_name=None,
     login=None,
@@ -2718,9 +2871,14 @@ def iot_hub_monitor_feedback(
         auth_type=auth_type_dataplane,
     )
 
-    return _iot_hub_monitor_feedback(
-        target=target, device_id=device_id, wait_on_id=wait_on_id
+    result = _iot_hub_monitor_feedback(
+        target=target, device_id=device_id, wait_on_id=wait_on_id, timeout=timeout
     )
+    # Delivery stats are only output when waiting on several messages or with a timeout
+    wait_on_ids = [wait_on_id] if isinstance(wait_on_id, str) else wait_on_id
+    if not timeout and len(wait_on_ids or []) <= 1:
+        return None
+    return result
 
 
 def iot_hub_distributed_tracing_show(
@@ -2966,11 +3124,18 @@ def _get_hub_connection_string(
     ]
 
 
-def _iot_hub_monitor_feedback(target, device_id, wait_on_id):
+def _iot_hub_monitor_feedback(target, device_id, wait_on_id=None, sent_times=None, timeout=0, message_acks=None):
     from azext_iot.monitor import event
 
-    event.monitor_feedback(
-        target=target, device_id=device_id, wait_on_id=wait_on_id, token_duration=3600
+    wait_on_ids = [wait_on_id] if isinstance(wait_on_id, str) else wait_on_id
+    return event.monitor_feedback(
+        target=target,
+        device_id=device_id,
+        wait_on_ids=wait_on_ids,
+        sent_times=sent_times,
+        timeout=timeout,
+        token_duration=3600,
+        message_acks=message_acks,
     )
 
 
@@ -6,15 +6,19 @@
 
 import pytest
 import json
+import re
 import responses
 from copy import deepcopy
 from unittest import mock
-from datetime import datetime
+from datetime import datetime, timedelta
 from knack.util import CLIError, todict
 
 from azure.cli.core.mock import DummyCli
+from azure.cli.core.azclierror import AzureResponseError, InvalidArgumentValueError
 from azext_iot.central import commands_device
 from azext_iot.central import commands_monitor
+from azext_iot.central import commands_job
+from azext_iot.central import commands_query
 from azext_iot.central.providers import CentralDeviceProvider
 from azext_iot.central.models.devicetwin import DeviceTwin
 from azext_iot.monitor.property import PropertyMonitor
@@ -33,6 +37,7 @@ from azext_iot.central.models.ga_2022_07_31 import (
     ScheduledJobGa,
     EnrollmentGroupGa,
 )
+from azext_iot.central.services import _utility
 from azext_iot.central.services._utility import get_object
 from azext_iot.central.models.edge import EdgeModule
 from azext_iot.central.providers import (
@@ -153,6 +158,362 @@ class TestMonitorEvents:
             commands_monitor.monitor_events(fixture_cmd, app_id, timeout=timeout)
 
 
+class TestCentralHttpClient:
+    url = f"https://{app_id}.azureiotcentral.com/api/devices/mydevice"
+
+    @pytest.fixture
+    def fixture_aad_token(self, mocker):
+        mocker.patch.dict(_utility._aad_tokens, clear=True)
+        return mocker.patch("azext_iot.common.auth.get_aad_token")
+
+    @pytest.mark.parametrize(
+        "expires_in, expected_calls",
+        [(timedelta(hours=1), 1), (timedelta(minutes=1), 2)],
+    )
+    def test_token_cached_until_expiry(self, fixture_cmd, fixture_aad_token, expires_in, expected_calls):
+        fixture_aad_token.return_value = {
+            "accessToken": "token",
+            "expiresOn": (datetime.now() + expires_in).strftime("%Y-%m-%d %H:%M:%S.%f"),
+        }
+        for _ in range(2):
+            headers = _utility.get_headers(None, fixture_cmd)
+        assert headers["Authorization"] == "Bearer token"
+        assert fixture_aad_token.call_count == expected_calls
+
+    def test_send_request_retries(self, mocked_response, mocker):
+        mocker.patch.object(_utility.logger, "isEnabledFor", return_value=True)
+        mocker.patch.dict(_utility._request_metrics, clear=True)
+        mocker.patch.object(_utility.atexit, "register")
+        mocked_response.add(method=responses.GET, url=self.url, status=503, headers={"Retry-After": "0"}, json={})
+        mocked_response.add(method=responses.GET, url=self.url, status=429, headers={"Retry-After": "0"}, json={})
+        mocked_response.add(method=responses.GET, url=self.url, status=200, json={"id": "mydevice"})
+
+        response = _utility.send_request("GET", self.url, headers={"Authorization": "token"})
+        assert response.json() == {"id": "mydevice"}
+        assert len(mocked_response.calls) == 3
+
+        metrics = _utility.get_request_metrics()
+        assert list(metrics) == ["GET /api/devices/{id}"]
+        assert metrics["GET /api/devices/{id}"]["requests"] == 3
+        assert metrics["GET /api/devices/{id}"]["retries"] == 2
+        _utility.atexit.register.assert_called_once_with(_utility.log_request_metrics)
+
+    def test_send_request_post_not_retried_when_unavailable(self, mocked_response):
+        # the service may have acted on a non-idempotent request before responding 503
+        mocked_response.add(method=responses.POST, url=self.url, status=503, json={})
+
+        response = _utility.send_request("POST", self.url, headers={"Authorization": "token"})
+        assert response.status_code == 503
+        assert len(mocked_response.calls) == 1
+
+    @pytest.mark.parametrize(
+        "url, expected",
+        [
+            ("https://myapp.azureiotcentral.com/api/devices", "GET /api/devices"),
+            ("https://myapp.azureiotcentral.com/api/devices/d1/relationships/r1", "GET /api/devices/{id}/relationships/{id}"),
+            ("https://myapp.azureiotcentral.com/system/iothub/devices/d1/get-twin", "GET /system/iothub/devices/{id}/get-twin"),
+            ("https://myapp.azureiotcentral.com/api/jobs/j1/devices?api-version=2022-07-31", "GET /api/jobs/{id}/devices"),
+        ],
+    )
+    def test_endpoint_key(self, url, expected):
+        assert _utility._endpoint_key("get", url) == expected
+
+
+class TestCentralChildren:
+    edge_id = "edge0"
+    token = "SharedAccessToken sr=myapp"
+    relationships_url = f"https://{app_id}.azureiotcentral.com/api/devices/{edge_id}/relationships"
+
+    def test_add_children(self, fixture_cmd, mocked_response):
+        def _put_callback(request):
+            body = json.loads(request.body)
+            if body["target"] == "bad-child":
+                return (400, {}, json.dumps({"error": {"code": "BadRequest", "message": "invalid target"}}))
+            return (200, {}, json.dumps(dict(body, name="contains")))
+
+        # the first request of a child is throttled and retried
+        mocked_response.add(
+            method=responses.PUT,
+            url=re.compile(self.relationships_url + "/.+"),
+            status=429,
+            headers={"Retry-After": "0"},
+            json={},
+        )
+        mocked_response.add_callback(
+            method=responses.PUT,
+            url=re.compile(self.relationships_url + "/.+"),
+            callback=_put_callback,
+            content_type="application/json",
+        )
+
+        children_ids = ["child-{}".format(i) for i in range(5)] + ["bad-child", "child-0"]
+        provider = CentralDeviceProvider(cmd=fixture_cmd, app_id=app_id, api_version=API_VERSION, token=self.token)
+        results = provider.add_relationships(device_id=self.edge_id, target_ids=children_ids, max_workers=3)
+
+        # duplicates are added once and one request is retried
+        assert len(mocked_response.calls) == 7
+        assert all(call.request.headers["Authorization"] == self.token for call in mocked_response.calls)
+        assert [result["target"] for result in results] == children_ids[:-1]
+        for result in results[:-1]:
+            assert result["source"] == self.edge_id
+            assert result["status"] == "succeeded"
+            assert result["id"]
+        assert results[-1]["status"] == "failed"
+        assert "invalid target" in results[-1]["error"]
+
+        # the command fails when any child fails
+        with pytest.raises(AzureResponseError) as e:
+            commands_device.add_children(
+                fixture_cmd,
+                app_id=app_id,
+                device_id=self.edge_id,
+                children_ids=["child-0", "bad-child"],
+                token=self.token,
+            )
+        assert "'bad-child': " in str(e.value)
+        assert "child-0" not in str(e.value)
+
+    def test_remove_children(self, fixture_cmd, mocked_response):
+        mocked_response.add(
+            method=responses.GET,
+            url=self.relationships_url,
+            json={
+                "value": [
+                    {"id": "rel-0", "source": self.edge_id, "target": "child-0"},
+                    {"id": "rel-1", "source": self.edge_id, "target": "child-1"},
+                ]
+            },
+        )
+        for rel_id in ["rel-0", "rel-1"]:
+            mocked_response.add(method=responses.DELETE, url=f"{self.relationships_url}/{rel_id}", status=204)
+
+        results = commands_device.remove_children(
+            fixture_cmd,
+            app_id=app_id,
+            device_id=self.edge_id,
+            children_ids=["child-0", "child-1", "child-2"],
+            token=self.token,
+        )
+        assert [(r["target"], r["status"]) for r in results] == [
+            ("child-0", "succeeded"),
+            ("child-1", "succeeded"),
+            ("child-2", "notFound"),
+        ]
+        assert results[0]["id"] == "rel-0"
+
+        with pytest.raises(CLIError):
+            commands_device.remove_children(
+                fixture_cmd,
+                app_id=app_id,
+                device_id=self.edge_id,
+                children_ids=["child-2"],
+                token=self.token,
+            )
+
+    def test_remove_children_failed(self, fixture_cmd, mocked_response):
+        mocked_response.add(
+            method=responses.GET,
+            url=self.relationships_url,
+            json={"value": [{"id": "rel-0", "source": self.edge_id, "target": "child-0"}]},
+        )
+        mocked_response.add(
+            method=responses.DELETE,
+            url=f"{self.relationships_url}/rel-0",
+            status=400,
+            json={"error": {"code": "BadRequest", "message": "cannot delete"}},
+        )
+
+        with pytest.raises(AzureResponseError):
+            commands_device.remove_children(
+                fixture_cmd,
+                app_id=app_id,
+                device_id=self.edge_id,
+                children_ids=["child-0"],
+                token=self.token,
+            )
+
+
+class TestCentralRegistrationInfoBatch:
+    token = "SharedAccessToken sr=myapp"
+    devices_url = f"https://{app_id}.azureiotcentral.com/api/devices"
+    next_link = f"{devices_url}?api-version={API_VERSION_PREVIEW}&$skiptoken=page2"
+
+    @staticmethod
+    def _device(device_id, provisioned=True, enabled=True):
+        return {
+            "id": device_id,
+            "displayName": device_id,
+            "enabled": enabled,
+            "provisioned": provisioned,
+            "simulated": False,
+            "template": "dtmi:contoso:sensor;1",
+        }
+
+    @pytest.fixture
+    def fixture_registration(self, mocked_response, mocker):
+        # the first page of devices is only listed by runs that are not resumed
+        mocked_response.add(
+            method=responses.GET,
+            url=self.next_link,
+            match=[responses.matchers.query_string_matcher(self.next_link.split("?")[1])],
+            json={"value": [self._device("d3"), self._device("bad")]},
+        )
+        mocked_response.add(
+            method=responses.GET,
+            url=re.compile(self.devices_url + "/bad/credentials"),
+            status=404,
+            json={"error": {"message": "not found"}},
+        )
+        mocked_response.add(
+            method=responses.GET,
+            url=re.compile(self.devices_url + "/d[0-9]/credentials"),
+            json={"idScope": "0ne00000000", "symmetricKey": {"primaryKey": "key"}},
+        )
+        return mocker.patch(
+            "azext_iot.dps.services.global_service.get_registration_state",
+            return_value={"status": "assigned"},
+        )
+
+    def test_list_device_pages_refreshes_token(self, fixture_cmd, mocked_response, mocker):
+        from azext_iot.central.services import device as device_service
+
+        mocker.patch.object(_utility, "get_bearer_token", side_effect=["Bearer token1", "Bearer token2"])
+        mocked_response.add(
+            method=responses.GET,
+            url=self.devices_url,
+            match=[responses.matchers.query_param_matcher({"api-version": API_VERSION_PREVIEW})],
+            json={"value": [self._device("d0")], "nextLink": self.next_link},
+        )
+        mocked_response.add(
+            method=responses.GET,
+            url=self.next_link,
+            match=[responses.matchers.query_string_matcher(self.next_link.split("?")[1])],
+            json={"value": [self._device("d1")]},
+        )
+
+        pages = list(device_service.list_device_pages(cmd=fixture_cmd, app_id=app_id, filter=None, token=None))
+        assert [[device.id for device in devices] for devices, _ in pages] == [["d0"], ["d1"]]
+        assert [call.request.headers["Authorization"] for call in mocked_response.calls] == [
+            "Bearer token1",
+            "Bearer token2",
+        ]
+
+    def test_registration_info_batch(self, fixture_cmd, fixture_registration, mocked_response, tmp_path):
+        mocked_response.add(
+            method=responses.GET,
+            url=self.devices_url,
+            match=[responses.matchers.query_param_matcher({"api-version": API_VERSION_PREVIEW})],
+            json={
+                "value": [
+                    self._device("d0"),
+                    self._device("d1", provisioned=False),
+                    self._device("d2", enabled=False),
+                ],
+                "nextLink": self.next_link,
+            },
+        )
+        output_file = tmp_path / "registrations.ndjson"
+        checkpoint_file = tmp_path / "checkpoint.json"
+        result = commands_device.registration_info_batch(
+            fixture_cmd,
+            app_id=app_id,
+            output_file=str(output_file),
+            checkpoint_file=str(checkpoint_file),
+            max_workers=2,
+            token=self.token,
+        )
+
+        infos = [json.loads(line) for line in output_file.read_text().splitlines()]
+        # output keeps the device list order and only provisioned devices have DPS state fetched
+        assert [info["@device_id"] for info in infos] == ["d0", "d1", "d2", "d3", "bad"]
+        assert fixture_registration.call_count == 2
+        assert infos[0]["dps_state"]["status"] == "assigned"
+        assert infos[1]["device_registration_info"]["device_status"] == "registered"
+        assert "error" in infos[-1]
+
+        assert result["total"] == 5
+        assert result["failed"] == 1
+        assert result["deviceStatuses"] == {"provisioned": 2, "registered": 1, "blocked": 1}
+        assert result["dpsStatuses"] == {"assigned": 2, "None": 2}
+
+        checkpoint = json.loads(checkpoint_file.read_text())
+        assert checkpoint["nextLink"] is None
+        assert checkpoint["offset"] == output_file.stat().st_size
+        assert checkpoint["outputFile"] == str(output_file)
+
+        # a completed checkpoint does not list devices again
+        calls = len(mocked_response.calls)
+        assert commands_device.registration_info_batch(
+            fixture_cmd,
+            app_id=app_id,
+            output_file=str(output_file),
+            checkpoint_file=str(checkpoint_file),
+            token=self.token,
+        )["total"] == 5
+        assert len(mocked_response.calls) == calls
+
+    def test_registration_info_batch_resume(self, fixture_cmd, fixture_registration, mocked_response, tmp_path):
+        first_page = '{"@device_id": "d0"}\n{"@device_id": "d1"}\n{"@device_id": "d2"}\n'
+        output_file = tmp_path / "registrations.ndjson"
+        # the interrupted run wrote part of the second page after the checkpoint was saved
+        output_file.write_text(first_page + '{"@device_id": "d3"}\n{"@dev')
+        checkpoint_file = tmp_path / "checkpoint.json"
+        checkpoint_file.write_text(
+            json.dumps(
+                {
+                    "appId": app_id,
+                    "filter": None,
+                    "outputFile": str(output_file),
+                    "nextLink": self.next_link,
+                    "offset": len(first_page),
+                    "total": 3,
+                    "failed": 0,
+                    "deviceStatuses": {"provisioned": 1, "registered": 1, "blocked": 1},
+                    "dpsStatuses": {"assigned": 1, "None": 2},
+                }
+            )
+        )
+
+        result = commands_device.registration_info_batch(
+            fixture_cmd,
+            app_id=app_id,
+            output_file=str(output_file),
+            checkpoint_file=str(checkpoint_file),
+            token=self.token,
+        )
+
+        assert mocked_response.calls[0].request.url == self.next_link
+        infos = [json.loads(line) for line in output_file.read_text().splitlines()]
+        assert [info["@device_id"] for info in infos] == ["d0", "d1", "d2", "d3", "bad"]
+        assert result["total"] == 5
+        assert result["deviceStatuses"]["provisioned"] == 2
+        assert result["dpsStatuses"]["assigned"] == 2
+
+    def test_registration_info_batch_invalid(self, fixture_cmd, tmp_path):
+        with pytest.raises(CLIError):
+            commands_device.registration_info_batch(
+                fixture_cmd, app_id=app_id, checkpoint_file=str(tmp_path / "checkpoint.json")
+            )
+
+        output_file = tmp_path / "registrations.ndjson"
+        output_file.write_text("")
+        checkpoint_file = tmp_path / "checkpoint.json"
+        for checkpoint in [
+            {"appId": "otherapp", "filter": None, "outputFile": str(output_file), "nextLink": "link"},
+            # resuming into a different existing output file would truncate it
+            {"appId": app_id, "filter": None, "outputFile": str(tmp_path / "other.ndjson"), "nextLink": "link"},
+        ]:
+            checkpoint_file.write_text(json.dumps(checkpoint))
+            with pytest.raises(InvalidArgumentValueError):
+                commands_device.registration_info_batch(
+                    fixture_cmd,
+                    app_id=app_id,
+                    output_file=str(output_file),
+                    checkpoint_file=str(checkpoint_file),
+                    token=self.token,
+                )
+
+
 class TestCentralDeviceProvider:
     _device = load_json(FileNames.central_device_file)
     _edge_devices = list(load_json(FileNames.central_edge_devices_file))
@@ -236,17 +597,91 @@ class TestCentralDeviceProvider:
         assert mock_device_svc.list_devices.call_count == 1
         assert children_devices == self._edge_children
 
-    @mock.patch("azext_iot.central.services.device.requests")
-    @mock.patch("azext_iot.central.services.device.get_aad_token")
-    def test_should_list_device_modules(self, get_aad_token_svc, req_svc):
+    @mock.patch("azext_iot.central.services.device")
+    def test_should_list_children_from_relationships(self, mock_device_svc):
+        provider = CentralDeviceProvider(
+            cmd=None, app_id=app_id, api_version=API_VERSION
+        )
+        children = [
+            get_object(device, "Device", api_version=API_VERSION)
+            for device in self._edge_children
+        ]
+        mock_device_svc.list_relationships.return_value = [
+            get_object({"id": str(i), "source": "edge0", "target": child.id}, "Relationship", api_version=API_VERSION)
+            for i, child in enumerate(children)
+        ]
+        mock_device_svc.list_device_pages.return_value = iter([(children, None)])
+
+        children_devices = [todict(dev) for dev in provider.list_children("edge0")]
+
+        # children are resolved with a single filtered list, without fetching any twins
+        assert mock_device_svc.list_device_pages.call_count == 1
+        assert mock_device_svc.list_devices.call_count == 0
+        joined = "' or id eq '".join([child.id for child in children])
+        assert mock_device_svc.list_device_pages.call_args.kwargs["filter"] == f"id eq '{joined}'"
+        assert mock_device_svc.get_device_twin.call_count == 0
+        assert children_devices == self._edge_children
+
+    @mock.patch("azext_iot.central.services.device")
+    def test_should_list_devices_by_id_escaped(self, mock_device_svc):
+        provider = CentralDeviceProvider(
+            cmd=None, app_id=app_id, api_version=API_VERSION
+        )
+        device_ids = ["dev'{}".format(i) for i in range(30)]
+        mock_device_svc.list_device_pages.side_effect = lambda **kwargs: iter([([], None)])
+
+        provider.list_devices_by_id(device_ids)
+
+        # ids are chunked into filters and single quotes are doubled
+        filters = [call.kwargs["filter"] for call in mock_device_svc.list_device_pages.call_args_list]
+        assert filters == [
+            " or ".join("id eq 'dev''{}'".format(i) for i in range(0, 25)),
+            " or ".join("id eq 'dev''{}'".format(i) for i in range(25, 30)),
+        ]
+
+    @mock.patch("azext_iot.central.services.device")
+    def test_should_list_children_from_device_scope(self, mock_device_svc):
+        provider = CentralDeviceProvider(
+            cmd=None, app_id=app_id, api_version=API_VERSION
+        )
+        devices = [
+            get_object(device, "Device", api_version=API_VERSION)
+            for device in self._edge_children + self._edge_devices
+        ]
+        child_ids = [child["id"] for child in self._edge_children]
+        mock_device_svc.list_relationships.return_value = []
+        mock_device_svc.list_devices.return_value = devices
+
+        def _get_device_twin(device_id, **kwargs):
+            if device_id == "testedge":
+                raise CLIError("Twin not found")
+            scope = "edge-scope" if device_id in child_ids + ["edge0"] else "other-scope"
+            return DeviceTwin({"deviceId": device_id, "deviceScope": scope})
+
+        mock_device_svc.get_device_twin.side_effect = _get_device_twin
+
+        children_devices = [dev.id for dev in provider.list_children("edge0")]
+        assert sorted(children_devices) == sorted(child_ids)
+        # the edge twin and one twin per other device
+        assert mock_device_svc.get_device_twin.call_count == len(devices)
+
+        # scopes are cached for subsequent lookups
+        provider.list_children("edge0")
+        assert mock_device_svc.get_device_twin.call_count == len(devices) + 1
+
+    @mock.patch("azext_iot.central.services._utility.get_session")
+    @mock.patch("azext_iot.central.services._utility.get_bearer_token")
+    def test_should_list_device_modules(self, get_bearer_token_svc, get_session_svc):
         # setup
         provider = CentralDeviceProvider(
             cmd=None, app_id=app_id, api_version=API_VERSION
         )
+        get_bearer_token_svc.return_value = "Bearer token"
         response = mock.MagicMock()
         response.status_code = 200
         response.json.return_value = self._edge_modules
-        req_svc.get.return_value = response
+        req_svc = get_session_svc.return_value
+        req_svc.request.return_value = response
 
         # act
         modules = [
@@ -255,7 +690,8 @@ class TestCentralDeviceProvider:
 
         # verify
         # call counts should be at most 1
-        assert req_svc.get.call_count == 1
+        assert req_svc.request.call_count == 1
+        assert req_svc.request.call_args.kwargs["method"] == "GET"
         parsed_modules = [
             todict(EdgeModule(_module)) for _module in self._edge_modules.get("modules")
         ]
@@ -683,6 +1119,91 @@ class TestCentralJobProvider:
         assert mock_job_svc.get_job.call_count == 1
         assert job.id == self._jobs[0].id
 
+    def test_watch_job(self, fixture_cmd, mocked_response, mocker, tmp_path):
+        from azext_iot.central.providers import job_provider
+
+        sleep = mocker.patch.object(job_provider, "sleep")
+        job_url = f"https://{app_id}.azureiotcentral.com/api/jobs/job0"
+        page2_url = f"{job_url}/devices?$skiptoken=page2"
+        job_statuses = ["running", "running", "complete"]
+        polls = []
+
+        def _job_callback(request):
+            polls.append(request.url)
+            return (200, {}, json.dumps(dict(self._jobs[0].__dict__, status=job_statuses[len(polls) - 1])))
+
+        def _page1_callback(request):
+            assert len(polls) == 1
+            return (
+                200,
+                {"ETag": "page1"},
+                json.dumps(
+                    {
+                        "value": [{"id": "d0", "status": "completed"}, {"id": "d1", "status": "completed"}],
+                        "nextLink": page2_url,
+                    }
+                ),
+            )
+
+        def _page2_callback(request):
+            if len(polls) == 2:
+                assert request.headers["If-None-Match"] == "page2-0"
+                return (304, {}, "")
+            statuses = ["running", "pending"] if len(polls) == 1 else ["completed", "failed"]
+            return (
+                200,
+                {"ETag": "page2-{}".format(len(polls) - 1)},
+                json.dumps({"value": [{"id": "d2", "status": statuses[0]}, {"id": "d3", "status": statuses[1]}]}),
+            )
+
+        mocked_response.add_callback(method=responses.GET, url=job_url, callback=_job_callback)
+        mocked_response.add_callback(
+            method=responses.GET,
+            url=f"{job_url}/devices",
+            match=[responses.matchers.query_param_matcher({"api-version": API_VERSION})],
+            callback=_page1_callback,
+        )
+        mocked_response.add_callback(
+            method=responses.GET,
+            url=page2_url,
+            match=[responses.matchers.query_param_matcher({"api-version": API_VERSION, "$skiptoken": "page2"})],
+            callback=_page2_callback,
+        )
+
+        output_file = tmp_path / "job.ndjson"
+        result = commands_job.watch_job(
+            fixture_cmd,
+            app_id=app_id,
+            job_id="job0",
+            output_file=str(output_file),
+            interval=5,
+            token="SharedAccessToken sr=myapp",
+        )
+
+        assert sleep.call_count == 2
+        events = [json.loads(line) for line in output_file.read_text().splitlines()]
+        transitions = [(e["deviceId"], e["previousStatus"], e["status"]) for e in events if e["event"] == "deviceStatus"]
+        assert transitions == [
+            ("d0", None, "completed"),
+            ("d1", None, "completed"),
+            ("d2", None, "running"),
+            ("d3", None, "pending"),
+            ("d2", "running", "completed"),
+            ("d3", "pending", "failed"),
+        ]
+        # nothing changed in the second poll so no progress is reported for it
+        assert [e["jobStatus"] for e in events if e["event"] == "progress"] == ["running", "complete"]
+
+        assert result["jobStatus"] == "complete"
+        assert result["devices"] == 4
+        assert result["statuses"] == {"completed": 3, "failed": 1}
+        assert result["successRate"] == 0.75
+        assert result["failureRate"] == 0.25
+        # the first page settled in the first poll and is not requested again
+        assert result["pagesDownloaded"] == 3
+        assert result["pagesUnchanged"] == 1
+        assert result["pagesSkipped"] == 2
+
 
 class TestCentralFileuploadProvider:
     _fileupload = FileUploadGa(load_json(FileNames.central_fileupload_file))
@@ -745,6 +1266,120 @@ class TestCentralQueryProvider:
         assert mock_query_svc.query_run.call_count == 1
         assert query_response.results == self._query_response.results
 
+    query_url = f"https://{app_id}.azureiotcentral.com/api/query"
+    token = "SharedAccessToken sr=myapp"
+
+    def test_query_follows_continuation(self, fixture_cmd, mocked_response):
+        def _query_callback(request):
+            token = json.loads(request.body).get("continuationToken")
+            if not token:
+                return (200, {}, json.dumps({"results": [{"$id": "d0"}], "continuationToken": "page2"}))
+            return (200, {}, json.dumps({"results": [{"$id": "d1"}, {"$id": "d2"}]}))
+
+        mocked_response.add_callback(
+            method=responses.POST, url=self.query_url, callback=_query_callback, content_type="application/json"
+        )
+        result = commands_query.query_run(
+            fixture_cmd, app_id=app_id, query_string="SELECT $id FROM dtmi:a;1", token=self.token
+        )
+        assert len(mocked_response.calls) == 2
+        assert result == {"results": [{"$id": "d0"}, {"$id": "d1"}, {"$id": "d2"}]}
+
+    @pytest.mark.parametrize("output_format", ["ndjson", "csv"])
+    def test_query_stream_windows(self, fixture_cmd, mocked_response, tmp_path, output_format):
+        queries = []
+
+        def _query_callback(request):
+            body = json.loads(request.body)
+            queries.append(body["query"])
+            start = re.search(r"\$ts >= '([^']+)'", body["query"]).group(1)
+            row = {"$id": "d0", "$ts": start, "reading": {"value": 1}}
+            if not body.get("continuationToken"):
+                return (200, {}, json.dumps({"results": [row], "continuationToken": start}))
+            return (200, {}, json.dumps({"results": [dict(row, **{"$id": "d1"})]}))
+
+        mocked_response.add_callback(
+            method=responses.POST, url=self.query_url, callback=_query_callback, content_type="application/json"
+        )
+        output_file = tmp_path / "results.{}".format(output_format)
+        result = commands_query.query_run(
+            fixture_cmd,
+            app_id=app_id,
+            query_string="SELECT $id, $ts, reading FROM dtmi:a;1 WHERE $id = 'd0' OR $id = 'd1'",
+            output_file=str(output_file),
+            output_format=output_format,
+            start_time="2023-01-01T00:00:00Z",
+            end_time="2023-01-01T15:00:00Z",
+            window_size="PT6H",
+            max_workers=2,
+            token=self.token,
+        )
+
+        # each window is bounded to its time range and followed to its last page
+        assert len(queries) == 6
+        assert (
+            "SELECT $id, $ts, reading FROM dtmi:a;1 WHERE $ts >= '2023-01-01T12:00:00.000Z' AND "
+            "$ts < '2023-01-01T15:00:00.000Z' AND ($id = 'd0' OR $id = 'd1')"
+        ) in queries
+        assert result["rows"] == 6
+        assert result["pages"] == 6
+        assert result["windows"] == 3
+
+        # rows are written in window order
+        if output_format == "ndjson":
+            rows = [json.loads(line) for line in output_file.read_text().splitlines()]
+            assert rows[0]["reading"] == {"value": 1}
+        else:
+            import csv
+
+            with open(output_file, newline="") as f:
+                rows = list(csv.DictReader(f))
+            assert rows[0]["reading"] == json.dumps({"value": 1})
+        assert [row["$ts"] for row in rows] == [
+            "2023-01-01T00:00:00.000Z",
+            "2023-01-01T00:00:00.000Z",
+            "2023-01-01T06:00:00.000Z",
+            "2023-01-01T06:00:00.000Z",
+            "2023-01-01T12:00:00.000Z",
+            "2023-01-01T12:00:00.000Z",
+        ]
+        assert [row["$id"] for row in rows[:2]] == ["d0", "d1"]
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"start_time": "2023-01-01T00:00:00Z"},
+            {"window_size": "PT1H"},
+            {"start_time": "2023-01-02T00:00:00Z", "end_time": "2023-01-01T00:00:00Z"},
+            {"start_time": "2023-01-01T00:00:00Z", "end_time": "2023-01-02T00:00:00Z", "window_size": "P1M"},
+            {"start_time": "yesterday", "end_time": "2023-01-02T00:00:00Z"},
+        ],
+    )
+    def test_query_stream_invalid(self, fixture_cmd, kwargs):
+        with pytest.raises(CLIError):
+            commands_query.query_run(
+                fixture_cmd, app_id=app_id, query_string="SELECT $id FROM dtmi:a;1", token=self.token, **kwargs
+            )
+
+    @pytest.mark.parametrize(
+        "query_string",
+        ["SELECT TOP 10 $id FROM dtmi:a;1", "SELECT $id, $ts FROM dtmi:a;1 WHERE $id = 'd0' order by $ts desc"],
+    )
+    def test_query_stream_windows_unsupported(self, fixture_cmd, tmp_path, query_string):
+        output_file = tmp_path / "results.ndjson"
+        with pytest.raises(InvalidArgumentValueError):
+            commands_query.query_run(
+                fixture_cmd,
+                app_id=app_id,
+                query_string=query_string,
+                output_file=str(output_file),
+                start_time="2023-01-01T00:00:00Z",
+                end_time="2023-01-01T15:00:00Z",
+                window_size="PT6H",
+                token=self.token,
+            )
+        assert not output_file.exists()
+
 
 class TestCentralDestinationProvider:
     _destinations = list(load_json(FileNames.central_destination_file))
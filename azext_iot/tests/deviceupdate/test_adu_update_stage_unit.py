@@ -0,0 +1,162 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from azext_iot.deviceupdate import commands_update as subject
+from azext_iot.deviceupdate.common import STAGE_HASH_METADATA_KEY
+from azext_iot.deviceupdate.providers.base import DeviceUpdateDataManager
+from azext_iot.tests.generators import generate_generic_id
+
+account_name = generate_generic_id()
+instance_name = generate_generic_id()
+resource_group = generate_generic_id()
+blob_url_root = "https://mystorage.blob.core.windows.net/staged"
+
+
+@pytest.fixture
+def fixture_stage(mocker):
+    mocker.patch(
+        "azure.cli.core.commands.client_factory.get_subscription_id", return_value=generate_generic_id()
+    )
+    storage_manager = mocker.patch("azext_iot.deviceupdate.providers.storage.StorageAccountManager")
+    blob_service_client = storage_manager.return_value.get_sas_blob_service_client.return_value
+    container_client = blob_service_client.get_container_client.return_value
+    generate_sas = mocker.patch("azure.storage.blob.generate_account_sas", return_value="sastoken")
+
+    existing_blobs = {}
+    blob_clients = {}
+
+    def _get_blob_client(blob):
+        blob_client = mocker.MagicMock(name=blob)
+        blob_client.url = f"{blob_url_root}/{blob}"
+        if blob in existing_blobs:
+            blob_client.get_blob_properties.return_value.metadata = {STAGE_HASH_METADATA_KEY: existing_blobs[blob]}
+        else:
+            blob_client.get_blob_properties.side_effect = ResourceNotFoundError("missing")
+        blob_clients[blob] = blob_client
+        return blob_client
+
+    container_client.get_blob_client.side_effect = _get_blob_client
+
+    data_manager = mocker.patch.object(subject, "DeviceUpdateDataManager")
+    data_manager.calculate_files_metadata.side_effect = DeviceUpdateDataManager.calculate_files_metadata
+    data_manager.return_value.container.resource_group = resource_group
+    cache = mocker.patch("azext_iot.deviceupdate.providers.base.MicroObjectCache")
+    import_update = mocker.patch.object(subject, "import_update")
+
+    yield {
+        "container_client": container_client,
+        "generate_sas": generate_sas,
+        "existing_blobs": existing_blobs,
+        "blob_clients": blob_clients,
+        "cache": cache.return_value,
+        "import_update": import_update,
+    }
+
+
+def _write_manifest(directory, update_version, file_names):
+    for file_name in file_names:
+        (directory / file_name).write_bytes(file_name.encode("utf-8"))
+    manifest_path = directory / f"manifest_{update_version}.json"
+    manifest_path.write_text(
+        json.dumps(
+            {
+                "updateId": {"provider": "contoso", "name": "toaster", "version": update_version},
+                "files": [{"filename": file_name} for file_name in file_names],
+            }
+        )
+    )
+    return str(manifest_path)
+
+
+@pytest.mark.parametrize("then_import", [False, True])
+def test_stage_update(fixture_cmd, fixture_stage, tmp_path, then_import):
+    manifest_paths = [
+        _write_manifest(tmp_path, "1.0", ["a.bin", "b.bin"]),
+        _write_manifest(tmp_path, "2.0", ["c.bin"]),
+    ]
+    # Blob content for a.bin is unchanged from a previous run
+    existing_blob = f"{tmp_path.name}/contoso_toaster_1.0/a.bin"
+    fixture_stage["existing_blobs"][existing_blob] = DeviceUpdateDataManager.calculate_file_metadata(
+        str(tmp_path / "a.bin")
+    ).hash
+
+    result = subject.stage_update(
+        cmd=fixture_cmd,
+        name=account_name,
+        instance_name=instance_name,
+        update_manifest_paths=manifest_paths,
+        storage_account_name="mystorage",
+        storage_container_name="staged",
+        then_import=then_import,
+    )
+
+    # SAS is generated once per batch
+    assert fixture_stage["generate_sas"].call_count == 1
+
+    container_client = fixture_stage["container_client"]
+    staged_blobs = [call.kwargs["blob"] for call in container_client.get_blob_client.call_args_list]
+    assert sorted(staged_blobs) == sorted(
+        [
+            f"{tmp_path.name}/contoso_toaster_1.0/manifest_1.0.json",
+            f"{tmp_path.name}/contoso_toaster_1.0/a.bin",
+            f"{tmp_path.name}/contoso_toaster_1.0/b.bin",
+            f"{tmp_path.name}/contoso_toaster_2.0/manifest_2.0.json",
+            f"{tmp_path.name}/contoso_toaster_2.0/c.bin",
+        ]
+    )
+
+    for blob, blob_client in fixture_stage["blob_clients"].items():
+        if blob == existing_blob:
+            blob_client.upload_blob.assert_not_called()
+        else:
+            blob_client.upload_blob.assert_called_once()
+            assert STAGE_HASH_METADATA_KEY in blob_client.upload_blob.call_args.kwargs["metadata"]
+
+    # Deferred imports are cached directly
+    cache_set = fixture_stage["cache"].set.call_args.kwargs
+    update_to_import = cache_set["payload"]
+    assert len(update_to_import) == 2
+    first_import = update_to_import[0]
+    manifest_metadata = DeviceUpdateDataManager.calculate_file_metadata(manifest_paths[0])
+    assert first_import.import_manifest.url == (
+        f"{blob_url_root}/{tmp_path.name}/contoso_toaster_1.0/manifest_1.0.json?sastoken"
+    )
+    assert first_import.import_manifest.size_in_bytes == manifest_metadata.bytes
+    assert first_import.import_manifest.hashes == {"sha256": manifest_metadata.hash}
+    assert [f.filename for f in first_import.files] == ["a.bin", "b.bin"]
+    assert all(f.url.endswith("?sastoken") for f in first_import.files)
+    assert [f.filename for f in update_to_import[1].files] == ["c.bin"]
+
+    if then_import:
+        fixture_stage["import_update"].assert_called_once()
+        assert fixture_stage["import_update"].call_args.kwargs["url"] == "cache://"
+        assert result == fixture_stage["import_update"].return_value.result.return_value
+    else:
+        fixture_stage["import_update"].assert_not_called()
+        assert result["importCommand"] == (
+            f"az iot du update import -n {account_name} -i {instance_name} -g {resource_group} --url cache://"
+        )
+
+
+@pytest.mark.parametrize("max_workers", [0, -1])
+def test_stage_update_invalid_max_workers(fixture_cmd, fixture_stage, tmp_path, max_workers):
+    from azure.cli.core.azclierror import InvalidArgumentValueError
+
+    with pytest.raises(InvalidArgumentValueError):
+        subject.stage_update(
+            cmd=fixture_cmd,
+            name=account_name,
+            instance_name=instance_name,
+            update_manifest_paths=[_write_manifest(tmp_path, "1.0", ["a.bin"])],
+            storage_account_name="mystorage",
+            storage_container_name="staged",
+            max_workers=max_workers,
+        )
+    # nothing is staged
+    fixture_stage["container_client"].get_blob_client.assert_not_called()
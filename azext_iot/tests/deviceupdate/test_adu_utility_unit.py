@@ -35,3 +35,124 @@ def test_parse_manifest_json(json_input: str, expect_error: bool, mocker):
         else:
             assert invalid_arg_error_str.format(property_name=parsed_prop_name, inline_json=json_input) == str(thrown_error)
             logger_mock.warning.mock_calls[0].args == (use_help_warning,)
+
+
+@pytest.mark.parametrize(
+    "file_sizes, mmap_threshold, pool_threshold, hash_algos, max_workers, expect_pool",
+    [
+        ([0], 1024, 1024, ("sha256",), None, False),
+        ([1024], 1024 * 1024, 1024, ("sha256",), None, False),
+        ([4097, 1, 2048], 1024, 4096, ("sha256",), 2, True),
+        ([4097, 1, 2048], 1024, 8192, ("sha256",), 2, False),
+        ([4097, 8192], 1024, 1024, ("sha256", "sha512"), 1, False),
+    ],
+)
+def test_hash_files(
+    file_sizes, mmap_threshold, pool_threshold, hash_algos, max_workers, expect_pool, tmp_path, mocker
+):
+    import hashlib
+    import os
+    from base64 import b64encode
+    from concurrent.futures import ProcessPoolExecutor
+    from azext_iot.deviceupdate.providers import hashing
+
+    mocker.patch.object(hashing, "MMAP_THRESHOLD_BYTES", mmap_threshold)
+    mocker.patch.object(hashing, "PROCESS_POOL_THRESHOLD_BYTES", pool_threshold)
+    mocker.patch.object(hashing, "HASH_CHUNK_BYTES", 1024)
+    pool = mocker.patch.object(hashing, "ProcessPoolExecutor", wraps=ProcessPoolExecutor)
+
+    file_paths = []
+    file_contents = []
+    for size in file_sizes:
+        content = os.urandom(size)
+        file_path = tmp_path / generate_generic_id()
+        file_path.write_bytes(content)
+        file_paths.append(str(file_path))
+        file_contents.append(content)
+
+    results = hashing.hash_files(file_paths, hash_algos=hash_algos, max_workers=max_workers)
+    # small batches of files are hashed inline
+    assert pool.called is expect_pool
+    assert len(results) == len(file_paths)
+    for result, content in zip(results, file_contents):
+        assert result.bytes == len(content)
+        for algo in hash_algos:
+            assert result.hashes[algo] == b64encode(hashlib.new(algo, content).digest()).decode("utf8")
+
+
+@pytest.mark.parametrize("max_workers", [0, -1])
+def test_calculate_hash_invalid_max_workers(tmp_path, max_workers):
+    from azure.cli.core.azclierror import InvalidArgumentValueError
+    from azext_iot.deviceupdate import commands_update
+
+    file_path = tmp_path / generate_generic_id()
+    file_path.write_bytes(b"content")
+    with pytest.raises(InvalidArgumentValueError):
+        commands_update.calculate_hash([str(file_path)], max_workers=max_workers)
+
+
+def test_hash_files_cache(tmp_path, mocker):
+    import os
+    from azext_iot.deviceupdate.providers import hashing
+
+    file_path = tmp_path / generate_generic_id()
+    file_path.write_bytes(os.urandom(2048))
+    cache_dir = str(tmp_path / "cache")
+
+    first = hashing.hash_files([str(file_path)], ("sha256",), cache=hashing.FileHashCache(cache_dir))
+    assert os.path.exists(os.path.join(cache_dir, hashing.HASH_CACHE_FILE_NAME))
+
+    # Unchanged files are served from a fresh cache instance without being read
+    hash_file_spy = mocker.spy(hashing, "hash_file")
+    second = hashing.hash_files([str(file_path)], ("sha256",), cache=hashing.FileHashCache(cache_dir))
+    assert second == first
+    assert hash_file_spy.call_count == 0
+
+    # Additional algorithms and modified files require rehashing
+    hashing.hash_files([str(file_path)], ("sha256", "sha512"), cache=hashing.FileHashCache(cache_dir))
+    assert hash_file_spy.call_count == 1
+    file_path.write_bytes(os.urandom(1024))
+    third = hashing.hash_files([str(file_path)], ("sha256",), cache=hashing.FileHashCache(cache_dir))
+    assert hash_file_spy.call_count == 2
+    assert third[0].bytes == 1024
+    assert third[0].hashes["sha256"] != first[0].hashes["sha256"]
+
+
+def test_calculate_manifest_metadata(tmp_path, mocker, monkeypatch):
+    import hashlib
+    import io
+    from base64 import b64encode
+    from urllib.error import HTTPError
+    from azext_iot.deviceupdate.providers.base import DeviceUpdateDataManager
+
+    monkeypatch.setenv("AZURE_CONFIG_DIR", str(tmp_path))
+    content = json.dumps({"updateId": {"provider": "contoso"}}).encode("utf-8")
+    expected_hash = b64encode(hashlib.sha256(content).digest()).decode("utf8")
+    data_manager = mocker.MagicMock()
+
+    # file:// urls are hashed locally
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_bytes(content)
+    result = DeviceUpdateDataManager.calculate_manifest_metadata(data_manager, manifest_path.as_uri())
+    assert result.bytes == len(content)
+    assert result.hash == expected_hash
+
+    # http(s) content is streamed and cached by ETag
+    response = mocker.MagicMock()
+    response.__enter__.return_value = response
+    response.read = io.BytesIO(content).read
+    response.headers = {"ETag": '"0x8DA"'}
+    patched_urlopen = mocker.patch("urllib.request.urlopen", return_value=response)
+    url = "https://mystorage.blob.core.windows.net/updates/manifest.json?sig=first"
+    result = DeviceUpdateDataManager.calculate_manifest_metadata(data_manager, url)
+    assert result.bytes == len(content)
+    assert result.hash == expected_hash
+    assert not patched_urlopen.call_args.args[0].has_header("If-none-match")
+
+    # Subsequent requests are conditional and unchanged content is not downloaded again
+    patched_urlopen.side_effect = HTTPError(url, 304, "Not Modified", {}, None)
+    url = "https://mystorage.blob.core.windows.net/updates/manifest.json?sig=second"
+    result = DeviceUpdateDataManager.calculate_manifest_metadata(data_manager, url)
+    assert result.bytes == len(content)
+    assert result.hash == expected_hash
+    assert patched_urlopen.call_args.args[0].get_header("If-none-match") == '"0x8DA"'
@@ -9,6 +9,7 @@ import pytest
 import responses
 import json
 from knack.cli import CLIError
+from azure.cli.core.azclierror import InvalidArgumentValueError
 from azext_iot.digitaltwins import commands_twins as subject
 from msrest.paging import Paged
 from azext_iot.tests.digitaltwins.dt_helpers import (
@@ -250,6 +251,160 @@ class TestTwinCreateTwin(object):
             )
 
 
+class TestTwinCreateBulk(object):
+    @pytest.fixture
+    def service_client(self, mocked_response, start_twin_response):
+        yield mocked_response
+
+    def _add_twin_response(self, service_client, twin, status=200):
+        service_client.add(
+            method=responses.PUT,
+            url="https://{}/digitaltwins/{}".format(hostname, twin["$dtId"]),
+            body=json.dumps(twin),
+            status=status,
+            content_type="application/json",
+            match_querystring=False,
+        )
+
+    def _add_relationship_response(self, service_client, edge, status=200):
+        service_client.add(
+            method=responses.PUT,
+            url="https://{}/digitaltwins/{}/relationships/{}".format(
+                hostname, edge["$sourceId"], edge["$relationshipId"]
+            ),
+            body=json.dumps(edge),
+            status=status,
+            content_type="application/json",
+            match_querystring=False,
+        )
+
+    @pytest.mark.parametrize("number_twins, if_none_match", [(1, False), (5, True)])
+    def test_create_twins_bulk(self, fixture_cmd, service_client, number_twins, if_none_match):
+        twins = [generate_twin_result(randomized=True) for _ in range(number_twins)]
+        edges = [
+            {
+                "$sourceId": twins[0]["$dtId"],
+                "$relationshipId": generate_generic_id(),
+                "$targetId": twin["$dtId"],
+                "$relationshipName": "contains",
+            }
+            for twin in twins[1:]
+        ]
+        for twin in twins:
+            self._add_twin_response(service_client, twin)
+        for edge in edges:
+            self._add_relationship_response(service_client, edge)
+
+        result = subject.create_twins_bulk(
+            cmd=fixture_cmd,
+            name_or_hostname=hostname,
+            data_file=json.dumps({"digitalTwins": twins, "relationships": edges}),
+            if_none_match=if_none_match,
+        )
+
+        assert result["digitalTwins"] == {"total": number_twins, "failed": 0}
+        assert result["relationships"] == {"total": len(edges), "failed": 0}
+        assert result["errors"] == []
+
+        put_calls = [call.request for call in service_client.calls if call.request.method == "PUT"]
+        assert len(put_calls) == number_twins + len(edges)
+        # All twins are created before any relationship
+        assert all("/relationships/" not in request.url for request in put_calls[:number_twins])
+        assert all("/relationships/" in request.url for request in put_calls[number_twins:])
+        for request in put_calls:
+            if if_none_match:
+                assert request.headers["If-None-Match"] == "*"
+        for request in put_calls[number_twins:]:
+            body = json.loads(request.body)
+            assert "$sourceId" not in body
+            assert "$relationshipId" not in body
+            assert body["$relationshipName"] == "contains"
+
+    def test_create_twins_bulk_failures(self, fixture_cmd, service_client, tmp_path):
+        twins = [generate_twin_result(randomized=True) for _ in range(3)]
+        edges = [
+            {
+                "$sourceId": twins[0]["$dtId"],
+                "$relationshipId": generate_generic_id(),
+                "$targetId": twins[1]["$dtId"],
+                "$relationshipName": "contains",
+            },
+            {
+                "$sourceId": twins[0]["$dtId"],
+                "$relationshipId": generate_generic_id(),
+                "$targetId": twins[2]["$dtId"],
+                "$relationshipName": "contains",
+            },
+        ]
+        self._add_twin_response(service_client, twins[0])
+        self._add_twin_response(service_client, twins[1])
+        self._add_twin_response(service_client, twins[2], status=400)
+        self._add_relationship_response(service_client, edges[0])
+
+        retry_file = str(tmp_path / "retry.json")
+        result = subject.create_twins_bulk(
+            cmd=fixture_cmd,
+            name_or_hostname=hostname,
+            data_file=json.dumps({"digitalTwins": twins, "relationships": edges}),
+            retry_file=retry_file,
+        )
+
+        assert result["digitalTwins"] == {"total": 3, "failed": 1}
+        assert result["relationships"] == {"total": 2, "failed": 1}
+        assert len(result["errors"]) == 2
+
+        # Relationship targeting the failed twin is never attempted
+        relationship_calls = [call for call in service_client.calls if "/relationships/" in call.request.url]
+        assert len(relationship_calls) == 1
+
+        with open(retry_file, "r") as f:
+            retry = json.load(f)
+        assert retry["digitalTwins"] == [twins[2]]
+        assert retry["relationships"] == [edges[1]]
+
+    @pytest.mark.parametrize(
+        "data, max_workers",
+        [
+            ([generate_twin_result(randomized=True)], 4),
+            ({"digitalTwins": [{"$dtId": generate_generic_id()}]}, 4),
+            ({"relationships": [{"$sourceId": generate_generic_id(), "$targetId": generate_generic_id()}]}, 4),
+            (
+                {
+                    "relationships": [
+                        {
+                            "$sourceId": generate_generic_id(),
+                            "$relationshipId": generate_generic_id(),
+                            "$targetId": generate_generic_id(),
+                        }
+                    ]
+                },
+                4,
+            ),
+            ({"digitalTwins": [generate_twin_result(randomized=True)]}, 0),
+            ({"digitalTwins": [generate_twin_result(randomized=True), "twin"]}, 4),
+            ({"relationships": [None]}, 4),
+            ({"relationships": {"$sourceId": generate_generic_id()}}, 4),
+        ]
+    )
+    def test_create_twins_bulk_invalid(self, fixture_cmd, service_client, data, max_workers):
+        with pytest.raises(InvalidArgumentValueError):
+            subject.create_twins_bulk(
+                cmd=fixture_cmd,
+                name_or_hostname=hostname,
+                data_file=json.dumps(data),
+                max_workers=max_workers,
+            )
+        assert not [call for call in service_client.calls if call.request.method == "PUT"]
+
+    def test_create_twins_bulk_invalid_entry_index(self, fixture_cmd, service_client):
+        with pytest.raises(InvalidArgumentValueError, match="'digitalTwins' entry 1 must be an object"):
+            subject.create_twins_bulk(
+                cmd=fixture_cmd,
+                name_or_hostname=hostname,
+                data_file=json.dumps({"digitalTwins": [generate_twin_result(randomized=True), ["twin"]]}),
+            )
+
+
 class TestTwinShowTwin(object):
     @pytest.fixture
     def service_client(self, mocked_response, start_twin_response):
@@ -496,39 +651,41 @@ class TestTwinDeleteAllTwin(object):
         "number_twins", [0, 1, 3]
     )
     def test_delete_twin_all(self, mocker, fixture_cmd, service_client_all, number_twins):
+        # Graph-wide relationship sweep, relationships are returned once per edge
+        relationships = []
+        for i in range(number_twins):
+            relationship = generate_relationship("contains")
+            relationships.append(relationship)
+            service_client_all.add(
+                method=responses.DELETE,
+                url="https://{}/digitaltwins/{}/relationships/{}".format(
+                    hostname, relationship["$sourceId"], relationship["$relationshipId"]
+                ),
+                body=None,
+                status=204,
+                content_type="application/json",
+                match_querystring=False,
+            )
+        service_client_all.add(
+            method=responses.POST,
+            url="https://{}/query".format(hostname),
+            body=json.dumps({
+                "value": relationships,
+                "continuationToken": None
+            }),
+            status=200,
+            content_type="application/json",
+            match_querystring=False,
+            headers={
+                "Query-Charge": "1.0"
+            }
+        )
 
         # Create query call and delete calls
         query_result = []
         for i in range(number_twins):
             twin = generate_twin_result(randomized=True)
             query_result.append(twin)
-            # Query calls to check if there are any relationships
-            service_client_all.add(
-                method=responses.GET,
-                url="https://{}/digitaltwins/{}/incomingrelationships".format(
-                    hostname, twin["$dtId"]
-                ),
-                body=json.dumps({
-                    "value" : [],
-                    "nextLink" : None
-                }),
-                status=200,
-                content_type="application/json",
-                match_querystring=False
-            )
-            service_client_all.add(
-                method=responses.GET,
-                url="https://{}/digitaltwins/{}/relationships".format(
-                    hostname, twin["$dtId"]
-                ),
-                body=json.dumps({
-                    "value" : [],
-                    "nextLink" : None
-                }),
-                status=200,
-                content_type="application/json",
-                match_querystring=False
-            )
             # Delete call
             service_client_all.add(
                 method=responses.DELETE,
@@ -564,22 +721,30 @@ class TestTwinDeleteAllTwin(object):
             name_or_hostname=hostname,
         )
 
-        delete_request = service_client_all.calls[0].request
-        assert delete_request.method == "POST"
+        relationship_query_request = service_client_all.calls[0].request
+        assert relationship_query_request.method == "POST"
+        assert "relationships" in json.loads(relationship_query_request.body)["query"]
 
-        # Check delete calls
-        for i in range(number_twins):
-            query1_request = service_client_all.calls[1 + 3 * i].request
-            assert query1_request.method == "GET"
-            assert query_result[i]["$dtId"] in query1_request.url
+        # Relationship deletes are concurrent, so order is not guaranteed
+        relationship_deletes = [call.request for call in service_client_all.calls[1:1 + number_twins]]
+        assert all(request.method == "DELETE" for request in relationship_deletes)
+        assert sorted(request.url.split("?")[0] for request in relationship_deletes) == sorted(
+            "https://{}/digitaltwins/{}/relationships/{}".format(
+                hostname, relationship["$sourceId"], relationship["$relationshipId"]
+            )
+            for relationship in relationships
+        )
 
-            query2_request = service_client_all.calls[2 + 3 * i].request
-            assert query2_request.method == "GET"
-            assert query_result[i]["$dtId"] in query2_request.url
+        twin_query_request = service_client_all.calls[1 + number_twins].request
+        assert twin_query_request.method == "POST"
+        assert "digitaltwins" in json.loads(twin_query_request.body)["query"]
 
-            delete_request = service_client_all.calls[3 + 3 * i].request
-            assert delete_request.method == "DELETE"
-            assert query_result[i]["$dtId"] in delete_request.url
+        twin_deletes = [call.request for call in service_client_all.calls[2 + number_twins:]]
+        assert len(twin_deletes) == number_twins
+        assert all(request.method == "DELETE" for request in twin_deletes)
+        assert sorted(request.url.split("?")[0] for request in twin_deletes) == sorted(
+            "https://{}/digitaltwins/{}".format(hostname, twin["$dtId"]) for twin in query_result
+        )
 
         assert result is None
 
@@ -1152,47 +1317,28 @@ class TestTwinDeleteAllRelationship(object):
         "number_twins", [0, 1, 3]
     )
     def test_delete_relationships_all_twins(self, mocker, fixture_cmd, service_client, number_twins):
-        # Create query call and delete calls
-        query_result = []
+        relationships = []
         for i in range(number_twins):
-            twin = generate_twin_result(randomized=True)
-            query_result.append(twin)
-            # Query calls to check if there are any relationships
-            service_client.add(
-                method=responses.GET,
-                url="https://{}/digitaltwins/{}/incomingrelationships".format(
-                    hostname, twin["$dtId"]
-                ),
-                body=json.dumps({
-                    "value" : [],
-                    "nextLink" : None
-                }),
-                status=200,
-                content_type="application/json",
-                match_querystring=False
-            )
+            relationship = generate_relationship("contains")
+            relationships.append(relationship)
             service_client.add(
-                method=responses.GET,
-                url="https://{}/digitaltwins/{}/relationships".format(
-                    hostname, twin["$dtId"]
+                method=responses.DELETE,
+                url="https://{}/digitaltwins/{}/relationships/{}".format(
+                    hostname, relationship["$sourceId"], relationship["$relationshipId"]
                 ),
-                body=json.dumps({
-                    "value" : [],
-                    "nextLink" : None
-                }),
-                status=200,
+                body=None,
+                status=204 if i % 2 == 0 else 400,
                 content_type="application/json",
-                match_querystring=False
+                match_querystring=False,
             )
-            # the only difference between this and delete_all_twins is no twin delete call
-        # Query call for twins to delete
+        # Duplicate entries are only deleted once
         service_client.add(
             method=responses.POST,
             url="https://{}/query".format(
                 hostname
             ),
             body=json.dumps({
-                "value": query_result,
+                "value": relationships + relationships,
                 "continuationToken": None
             }),
             status=200,
@@ -1209,18 +1355,15 @@ class TestTwinDeleteAllRelationship(object):
             name_or_hostname=hostname,
         )
 
-        delete_request = service_client.calls[0].request
-        assert delete_request.method == "POST"
-
-        # Check delete calls
-        for i in range(number_twins):
-            query1_request = service_client.calls[1 + 2 * i].request
-            assert query1_request.method == "GET"
-            assert query_result[i]["$dtId"] in query1_request.url
+        query_request = service_client.calls[0].request
+        assert query_request.method == "POST"
+        assert json.loads(query_request.body)["query"] == "select * from relationships"
 
-            query2_request = service_client.calls[2 + 2 * i].request
-            assert query2_request.method == "GET"
-            assert query_result[i]["$dtId"] in query2_request.url
+        # No twin queries or twin deletes
+        delete_requests = [call.request for call in service_client.calls[1:]]
+        assert len(delete_requests) == number_twins
+        assert all(request.method == "DELETE" for request in delete_requests)
+        assert all("/relationships/" in request.url for request in delete_requests)
 
         assert result is None
 
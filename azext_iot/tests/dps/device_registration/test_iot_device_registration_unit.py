@@ -0,0 +1,182 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import re
+import pytest
+import responses
+from azure.cli.core.azclierror import MutuallyExclusiveArgumentError, RequiredArgumentMissingError
+from knack.util import CLIError
+from azext_iot.common.utility import compute_device_key, ensure_azure_namespace_path
+from azext_iot.dps import commands_device_registration as subject
+from azext_iot.tests.conftest import mock_dps_target
+from azext_iot.tests.dps import TEST_ENDORSEMENT_KEY
+
+id_scope = "0ne00000000"
+enrollment_group_id = "mygroup"
+failed_registration_id = "failed-device"
+error_registration_id = "error-device"
+unassigned_registration_id = "unassigned-device"
+
+
+@pytest.fixture
+def provisioning_client(mocker):
+    ensure_azure_namespace_path()
+    from azure.iot.device.exceptions import ClientError
+
+    registered = {}
+
+    def _create_from_symmetric_key(provisioning_host, registration_id, id_scope, symmetric_key):
+        registered[registration_id] = {"id_scope": id_scope, "symmetric_key": symmetric_key}
+        client = mocker.MagicMock()
+
+        async def _register():
+            if registration_id == failed_registration_id:
+                raise ClientError("registration failed")
+            if registration_id == error_registration_id:
+                raise ValueError("bad key")
+            result = mocker.MagicMock()
+            if registration_id == unassigned_registration_id:
+                result.status = "failed"
+                result.registration_state = None
+                return result
+            result.status = "assigned"
+            # alternate assignment between two hubs
+            result.registration_state.assigned_hub = "hub{}.azure-devices.net".format(len(registered) % 2)
+            return result
+
+        client.register = _register
+        return client
+
+    mocker.patch(
+        "azure.iot.device.aio.ProvisioningDeviceClient.create_from_symmetric_key",
+        side_effect=_create_from_symmetric_key,
+    )
+    return registered
+
+
+class TestDeviceRegistrationCreateBatch:
+    def test_create_batch_offline(self, fixture_cmd, provisioning_client):
+        registration_ids = ["device-{}".format(i) for i in range(5)] + [failed_registration_id, "device-0"]
+        result = subject.create_device_registration_batch(
+            cmd=fixture_cmd,
+            id_scope=id_scope,
+            device_symmetric_key=TEST_ENDORSEMENT_KEY,
+            registration_ids=registration_ids,
+            concurrency=2,
+        )
+
+        # duplicate registration ids are registered once
+        assert len(provisioning_client) == 6
+        for registration_id, registration in provisioning_client.items():
+            assert registration["id_scope"] == id_scope
+            assert registration["symmetric_key"] == compute_device_key(
+                TEST_ENDORSEMENT_KEY, registration_id
+            ).decode()
+
+        assert result["total"] == 6
+        assert result["assigned"] == 5
+        assert result["failed"] == 1
+        assert result["statuses"] == {"assigned": 5}
+        assert sum(result["assignedHubs"].values()) == 5
+        assert len(result["assignedHubs"]) == 2
+        assert set(result["latencyMs"]) == {"p50", "p90", "p95", "p99", "max"}
+        assert result["errors"][0]["registrationId"] == failed_registration_id
+
+    def test_create_batch_group_key(self, fixture_cmd, fixture_gdcs, fixture_dps_sas, mocked_response, provisioning_client):
+        mocked_response.add(
+            method=responses.POST,
+            url=re.compile(
+                "https://{}/enrollmentGroups/{}/attestationmechanism".format(
+                    mock_dps_target["entity"], enrollment_group_id
+                )
+            ),
+            body=json.dumps({"type": "symmetricKey", "symmetricKey": {"primaryKey": TEST_ENDORSEMENT_KEY}}),
+            status=200,
+            content_type="application/json",
+        )
+        result = subject.create_device_registration_batch(
+            cmd=fixture_cmd,
+            dps_name=mock_dps_target["entity"],
+            id_scope=id_scope,
+            enrollment_group_id=enrollment_group_id,
+            registration_id_pattern="sensor-{08..12}",
+        )
+
+        # the group key is retrieved once for the whole batch
+        assert len(mocked_response.calls) == 1
+        assert fixture_gdcs.call_count == 1
+        assert sorted(provisioning_client) == ["sensor-08", "sensor-09", "sensor-10", "sensor-11", "sensor-12"]
+        assert provisioning_client["sensor-10"]["symmetric_key"] == compute_device_key(
+            TEST_ENDORSEMENT_KEY, "sensor-10"
+        ).decode()
+        assert result["total"] == 5
+        assert result["failed"] == 0
+
+    def test_create_batch_file(self, fixture_cmd, provisioning_client, tmp_path):
+        registration_file = tmp_path / "registrations.txt"
+        registration_file.write_text("device-a\n\ndevice-b\n")
+        result = subject.create_device_registration_batch(
+            cmd=fixture_cmd,
+            id_scope=id_scope,
+            device_symmetric_key=TEST_ENDORSEMENT_KEY,
+            registration_id_file=str(registration_file),
+        )
+        assert sorted(provisioning_client) == ["device-a", "device-b"]
+        assert result["total"] == 2
+
+    def test_create_batch_device_errors(self, fixture_cmd, provisioning_client):
+        result = subject.create_device_registration_batch(
+            cmd=fixture_cmd,
+            id_scope=id_scope,
+            device_symmetric_key=TEST_ENDORSEMENT_KEY,
+            registration_ids=["device-a", error_registration_id, unassigned_registration_id],
+        )
+        # unexpected errors are reported per device and do not abort the batch
+        assert result["total"] == 3
+        assert result["failed"] == 1
+        assert result["errors"] == [{"registrationId": error_registration_id, "error": "bad key"}]
+        assert result["statuses"] == {"assigned": 1, "failed": 1}
+        assert result["assigned"] == 1
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"registration_id_pattern": "device-{5..1}"}, {"registration_id_file": "missing-registrations.txt"}],
+    )
+    def test_create_batch_invalid_ids_before_service(self, fixture_cmd, provisioning_client, mocker, kwargs):
+        from azext_iot.dps.providers import device_registration
+
+        discovery = mocker.patch.object(device_registration, "DPSDiscovery")
+        with pytest.raises(CLIError):
+            subject.create_device_registration_batch(
+                cmd=fixture_cmd,
+                dps_name=mock_dps_target["entity"],
+                enrollment_group_id=enrollment_group_id,
+                **kwargs
+            )
+        # the id source is validated before dps discovery or the group key lookup
+        discovery.assert_not_called()
+        assert not provisioning_client
+
+    @pytest.mark.parametrize(
+        "kwargs, error",
+        [
+            ({"device_symmetric_key": TEST_ENDORSEMENT_KEY}, RequiredArgumentMissingError),
+            (
+                {
+                    "device_symmetric_key": TEST_ENDORSEMENT_KEY,
+                    "registration_ids": ["device-a"],
+                    "registration_id_pattern": "device-{1..2}",
+                },
+                MutuallyExclusiveArgumentError,
+            ),
+            ({"registration_ids": ["device-a"]}, RequiredArgumentMissingError),
+        ],
+    )
+    def test_create_batch_invalid(self, fixture_cmd, provisioning_client, kwargs, error):
+        with pytest.raises(error):
+            subject.create_device_registration_batch(cmd=fixture_cmd, id_scope=id_scope, **kwargs)
+        assert not provisioning_client
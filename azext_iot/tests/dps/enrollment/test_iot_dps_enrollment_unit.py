@@ -593,6 +593,18 @@ class TestEnrollmentList():
         assert method == "POST"
         assert json.dumps(result)
 
+    def test_enrollment_list_fields(self, serviceclient, fixture_cmd):
+        result = subject.iot_dps_device_enrollment_list(
+            cmd=fixture_cmd,
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+            fields=["registrationId", "attestation.type"],
+        )
+        expected = generate_enrollment_show()
+        assert result == [
+            {"registrationId": expected["registrationId"], "attestation": {"type": expected["attestation"]["type"]}}
+        ]
+
     def test_enrollment_list_error(self, fixture_cmd, serviceclient_generic_error):
         with pytest.raises(CLIError):
             subject.iot_dps_device_enrollment_list(
@@ -644,6 +656,205 @@ class TestEnrollmentDelete():
             )
 
 
+class TestEnrollmentBulk():
+    failed_id = "failed-device"
+
+    @pytest.fixture()
+    def serviceclient(self, mocked_response, fixture_gdcs, fixture_dps_sas):
+        def _bulk_callback(request):
+            body = json.loads(request.body)
+            errors = [
+                {"registrationId": e["registrationId"], "errorCode": 409, "errorStatus": "Conflict"}
+                for e in body["enrollments"] if e["registrationId"] == self.failed_id
+            ]
+            return (200, {}, json.dumps({"isSuccessful": not errors, "errors": errors}))
+
+        mocked_response.add_callback(
+            method=responses.POST,
+            url="https://{}/enrollments".format(mock_dps_target['entity']),
+            callback=_bulk_callback,
+            content_type="application/json",
+            match_querystring=False,
+        )
+        yield mocked_response
+
+    def _write_enrollments(self, tmp_path, count, ndjson=False):
+        enrollments = [
+            dict(attestation=mock_symmetric_key_attestation, registrationId="device-{}".format(i)) for i in range(count)
+        ]
+        enrollments.append(dict(attestation=mock_symmetric_key_attestation, registrationId=self.failed_id))
+        enrollment_file = tmp_path / "enrollments.json"
+        if ndjson:
+            enrollment_file.write_text("\n".join(json.dumps(e) for e in enrollments))
+        else:
+            enrollment_file.write_text(json.dumps(enrollments))
+        return str(enrollment_file)
+
+    @pytest.mark.parametrize(
+        "command, kwargs, mode",
+        [
+            ("iot_dps_device_enrollment_bulk_create", {}, "create"),
+            ("iot_dps_device_enrollment_bulk_update", {}, "update"),
+            ("iot_dps_device_enrollment_bulk_update", {"etag_match": True}, "updateIfMatchETag"),
+        ],
+    )
+    @pytest.mark.parametrize("ndjson", [False, True])
+    def test_enrollment_bulk(self, serviceclient, fixture_cmd, tmp_path, command, kwargs, mode, ndjson):
+        retry_file = str(tmp_path / "retry.json")
+        result = getattr(subject, command)(
+            cmd=fixture_cmd,
+            enrollment_file=self._write_enrollments(tmp_path, 24, ndjson),
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+            retry_file=retry_file,
+            **kwargs
+        )
+
+        # 25 enrollments are sent in requests of at most 10
+        bodies = [json.loads(call.request.body) for call in serviceclient.calls]
+        assert sorted(len(body["enrollments"]) for body in bodies) == [5, 10, 10]
+        assert all(body["mode"] == mode for body in bodies)
+        # enrollment content is sent as provided
+        assert bodies[0]["enrollments"][0]["attestation"] == mock_symmetric_key_attestation
+
+        assert result["total"] == 25
+        assert result["succeeded"] == 24
+        assert result["failed"] == 1
+        assert result["errors"] == [{"registrationId": self.failed_id, "errorCode": 409, "errorStatus": "Conflict"}]
+        with open(retry_file, "r") as f:
+            assert json.load(f) == [dict(attestation=mock_symmetric_key_attestation, registrationId=self.failed_id)]
+
+    def test_enrollment_bulk_delete_ids(self, serviceclient, fixture_cmd, tmp_path):
+        enrollment_file = tmp_path / "ids.txt"
+        enrollment_file.write_text('"device-0"\n{"registrationId": "device-1", "etag": "AAAA=="}\n"device-0"\n')
+        result = subject.iot_dps_device_enrollment_bulk_delete(
+            cmd=fixture_cmd,
+            enrollment_file=str(enrollment_file),
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+        )
+        body = json.loads(serviceclient.calls[0].request.body)
+        assert body == {
+            "enrollments": [{"registrationId": "device-0"}, {"registrationId": "device-1", "etag": "AAAA=="}],
+            "mode": "delete",
+        }
+        assert result == {"total": 2, "succeeded": 2, "failed": 0, "errors": []}
+
+    def test_enrollment_bulk_delete_bare_ids(self, serviceclient, fixture_cmd, tmp_path):
+        enrollment_file = tmp_path / "ids.txt"
+        enrollment_file.write_text('device-0\n\n"device-1"\n{"registrationId": "device-2"}\ndevice-0\n')
+        result = subject.iot_dps_device_enrollment_bulk_delete(
+            cmd=fixture_cmd,
+            enrollment_file=str(enrollment_file),
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+        )
+        body = json.loads(serviceclient.calls[0].request.body)
+        assert body["enrollments"] == [
+            {"registrationId": "device-0"}, {"registrationId": "device-1"}, {"registrationId": "device-2"}
+        ]
+        assert result["total"] == 3
+
+    def test_enrollment_bulk_throttled(self, mocked_response, fixture_gdcs, fixture_dps_sas, fixture_cmd, tmp_path):
+        url = "https://{}/enrollments".format(mock_dps_target['entity'])
+        mocked_response.add(
+            method=responses.POST, url=url, status=429, headers={"Retry-After": "0"}, match_querystring=False
+        )
+        mocked_response.add(
+            method=responses.POST, url=url, json={"isSuccessful": True, "errors": []}, match_querystring=False
+        )
+        result = subject.iot_dps_device_enrollment_bulk_create(
+            cmd=fixture_cmd,
+            enrollment_file=self._write_enrollments(tmp_path, 2),
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+        )
+        assert len(mocked_response.calls) == 2
+        assert result["failed"] == 0
+
+    @pytest.fixture(params=[400, 500])
+    def serviceclient_bulk_error(self, mocked_response, fixture_gdcs, fixture_dps_sas, request):
+        mocked_response.add(
+            method=responses.POST,
+            url="https://{}/enrollments".format(mock_dps_target['entity']),
+            body='{"errorCode": 400000, "message": "something failed"}',
+            status=request.param,
+            content_type="application/json",
+            match_querystring=False,
+        )
+        yield request.param
+
+    def test_enrollment_bulk_request_error(self, serviceclient_bulk_error, fixture_cmd, tmp_path):
+        result = subject.iot_dps_device_enrollment_bulk_create(
+            cmd=fixture_cmd,
+            enrollment_file=self._write_enrollments(tmp_path, 2),
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+        )
+        # every enrollment in a rejected request is reported as failed
+        assert result["failed"] == 3
+        assert sorted(e["registrationId"] for e in result["errors"]) == ["device-0", "device-1", self.failed_id]
+        assert all(e["errorCode"] == serviceclient_bulk_error for e in result["errors"])
+
+    @pytest.mark.parametrize("content", ["[]", '[{"etag": "AAAA=="}]', '["device-0"]', "not json"])
+    def test_enrollment_bulk_invalid(self, fixture_cmd, tmp_path, content):
+        enrollment_file = tmp_path / "enrollments.json"
+        enrollment_file.write_text(content)
+        with pytest.raises(CLIError):
+            subject.iot_dps_device_enrollment_bulk_create(
+                cmd=fixture_cmd,
+                enrollment_file=str(enrollment_file),
+                dps_name=mock_dps_target['entity'],
+            )
+
+
+class TestEnrollmentBulkRequest():
+    @pytest.fixture()
+    def sdk(self, fixture_dps_sas):
+        from azext_iot._factory import SdkResolver
+        from azext_iot.common.shared import SdkType
+
+        return SdkResolver(target=mock_dps_target).get_sdk(SdkType.dps_sdk)
+
+    def test_send_bulk_enrollment_request(self, mocked_response, sdk):
+        from azext_iot.dps.providers.enrollment_bulk import send_bulk_enrollment_request
+
+        mocked_response.add(
+            method=responses.POST,
+            url="https://{}/enrollments".format(mock_dps_target['entity']),
+            json={"isSuccessful": True, "errors": []},
+            status=200,
+            match_querystring=False,
+        )
+        enrollments = [{"registrationId": "device-0", "unknownField": "kept"}]
+        response = send_bulk_enrollment_request(sdk, enrollments, "create")
+
+        assert response.status_code == 200
+        assert response.json() == {"isSuccessful": True, "errors": []}
+        request = mocked_response.calls[0].request
+        assert "api-version={}".format(sdk.individual_enrollment.api_version) in request.url
+        assert request.headers["Content-Type"] == "application/json; charset=utf-8"
+        assert json.loads(request.body) == {"enrollments": enrollments, "mode": "create"}
+
+    def test_bulk_enrollment_error(self, mocked_response, sdk):
+        from azext_iot.dps.providers.enrollment_bulk import bulk_enrollment_error, send_bulk_enrollment_request
+
+        mocked_response.add(
+            method=responses.POST,
+            url="https://{}/enrollments".format(mock_dps_target['entity']),
+            body='{"errorCode": 400000, "message": "something failed"}',
+            status=400,
+            content_type="application/json",
+            match_querystring=False,
+        )
+        response = send_bulk_enrollment_request(sdk, [{"registrationId": "device-0"}], "delete")
+        error = bulk_enrollment_error(sdk, response)
+
+        assert isinstance(error, subject.ProvisioningServiceErrorDetailsException)
+        assert error.response.status_code == 400
+        assert error.error.error_code == 400000
+
+
 def generate_registration_state_show():
     payload = {'registrationId': enrollment_id, 'status': 'assigned', 'etag': etag, 'assignedHub': 'myHub',
                'deviceId': 'myDevice'}
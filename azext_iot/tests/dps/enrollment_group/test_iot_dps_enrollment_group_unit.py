@@ -798,6 +798,27 @@ class TestRegistrationList():
         else:
             assert len(pagingserviceclient.calls) == 2
 
+    @pytest.mark.parametrize("top", [None, 6])
+    def test_registration_list_stream(self, pagingserviceclient, fixture_cmd, capsys, top):
+        result = subject.iot_dps_registration_list(
+            cmd=fixture_cmd,
+            dps_name=mock_dps_target['entity'],
+            enrollment_id=enrollment_id,
+            resource_group_name=resource_group,
+            top=top,
+            fields=["registrationId", "assignedHub", "etag.missing", "missing"],
+            stream=True,
+        )
+        assert result is None
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == (top or 7)
+        for line in lines:
+            assert json.loads(line) == {"registrationId": registration_id, "assignedHub": "myHub"}
+        # the continuation page request carries the token and remaining item count
+        assert pagingserviceclient.calls[1].request.headers["x-ms-continuation"] == "continuation_token123"
+        if top:
+            assert pagingserviceclient.calls[1].request.headers["x-ms-max-item-count"] == "2"
+
     def test_registration_list_error(self, fixture_cmd):
         with pytest.raises(CLIError):
             subject.iot_dps_registration_list(
@@ -859,3 +880,85 @@ class TestComputeDeviceKey():
         ).decode()
         offline_device_key = offline_device_key.strip("\"'\n")
         assert offline_device_key == GENERATED_KEY
+
+    @pytest.mark.parametrize("output_format", ["csv", "ndjson"])
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_offline_compute_device_key_batch(self, fixture_cmd, mocker, tmp_path, output_format, max_workers):
+        # use small chunks so the batch spans several of them
+        mocker.patch.object(subject, "DEVICE_KEY_BATCH_CHUNK_SIZE", 3)
+        registration_file = tmp_path / "registrations.txt"
+        registration_ids = ["device-{}".format(i) for i in range(10)] + [TEST_KEY_REGISTRATION_ID]
+        registration_file.write_text("\n".join(registration_ids) + "\n\n")
+        output_file = tmp_path / "keys.{}".format(output_format)
+
+        result = subject.iot_dps_compute_device_key(
+            cmd=fixture_cmd,
+            symmetric_key=TEST_ENDORSEMENT_KEY,
+            registration_id_file=str(registration_file),
+            output_file=str(output_file),
+            output_format=output_format,
+            max_workers=max_workers,
+        )
+        assert result["count"] == len(registration_ids)
+        assert result["outputFile"] == str(output_file)
+
+        if output_format == "csv":
+            import csv
+            with open(output_file, newline="") as f:
+                content = f.read()
+            # rows use unix line endings, consistent with ndjson output
+            assert "\r" not in content
+            rows = list(csv.DictReader(content.splitlines()))
+        else:
+            rows = [json.loads(line) for line in output_file.read_text().splitlines()]
+
+        assert [row["registrationId"] for row in rows] == registration_ids
+        assert rows[-1]["deviceKey"] == GENERATED_KEY
+        for row in rows:
+            assert row["deviceKey"] == subject.compute_device_key(
+                TEST_ENDORSEMENT_KEY, row["registrationId"]
+            ).decode()
+
+    def test_offline_compute_device_key_pattern_stdout(self, fixture_cmd, capsys):
+        result = subject.iot_dps_compute_device_key(
+            cmd=fixture_cmd,
+            symmetric_key=TEST_ENDORSEMENT_KEY,
+            registration_id_pattern="device-{01..03}",
+            output_format="ndjson",
+        )
+        assert result is None
+        rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [row["registrationId"] for row in rows] == ["device-01", "device-02", "device-03"]
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {},
+            {"registration_id": TEST_KEY_REGISTRATION_ID, "registration_id_pattern": "device-{1..2}"},
+            {"registration_id_pattern": "device-{1..2}", "max_workers": -1},
+        ],
+    )
+    def test_compute_device_key_invalid(self, fixture_cmd, kwargs):
+        with pytest.raises(CLIError):
+            subject.iot_dps_compute_device_key(cmd=fixture_cmd, symmetric_key=TEST_ENDORSEMENT_KEY, **kwargs)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"registration_id_pattern": "device-{5..1}"}, {"registration_id_file": "missing-registrations.txt"}],
+    )
+    def test_compute_device_key_invalid_ids_before_service(self, fixture_cmd, mocker, tmp_path, kwargs):
+        discovery = mocker.patch.object(subject, "DPSDiscovery")
+        get_group_key = mocker.patch.object(subject, "_get_enrollment_group_symmetric_key")
+        output_file = tmp_path / "keys.csv"
+        with pytest.raises(CLIError):
+            subject.iot_dps_compute_device_key(
+                cmd=fixture_cmd,
+                dps_name=mock_dps_target['entity'],
+                enrollment_id=enrollment_id,
+                output_file=str(output_file),
+                **kwargs
+            )
+        # the id source is validated before the group key is fetched or the output file is created
+        discovery.assert_not_called()
+        get_group_key.assert_not_called()
+        assert not output_file.exists()
@@ -16,6 +16,7 @@ import json
 import os
 import responses
 import re
+from functools import partial
 from azext_iot.operations import hub as subject
 from azext_iot.common.utility import read_file_content
 from azext_iot.common.sas_token_auth import SasTokenAuthentication
@@ -718,6 +719,106 @@ class TestDeviceRegenerateKey:
         )
         assert minclient.call_count == (num_throttles + 1)
 
+    def test_device_bulk_key_regenerate_checkpoint(self, mocker, fixture_cmd, minclient, tmp_path):
+        mocker.patch("time.sleep")
+        device_ids = ["device-{}".format(i) for i in range(150)]
+        checkpoint_file = tmp_path / "checkpoint.ndjson"
+        renew_keys = partial(
+            subject.iot_device_key_regenerate,
+            cmd=fixture_cmd,
+            hub_name_or_hostname=mock_target["entity"],
+            device_ids=device_ids,
+            renew_key_type="primary",
+            checkpoint_file=str(checkpoint_file),
+        )
+
+        def _rotated(ids):
+            return build_mock_response(mocker, 200, {
+                "policyKey": "primaryKey",
+                "rotatedKeys": [{"id": i, "primaryKey": "key"} for i in ids],
+                "errors": []
+            })
+
+        # the second batch fails, interrupting the run
+        minclient.side_effect = [_rotated(device_ids[:100]), build_mock_response(mocker, 500, {})]
+        with pytest.raises(CLIError):
+            renew_keys()
+        checkpoint = checkpoint_file.read_text()
+        assert "primaryKey" in checkpoint
+        assert '"key"' not in checkpoint
+
+        # a partially written record is ignored and devices already rotated are not rotated again
+        checkpoint_file.write_text(checkpoint + '{"rotated": [["device-1')
+        minclient.side_effect = [_rotated(device_ids[100:])]
+        result = renew_keys()
+        body = minclient.call_args_list[-1][0][2]
+        assert [device["id"] for device in body["devices"]] == device_ids[100:]
+        assert result["skipped"] == 100
+        assert len(result["rotatedKeys"]) == 50
+
+        # everything was rotated, nothing else is sent
+        call_count = minclient.call_count
+        result = renew_keys()
+        assert minclient.call_count == call_count
+        assert result["skipped"] == 150
+
+        # checkpoints cannot be reused for a different key type
+        with pytest.raises(CLIError):
+            renew_keys(renew_key_type="secondary")
+
+    @pytest.mark.parametrize("interrupt", [KeyboardInterrupt, ValueError])
+    def test_device_bulk_key_regenerate_checkpoint_interrupted(
+        self, mocker, fixture_cmd, minclient, tmp_path, interrupt
+    ):
+        device_ids = ["device-{}".format(i) for i in range(250)]
+        checkpoint_file = tmp_path / "checkpoint.ndjson"
+
+        def _regenerate(request, headers, body, **kwargs):
+            ids = [device["id"] for device in body["devices"]]
+            if ids[0] == "device-100":
+                raise interrupt()
+            return build_mock_response(mocker, 200, {
+                "policyKey": "primaryKey",
+                "rotatedKeys": [{"id": i, "primaryKey": "key"} for i in ids],
+                "errors": []
+            })
+
+        minclient.side_effect = _regenerate
+        with pytest.raises(interrupt):
+            subject.iot_device_key_regenerate(
+                cmd=fixture_cmd,
+                hub_name_or_hostname=mock_target["entity"],
+                device_ids=device_ids,
+                renew_key_type="primary",
+                checkpoint_file=str(checkpoint_file),
+                max_workers=2,
+            )
+
+        # batches completed alongside the failed batch are recorded
+        records = [json.loads(line) for line in checkpoint_file.read_text().splitlines()]
+        rotated = [device_id for record in records[1:] for device_id, _ in record["rotated"]]
+        assert sorted(rotated) == sorted(device_ids[:100] + device_ids[200:])
+
+    def test_adaptive_concurrency(self):
+        concurrency = subject._AdaptiveConcurrency(max_limit=4)
+        assert concurrency.limit == 1
+
+        # additive increase after a full limit of successes
+        for _ in range(1 + 2 + 3):
+            concurrency.succeeded()
+        assert concurrency.limit == 4
+        concurrency.succeeded()
+        assert concurrency.limit == 4
+
+        # multiplicative decrease, once for requests sent at the same limit
+        generation = concurrency.generation
+        concurrency.throttled(generation)
+        concurrency.throttled(generation)
+        assert concurrency.limit == 2
+        concurrency.throttled(concurrency.generation)
+        concurrency.throttled(concurrency.generation)
+        assert concurrency.limit == 1
+
     def test_device_key_regenerate_swap_errors(
         self, mocker, fixture_cmd, minclient
     ):
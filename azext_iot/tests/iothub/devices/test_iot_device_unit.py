@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------------------------
 
 import pytest
+from functools import partial
 import json
 import responses
 import re
@@ -424,6 +425,280 @@ class TestCloudToDeviceMessaging:
         assert not result.module_id
 
 
+class TestCloudToDeviceMessageSendBatch:
+    @pytest.fixture
+    def send_client(self, mocker, fixture_ghcs):
+        from uamqp.constants import MessageState
+
+        mocker.patch("azext_iot.common.deps.ensure_uamqp")
+        mocker.patch(
+            "azext_iot.monitor.event._get_endpoint_and_token_auth", return_value=("target", mocker.MagicMock())
+        )
+        mocker.patch("azext_iot.monitor.event.C2D_SEND_BATCH_SIZE", 2)
+        client = mocker.patch("azext_iot.monitor.event.uamqp.SendClient").return_value
+        queued = []
+        client.queue_message.side_effect = lambda *messages: queued.extend(messages)
+
+        def _send_all_messages(close_on_done):
+            # fail any message sent to the "bad" device
+            states = [
+                MessageState.SendFailed if m.properties.to.endswith(b"/bad/messages/devicebound")
+                else MessageState.SendComplete
+                for m in queued
+            ]
+            queued.clear()
+            return states
+
+        client.send_all_messages.side_effect = _send_all_messages
+        return client
+
+    def test_c2d_message_send_batch(self, fixture_cmd, send_client, tmp_path):
+        targets_file = tmp_path / "targets.txt"
+        targets_file.write_text(
+            "\n".join(
+                [
+                    "device3",
+                    "",
+                    json.dumps({"deviceId": "bad", "data": "custom", "messageId": "msg-bad", "properties": "a=b"}),
+                ]
+            )
+        )
+
+        result = subject.iot_c2d_message_send_batch(
+            fixture_cmd,
+            device_ids=["device1", "device2"],
+            targets_file=str(targets_file),
+            properties="key0=value0",
+            ack="full",
+        )
+
+        # a single link is used and messages are sent in batches of the configured size
+        assert send_client.queue_message.call_count == 2
+        assert send_client.send_all_messages.call_count == 2
+        assert all(c.kwargs == {"close_on_done": False} for c in send_client.send_all_messages.call_args_list)
+        send_client.close.assert_called_once()
+
+        queued_messages = [m for c in send_client.queue_message.call_args_list for m in c.args]
+        assert [m.properties.to for m in queued_messages] == [
+            "/devices/{}/messages/devicebound".format(d).encode() for d in ["device1", "device2", "device3", "bad"]
+        ]
+        assert queued_messages[0].application_properties == {"key0": "value0", "iothub-ack": "full"}
+        assert queued_messages[3].application_properties == {"a": "b", "iothub-ack": "full"}
+        assert next(queued_messages[3].get_data()) == b"custom"
+
+        assert result["total"] == 4
+        assert result["sent"] == 3
+        assert result["failed"] == 1
+        assert [m["deviceId"] for m in result["messages"]] == ["device1", "device2", "device3", "bad"]
+        assert result["messages"][3] == {"deviceId": "bad", "messageId": "msg-bad", "state": "SendFailed"}
+        assert all(m["state"] == "SendComplete" for m in result["messages"][:3])
+
+    @pytest.mark.parametrize(
+        "device_ids, targets_content, expiry_time_utc",
+        [
+            (None, None, None),
+            (["device1"], None, "1000"),
+            (None, '{"data": "missing device id"}', None),
+            (None, "{not json", None),
+        ],
+    )
+    def test_c2d_message_send_batch_invalid(
+        self, fixture_cmd, send_client, tmp_path, device_ids, targets_content, expiry_time_utc
+    ):
+        targets_file = None
+        if targets_content:
+            targets_file = tmp_path / "targets.txt"
+            targets_file.write_text(targets_content)
+            targets_file = str(targets_file)
+
+        with pytest.raises(CLIError):
+            subject.iot_c2d_message_send_batch(
+                fixture_cmd,
+                device_ids=device_ids,
+                targets_file=targets_file,
+                expiry_time_utc=expiry_time_utc,
+            )
+        send_client.queue_message.assert_not_called()
+
+
+def build_feedback_message(mocker, records):
+    message = mocker.MagicMock()
+    message.get_data.side_effect = lambda: iter([json.dumps(records).encode("utf-8")])
+    return message
+
+
+class TestCloudToDeviceFeedback:
+    @pytest.fixture
+    def receive_client(self, mocker, fixture_ghcs):
+        mocker.patch("azext_iot.common.deps.ensure_uamqp")
+        mocker.patch(
+            "azext_iot.monitor.event._get_endpoint_and_token_auth", return_value=("source", mocker.MagicMock())
+        )
+        return mocker.patch("azext_iot.monitor.event.uamqp.ReceiveClient")
+
+    def test_monitor_feedback_wait_on_ids(self, mocker, fixture_cmd, receive_client, capsys):
+        import uamqp
+        from azext_iot.operations.hub import iot_hub_monitor_feedback
+
+        batches = [
+            [
+                build_feedback_message(
+                    mocker,
+                    [
+                        {"originalMessageId": "msg1", "deviceId": device_id, "statusCode": "Success"},
+                        {"originalMessageId": "other", "deviceId": "otherdevice", "statusCode": "Success"},
+                        {"originalMessageId": "msg2", "deviceId": device_id, "statusCode": "Rejected"},
+                    ],
+                ),
+            ],
+            uamqp.errors.AMQPConnectionError("token expired"),
+            [],
+            [
+                build_feedback_message(
+                    mocker, [{"originalMessageId": "msg3", "deviceId": device_id, "statusCode": "Success"}]
+                )
+            ],
+        ]
+        client = receive_client.return_value
+        client.receive_message_batch.side_effect = batches
+
+        result = iot_hub_monitor_feedback(
+            fixture_cmd, device_id=device_id, wait_on_id=["msg1", "msg2", "msg3"], timeout=0
+        )
+
+        # the connection is re-established after the token expires
+        assert receive_client.call_count == 2
+        assert client.close.call_count == 2
+        assert receive_client.call_args.kwargs["auto_complete"] is False
+        for batch in batches:
+            if isinstance(batch, list):
+                for message in batch:
+                    message.accept.assert_called_once()
+
+        # records for other devices are filtered out
+        output = capsys.readouterr().out
+        assert "originalMessageId: msg1" in output
+        assert "originalMessageId: other" not in output
+
+        assert result["tracked"] == 3
+        assert result["received"] == 3
+        assert result["outstanding"] == []
+        assert result["outcomes"] == {"Success": 2, "Rejected": 1}
+        assert result["reconnects"] == 1
+        assert result["latencyMs"] == {}
+
+    def test_monitor_feedback_timeout(self, fixture_cmd, receive_client):
+        from azext_iot.operations.hub import iot_hub_monitor_feedback
+
+        receive_client.return_value.receive_message_batch.return_value = []
+
+        result = iot_hub_monitor_feedback(fixture_cmd, wait_on_id=["msg1"], timeout=1)
+        assert result["received"] == 0
+        assert result["outstanding"] == ["msg1"]
+
+    def test_monitor_feedback_single_id(self, mocker, fixture_cmd, receive_client):
+        from azext_iot.operations.hub import iot_hub_monitor_feedback
+
+        receive_client.return_value.receive_message_batch.return_value = [
+            build_feedback_message(mocker, [{"originalMessageId": "msg1", "statusCode": "Success"}])
+        ]
+
+        # without a timeout, waiting on a single message has no output
+        assert iot_hub_monitor_feedback(fixture_cmd, wait_on_id=["msg1"]) is None
+        assert receive_client.return_value.receive_message_batch.call_count == 1
+
+    def test_monitor_feedback_no_wait_expiry(self, mocker, fixture_cmd, receive_client):
+        import uamqp
+        from azext_iot.operations.hub import iot_hub_monitor_feedback
+
+        receive_client.return_value.receive_message_batch.side_effect = [
+            [build_feedback_message(mocker, [{"originalMessageId": "msg1", "statusCode": "Success"}])],
+            uamqp.errors.AMQPConnectionError("token expired"),
+        ]
+
+        # with nothing to wait on, the monitor stops when the connection expires
+        assert iot_hub_monitor_feedback(fixture_cmd) is None
+        assert receive_client.call_count == 1
+        receive_client.return_value.close.assert_called_once()
+
+    def test_monitor_feedback_connection_failures(self, fixture_cmd, receive_client):
+        import uamqp
+        from azext_iot.operations.hub import iot_hub_monitor_feedback
+
+        receive_client.return_value.receive_message_batch.side_effect = uamqp.errors.AMQPConnectionError("failed")
+
+        with pytest.raises(uamqp.errors.AMQPConnectionError):
+            iot_hub_monitor_feedback(fixture_cmd, wait_on_id=["msg1"])
+        assert receive_client.call_count == 3
+
+    def test_c2d_message_send_batch_wait(self, mocker, fixture_cmd, receive_client, tmp_path):
+        from uamqp.constants import MessageState
+
+        mocker.patch("azext_iot.monitor.event._get_endpoint_and_token_auth", return_value=("target", None))
+        send_client = mocker.patch("azext_iot.monitor.event.uamqp.SendClient").return_value
+        send_client.send_all_messages.side_effect = lambda close_on_done: [
+            MessageState.SendComplete for _ in send_client.queue_message.call_args.args
+        ]
+
+        def _receive_message_batch(max_batch_size, timeout, device_ids=None):
+            queued = [
+                m for m in send_client.queue_message.call_args.args
+                if not device_ids or m.properties.to.decode("utf-8").split("/")[2] in device_ids
+            ]
+            return [
+                build_feedback_message(
+                    mocker,
+                    [
+                        {
+                            "originalMessageId": m.properties.message_id.decode("utf-8"),
+                            "deviceId": m.properties.to.decode("utf-8").split("/")[2],
+                            "statusCode": "Success",
+                            "enqueuedTimeUtc": "2000-01-01T00:00:00.0000000Z",
+                        }
+                        for m in queued
+                    ],
+                )
+            ]
+
+        receive_client.return_value.receive_message_batch.side_effect = _receive_message_batch
+
+        with pytest.raises(CLIError):
+            subject.iot_c2d_message_send_batch(fixture_cmd, device_ids=["device1"], wait_on_feedback=True)
+
+        result = subject.iot_c2d_message_send_batch(
+            fixture_cmd, device_ids=["device1", "device2"], ack="positive", wait_on_feedback=True
+        )
+        assert result["sent"] == 2
+        feedback = result["feedback"]
+        assert feedback["tracked"] == 2
+        assert feedback["outcomes"] == {"Success": 2}
+        # feedback enqueued before the message was sent is reported as zero latency
+        assert feedback["latencyMs"] == {"p50": 0, "p90": 0, "p95": 0, "p99": 0, "max": 0}
+
+        # acks are resolved per target and negative acks do not hold the wait open
+        targets_file = tmp_path / "targets.txt"
+        targets_file.write_text(
+            "\n".join(
+                json.dumps(target)
+                for target in [
+                    {"deviceId": "device1", "ack": "full"},
+                    {"deviceId": "device2", "ack": "negative"},
+                    {"deviceId": "device3"},
+                ]
+            )
+        )
+        # only the full ack message receives feedback
+        receive_client.return_value.receive_message_batch.side_effect = partial(
+            _receive_message_batch, device_ids=["device1"]
+        )
+        result = subject.iot_c2d_message_send_batch(fixture_cmd, targets_file=str(targets_file), wait_on_feedback=True)
+        assert result["sent"] == 3
+        feedback = result["feedback"]
+        assert feedback["tracked"] == 2
+        assert feedback["received"] == 1
+        assert feedback["outstanding"] == []
+
+
 class TestDeviceSimulate:
     @pytest.fixture(params=[204])
     def serviceclient(
@@ -580,3 +855,176 @@ class TestMQTTClientSetup:
                 "passphrase": "pass"
             }
         )
+
+
+class TestDeviceSimulateLoad:
+    load_device_ids = ["loadtest-1", "loadtest-2", "loadtest-3", "other-1"]
+
+    @pytest.fixture()
+    def service_client(self, mocked_response, fixture_ghcs, fixture_sas):
+        mocked_response.assert_all_requests_are_fired = False
+        devices_url = f"https://{mock_target['entity']}/devices"
+
+        def _query_callback(request):
+            # emulate the service applying a STARTSWITH filter and top
+            query = json.loads(request.body)["query"]
+            prefix = re.search(r"STARTSWITH\(deviceId, '(.*)'\)", query)
+            device_ids = [d for d in self.load_device_ids if not prefix or d.startswith(prefix.group(1))]
+            top = request.headers.get("x-ms-max-item-count")
+            if top:
+                device_ids = device_ids[:int(top)]
+            return (200, {}, json.dumps([{"deviceId": d} for d in device_ids]))
+
+        mocked_response.add_callback(
+            method=responses.POST,
+            url=f"{devices_url}/query",
+            callback=_query_callback,
+            content_type="application/json",
+            match_querystring=False,
+        )
+        for load_device_id in self.load_device_ids:
+            mocked_response.add(
+                method=responses.GET,
+                url=f"{devices_url}/{load_device_id}",
+                body=json.dumps(
+                    {
+                        "deviceId": load_device_id,
+                        "authentication": {
+                            "type": "selfSigned" if load_device_id == "loadtest-3" else "sas",
+                            "symmetricKey": {"primaryKey": "cHJpbWFyeUtleQ==", "secondaryKey": "c2Vjb25kYXJ5S2V5"},
+                        },
+                    }
+                ),
+                status=200,
+                content_type="application/json",
+                match_querystring=False,
+            )
+        yield mocked_response
+
+    @pytest.fixture()
+    def async_device_clients(self, mocker):
+        from unittest.mock import AsyncMock, MagicMock
+
+        clients = {}
+
+        def _create_client(connection_string, **kwargs):
+            client = MagicMock()
+            client.connect = AsyncMock()
+            client.send_message = AsyncMock()
+            client.shutdown = AsyncMock()
+            client.create_kwargs = kwargs
+            clients[connection_string.split(";")[1].split("=")[1]] = client
+            return client
+
+        mocker.patch(
+            "azure.iot.device.aio.IoTHubDeviceClient.create_from_connection_string", side_effect=_create_client
+        )
+        return clients
+
+    @pytest.mark.parametrize(
+        "device_prefix, msg_count, burst_size, payload_size, expected_devices",
+        [
+            ("loadtest", 10, 1, None, ["loadtest-1", "loadtest-2"]),
+            (None, 9, 4, 512, ["loadtest-1", "loadtest-2", "other-1"]),
+        ],
+    )
+    def test_device_simulate_load(
+        self, service_client, async_device_clients, device_prefix, msg_count, burst_size, payload_size, expected_devices
+    ):
+        result = subject.iot_simulate_device_load(
+            cmd=fixture_cmd,
+            hub_name_or_hostname=mock_target["entity"],
+            device_prefix=device_prefix,
+            msg_count=msg_count,
+            rate=1000,
+            burst_size=burst_size,
+            payload_size=payload_size,
+            properties="myprop=myvalue",
+        )
+
+        # x509 devices are skipped
+        assert sorted(async_device_clients.keys()) == expected_devices
+        assert result["devices"] == result["connectedDevices"] == len(expected_devices)
+        assert result["messagesSent"] == msg_count
+        assert result["messagesFailed"] == 0
+        assert set(result["latencyMs"].keys()) == {"p50", "p90", "p95", "p99", "max"}
+
+        sent_messages = []
+        for client in async_device_clients.values():
+            client.connect.assert_awaited_once()
+            client.shutdown.assert_awaited_once()
+            sent_messages.extend(call.args[0] for call in client.send_message.await_args_list)
+        # messages are spread round-robin across devices
+        assert all(
+            client.send_message.await_count in [msg_count // len(expected_devices), -(-msg_count // len(expected_devices))]
+            for client in async_device_clients.values()
+        )
+        assert len(sent_messages) == msg_count
+        for message in sent_messages:
+            assert message.custom_properties == {"$.ct": "application/json", "$.ce": "utf-8", "myprop": "myvalue"}
+            if payload_size:
+                assert len(message.data) == payload_size
+
+    @pytest.mark.parametrize("websockets", [False, True])
+    def test_device_simulate_load_prefix_query(self, service_client, async_device_clients, websockets):
+        result = subject.iot_simulate_device_load(
+            cmd=fixture_cmd,
+            hub_name_or_hostname=mock_target["entity"],
+            device_prefix="loadtest",
+            max_devices=1,
+            msg_count=2,
+            rate=1000,
+            websockets=websockets,
+        )
+        # the prefix filter and device limit are applied by the service
+        query_request = service_client.calls[0].request
+        assert json.loads(query_request.body)["query"] == (
+            "SELECT deviceId FROM devices WHERE STARTSWITH(deviceId, 'loadtest')"
+        )
+        assert query_request.headers["x-ms-max-item-count"] == "1"
+        assert list(async_device_clients.keys()) == ["loadtest-1"]
+        assert async_device_clients["loadtest-1"].create_kwargs == {"websockets": websockets}
+        assert result["messagesSent"] == 2
+
+    def test_device_simulate_load_prefix_escaped(self, service_client, async_device_clients):
+        with pytest.raises(CLIError):
+            subject.iot_simulate_device_load(
+                cmd=fixture_cmd,
+                hub_name_or_hostname=mock_target["entity"],
+                device_prefix="load'test",
+            )
+        assert json.loads(service_client.calls[0].request.body)["query"] == (
+            "SELECT deviceId FROM devices WHERE STARTSWITH(deviceId, 'load''test')"
+        )
+
+    def test_device_simulate_load_device_file(self, service_client, async_device_clients, tmp_path):
+        device_file = tmp_path / "devices.txt"
+        device_file.write_text("other-1\n\nloadtest-1\nother-1\n")
+        result = subject.iot_simulate_device_load(
+            cmd=fixture_cmd,
+            hub_name_or_hostname=mock_target["entity"],
+            device_file=str(device_file),
+            max_devices=1,
+            msg_count=3,
+            rate=1000,
+        )
+        assert list(async_device_clients.keys()) == ["other-1"]
+        assert result["messagesSent"] == 3
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            {"device_prefix": "loadtest", "device_query": "select * from devices"},
+            {"msg_count": 0},
+            {"rate": 0},
+            {"burst_size": 0},
+            {"device_prefix": "missing"},
+        ],
+    )
+    def test_device_simulate_load_invalid_args(self, service_client, async_device_clients, args):
+        with pytest.raises(CLIError):
+            subject.iot_simulate_device_load(
+                cmd=fixture_cmd,
+                hub_name_or_hostname=mock_target["entity"],
+                **args
+            )
@@ -11,15 +11,17 @@ import pytest
 import json
 import responses
 import re
+import tarfile
 import tomli
 from shutil import rmtree
 from os.path import exists, join
 from azext_iot.common.certops import create_self_signed_certificate
 from azext_iot.common.fileops import write_content_to_file
-from azext_iot.common.shared import DeviceAuthType
+from azext_iot.common.shared import CertificateKeyType, DeviceAuthType
 from azext_iot.common.utility import process_json_arg, process_yaml_arg
 from azext_iot.sdk.iothub.service.models import ConfigurationContent
 from azext_iot.iothub import commands_device_identity as subject
+from azext_iot.iothub.providers.device_identity import generate_device_certificates
 from azext_iot.iothub.providers.helpers.edge_device_config import (
     EDGE_CONFIG_SCRIPT_APPLY,
     EDGE_CONFIG_SCRIPT_CA_CERTS,
@@ -63,18 +65,26 @@ test_certs_folder = "./test_certs"
 test_root_cert = "root-cert.pem"
 test_root_key = "root-key.pem"
 
-test_device_scopes = [
-    {"deviceId": "device_1", "deviceScope": "dev1-scope-value"},
-    {"deviceId": "device_2", "deviceScope": "dev2-scope-value"},
-    {"deviceId": "device_3", "deviceScope": "dev3-scope-value"},
-    {"deviceId": "device_4", "deviceScope": "dev4-scope-value"},
-    {"deviceId": "device_5", "deviceScope": "dev5-scope-value"},
-    {"deviceId": "device_6", "deviceScope": "dev6-scope-value"},
-    {"deviceId": "device_7", "deviceScope": "dev7-scope-value"},
-]
 test_path = getcwd()
 
 
+def create_device_identity_callback(request):
+    device = json.loads(request.body)
+    device_id = device["deviceId"]
+    return (
+        200,
+        {},
+        json.dumps(
+            {
+                "deviceId": device_id,
+                "deviceScope": f"{device_id}-scope-value",
+                "parentScopes": device.get("parentScopes", []),
+                "authentication": {"symmetricKey": {"primaryKey": "devicePrimaryKey"}},
+            }
+        ),
+    )
+
+
 class TestEdgeHierarchyCreateArgs:
     @pytest.fixture()
     def service_client(self, mocked_response, fixture_ghcs, fixture_sas):
@@ -126,15 +136,11 @@ class TestEdgeHierarchyCreateArgs:
         )
 
         # Create / Update device-identity
-        mocked_response.add(
+        mocked_response.add_callback(
             method=responses.PUT,
             url=re.compile(r"{}/dev\d+".format(devices_url)),
-            body=json.dumps(
-                {"authentication": {"symmetricKey": {"primaryKey": "devicePrimaryKey"}}}
-            ),
-            status=200,
+            callback=create_device_identity_callback,
             content_type="application/json",
-            match_querystring=False,
         )
 
         # Update config content / set modules
@@ -150,10 +156,10 @@ class TestEdgeHierarchyCreateArgs:
         yield mocked_response
 
     @pytest.mark.parametrize(
-        "devices, config, visualize, clean, auth, output",
+        "devices, config, visualize, clean, auth, output, key_type",
         [
             # basic example, default auth, should output no files
-            ([["id=dev1", "parent=dev2"], ["id=dev2"]], None, False, True, None, None),
+            ([["id=dev1", "parent=dev2"], ["id=dev2"]], None, False, True, None, None, CertificateKeyType.rsa.value),
             # Visualize, no clean, certificate auth, specified output
             (
                 [["id=dev3"]],
@@ -162,6 +168,17 @@ class TestEdgeHierarchyCreateArgs:
                 False,
                 DeviceAuthType.x509_thumbprint.value,
                 "device_bundles",
+                CertificateKeyType.rsa.value,
+            ),
+            # EC device certificates for a nested hierarchy with bundles
+            (
+                [["id=dev1"], ["id=dev2", "parent=dev1"]],
+                None,
+                False,
+                True,
+                DeviceAuthType.x509_thumbprint.value,
+                "ec_device_bundles",
+                CertificateKeyType.ec.value,
             ),
             # Flex argument processing
             (
@@ -186,6 +203,7 @@ class TestEdgeHierarchyCreateArgs:
                 True,
                 DeviceAuthType.x509_thumbprint.value,
                 "new_device_bundle_folder",
+                CertificateKeyType.rsa.value,
             ),
         ],
     )
@@ -200,6 +218,7 @@ class TestEdgeHierarchyCreateArgs:
         clean,
         auth,
         output,
+        key_type,
     ):
         subject.iot_edge_devices_create(
             cmd=fixture_cmd,
@@ -211,13 +230,31 @@ class TestEdgeHierarchyCreateArgs:
             yes=clean,
             device_auth_type=auth,
             bundle_output_path=output,
+            key_type=key_type,
         )
 
         if output:
             assert exists(output)
             for device in devices:
                 device_id = device[0].split("=")[1]
-                assert exists(join(output, f"{device_id}.tgz"))
+                bundle_path = join(output, f"{device_id}.tgz")
+                assert exists(bundle_path)
+                # no uncompressed staging folder is left behind
+                assert not exists(join(output, device_id))
+                with tarfile.open(bundle_path, "r:gz") as bundle:
+                    bundle_files = bundle.getnames()
+                    for file_name in [
+                        f"{device_id}.cert.pem",
+                        f"{device_id}.full-chain.cert.pem",
+                        EDGE_ROOT_CERTIFICATE_FILENAME,
+                        "install.sh",
+                        "README.md",
+                    ]:
+                        assert file_name in bundle_files
+                    device_toml = tomli.loads(bundle.extractfile("config.toml").read().decode("utf-8"))
+                    assert device_toml["provisioning"]["device_id"] == device_id
+                    device_key = bundle.extractfile(f"{device_id}.key.pem").read()
+                    assert (b"EC PRIVATE KEY" in device_key) == (key_type == CertificateKeyType.ec.value)
 
             rmtree(output)
 
@@ -426,20 +463,15 @@ class TestHierarchyCreateConfig:
     def service_client(self, mocked_response, fixture_ghcs, fixture_sas):
         mocked_response.assert_all_requests_are_fired = False
         devices_url = f"https://{hub_entity}/devices"
-        # get scopes (force retry)
-        for scope_response in [
-            [],  # Query existing devices
-            test_device_scopes[:-2],  # Get Scopes [missing last 2]
-            test_device_scopes  # On retry, return full list
-        ]:
-            mocked_response.add(
-                method=responses.POST,
-                url=f"{devices_url}/query",
-                body=json.dumps(scope_response),
-                status=200,
-                content_type="application/json",
-                match_querystring=False,
-            )
+        # Query existing devices
+        mocked_response.add(
+            method=responses.POST,
+            url=f"{devices_url}/query",
+            body="[]",
+            status=200,
+            content_type="application/json",
+            match_querystring=False,
+        )
 
         # delete any existing devices
         mocked_response.add(
@@ -462,15 +494,11 @@ class TestHierarchyCreateConfig:
         )
 
         # Create / Update device-identity
-        mocked_response.add(
+        mocked_response.add_callback(
             method=responses.PUT,
             url=re.compile(r"{}/device_\d+".format(devices_url)),
-            body=json.dumps(
-                {"authentication": {"symmetricKey": {"primaryKey": "devicePrimaryKey"}}}
-            ),
-            status=200,
+            callback=create_device_identity_callback,
             content_type="application/json",
-            match_querystring=False,
         )
 
         # GET specific device
@@ -498,9 +526,9 @@ class TestHierarchyCreateConfig:
         yield mocked_response
 
     @pytest.fixture()
-    def scope_retry_failed_client(self, mocked_response, fixture_ghcs, fixture_sas):
+    def missing_scope_client(self, mocked_response, fixture_ghcs, fixture_sas):
         devices_url = f"https://{hub_entity}/devices"
-        # always return empty query
+        # Query existing devices
         mocked_response.add(
             method=responses.POST,
             url=f"{devices_url}/query",
@@ -510,7 +538,7 @@ class TestHierarchyCreateConfig:
             match_querystring=False,
         )
 
-        # Create / Update device-identities
+        # Create / Update device-identities, without a device scope
         mocked_response.add(
             method=responses.PUT,
             url=re.compile(r"{}/device_\d+".format(devices_url)),
@@ -687,14 +715,38 @@ class TestHierarchyCreateConfig:
         )
 
         expected_devices = []
+        expected_parents = {}
+        expected_deployments = []
 
-        def add_device(device):
+        def add_device(device, parent_id=None):
             expected_devices.append(device["deviceId"])
+            expected_parents[device["deviceId"]] = parent_id
+            if device.get("deployment"):
+                expected_deployments.append(device["deviceId"])
             for child in device.get("children", []):
-                add_device(child)
+                add_device(child, device["deviceId"])
 
         for device in cfg_obj["edgeDevices"]:
             add_device(device)
+
+        # devices are created with parent scopes from the parent's create response, parents first
+        create_calls = [c for c in service_client.calls if c.request.method == responses.PUT]
+        created_order = []
+        for create_call in create_calls:
+            created_device = json.loads(create_call.request.body)
+            device_id = created_device["deviceId"]
+            parent_id = expected_parents[device_id]
+            assert created_device["parentScopes"] == ([f"{parent_id}-scope-value"] if parent_id else [])
+            if parent_id:
+                assert parent_id in created_order
+            created_order.append(device_id)
+        assert sorted(created_order) == sorted(expected_devices)
+        assert not [c for c in service_client.calls if c.request.method == responses.GET and "/devices/" in c.request.url]
+
+        # module content applied to every device with a deployment
+        applied = [c for c in service_client.calls if "applyConfigurationContent" in c.request.url]
+        assert len(applied) == len(expected_deployments)
+
         if out:
             assert exists(out)
             for device_id in expected_devices:
@@ -702,7 +754,7 @@ class TestHierarchyCreateConfig:
 
             rmtree(out)
 
-    def test_edge_devices_scope_retry_failure(self, fixture_cmd, scope_retry_failed_client, set_cwd):
+    def test_edge_devices_missing_scope_failure(self, fixture_cmd, missing_scope_client, set_cwd):
         with pytest.raises(AzureResponseError):
             subject.iot_edge_devices_create(
                 cmd=fixture_cmd,
@@ -1240,6 +1292,40 @@ class TestEdgeHierarchyConfigFunctions:
 
         assert script_content == "\n".join(segments)
 
+    @pytest.mark.parametrize(
+        "hub_cert_auth, key_type",
+        [
+            (False, CertificateKeyType.rsa.value),
+            (True, CertificateKeyType.ec.value),
+        ],
+    )
+    def test_generate_device_certificates(self, hub_cert_auth, key_type):
+        from cryptography import x509
+        from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+        root_cert = create_self_signed_certificate(
+            subject=EDGE_ROOT_CERTIFICATE_SUBJECT,
+            v3_extensions=True
+        )
+        device_certs = generate_device_certificates(
+            device_id=self.test_device_id,
+            root_cert=root_cert,
+            hub_cert_auth=hub_cert_auth,
+            key_type=key_type,
+        )
+        expected_key_class = ec.EllipticCurvePublicKey if key_type == CertificateKeyType.ec.value else rsa.RSAPublicKey
+
+        device_cert = x509.load_pem_x509_certificate(device_certs["deviceCert"]["certificate"].encode("utf-8"))
+        root = x509.load_pem_x509_certificate(root_cert["certificate"].encode("utf-8"))
+        assert device_cert.issuer == root.subject
+        assert isinstance(device_cert.public_key(), expected_key_class)
+
+        assert ("hubAuthCert" in device_certs) == hub_cert_auth
+        if hub_cert_auth:
+            hub_cert = x509.load_pem_x509_certificate(device_certs["hubAuthCert"]["certificate"].encode("utf-8"))
+            assert isinstance(hub_cert.public_key(), expected_key_class)
+            assert device_certs["hubAuthCert"]["thumbprint"] != device_certs["deviceCert"]["thumbprint"]
+
 
 class TestDevicesDelete:
     @pytest.fixture()
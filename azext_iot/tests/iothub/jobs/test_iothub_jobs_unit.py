@@ -957,3 +957,134 @@ class TestJobList:
     def test_job_list_error(self, fixture_cmd, serviceclient_generic_error):
         with pytest.raises(CLIError):
             subject.job_list(cmd=fixture_cmd, hub_name_or_hostname=mock_target["entity"])
+
+
+def generate_job_progress(job_id, job_status, device_count=0, done_count=0):
+    return {
+        "jobId": job_id,
+        "status": job_status,
+        "type": JobType.scheduleUpdateTwin.value,
+        "deviceJobStatistics": {
+            "deviceCount": device_count,
+            "failedCount": 0,
+            "pendingCount": device_count - done_count,
+            "runningCount": 0,
+            "succeededCount": done_count,
+        },
+    }
+
+
+class TestJobWatch:
+    @pytest.fixture
+    def clock(self, mocker):
+        clock = {"now": 0.0, "sleeps": []}
+
+        def _sleep(seconds):
+            clock["sleeps"].append(seconds)
+            clock["now"] += seconds
+
+        mocker.patch("azext_iot.iothub.providers.job.monotonic", side_effect=lambda: clock["now"])
+        mocker.patch("azext_iot.iothub.providers.job.sleep", side_effect=_sleep)
+        return clock
+
+    def test_job_watcher_adaptive_intervals(self, clock):
+        from azext_iot.iothub.providers.job import JobWatcher
+
+        responses = {
+            "queued-job": [
+                generate_job_progress("queued-job", JobStatusType.queued.value),
+                generate_job_progress("queued-job", JobStatusType.queued.value),
+                generate_job_progress("queued-job", JobStatusType.cancelled.value),
+            ],
+            "running-job": [
+                generate_job_progress("running-job", JobStatusType.running.value, 100, 10),
+                generate_job_progress("running-job", JobStatusType.running.value, 100, 60),
+                generate_job_progress("running-job", JobStatusType.running.value, 100, 95),
+                generate_job_progress("running-job", JobStatusType.completed.value, 100, 100),
+            ],
+        }
+        polls = []
+
+        def _get_job(job_id):
+            polls.append((clock["now"], job_id))
+            return responses[job_id].pop(0)
+
+        watcher = JobWatcher(
+            get_job=_get_job, job_ids=["queued-job", "running-job", "queued-job"], poll_interval=10, poll_duration=600
+        )
+        progress = list(watcher.watch())
+
+        # duplicate job ids are watched once and every job is polled until it reaches a terminal status
+        assert not any(responses.values())
+        assert watcher.pending == []
+        assert watcher.jobs["queued-job"]["status"] == JobStatusType.cancelled.value
+        assert watcher.jobs["running-job"]["status"] == JobStatusType.completed.value
+
+        # queued jobs back off, running jobs are polled sooner as they near completion
+        queued_polls = [now for now, job_id in polls if job_id == "queued-job"]
+        running_polls = [now for now, job_id in polls if job_id == "running-job"]
+        assert queued_polls == [0, 20, 60]
+        assert running_polls == [0, 10, 14, 15]
+
+        # unchanged queued job status is not reported again
+        assert [(p["jobId"], p["status"]) for p in progress] == [
+            ("queued-job", JobStatusType.queued.value),
+            ("running-job", JobStatusType.running.value),
+            ("running-job", JobStatusType.running.value),
+            ("running-job", JobStatusType.running.value),
+            ("running-job", JobStatusType.completed.value),
+            ("queued-job", JobStatusType.cancelled.value),
+        ]
+        assert progress[2]["percentComplete"] == 60.0
+        assert progress[-1]["nextPollSeconds"] is None
+
+        summary = watcher.summary()
+        assert summary["jobs"] == 2
+        assert summary["polls"] == 7
+        assert summary["statuses"] == {JobStatusType.cancelled.value: 1, JobStatusType.completed.value: 1}
+
+    def test_job_watcher_poll_duration(self, clock):
+        from azext_iot.iothub.providers.job import JobWatcher
+
+        watcher = JobWatcher(
+            get_job=lambda job_id: generate_job_progress(job_id, JobStatusType.scheduled.value),
+            job_ids=["myjob"],
+            poll_interval=10,
+            poll_duration=100,
+        )
+        assert len(list(watcher.watch())) == 1
+        assert clock["sleeps"] == [20, 40]
+        assert watcher.pending == ["myjob"]
+
+    def test_job_watch_throttled(self, fixture_cmd, mocker, fixture_ghcs, fixture_sas, clock, tmp_path):
+        service_client = mocker.patch(path_service_client)
+        service_client.side_effect = [
+            build_mock_response(mocker, 429, {"error": "throttled"}, headers={"Retry-After": "30"}),
+            build_mock_response(mocker, 200, generate_job_progress("myjob", JobStatusType.running.value, 4, 1)),
+            build_mock_response(mocker, 429, {"error": "throttled"}),
+            build_mock_response(mocker, 200, generate_job_progress("myjob", JobStatusType.completed.value, 4, 4)),
+        ]
+        output_file = tmp_path / "progress.ndjson"
+
+        result = subject.job_watch(
+            cmd=fixture_cmd,
+            job_ids=["myjob"],
+            output_file=str(output_file),
+            poll_interval=10,
+            hub_name_or_hostname=mock_target["entity"],
+        )
+
+        # retry after is honored, later throttling backs off from the poll interval
+        assert clock["sleeps"] == [30, 10, 10]
+        assert result["throttled"] == 2
+        assert result["polls"] == 2
+        assert result["pending"] == []
+        assert result["outputFile"] == str(output_file)
+
+        progress = [json.loads(line) for line in output_file.read_text().splitlines()]
+        assert [p["status"] for p in progress] == [JobStatusType.running.value, JobStatusType.completed.value]
+        assert progress[0]["percentComplete"] == 25.0
+
+    def test_job_watch_error(self, fixture_cmd, serviceclient_generic_error):
+        with pytest.raises(CLIError):
+            subject.job_watch(cmd=fixture_cmd, job_ids=["myjob"], hub_name_or_hostname=mock_target["entity"])
@@ -0,0 +1,179 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import pytest
+import azext_iot.iothub.commands_message_route as subject
+from azure.cli.core.azclierror import MutuallyExclusiveArgumentError
+from azure.mgmt.iothub.models import FallbackRouteProperties, RouteProperties
+from azext_iot.iothub.providers.routing_query import (
+    UNDEFINED,
+    RouteMessage,
+    RoutingQueryError,
+    compile_route_condition,
+)
+
+hub_name = "hubname"
+hub_rg = "hubrg"
+path_find_resource = "azext_iot.iothub.providers.discovery.IotHubDiscovery.find_resource"
+
+json_system_properties = {"contentType": "application/json", "contentEncoding": "utf-8"}
+sample_message = RouteMessage(
+    body=json.dumps({"temperature": 30, "weather": {"history": [{"month": "Feb"}]}}),
+    app_properties={"processingPath": "hot", "level": 3},
+    system_properties=dict(json_system_properties, **{"iothub-connection-device-id": "sensor-1"}),
+    twin={"tags": {"floor": 1}, "properties": {"desired": {"frequency": "5m"}}},
+)
+
+
+class TestRoutingQuery:
+    @pytest.mark.parametrize(
+        "condition, expected",
+        [
+            ("", True),
+            ("true", True),
+            ("false", False),
+            ("processingPath = 'hot'", True),
+            ("processingPath <> 'hot'", False),
+            ("level >= 3 AND level < 4.5", True),
+            ("$connectionDeviceId = 'sensor-1'", True),
+            ("$contentType = 'application/json'", True),
+            ("$body.temperature > 25", True),
+            ("$body.weather.history[0].month = 'Feb'", True),
+            ("$body.weather.history[1].month = 'Feb'", UNDEFINED),
+            ("$twin.tags.floor = 1 AND $twin.properties.desired.frequency = '5m'", True),
+            # mismatched types and missing references are undefined
+            ("$body.temperature = '30'", UNDEFINED),
+            ("missing = 1", UNDEFINED),
+            ("NOT missing = 1", UNDEFINED),
+            ("missing = 1 OR processingPath = 'hot'", True),
+            ("missing = 1 AND processingPath = 'cold'", False),
+            ("NOT IS_DEFINED(missing) and is_string(processingPath)", True),
+            ("(level + 2) * 2 = 10 AND -level = -3 AND level % 2 = 1", True),
+            ("UPPER(processingPath) = 'HOT' AND LENGTH(CONCAT(processingPath, '-', 'path')) = 8", True),
+            ("STARTS_WITH($connectionDeviceId, 'sensor') AND CONTAINS(processingPath, 'o')", True),
+            ("SUBSTRING(processingPath, 1, 2) = 'ot' AND INDEX_OF(processingPath, 't') = 2", True),
+            ("ABS(-2) = 2 AND FLOOR(2.5) = 2 AND SQRT(level * 3) = 3", True),
+        ],
+    )
+    def test_evaluate(self, condition, expected):
+        assert compile_route_condition(condition).evaluate(sample_message) is expected
+
+    def test_body_requires_json_content(self):
+        condition = compile_route_condition("$body.temperature = 30")
+        assert condition.matches(RouteMessage(body='{"temperature": 30}', system_properties=json_system_properties))
+        assert condition.evaluate(RouteMessage(body='{"temperature": 30}')) is UNDEFINED
+        assert condition.evaluate(
+            RouteMessage(body="not json", system_properties=json_system_properties)
+        ) is UNDEFINED
+
+    @pytest.mark.parametrize(
+        "condition", ["level = ", "level == 1", "(level = 1", "unknown(level)", "length(level, 1)", "level = 1 1"]
+    )
+    def test_compile_error(self, condition):
+        with pytest.raises(RoutingQueryError):
+            compile_route_condition(condition)
+
+
+@pytest.fixture()
+def fixture_routes(mocker):
+    find_resource = mocker.patch(path_find_resource, autospec=True)
+    hub_mock = mocker.MagicMock()
+    hub_mock.properties.routing.routes = [
+        RouteProperties(
+            name="hot", source="DeviceMessages", endpoint_names=["hot"], is_enabled=True,
+            condition="processingPath = 'hot'",
+        ),
+        RouteProperties(
+            name="warm", source="DeviceMessages", endpoint_names=["warm"], is_enabled=True,
+            condition="$body.temperature > 25",
+        ),
+        RouteProperties(
+            name="disabled", source="DeviceMessages", endpoint_names=["events"], is_enabled=False, condition="true",
+        ),
+        RouteProperties(
+            name="twin", source="TwinChangeEvents", endpoint_names=["events"], is_enabled=True, condition="true",
+        ),
+        RouteProperties(
+            name="invalid", source="DeviceMessages", endpoint_names=["events"], is_enabled=True, condition="a ==",
+        ),
+    ]
+    hub_mock.properties.routing.fallback_route = FallbackRouteProperties(
+        name="$fallback", source="DeviceMessages", endpoint_names=["events"], is_enabled=True, condition="true",
+    )
+
+    def initialize_mock_client(self, *args):
+        self.client = mocker.MagicMock()
+        return hub_mock
+
+    find_resource.side_effect = initialize_mock_client
+    yield find_resource
+
+
+class TestMessageRouteTest:
+    def _route_names(self, result):
+        return [route["properties"].name for route in result["routes"]]
+
+    def test_route(self, fixture_cmd, fixture_routes):
+        result = subject.message_route_test(
+            cmd=fixture_cmd, hub_name=hub_name, route_name="hot", app_properties='{"processingPath": "hot"}'
+        )
+        assert result["result"] == "true"
+
+        result = subject.message_route_test(cmd=fixture_cmd, hub_name=hub_name, route_name="warm")
+        assert result["result"] == "undefined"
+
+        result = subject.message_route_test(cmd=fixture_cmd, hub_name=hub_name, route_name="invalid")
+        assert result["result"] == "undefined"
+        assert result["details"]["compilationErrors"]
+
+    def test_all_routes(self, fixture_cmd, fixture_routes):
+        result = subject.message_route_test(
+            cmd=fixture_cmd,
+            hub_name=hub_name,
+            body='{"temperature": 30}',
+            system_properties=json.dumps(json_system_properties),
+        )
+        assert self._route_names(result) == ["warm", "twin"]
+
+        # messages matching no device message route are sent to the fallback route
+        result = subject.message_route_test(cmd=fixture_cmd, hub_name=hub_name, source_type="DeviceMessages")
+        assert self._route_names(result) == ["$fallback"]
+
+        result = subject.message_route_test(cmd=fixture_cmd, hub_name=hub_name, source_type="TwinChangeEvents")
+        assert self._route_names(result) == ["twin"]
+
+    def test_messages_file(self, fixture_cmd, fixture_routes, tmp_path):
+        messages_file = tmp_path / "messages.ndjson"
+        messages = [
+            {"appProperties": {"processingPath": "hot"}},
+            {"body": {"temperature": 30}, "systemProperties": json_system_properties},
+            {"body": {"temperature": 20}, "systemProperties": json_system_properties},
+        ]
+        messages_file.write_text("\n".join(json.dumps(message) for message in messages))
+
+        result = subject.message_route_test(
+            cmd=fixture_cmd, hub_name=hub_name, source_type="DeviceMessages", messages_file=str(messages_file)
+        )
+        assert result["total"] == 3
+        assert result["unmatched"] == 0
+        assert result["routes"] == {"hot": 1, "warm": 1, "$fallback": 1}
+        assert [r["routes"] for r in result["results"]] == [["hot"], ["warm"], ["$fallback"]]
+
+        with pytest.raises(MutuallyExclusiveArgumentError):
+            subject.message_route_test(
+                cmd=fixture_cmd, hub_name=hub_name, messages_file=str(messages_file), use_service=True
+            )
+
+    def test_use_service(self, fixture_cmd, fixture_routes, mocker):
+        from azext_iot.iothub.providers.message_route import MessageRoute
+
+        test_route = mocker.patch.object(MessageRoute, "_test_with_service")
+        result = subject.message_route_test(
+            cmd=fixture_cmd, hub_name=hub_name, route_name="hot", twin='{"tags": {}}', use_service=True
+        )
+        assert result == test_route.return_value
+        assert test_route.call_args.kwargs["twin"] == {"tags": {}}
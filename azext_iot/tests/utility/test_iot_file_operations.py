@@ -4,9 +4,10 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from azext_iot.common.fileops import tar_directory, write_content_to_file
+from azext_iot.common.fileops import tar_contents, tar_directory, write_content_to_file
 import pytest
 import os
+import tarfile
 from os.path import join, exists
 from azure.cli.core.azclierror import FileOperationError
 
@@ -64,3 +65,33 @@ class TestFileOperations(object):
                     os.rmdir(tarfile_path)
         except Exception as ex:
             assert (error and isinstance(ex, error))
+
+    @pytest.mark.parametrize(
+        "tarfile_path, tarfile_name, overwrite, error, delete_after_test",
+        [
+            ("./", "test_tar_contents", False, None, False),
+            ("./", "test_tar_contents", False, FileOperationError, False),
+            ("./", "test_tar_contents", True, None, True),
+            ("new_dir", "test_tar_contents", True, None, True),
+        ]
+    )
+    def test_tar_contents(self, set_cwd, tarfile_path, tarfile_name, overwrite, error, delete_after_test):
+        contents = {"config.toml": "hostname = \"device\"", "cert.pem": b"certificate_bytes"}
+        try:
+            tar_contents(
+                contents=contents,
+                tarfile_path=tarfile_path,
+                tarfile_name=tarfile_name,
+                overwrite=overwrite
+            )
+            full_path = join(tarfile_path, f"{tarfile_name}.tgz")
+            with tarfile.open(full_path, "r:gz") as tar:
+                assert sorted(tar.getnames()) == sorted(contents.keys())
+                assert tar.extractfile("config.toml").read().decode("utf-8") == contents["config.toml"]
+                assert tar.extractfile("cert.pem").read() == contents["cert.pem"]
+            if delete_after_test:
+                os.remove(full_path)
+                if tarfile_path not in current_or_empty_dirs:
+                    os.rmdir(tarfile_path)
+        except Exception as ex:
+            assert (error and isinstance(ex, error))
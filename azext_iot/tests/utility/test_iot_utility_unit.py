@@ -21,6 +21,9 @@ from azext_iot.common.utility import (
     logger,
     ensure_iothub_sdk_min_version,
     ensure_iotdps_sdk_min_version,
+    expand_id_pattern,
+    read_ids_from_file,
+    get_retry_after,
 )
 from azext_iot.operations.generic import _process_top
 from azext_iot.common.deps import ensure_uamqp
@@ -489,6 +492,20 @@ class TestHandleServiceException(object):
             handle_service_exception(error)
 
 
+class TestGetRetryAfter(object):
+    @pytest.mark.parametrize(
+        "headers, expected",
+        [({"Retry-After": "5"}, 5), ({"Retry-After": "1.5"}, 0), ({"Retry-After": "date"}, 0), ({}, 0)],
+    )
+    def test_get_retry_after(self, headers, expected):
+        error = mock.MagicMock()
+        error.response.headers = headers
+        assert get_retry_after(error) == expected
+
+    def test_get_retry_after_no_response(self):
+        assert get_retry_after(ValueError("no response")) == 0
+
+
 class TestFileHeaders(object):
     def test_file_headers(self):
         from azext_iot.constants import EXTENSION_ROOT
@@ -557,3 +574,34 @@ class TestProcessTop(object):
         assert "top must be > 0" in e.value.error_msg
         if upper_limit:
             assert f" and <= {upper_limit}" in e.value.error_msg
+
+
+class TestExpandIdPattern(object):
+    @pytest.mark.parametrize(
+        "pattern, expected",
+        [
+            ("device-{1..3}", ["device-1", "device-2", "device-3"]),
+            ("device-{08..10}-edge", ["device-08-edge", "device-09-edge", "device-10-edge"]),
+            ("{5..5}", ["5"]),
+        ],
+    )
+    def test_expand_id_pattern(self, pattern, expected):
+        assert list(expand_id_pattern(pattern)) == expected
+
+    @pytest.mark.parametrize("pattern", ["device", "device-{a..b}", "device-{5..1}"])
+    def test_expand_id_pattern_error(self, pattern):
+        # the pattern is validated before any id is consumed
+        with pytest.raises(CLIError):
+            expand_id_pattern(pattern)
+
+
+class TestReadIdsFromFile(object):
+    def test_read_ids_from_file(self, tmp_path):
+        id_file = tmp_path / "ids.txt"
+        id_file.write_text("device-1\n\n  device-2  \n")
+        assert list(read_ids_from_file(str(id_file))) == ["device-1", "device-2"]
+
+    def test_read_ids_from_file_missing(self, tmp_path):
+        # the path is validated before any id is consumed
+        with pytest.raises(CLIError):
+            read_ids_from_file(str(tmp_path / "missing.txt"))
@@ -16,9 +16,15 @@ from azext_iot.central.providers import (
 )
 from azext_iot.central.models.v2022_06_30_preview import TemplatePreview
 from azext_iot.central.models.ga_2022_07_31 import DeviceGa
-from azext_iot.monitor.parsers import common_parser, central_parser
+from azext_iot.monitor.handlers import central_handler
+from azext_iot.monitor.parsers import common_parser, central_parser, issue
 from azext_iot.monitor.parsers import strings
-from azext_iot.monitor.models.arguments import CommonParserArguments
+from azext_iot.monitor.parsers.issue import IssueHandler
+from azext_iot.monitor.models.arguments import (
+    CentralHandlerArguments,
+    CommonHandlerArguments,
+    CommonParserArguments,
+)
 from azext_iot.monitor.models.enum import Severity
 from azext_iot.tests.helpers import load_json
 from azext_iot.tests.test_constants import FileNames
@@ -635,3 +641,86 @@ class TestCentralParser:
             central_template_provider=template_provider,
             common_parser_args=args,
         )
+
+
+class TestCentralHandlerSummary:
+    @pytest.fixture
+    def issue_parser(self, mocker):
+        def _build_parser(message, **kwargs):
+            device_id, template_id, details = message
+            issues_handler = IssueHandler()
+            issues_handler.add_central_issue(
+                severity=Severity.error,
+                details=details,
+                message=None,
+                device_id=device_id,
+                template_id=template_id,
+            )
+            parser = mocker.MagicMock()
+            parser.device_id = device_id
+            parser.module_id = ""
+            parser.issues_handler = issues_handler
+            return parser
+
+        mocker.patch.object(central_handler, "CentralParser", side_effect=_build_parser)
+
+    def _create_handler(self, summary_file, summary_interval=60):
+        common_handler_args = CommonHandlerArguments(
+            output="json", common_parser_args=CommonParserArguments()
+        )
+        central_handler_args = CentralHandlerArguments(
+            duration=0,
+            max_messages=0,
+            common_handler_args=common_handler_args,
+            style="json",
+            progress_interval=1000,
+            summary_file=summary_file,
+            summary_interval=summary_interval,
+        )
+        return central_handler.CentralHandler(
+            central_device_provider=None,
+            central_template_provider=None,
+            central_handler_args=central_handler_args,
+            central_dns_suffix=None,
+        )
+
+    def test_summary_json(self, issue_parser, tmp_path):
+        summary_file = str(tmp_path / "summary.json")
+        handler = self._create_handler(summary_file, summary_interval=3600)
+        handler._issue_summary.max_issue_types = 3
+        for i in range(100):
+            handler.validate_message(("device-{}".format(i % 2), "template", "details {}".format(i % 4)))
+
+        # issues are aggregated, not kept
+        assert not handler._issues
+        assert handler._n_messages == 100
+
+        handler._print_results()
+        with open(summary_file, "r") as f:
+            summary = json.load(f)
+        assert summary["messages"] == 100
+        assert summary["issues"] == 100
+        assert summary["severities"] == {"error": 100}
+        assert summary["devices"] == {"device-0": 50, "device-1": 50}
+        assert summary["templates"] == {"template": 100}
+        # issue types past the limit are combined and samples are bounded
+        assert [t["count"] for t in summary["issueTypes"]] == [25, 25, 25, 25]
+        assert summary["issueTypes"][-1]["details"] == issue.ISSUE_SUMMARY_OTHER_TYPE
+        assert all(len(t["samples"]) == issue.ISSUE_SUMMARY_MAX_SAMPLES for t in summary["issueTypes"])
+        assert summary["issueTypes"][0]["samples"][0]["severity"] == "error"
+
+    def test_summary_csv_flushed_periodically(self, issue_parser, tmp_path):
+        summary_file = tmp_path / "summary.csv"
+        handler = self._create_handler(str(summary_file), summary_interval=0)
+        handler.validate_message(("device-0", "template", "details"))
+        rows = summary_file.read_text().splitlines()
+        assert rows == [
+            "category,key,severity,count",
+            "severity,error,error,1",
+            "device,device-0,,1",
+            "template,template,,1",
+            "issue,details,error,1",
+        ]
+
+        handler.validate_message(("device-1", "template", "details"))
+        assert "issue,details,error,2" in summary_file.read_text().splitlines()